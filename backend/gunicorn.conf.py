@@ -0,0 +1,10 @@
+# Gunicorn settings for the production server (see start-prod.sh)
+
+
+def post_fork(server, worker):
+    """Warm the new worker's caches before it takes requests (requires pim_cache_warmup in site config)"""
+    from imperium_pim.performance.warmup import on_worker_start
+
+    # The arbiter kills a worker silent for --timeout seconds; steps left out
+    # of the budget are built by the first request that needs them
+    on_worker_start(budget=server.cfg.timeout / 2, heartbeat=worker.notify)
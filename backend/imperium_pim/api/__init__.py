@@ -8,3 +8,5 @@ from . import vendors
 from . import attributes
 from . import ping
 from . import permission
+from . import metrics
+from . import profiler
@@ -23,7 +23,9 @@ def get_api_info():
         'endpoints': {
             'ping': {
                 'ping': 'imperium_pim.api.ping.ping',
-                'health_check': 'imperium_pim.api.ping.health_check'
+                'liveness': 'imperium_pim.api.ping.liveness',
+                'health_check': 'imperium_pim.api.ping.health_check',
+                'get_health_details': 'imperium_pim.api.ping.get_health_details'
             },
             'dashboard': {
                 'get_dashboard_stats': 'imperium_pim.api.dashboard.get_dashboard_stats',
@@ -34,7 +36,11 @@ def get_api_info():
                 'get_item_list': 'imperium_pim.api.items.get_item_list',
                 'get_item_details': 'imperium_pim.api.items.get_item_details',
                 'get_items_by_status': 'imperium_pim.api.items.get_items_by_status',
-                'get_items_by_brand': 'imperium_pim.api.items.get_items_by_brand'
+                'get_items_by_brand': 'imperium_pim.api.items.get_items_by_brand',
+                'get_item_facets': 'imperium_pim.api.items.get_item_facets',
+                'resolve_codes': 'imperium_pim.api.items.resolve_codes',
+                'get_kit_components': 'imperium_pim.api.items.get_kit_components',
+                'get_kits_containing': 'imperium_pim.api.items.get_kits_containing'
             },
             'vendors': {
                 'get_vendor_list': 'imperium_pim.api.vendors.get_vendor_list',
@@ -43,6 +49,28 @@ def get_api_info():
             'attributes': {
                 'get_attribute_list': 'imperium_pim.api.attributes.get_attribute_list',
                 'get_attribute_details': 'imperium_pim.api.attributes.get_attribute_details'
+            },
+            'query': {
+                'query': 'imperium_pim.api.query.query'
+            },
+            'changes': {
+                'subscribe': 'imperium_pim.api.changes.subscribe',
+                'get_changes': 'imperium_pim.api.changes.get_changes'
+            },
+            'metrics': {
+                'get_metrics': 'imperium_pim.api.metrics.get_metrics',
+                'get_metrics_summary': 'imperium_pim.api.metrics.get_metrics_summary',
+                'reset_metrics': 'imperium_pim.api.metrics.reset_metrics',
+                'get_query_log': 'imperium_pim.api.metrics.get_query_log',
+                'clear_query_log': 'imperium_pim.api.metrics.clear_query_log',
+                'get_read_model_stats': 'imperium_pim.api.metrics.get_read_model_stats',
+                'rebuild_catalog_snapshot': 'imperium_pim.api.metrics.rebuild_catalog_snapshot'
+            },
+            'profiler': {
+                'create_profile_token': 'imperium_pim.api.profiler.create_profile_token',
+                'list_profiles': 'imperium_pim.api.profiler.list_profiles',
+                'download_profile': 'imperium_pim.api.profiler.download_profile',
+                'clear_profiles': 'imperium_pim.api.profiler.clear_profiles'
             }
         }
     }
@@ -65,7 +93,7 @@ def get_products(limit=50, offset=0):
 
 @frappe.whitelist(allow_guest=True)
 def get_dashboard_data():
-    """Get comprehensive dashboard data"""
+    """Get comprehensive dashboard data; each part is shared by concurrent requests (see performance.cache)"""
     try:
         stats = dashboard.get_dashboard_stats()
         recent_items = dashboard.get_recent_items(limit=5)
@@ -25,16 +25,23 @@ def get_attribute_list(limit=50, filters=None):
             limit=limit
         )
         
+        # Count the values of all attributes on the page in one query
+        values_counts = {}
+        if attributes:
+            values_counts = dict(frappe.get_all('PIM Attribute Value',
+                fields=['pim_attribute', 'count(name) as values_count'],
+                filters={'pim_attribute': ['in', [attr.name for attr in attributes]]},
+                group_by='pim_attribute',
+                as_list=True
+            ))
+        
         # Format the data for frontend consumption
         formatted_attributes = []
         for attr in attributes:
-            # Get attribute values count
-            values_count = frappe.db.count('PIM Attribute Value', {'parent': attr.name})
-            
             formatted_attributes.append({
                 'id': attr.name,
                 'name': attr.name,
-                'values_count': values_count,
+                'values_count': values_counts.get(attr.name, 0),
                 'lastModified': frappe.format_date(attr.modified, 'medium'),
                 'creation': attr.creation,
                 'modified': attr.modified
@@ -56,7 +63,7 @@ def get_attribute_details(attribute_id):
         # Get attribute values
         values = frappe.get_list('PIM Attribute Value',
             fields=['name', 'creation', 'modified'],
-            filters={'parent': attribute_id},
+            filters={'pim_attribute': attribute_id},
             order_by='creation asc'
         )
         
@@ -80,17 +87,17 @@ def get_attribute_values(attribute_id=None, limit=100):
     try:
         filters = {}
         if attribute_id:
-            filters['parent'] = attribute_id
+            filters['pim_attribute'] = attribute_id
             
         values = frappe.get_list('PIM Attribute Value',
             fields=[
                 'name',
-                'parent as attribute_name',
+                'pim_attribute as attribute_name',
                 'creation', 
                 'modified'
             ],
             filters=filters,
-            order_by='parent asc, creation asc',
+            order_by='pim_attribute asc, creation asc',
             limit=limit
         )
         
@@ -123,10 +130,10 @@ def get_attributes_summary():
         # Get attributes with most values
         attributes_with_counts = frappe.db.sql("""
             SELECT 
-                parent as attribute_name,
+                pim_attribute as attribute_name,
                 COUNT(*) as value_count
             FROM `tabPIM Attribute Value`
-            GROUP BY parent
+            GROUP BY pim_attribute
             ORDER BY value_count DESC
             LIMIT 10
         """, as_dict=True)
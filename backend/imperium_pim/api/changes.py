@@ -0,0 +1,65 @@
+import frappe
+
+from imperium_pim.catalog import realtime
+from imperium_pim.catalog.permissions import has_unrestricted_read
+
+def get_readable_doctypes(doctypes=None):
+    """Doctypes with realtime deltas the current user can read, limited to doctypes when given"""
+    if isinstance(doctypes, str):
+        doctypes = frappe.parse_json(doctypes) if doctypes.startswith('[') else [doctypes]
+    return [
+        doctype for doctype in realtime.DELTA_FIELDS
+        if (not doctypes or doctype in doctypes) and frappe.has_permission(doctype, 'read')
+    ]
+
+@frappe.whitelist()
+def subscribe(doctypes=None):
+    """
+    What a client needs to receive catalog changes over socket.io (see catalog.realtime):
+    join each room with `doctype_subscribe`, listen for the event, and after
+    a reconnect pass the last delta id seen to get_changes
+    """
+    
+    try:
+        readable = get_readable_doctypes(doctypes)
+        return {
+            'success': True,
+            'event': realtime.EVENT,
+            'doctypes': readable,
+            'rooms': {doctype: realtime.get_room(doctype) for doctype in readable},
+            'cursor': realtime.get_latest_id()
+        }
+        
+    except Exception as e:
+        frappe.log_error(f"Error subscribing to catalog changes: {str(e)}")
+        return {
+            'success': False,
+            'message': str(e)
+        }
+
+@frappe.whitelist()
+def get_changes(since=None, doctypes=None):
+    """
+    Catalog change deltas published after a delta id; reset means refetch
+    instead. Updated records carry their fields only for doctypes whose rows
+    the user may all read, names otherwise
+    """
+    
+    try:
+        readable = get_readable_doctypes(doctypes)
+        result = realtime.get_changes(
+            since,
+            readable,
+            full_doctypes=[doctype for doctype in readable if has_unrestricted_read(doctype)]
+        )
+        result['success'] = True
+        return result
+        
+    except Exception as e:
+        frappe.log_error(f"Error getting catalog changes: {str(e)}")
+        return {
+            'success': False,
+            'message': str(e),
+            'deltas': [],
+            'reset': True
+        }
@@ -1,80 +1,121 @@
 import frappe
 from frappe import _
 
+from imperium_pim.catalog.attributes import query_permitted_items
+from imperium_pim.catalog.codes import resolve
+from imperium_pim.catalog.facets import get_facet_index, parse_filters, query_page
+from imperium_pim.catalog.kits import get_components, get_containing_kits
+from imperium_pim.catalog.logistics import get_box_filters
+from imperium_pim.catalog.permissions import has_unrestricted_read
+from imperium_pim.catalog.read_model import get_read_model
+from imperium_pim.performance.cache import get_cache_name, get_cached
+
 @frappe.whitelist(allow_guest=True)
-def get_item_list(limit=50, filters=None):
-    """Get list of PIM items with filtering support"""
+def get_item_list(limit=50, filters=None, fits_in_box=None, attributes=None):
+    """Get list of PIM items with filtering support, including shipping metric ranges, box fit and attribute values"""
     
     try:
-        # Build filters
-        filter_dict = {}
-        if filters:
-            if isinstance(filters, str):
-                import json
-                filters = json.loads(filters)
-            filter_dict.update(filters)
+        # Identical pages requested at once are computed once (see performance.cache)
+        name = get_cache_name('item_list', limit, filters, fits_in_box, attributes, user=frappe.session.user)
+        return get_cached(name, lambda: compute_item_list(limit, filters, fits_in_box, attributes))
         
+    except Exception as e:
+        frappe.log_error(f"Error getting item list: {str(e)}")
+        return []
+
+def compute_item_list(limit=50, filters=None, fits_in_box=None, attributes=None):
+    """Item list page formatted for the frontend"""
+    
+    # Build filters
+    filter_dict = {}
+    if filters:
+        if isinstance(filters, str):
+            import json
+            filters = json.loads(filters)
+        filter_dict.update(filters)
+    if fits_in_box:
+        filter_dict.update(get_box_filters(fits_in_box))
+    
+    fields = [
+        'name', 
+        'sku', 
+        'name1 as item_name', 
+        'brand', 
+        'status', 
+        'item_type',
+        'creation', 
+        'modified',
+        'item_weight_lbs',
+        'item_width_inches',
+        'item_height_inches',
+        'item_depth_inches',
+        'carton_billable_weight_lbs',
+        'upc',
+        'vendor_code',
+        'vendor_sku'
+    ]
+    
+    if attributes:
+        # Attribute filters are semi-joins on the assignment index, read through
+        # get_list for users whose rows it filters
+        items = query_permitted_items(
+            filters=filter_dict,
+            attributes=attributes,
+            fields=fields,
+            order_by='modified desc',
+            limit=limit
+        )
+    elif parse_filters(filter_dict) is not None and has_unrestricted_read('PIM Item'):
+        # Facet-only filters are answered by the in-memory bitmap index, for
+        # users whose rows get_list would not filter (see catalog.permissions)
+        items, _total = query_page(filter_dict, fields, limit=limit)
+    else:
         items = frappe.get_list('PIM Item',
-            fields=[
-                'name', 
-                'sku', 
-                'name1 as item_name', 
-                'brand', 
-                'status', 
-                'item_type',
-                'creation', 
-                'modified',
-                'item_weight_lbs',
-                'item_width_inches',
-                'item_height_inches',
-                'item_depth_inches',
-                'upc',
-                'vendor_code',
-                'vendor_sku'
-            ],
+            fields=fields,
             filters=filter_dict,
             order_by='modified desc',
             limit=limit
         )
-        
-        # Format the data for frontend consumption
-        formatted_items = []
-        for item in items:
-            formatted_items.append({
-                'id': item.name,
-                'name': item.item_name or item.sku,
-                'sku': item.sku,
-                'status': item.status or 'New',
-                'brand': item.brand,
-                'type': item.item_type,
-                'weight': item.item_weight_lbs,
-                'dimensions': {
-                    'width': item.item_width_inches,
-                    'height': item.item_height_inches,
-                    'depth': item.item_depth_inches
-                },
-                'upc': item.upc,
-                'vendor_code': item.vendor_code,
-                'vendor_sku': item.vendor_sku,
-                'price': '$0.00',  # No price field in current structure
-                'stock': 0,  # No stock field in current structure
-                'lastModified': frappe.format_date(item.modified, 'medium'),
-                'creation': item.creation,
-                'modified': item.modified
-            })
-        
-        return formatted_items
-        
-    except Exception as e:
-        frappe.log_error(f"Error getting item list: {str(e)}")
-        return []
+    
+    # Format the data for frontend consumption
+    formatted_items = []
+    for item in items:
+        formatted_items.append({
+            'id': item.name,
+            'name': item.item_name or item.sku,
+            'sku': item.sku,
+            'status': item.status or 'New',
+            'brand': item.brand,
+            'type': item.item_type,
+            'weight': item.item_weight_lbs,
+            'dimensions': {
+                'width': item.item_width_inches,
+                'height': item.item_height_inches,
+                'depth': item.item_depth_inches
+            },
+            'billable_weight': item.carton_billable_weight_lbs,
+            'upc': item.upc,
+            'vendor_code': item.vendor_code,
+            'vendor_sku': item.vendor_sku,
+            'price': '$0.00',  # No price field in current structure
+            'stock': 0,  # No stock field in current structure
+            'lastModified': frappe.format_date(item.modified, 'medium'),
+            'creation': item.creation,
+            'modified': item.modified
+        })
+    
+    return formatted_items
 
 @frappe.whitelist(allow_guest=True)
 def get_item_details(item_id):
     """Get detailed information for a specific PIM item"""
     
     try:
-        item = frappe.get_doc('PIM Item', item_id)
+        # Served from the in-memory read model when enabled, with the same fields as the document
+        model = get_read_model()
+        item = model.get(item_id) if model else None
+        if item is None:
+            item = frappe.get_doc('PIM Item', item_id)
         
         return {
             'id': item.name,
@@ -99,6 +140,22 @@ def get_item_details(item_id):
                     'weight': item.carton_weight_lbs
                 }
             },
+            'shipping': {
+                'cubic_feet': item.carton_cubic_feet,
+                'dim_weight': item.carton_dim_weight_lbs,
+                'billable_weight': item.carton_billable_weight_lbs,
+                'longest_side': item.carton_longest_side_inches,
+                'girth': item.carton_girth_inches,
+                'length_plus_girth': item.carton_length_girth_inches
+            },
+            'attributes': [
+                {
+                    'attribute': row.pim_attribute,
+                    'value': row.pim_attribute_value,
+                    'value_name': row.attribute_value_name
+                }
+                for row in item.item_attributes
+            ],
             'vendor_info': {
                 'upc': item.upc,
                 'vendor_code': item.vendor_code,
@@ -141,3 +198,104 @@ def get_items_by_brand(brand=None):
     except Exception as e:
         frappe.log_error(f"Error getting items by brand {brand}: {str(e)}")
         return []
+
+@frappe.whitelist()
+def get_item_facets(filters=None, fields=None):
+    """Count items per value of each facet field, e.g. for a filter sidebar"""
+    
+    try:
+        frappe.has_permission('PIM Item', 'read', throw=True)
+        
+        if isinstance(filters, str):
+            filters = frappe.parse_json(filters)
+        if isinstance(fields, str):
+            fields = frappe.parse_json(fields) if fields.lstrip().startswith('[') else fields.split(',')
+        
+        index = get_facet_index()
+        return {
+            'success': True,
+            'total': index.count(filters),
+            'facets': index.facet_counts(filters, fields=[field.strip() for field in fields or []] or None)
+        }
+        
+    except frappe.PermissionError:
+        raise
+    except Exception as e:
+        frappe.log_error(f"Error getting item facets: {str(e)}")
+        return {
+            'success': False,
+            'message': str(e),
+            'total': 0,
+            'facets': {}
+        }
+
+@frappe.whitelist()
+def resolve_codes(codes, kind='upc', vendor=None):
+    """Resolve up to 10,000 UPCs, SKUs or vendor SKUs to PIM items in one call"""
+    
+    try:
+        frappe.has_permission('PIM Item', 'read', throw=True)
+        
+        result = resolve(codes, kind=kind, vendor=vendor)
+        result['success'] = True
+        return result
+        
+    except frappe.PermissionError:
+        raise
+    except Exception as e:
+        frappe.log_error(f"Error resolving {kind} codes: {str(e)}")
+        return {
+            'success': False,
+            'message': str(e),
+            'resolved': {},
+            'missing': [],
+            'ambiguous': []
+        }
+
+def add_item_details(rows, key):
+    """Attach name and status of the item in rows[key] with one query for the whole list"""
+    names = list({row[key] for row in rows})
+    items = {
+        item.name: item
+        for item in frappe.get_all('PIM Item',
+            filters={'name': ['in', names]},
+            fields=['name', 'name1', 'status', 'item_type']
+        )
+    } if names else {}
+    
+    for row in rows:
+        item = items.get(row[key]) or {}
+        row['name'] = item.get('name1')
+        row['status'] = item.get('status')
+        row['type'] = item.get('item_type')
+    return rows
+
+@frappe.whitelist(allow_guest=True)
+def get_kit_components(item_id, max_depth=None):
+    """Get every component of a kit at any level, with quantities per kit"""
+    
+    try:
+        frappe.has_permission('PIM Item', 'read', item_id, throw=True)
+        
+        return add_item_details(get_components(item_id, max_depth=max_depth), 'component')
+        
+    except frappe.PermissionError:
+        raise
+    except Exception as e:
+        frappe.log_error(f"Error getting kit components for {item_id}: {str(e)}")
+        return []
+
+@frappe.whitelist(allow_guest=True)
+def get_kits_containing(item_id):
+    """Get every kit that contains an item at any level"""
+    
+    try:
+        frappe.has_permission('PIM Item', 'read', item_id, throw=True)
+        
+        return add_item_details(get_containing_kits(item_id), 'kit')
+        
+    except frappe.PermissionError:
+        raise
+    except Exception as e:
+        frappe.log_error(f"Error getting kits containing {item_id}: {str(e)}")
+        return []
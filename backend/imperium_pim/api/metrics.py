@@ -0,0 +1,101 @@
+import frappe
+from werkzeug.wrappers import Response
+
+from imperium_pim.catalog.read_model import get_read_model, is_enabled as read_model_enabled
+from imperium_pim.catalog.snapshot import enqueue_snapshot_build
+from imperium_pim.performance.metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    get_method_stats,
+    render_prometheus,
+    reset_metrics as reset_method_metrics,
+    summarize
+)
+from imperium_pim.performance.query_log import clear_flagged_requests, get_flagged_requests
+
+@frappe.whitelist()
+def get_metrics():
+    """
+    Request metrics in Prometheus text format
+
+    Scrape with an API key of a System Manager:
+        Authorization: token <api_key>:<api_secret>
+    """
+    frappe.only_for("System Manager")
+    return Response(render_prometheus(get_method_stats()), content_type=PROMETHEUS_CONTENT_TYPE)
+
+@frappe.whitelist()
+def get_metrics_summary(sort_by="total_seconds", limit=50):
+    """Per-method latency, error and query summary for the dashboard of System Managers"""
+    frappe.only_for("System Manager")
+    
+    try:
+        rows = summarize(get_method_stats(), sort_by=sort_by)
+        return {
+            'success': True,
+            'methods': rows[:int(limit)],
+            'total_requests': sum(row['count'] for row in rows),
+            'timestamp': frappe.utils.now()
+        }
+    except Exception as e:
+        frappe.log_error(f"Error getting metrics summary: {str(e)}")
+        return {
+            'success': False,
+            'message': f'Error getting metrics summary: {str(e)}',
+            'methods': []
+        }
+
+@frappe.whitelist(methods=["POST"])
+def reset_metrics():
+    """Clear all collected request metrics"""
+    frappe.only_for("System Manager")
+    reset_method_metrics()
+    return {
+        'success': True,
+        'message': 'Metrics have been reset'
+    }
+
+@frappe.whitelist()
+def get_query_log(limit=50):
+    """Requests flagged for repeated query shapes (requires pim_query_log in site config)"""
+    frappe.only_for("System Manager")
+    return {
+        'success': True,
+        'enabled': bool(frappe.conf.get('pim_query_log')),
+        'requests': get_flagged_requests(limit)
+    }
+
+@frappe.whitelist(methods=["POST"])
+def clear_query_log():
+    """Clear the flagged request log"""
+    frappe.only_for("System Manager")
+    clear_flagged_requests()
+    return {
+        'success': True,
+        'message': 'Query log has been cleared'
+    }
+
+@frappe.whitelist()
+def get_read_model_stats():
+    """Size and memory footprint of this worker's catalog read model (requires pim_item_read_model or pim_catalog_snapshot in site config)"""
+    frappe.only_for("System Manager")
+    model = get_read_model()
+    return {
+        'success': True,
+        'enabled': read_model_enabled(),
+        'memory': model.memory_usage() if model else None
+    }
+
+@frappe.whitelist(methods=["POST"])
+def rebuild_catalog_snapshot():
+    """Queue a rebuild of the shared catalog snapshot (requires pim_catalog_snapshot in site config)"""
+    frappe.only_for("System Manager")
+    if not frappe.conf.get('pim_catalog_snapshot'):
+        return {
+            'success': False,
+            'message': 'pim_catalog_snapshot is not enabled in site config'
+        }
+    queued = enqueue_snapshot_build()
+    return {
+        'success': queued,
+        'message': 'Catalog snapshot rebuild has been queued' if queued else 'A catalog snapshot rebuild is already queued'
+    }
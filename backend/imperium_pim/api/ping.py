@@ -1,6 +1,10 @@
+import os
+
 import frappe
 from frappe.utils import now
 
+from imperium_pim.performance.health import run_checks
+
 @frappe.whitelist(allow_guest=True)
 def ping():
     """Simple ping endpoint to test API connectivity"""
@@ -11,27 +15,53 @@ def ping():
         'version': '1.0.0'
     }
 
+@frappe.whitelist(allow_guest=True)
+def liveness():
+    """
+    Cheap liveness probe for load balancers
+
+    Does no database or Redis work; it only shows the web worker can serve
+    requests. Use health_check for readiness.
+    """
+    return {
+        'status': 'ok',
+        'timestamp': now(),
+        'pid': os.getpid()
+    }
+
 @frappe.whitelist()
 def health_check():
-    """Detailed health check endpoint"""
+    """
+    Readiness endpoint
+
+    Reports the overall status of the checks in performance.health and
+    responds with HTTP 503 when the database or Redis is down. Their
+    measurements are served to System Managers by get_health_details.
+    """
     try:
-        # Test database connectivity
-        frappe.db.sql("SELECT 1")
+        status, checks = run_checks()
         
-        # Get basic system info
-        site_config = frappe.get_site_config()
+        if status == 'unhealthy':
+            frappe.local.response['http_status_code'] = 503
         
         return {
-            'status': 'healthy',
-            'message': 'All systems operational',
+            'status': status,
+            'message': {
+                'healthy': 'All systems operational',
+                'degraded': 'Operational with degraded checks: ' + ', '.join(
+                    name for name, check in checks.items() if check['status'] != 'ok'
+                ),
+                'unhealthy': 'Database or cache unavailable'
+            }[status],
             'timestamp': now(),
-            'database': 'connected',
+            'database': 'connected' if checks['database']['status'] != 'down' else 'error',
             'site': frappe.local.site,
             'version': frappe.__version__,
             'app_version': '1.0.0'
         }
     except Exception as e:
         frappe.log_error(f"Health check failed: {str(e)}")
+        frappe.local.response['http_status_code'] = 503
         return {
             'status': 'unhealthy',
             'message': f'System error: {str(e)}',
@@ -39,3 +69,19 @@ def health_check():
             'database': 'error',
             'site': frappe.local.site if hasattr(frappe.local, 'site') else 'unknown'
         }
+
+@frappe.whitelist()
+def get_health_details():
+    """
+    Diagnostics for System Managers: DB and Redis round-trip latency,
+    background queue depth and oldest job age, cache hit ratios, PIM table
+    sizes and recent slow requests
+    """
+    frappe.only_for("System Manager")
+    
+    status, checks = run_checks()
+    return {
+        'status': status,
+        'timestamp': now(),
+        'checks': checks
+    }
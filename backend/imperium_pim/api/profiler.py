@@ -0,0 +1,79 @@
+import base64
+
+import frappe
+from werkzeug.wrappers import Response
+
+from imperium_pim.performance import profiler
+
+@frappe.whitelist(methods=["POST"])
+def create_profile_token(expires_in=3600):
+    """
+    Mint a token that enables profiling for requests sending it
+
+    Send it as the X-PIM-Profile header, optionally with
+    X-PIM-Profile-Mode: sample | cprofile
+    """
+    token = profiler.create_token(expires_in)
+    return {
+        'success': True,
+        'header': profiler.PROFILE_HEADER,
+        'token': token
+    }
+
+@frappe.whitelist()
+def list_profiles(limit=20):
+    """List the most recent request profiles"""
+    frappe.only_for("System Manager")
+    
+    try:
+        return {
+            'success': True,
+            'profiles': profiler.list_profiles(limit)
+        }
+    except Exception as e:
+        frappe.log_error(f"Error listing profiles: {str(e)}")
+        return {
+            'success': False,
+            'message': f'Error listing profiles: {str(e)}',
+            'profiles': []
+        }
+
+@frappe.whitelist()
+def download_profile(profile_id, fmt=None):
+    """
+    Download a stored profile
+
+    fmt: "collapsed" (sampling profiles, for flame graphs), "pstats" (cProfile
+    data for snakeviz or pstats) or "text" (cProfile summary). Defaults to
+    the natural format of the profile.
+    """
+    frappe.only_for("System Manager")
+    
+    record = profiler.get_profile(profile_id)
+    if not record:
+        frappe.throw(f"Profile {profile_id} not found or expired", frappe.DoesNotExistError)
+    
+    fmt = fmt or ('collapsed' if record['mode'] == 'sample' else 'pstats')
+    if fmt == 'collapsed' and record.get('collapsed') is not None:
+        data, content_type, extension = record['collapsed'], 'text/plain; charset=utf-8', 'txt'
+    elif fmt == 'pstats' and record.get('pstats'):
+        data, content_type, extension = base64.b64decode(record['pstats']), 'application/octet-stream', 'prof'
+    elif fmt == 'text' and record.get('text'):
+        data, content_type, extension = record['text'], 'text/plain; charset=utf-8', 'txt'
+    else:
+        frappe.throw(f"Profile {profile_id} has no {fmt} data")
+    
+    filename = f"{record['method'].rsplit('.', 1)[-1]}-{profile_id}.{extension}"
+    response = Response(data, content_type=content_type)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@frappe.whitelist(methods=["POST"])
+def clear_profiles():
+    """Delete all stored profiles"""
+    frappe.only_for("System Manager")
+    profiler.clear_profiles()
+    return {
+        'success': True,
+        'message': 'Profiles have been cleared'
+    }
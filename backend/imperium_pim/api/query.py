@@ -0,0 +1,26 @@
+import frappe
+
+from imperium_pim.catalog.relations import run_query
+
+@frappe.whitelist(methods=["GET", "POST"])
+def query(root='items', selection=None):
+    """Items, vendors or attributes with nested relations, one batched query per relation (see catalog.relations)"""
+    
+    try:
+        if isinstance(selection, str):
+            selection = frappe.parse_json(selection)
+        
+        result = run_query(root, selection or {})
+        result['success'] = True
+        return result
+        
+    except frappe.PermissionError:
+        raise
+    except Exception as e:
+        frappe.log_error(f"Error running {root} query: {str(e)}")
+        return {
+            'success': False,
+            'message': str(e),
+            'data': [],
+            'queries': 0
+        }
@@ -1,58 +1,65 @@
 import frappe
 from frappe import _
 
+from imperium_pim.performance.cache import get_cache_name, get_cached
+
 @frappe.whitelist()
 def get_vendor_list(limit=50, filters=None):
     """Get list of PIM vendors with filtering support"""
     
     try:
-        # Build filters
-        filter_dict = {}
-        if filters:
-            if isinstance(filters, str):
-                import json
-                filters = json.loads(filters)
-            filter_dict.update(filters)
-        
-        vendors = frappe.get_list('PIM Vendor',
-            fields=[
-                'name', 
-                'vendor_name', 
-                'vendor_code', 
-                'vendor_active',
-                'vendor_integration_enabled',
-                'vendor_last_sync',
-                'vendor_api_base_url',
-                'creation', 
-                'modified'
-            ],
-            filters=filter_dict,
-            order_by='modified desc',
-            limit=limit
-        )
-        
-        # Format the data for frontend consumption
-        formatted_vendors = []
-        for vendor in vendors:
-            formatted_vendors.append({
-                'id': vendor.name,
-                'name': vendor.vendor_name,
-                'code': vendor.vendor_code,
-                'active': vendor.vendor_active,
-                'integration_enabled': vendor.vendor_integration_enabled,
-                'last_sync': vendor.vendor_last_sync,
-                'api_url': vendor.vendor_api_base_url,
-                'lastModified': frappe.format_date(vendor.modified, 'medium'),
-                'creation': vendor.creation,
-                'modified': vendor.modified
-            })
-        
-        return formatted_vendors
+        return compute_vendor_list(limit, filters)
         
     except Exception as e:
         frappe.log_error(f"Error getting vendor list: {str(e)}")
         return []
 
+def compute_vendor_list(limit=50, filters=None):
+    """Vendor list formatted for the frontend"""
+    
+    # Build filters
+    filter_dict = {}
+    if filters:
+        if isinstance(filters, str):
+            import json
+            filters = json.loads(filters)
+        filter_dict.update(filters)
+    
+    vendors = frappe.get_list('PIM Vendor',
+        fields=[
+            'name', 
+            'vendor_name', 
+            'vendor_code', 
+            'vendor_active',
+            'vendor_integration_enabled',
+            'vendor_last_sync',
+            'vendor_api_base_url',
+            'creation', 
+            'modified'
+        ],
+        filters=filter_dict,
+        order_by='modified desc',
+        limit=limit
+    )
+    
+    # Format the data for frontend consumption
+    formatted_vendors = []
+    for vendor in vendors:
+        formatted_vendors.append({
+            'id': vendor.name,
+            'name': vendor.vendor_name,
+            'code': vendor.vendor_code,
+            'active': vendor.vendor_active,
+            'integration_enabled': vendor.vendor_integration_enabled,
+            'last_sync': vendor.vendor_last_sync,
+            'api_url': vendor.vendor_api_base_url,
+            'lastModified': frappe.format_date(vendor.modified, 'medium'),
+            'creation': vendor.creation,
+            'modified': vendor.modified
+        })
+    
+    return formatted_vendors
+
 @frappe.whitelist()
 def get_vendor_details(vendor_id):
     """Get detailed information for a specific PIM vendor"""
@@ -91,10 +98,13 @@ def get_vendor_details(vendor_id):
 
 @frappe.whitelist()
 def get_active_vendors():
-    """Get list of active vendors only"""
+    """Get list of active vendors only, cached for all workers (see performance.cache)"""
     
     try:
-        return get_vendor_list(filters={'vendor_active': 1})
+        frappe.has_permission('PIM Vendor', 'read', throw=True)
+        # get_list filters vendors by the user's permissions, so each user has their own entry
+        name = get_cache_name('active_vendors', user=frappe.session.user)
+        return get_cached(name, lambda: compute_vendor_list(filters={'vendor_active': 1}))
         
     except Exception as e:
         frappe.log_error(f"Error getting active vendors: {str(e)}")
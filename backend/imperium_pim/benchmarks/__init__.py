@@ -0,0 +1,4 @@
+# Benchmarks for Imperium PIM
+#
+# Scripts that measure throughput and memory of performance-sensitive paths.
+# Each module can be run directly with python -m or through bench execute.
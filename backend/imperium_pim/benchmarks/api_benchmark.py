@@ -0,0 +1,305 @@
+"""
+API benchmark suite
+
+Times the read endpoints of imperium_pim.api.* and the whitelisted methods of
+PIM Vendor and PIM Item against synthetic catalogs of increasing size (see
+benchmarks.seed). Every method is called in-process as Administrator, so the
+numbers cover the Python and database work of a request without HTTP or
+session overhead. The shared endpoint cache (performance.cache) is
+invalidated before every timed call, so cached endpoints are timed computing
+their result rather than reading it back.
+
+For each data size and method the report holds median, p95 and min
+milliseconds and the number of queries per call. Pass a previous report as
+the baseline to flag methods that got slower or issue more queries:
+
+    python -m imperium_pim.benchmarks.api_benchmark --site [site-name] --sizes small medium --output before.json
+    python -m imperium_pim.benchmarks.api_benchmark --site [site-name] --sizes small medium --baseline before.json
+
+The command exits non-zero when regressions are found, so it can gate CI.
+Seeding replaces previously seeded data; pass --keep to leave the last
+catalog in place afterwards.
+
+Usage:
+    bench --site [site-name] execute imperium_pim.benchmarks.api_benchmark.run --kwargs "{'sizes': ['small']}"
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+import frappe
+from frappe.utils import now
+
+from imperium_pim.benchmarks import seed
+from imperium_pim.performance.cache import invalidate_cache
+from imperium_pim.performance.db_tracer import QueryTracer
+
+# Latency growth, as a fraction of the baseline, reported as a regression
+DEFAULT_TOLERANCE = 0.2
+
+# Differences below this many milliseconds are noise
+MIN_REGRESSION_MS = 2.0
+
+
+def sample_vendor():
+    return seed.vendor_code(1)
+
+
+def sample_item():
+    return f"{seed.vendor_code(1)}-{0:07d}"
+
+
+def sample_attribute():
+    return seed.attribute_code(1)
+
+
+def sample_attribute_filter(attributes):
+    """Two values of each of the first attributes items are seeded with"""
+    return {
+        seed.attribute_code(a): [f"{seed.attribute_code(a)}-value-1", f"{seed.attribute_code(a)}-value-2"]
+        for a in range(1, attributes + 1)
+    }
+
+
+# (method path, kwargs factory). Factories run after seeding so they can
+# point at seeded records. Only read-only methods belong here.
+BENCHMARKS = [
+    ("imperium_pim.api.ping.ping", dict),
+    ("imperium_pim.api.ping.health_check", dict),
+    ("imperium_pim.api.api.get_api_info", dict),
+    ("imperium_pim.api.api.get_stats", dict),
+    ("imperium_pim.api.api.get_items", lambda: {"limit": 50}),
+    ("imperium_pim.api.dashboard.get_dashboard_stats", dict),
+    ("imperium_pim.api.dashboard.get_recent_items", lambda: {"limit": 10}),
+    ("imperium_pim.api.dashboard.get_recent_vendors", lambda: {"limit": 10}),
+    ("imperium_pim.api.items.get_item_list", lambda: {"limit": 50}),
+    ("imperium_pim.api.items.get_item_list", lambda: {"limit": 50, "filters": {"status": "Current"}}),
+    ("imperium_pim.api.items.get_item_list", lambda: {"limit": 50, "attributes": sample_attribute_filter(1)}),
+    ("imperium_pim.api.items.get_item_list", lambda: {
+        "limit": 50, "filters": {"status": "Current"}, "attributes": sample_attribute_filter(3)
+    }),
+    ("imperium_pim.api.items.get_item_facets", lambda: {"filters": {"status": "Current"}}),
+    ("imperium_pim.api.items.get_item_details", lambda: {"item_id": sample_item()}),
+    ("imperium_pim.api.items.get_items_by_status", lambda: {"status": "Discontinued"}),
+    ("imperium_pim.api.items.get_items_by_brand", lambda: {"brand": frappe.db.get_value("PIM Item", sample_item(), "brand")}),
+    ("imperium_pim.api.vendors.get_vendor_list", lambda: {"limit": 50}),
+    ("imperium_pim.api.vendors.get_vendor_details", lambda: {"vendor_id": sample_vendor()}),
+    ("imperium_pim.api.vendors.get_active_vendors", dict),
+    ("imperium_pim.api.vendors.get_vendors_with_integration", dict),
+    ("imperium_pim.api.vendors.get_vendor_items", lambda: {"vendor_code": sample_vendor(), "limit": 50}),
+    ("imperium_pim.api.attributes.get_attribute_list", lambda: {"limit": 50}),
+    ("imperium_pim.api.attributes.get_attribute_details", lambda: {"attribute_id": sample_attribute()}),
+    ("imperium_pim.api.attributes.get_attribute_values", lambda: {"attribute_id": sample_attribute()}),
+    ("imperium_pim.api.attributes.get_attributes_summary", dict),
+    ("imperium_pim.api.query.query", lambda: {"root": "items", "selection": {
+        "fields": ["name", "sku", "name1", "status"],
+        "limit": 50,
+        "vendor": {"fields": ["vendor_name", "vendor_active"]},
+        "attributes": {"fields": ["attribute_value_name"], "attribute": {"fields": ["attribute_name"]}}
+    }}),
+    ("imperium_pim.pim.doctype.pim_vendor.pim_vendor.get_attribute_mapping_data", lambda: {"vendor": sample_vendor()}),
+    ("imperium_pim.pim.doctype.pim_item.pim_item.get_items", lambda: {"limit": 50}),
+    ("imperium_pim.pim.doctype.pim_item.pim_item.validate_sku_uniqueness", lambda: {"sku": sample_item()}),
+    ("imperium_pim.pim.doctype.pim_item.pim_item.get_vendor_info", lambda: {"vendor_code": sample_vendor()})
+]
+
+
+def benchmark_key(method, kwargs):
+    """Report key of one benchmark; methods run with several argument sets get a suffix"""
+    variants = [kwargs[key] for key in ("filters", "attributes") if kwargs.get(key)]
+    return method + "".join(f"[{json.dumps(variant, sort_keys=True)}]" for variant in variants)
+
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def time_method(method, kwargs, iterations=20, warmup=3):
+    """
+    Call a whitelisted method repeatedly
+
+    Returns:
+        dict: median, p95 and min milliseconds, queries per call and whether
+              the method reported success
+    """
+    fn = frappe.get_attr(method)
+
+    for _ in range(warmup):
+        result = fn(**kwargs)
+        frappe.db.rollback()
+
+    timings = []
+    with QueryTracer() as tracer:
+        for _ in range(iterations):
+            invalidate_cache()
+            start = time.perf_counter()
+            result = fn(**kwargs)
+            timings.append((time.perf_counter() - start) * 1000)
+    frappe.db.rollback()
+
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "min_ms": round(min(timings), 3),
+        "queries": round(tracer.count / iterations, 1),
+        "success": result.get("success", True) if isinstance(result, dict) else True
+    }
+
+
+def run_size(size, iterations=20, warmup=3):
+    """Seed one catalog size and benchmark every method against it"""
+    seed.cleanup()
+    seeded = seed.seed(size=size)
+    frappe.clear_cache()
+
+    results = {}
+    for method, kwargs_factory in BENCHMARKS:
+        kwargs = kwargs_factory()
+        key = benchmark_key(method, kwargs)
+        try:
+            results[key] = time_method(method, kwargs, iterations=iterations, warmup=warmup)
+        except Exception as e:
+            frappe.db.rollback()
+            results[key] = {"error": str(e)}
+
+    return {"seeded": seeded["doctypes"], "methods": results}
+
+
+def compare(baseline, report, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare two reports
+
+    A method regresses when its median grows by more than `tolerance` (and
+    by at least MIN_REGRESSION_MS) or when it issues more queries per call.
+
+    Returns:
+        list: one dict per regression
+    """
+    regressions = []
+
+    for size, current in report["sizes"].items():
+        previous = baseline.get("sizes", {}).get(size)
+        if not previous:
+            continue
+
+        for key, result in current["methods"].items():
+            before = previous["methods"].get(key)
+            if not before or "error" in before:
+                continue
+            if "error" in result:
+                regressions.append({"size": size, "method": key, "reason": "error", "detail": result["error"]})
+                continue
+
+            growth = result["median_ms"] - before["median_ms"]
+            if growth > MIN_REGRESSION_MS and growth > before["median_ms"] * tolerance:
+                regressions.append({
+                    "size": size,
+                    "method": key,
+                    "reason": "latency",
+                    "before_ms": before["median_ms"],
+                    "after_ms": result["median_ms"]
+                })
+            if result["queries"] > before["queries"]:
+                regressions.append({
+                    "size": size,
+                    "method": key,
+                    "reason": "queries",
+                    "before": before["queries"],
+                    "after": result["queries"]
+                })
+
+    return regressions
+
+
+def get_environment():
+    return {
+        "timestamp": now(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "db_type": frappe.db.db_type,
+        "frappe_version": frappe.__version__
+    }
+
+
+def run(sizes=("small",), iterations=20, warmup=3, baseline=None, tolerance=DEFAULT_TOLERANCE, keep=False):
+    """
+    Benchmark every method at each catalog size
+
+    Args:
+        sizes (list): seed presets, smallest first
+        iterations (int): timed calls per method
+        warmup (int): untimed calls per method
+        baseline (dict): previous report to compare against
+        tolerance (float): latency growth tolerated before flagging
+        keep (bool): leave the last seeded catalog in place
+
+    Returns:
+        dict: environment, per-size results and regressions against the baseline
+    """
+    frappe.set_user("Administrator")
+    report = {
+        "environment": get_environment(),
+        "iterations": iterations,
+        "sizes": {}
+    }
+
+    try:
+        for size in sizes:
+            report["sizes"][size] = run_size(size, iterations=iterations, warmup=warmup)
+    finally:
+        if not keep:
+            seed.cleanup()
+
+    if baseline:
+        report["regressions"] = compare(baseline, report, tolerance)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--site", required=True)
+    parser.add_argument("--sizes", nargs="+", choices=list(seed.PRESETS), default=["small"])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--baseline", help="previous report to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--output", help="write the report to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the last seeded catalog")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    frappe.init(site=args.site)
+    frappe.connect()
+    try:
+        report = run(
+            sizes=args.sizes,
+            iterations=args.iterations,
+            warmup=args.warmup,
+            baseline=baseline,
+            tolerance=args.tolerance,
+            keep=args.keep
+        )
+    finally:
+        frappe.destroy()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Streaming feed parser benchmark
+
+Writes a synthetic vendor feed (1M records by default) to a temporary file in
+each supported format, then parses it in fixed-size batches with the
+streaming readers from vendor_sync.feeds, reporting records/sec and peak
+Python memory. With --compare the same JSON feed is also loaded with
+json.load for reference.
+
+Usage:
+    python -m imperium_pim.benchmarks.feed_parser --records 1000000
+    python -m imperium_pim.benchmarks.feed_parser --records 200000 --compare
+"""
+
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from imperium_pim.vendor_sync.feeds import get_record_reader, iter_batches
+
+FORMATS = ("json", "ndjson", "csv")
+
+
+def synthetic_record(i):
+    """A vendor master item record of realistic size (~400 bytes)"""
+    return {
+        "vendor_sku": f"SKU{i:08d}",
+        "name": f"Synthetic Item {i} with a reasonably long descriptive title",
+        "brand": f"Brand {i % 250}",
+        "upc": f"{100000000000 + i:012d}",
+        "type": ("Component", "Item", "Kit")[i % 3],
+        "width": round(10 + (i % 50) * 0.5, 2),
+        "depth": round(12 + (i % 40) * 0.5, 2),
+        "height": round(8 + (i % 30) * 0.5, 2),
+        "weight": round(5 + (i % 100) * 0.25, 2),
+        "carton_width": round(12 + (i % 50) * 0.5, 2),
+        "carton_depth": round(14 + (i % 40) * 0.5, 2),
+        "carton_height": round(10 + (i % 30) * 0.5, 2),
+        "carton_weight": round(7 + (i % 100) * 0.25, 2),
+        "color": ("Black", "White", "Oak", "Walnut", "Grey")[i % 5],
+        "material": ("Wood", "Metal", "Fabric", "Leather")[i % 4]
+    }
+
+
+def write_feed(path, fmt, count):
+    """Write a synthetic feed without holding it in memory"""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "json":
+            f.write('{"total": %d, "data": [' % count)
+            for i in range(count):
+                if i:
+                    f.write(",")
+                f.write(json.dumps(synthetic_record(i)))
+            f.write("]}")
+        elif fmt == "ndjson":
+            for i in range(count):
+                f.write(json.dumps(synthetic_record(i)))
+                f.write("\n")
+        else:
+            writer = csv.DictWriter(f, fieldnames=list(synthetic_record(0)))
+            writer.writeheader()
+            for i in range(count):
+                writer.writerow(synthetic_record(i))
+
+
+def measure(fn):
+    """
+    Run fn twice and return (result, seconds, peak traced bytes)
+
+    Timing and memory come from separate runs since tracemalloc slows
+    allocation-heavy code down several times.
+    """
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def parse_streaming(path, fmt, batch_size):
+    with open(path, "rb") as f:
+        count = 0
+        for batch in iter_batches(get_record_reader(f, fmt), batch_size):
+            count += len(batch)
+        return count
+
+
+def parse_json_load(path):
+    with open(path, "rb") as f:
+        return len(json.load(f)["data"])
+
+
+def run(records=1000000, batch_size=1000, formats=FORMATS, compare=False):
+    """
+    Run the benchmark
+
+    Returns:
+        dict: per-format file size, records/sec and peak memory
+    """
+    report = {"records": records, "batch_size": batch_size, "results": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in formats:
+            path = os.path.join(tmp, f"feed.{fmt}")
+            write_feed(path, fmt, records)
+            size = os.path.getsize(path)
+
+            count, elapsed, peak = measure(lambda: parse_streaming(path, fmt, batch_size))
+            assert count == records, f"{fmt}: parsed {count} of {records} records"
+            report["results"][fmt] = {
+                "file_mb": round(size / 1048576, 1),
+                "seconds": round(elapsed, 2),
+                "records_per_second": round(records / elapsed),
+                "peak_memory_mb": round(peak / 1048576, 2)
+            }
+
+            if compare and fmt == "json":
+                count, elapsed, peak = measure(lambda: parse_json_load(path))
+                report["results"]["json.load"] = {
+                    "file_mb": round(size / 1048576, 1),
+                    "seconds": round(elapsed, 2),
+                    "records_per_second": round(records / elapsed),
+                    "peak_memory_mb": round(peak / 1048576, 2)
+                }
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--compare", action="store_true", help="also measure json.load")
+    args = parser.parse_args()
+
+    report = run(args.records, args.batch_size, args.formats, args.compare)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
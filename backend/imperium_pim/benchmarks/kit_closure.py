@@ -0,0 +1,257 @@
+"""
+Kit closure benchmark
+
+Builds a synthetic bill of materials out of PIM Items and kit component rows,
+then compares exploding it through the PIM Kit Closure table with walking the
+component tables level by level, and times closure maintenance:
+
+    build           rebuild_all() over the whole BOM
+    explode         all components of the root kit, closure vs level-by-level walk
+    containing      all kits containing a leaf component, closure vs walk upwards
+    update          rebuild_closure() after changing a quantity in the deepest kit
+
+Two shapes are available:
+
+    wide    every kit has `width` sub-kits down to `depth` levels, leaves are
+            components (width ** depth leaves)
+    deep    a chain of `depth` kits, each holding the next kit and `width - 1`
+            components
+
+Usage:
+    bench --site [site-name] execute imperium_pim.benchmarks.kit_closure.run --kwargs "{'shape': 'deep', 'depth': 50}"
+    python -m imperium_pim.benchmarks.kit_closure --site [site-name] --shape wide --depth 4 --width 8
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import frappe
+from frappe.utils import now
+
+from imperium_pim.catalog.changes import reset_item_changes
+from imperium_pim.catalog.kits import (
+    COMPONENT_DOCTYPE,
+    get_components,
+    get_containing_kits,
+    get_direct_components,
+    rebuild_all,
+    rebuild_closure
+)
+
+VENDOR_CODE = "BOMBENCH"
+
+ITEM_FIELDS = ["name", "sku", "name1", "item_type", "status", "vendor_code", "vendor_sku",
+               "creation", "modified", "owner", "modified_by", "docstatus"]
+COMPONENT_FIELDS = ["name", "parent", "parenttype", "parentfield", "idx", "component", "quantity",
+                    "creation", "modified", "owner", "modified_by", "docstatus"]
+
+
+def item_name(path):
+    return f"{VENDOR_CODE}-{path}"
+
+
+def build_shape(shape, depth, width):
+    """
+    Edges of a synthetic BOM
+
+    Returns:
+        tuple: (root kit, {kit: [(component, quantity)]}, set of leaf components)
+    """
+    edges = {}
+    leaves = set()
+
+    if shape == "deep":
+        for level in range(depth):
+            kit = item_name(f"K{level}")
+            children = [(item_name(f"C{level}-{n}"), n + 1) for n in range(1, width)]
+            leaves.update(child for child, _quantity in children)
+            if level < depth - 1:
+                children.insert(0, (item_name(f"K{level + 1}"), 1))
+            edges[kit] = children
+        return item_name("K0"), edges, leaves
+
+    def expand(path, level):
+        kit = item_name(f"K{path}")
+        children = []
+        for n in range(width):
+            child_path = f"{path}.{n}"
+            if level + 1 < depth:
+                children.append((item_name(f"K{child_path}"), 2))
+                expand(child_path, level + 1)
+            else:
+                leaf = item_name(f"C{child_path}")
+                children.append((leaf, n + 1))
+                leaves.add(leaf)
+        edges[kit] = children
+
+    expand("0", 0)
+    return item_name("K0"), edges, leaves
+
+
+def insert_bom(edges, leaves):
+    """Bulk insert the items and kit component rows of a BOM"""
+    timestamp = now()
+    user = frappe.session.user
+
+    def item_row(name, item_type):
+        vendor_sku = name[len(VENDOR_CODE) + 1:]
+        return [name, name, vendor_sku, item_type, "Current", VENDOR_CODE, vendor_sku,
+                timestamp, timestamp, user, user, 0]
+
+    items = [item_row(kit, "Kit") for kit in edges] + [item_row(leaf, "Component") for leaf in leaves]
+    frappe.db.bulk_insert("PIM Item", fields=ITEM_FIELDS, values=items, chunk_size=5000)
+
+    components = [
+        [frappe.generate_hash(length=12), kit, "PIM Item", "kit_components", idx, component, quantity,
+         timestamp, timestamp, user, user, 0]
+        for kit, children in edges.items()
+        for idx, (component, quantity) in enumerate(children, 1)
+    ]
+    frappe.db.bulk_insert(COMPONENT_DOCTYPE, fields=COMPONENT_FIELDS, values=components, chunk_size=5000)
+    frappe.db.commit()
+    reset_item_changes()
+    return len(items), len(components)
+
+
+def walk_down(kit):
+    """All components of a kit by querying the component tables one level at a time"""
+    totals = {}
+    frontier = {kit: 1.0}
+    while frontier:
+        direct = get_direct_components(list(frontier))
+        next_frontier = {}
+        for parent, multiplier in frontier.items():
+            for component, quantity in direct.get(parent, ()):
+                totals[component] = totals.get(component, 0) + multiplier * quantity
+                next_frontier[component] = next_frontier.get(component, 0) + multiplier * quantity
+        frontier = next_frontier
+    return totals
+
+
+def walk_up(component):
+    """All kits containing a component by querying the component tables one level at a time"""
+    kits = set()
+    frontier = {component}
+    while frontier:
+        parents = set(frappe.get_all(
+            COMPONENT_DOCTYPE,
+            filters={"component": ["in", list(frontier)], "parenttype": "PIM Item"},
+            pluck="parent"
+        ))
+        frontier = parents - kits
+        kits |= parents
+    return kits
+
+
+def median_ms(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def cleanup():
+    """Remove everything the benchmark wrote"""
+    frappe.db.delete("PIM Kit Closure", {"ancestor": ["like", f"{VENDOR_CODE}-%"]})
+    frappe.db.delete(COMPONENT_DOCTYPE, {"parent": ["like", f"{VENDOR_CODE}-%"]})
+    frappe.db.delete("PIM Item", {"vendor_code": VENDOR_CODE})
+    if frappe.db.exists("PIM Vendor", VENDOR_CODE):
+        frappe.delete_doc("PIM Vendor", VENDOR_CODE, ignore_permissions=True, force=True)
+    frappe.db.commit()
+    reset_item_changes()
+
+
+def run(shape="wide", depth=4, width=6, iterations=10, keep=False):
+    """
+    Run the benchmark
+
+    Args:
+        shape (str): "wide" or "deep"
+        depth (int): kit levels
+        width (int): components per kit
+        iterations (int): timed repetitions of each lookup
+        keep (bool): keep the benchmark items afterwards
+
+    Returns:
+        dict: BOM size and timings
+    """
+    cleanup()
+    frappe.get_doc({
+        "doctype": "PIM Vendor",
+        "vendor_code": VENDOR_CODE,
+        "vendor_name": "Kit Closure Benchmark Vendor",
+        "vendor_active": 1
+    }).insert(ignore_permissions=True)
+
+    root, edges, leaves = build_shape(shape, depth, width)
+    report = {"shape": shape, "depth": depth, "width": width, "kits": len(edges), "components": len(leaves)}
+
+    try:
+        report["items"], report["component_rows"] = insert_bom(edges, leaves)
+
+        start = time.perf_counter()
+        built = rebuild_all()
+        frappe.db.commit()
+        report["build"] = {"seconds": round(time.perf_counter() - start, 3), "closure_rows": built["rows"]}
+
+        # a leaf under the deepest kit, contained by the longest chain of kits
+        deepest_kit = max(edges, key=lambda kit: (kit.count(".") if shape == "wide" else int(kit.rsplit("K", 1)[1])))
+        leaf = next(component for component, _quantity in edges[deepest_kit] if component in leaves)
+
+        exploded = get_components(root)
+        report["explode"] = {
+            "components": len(exploded),
+            "closure_ms": median_ms(lambda: get_components(root), iterations),
+            "walk_ms": median_ms(lambda: walk_down(root), iterations)
+        }
+        report["containing"] = {
+            "kits": len(get_containing_kits(leaf)),
+            "closure_ms": median_ms(lambda: get_containing_kits(leaf), iterations),
+            "walk_ms": median_ms(lambda: walk_up(leaf), iterations)
+        }
+
+        frappe.db.set_value(COMPONENT_DOCTYPE, {"parent": deepest_kit, "component": leaf}, "quantity", 7,
+                            update_modified=False)
+        start = time.perf_counter()
+        rebuilt = rebuild_closure(deepest_kit)
+        frappe.db.commit()
+        report["update"] = {"kits_rebuilt": rebuilt, "seconds": round(time.perf_counter() - start, 3)}
+    finally:
+        if not keep:
+            cleanup()
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--site", required=True)
+    parser.add_argument("--shape", choices=("wide", "deep"), default="wide")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--width", type=int, default=6)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark items")
+    args = parser.parse_args()
+
+    frappe.init(site=args.site)
+    frappe.connect()
+    try:
+        report = run(
+            shape=args.shape,
+            depth=args.depth,
+            width=args.width,
+            iterations=args.iterations,
+            keep=args.keep
+        )
+    finally:
+        frappe.destroy()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
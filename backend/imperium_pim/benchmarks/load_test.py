@@ -0,0 +1,362 @@
+"""
+HTTP load test for the public API
+
+Drives a running bench over HTTP with concurrent virtual users, each picking
+requests from a weighted scenario mix, and reports p50/p95/p99 latency,
+errors and requests/sec per endpoint and overall. Unlike
+benchmarks.api_benchmark this includes the web server, request parsing,
+session handling and JSON encoding, and shows how the workers behave under
+contention.
+
+Every user runs a closed loop (send, wait for the response, optionally think,
+repeat) on its own keep-alive session. Pass --rate to cap the total request
+rate instead of sending as fast as responses come back.
+
+Scenarios are defined in SCENARIOS; `frontend` mirrors the calls the Next.js
+frontend makes. Item ids for detail requests are discovered from
+get_item_list before the run starts.
+
+Usage:
+    python -m imperium_pim.benchmarks.load_test --url http://localhost:8000 --users 20 --duration 60
+    python -m imperium_pim.benchmarks.load_test --url http://localhost:8000 --scenario browse --api-key KEY --api-secret SECRET
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+
+import requests
+
+API_PREFIX = "/api/method/"
+
+
+class Endpoint:
+    """
+    One request type of a scenario
+
+    Args:
+        name (str): label used in the report
+        method (str): dotted path of the whitelisted method
+        weight (int): relative share of requests
+        params: callable(rng, context) returning the query parameters
+    """
+
+    def __init__(self, name, method, weight=1, params=None):
+        self.name = name
+        self.method = method
+        self.weight = weight
+        self.params = params or (lambda rng, context: {})
+
+    def path(self):
+        return API_PREFIX + self.method
+
+
+def item_details_params(rng, context):
+    return {"item_id": rng.choice(context["item_ids"])} if context.get("item_ids") else {}
+
+
+def item_list_params(rng, context):
+    params = {"limit": rng.choice((20, 50))}
+    if rng.random() < 0.3:
+        params["filters"] = json.dumps({"status": rng.choice(("New", "Current", "Discontinued"))})
+    return params
+
+
+DASHBOARD_DATA = Endpoint("get_dashboard_data", "imperium_pim.api.api.get_dashboard_data")
+DASHBOARD_STATS = Endpoint("get_dashboard_stats", "imperium_pim.api.dashboard.get_dashboard_stats")
+ITEM_LIST = Endpoint("get_item_list", "imperium_pim.api.items.get_item_list", params=item_list_params)
+ITEM_DETAILS = Endpoint("get_item_details", "imperium_pim.api.items.get_item_details", params=item_details_params)
+RECENT_ITEMS = Endpoint("get_recent_items", "imperium_pim.api.dashboard.get_recent_items",
+                        params=lambda rng, context: {"limit": 10})
+PING = Endpoint("ping", "imperium_pim.api.ping.ping")
+
+
+def weighted(endpoint, weight):
+    return Endpoint(endpoint.name, endpoint.method, weight, endpoint.params)
+
+
+SCENARIOS = {
+    # what the frontend sends: dashboard on landing, then list and detail pages
+    "frontend": [
+        weighted(DASHBOARD_DATA, 2),
+        weighted(ITEM_LIST, 4),
+        weighted(ITEM_DETAILS, 5),
+        weighted(RECENT_ITEMS, 2)
+    ],
+    "dashboard": [
+        weighted(DASHBOARD_DATA, 3),
+        weighted(DASHBOARD_STATS, 2),
+        weighted(RECENT_ITEMS, 1)
+    ],
+    "browse": [
+        weighted(ITEM_LIST, 1),
+        weighted(ITEM_DETAILS, 3)
+    ],
+    "ping": [PING]
+}
+
+
+class RateLimiter:
+    """Spaces requests evenly across all users; rate 0 disables it"""
+
+    def __init__(self, rate=0):
+        self.interval = 1.0 / rate if rate else 0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            slot = max(self.next_slot, time.monotonic())
+            self.next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def percentile(timings, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not timings:
+        return None
+    ordered = sorted(timings)
+    rank = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(samples, elapsed):
+    """
+    Latency and throughput of a list of samples
+
+    Args:
+        samples (list): (latency seconds, ok) tuples
+        elapsed (float): wall clock seconds of the run
+    """
+    timings = [latency * 1000 for latency, _ok in samples]
+    errors = sum(1 for _latency, ok in samples if not ok)
+
+    def ms(value):
+        return round(value, 2) if value is not None else None
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0,
+        "requests_per_second": round(len(samples) / elapsed, 2) if elapsed else 0,
+        "p50_ms": ms(percentile(timings, 0.50)),
+        "p95_ms": ms(percentile(timings, 0.95)),
+        "p99_ms": ms(percentile(timings, 0.99)),
+        "max_ms": ms(max(timings) if timings else None)
+    }
+
+
+def create_session(base_url, api_key=None, api_secret=None, user=None, password=None, timeout=30):
+    """Keep-alive session authenticated with an API key pair, a login or as Guest"""
+    session = requests.Session()
+    if api_key and api_secret:
+        session.headers["Authorization"] = f"token {api_key}:{api_secret}"
+    elif user and password:
+        response = session.post(f"{base_url}/api/method/login", data={"usr": user, "pwd": password}, timeout=timeout)
+        response.raise_for_status()
+    return session
+
+
+def discover_item_ids(session, base_url, limit=200, timeout=30):
+    """Item ids to request details for"""
+    response = session.get(
+        base_url + ITEM_LIST.path(), params={"limit": limit}, timeout=timeout
+    )
+    response.raise_for_status()
+    return [item["id"] for item in response.json().get("message") or []]
+
+
+class LoadTest:
+    """
+    Concurrent closed-loop load against one bench
+
+    Args:
+        base_url (str): site URL, e.g. http://localhost:8000
+        scenario (list): Endpoints to mix
+        users (int): concurrent virtual users
+        duration (float): seconds to run; ignored when `total_requests` is set
+        total_requests (int): stop after this many requests in total
+        ramp_up (float): seconds over which users are started
+        think_time (float): seconds each user waits between requests
+        rate (float): overall requests per second cap, 0 for unlimited
+        timeout (float): request timeout in seconds
+        seed (int): seed of the request mix
+        auth (dict): create_session keyword arguments
+    """
+
+    def __init__(self, base_url, scenario, users=10, duration=30, total_requests=None, ramp_up=0,
+                 think_time=0, rate=0, timeout=30, seed=None, auth=None):
+        self.base_url = base_url.rstrip("/")
+        self.scenario = scenario
+        self.users = users
+        self.duration = duration
+        self.max_requests = total_requests
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.limiter = RateLimiter(rate)
+        self.timeout = timeout
+        self.seed = seed
+        self.auth = auth or {}
+        self.context = {}
+        self.samples = {endpoint.name: [] for endpoint in scenario}
+        self.status_codes = {}
+        self.sent = 0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    def take_ticket(self):
+        """Whether another request may be sent"""
+        with self.lock:
+            if self.max_requests is not None and self.sent >= self.max_requests:
+                return False
+            self.sent += 1
+            return True
+
+    def record(self, endpoint, latency, status):
+        ok = status is not None and status < 400
+        with self.lock:
+            self.samples[endpoint.name].append((latency, ok))
+            self.status_codes[str(status)] = self.status_codes.get(str(status), 0) + 1
+
+    def user_loop(self, index, deadline):
+        rng = random.Random(None if self.seed is None else self.seed + index)
+        weights = [endpoint.weight for endpoint in self.scenario]
+        session = create_session(self.base_url, timeout=self.timeout, **self.auth)
+
+        try:
+            while not self.stop_event.is_set() and time.monotonic() < deadline and self.take_ticket():
+                endpoint = rng.choices(self.scenario, weights)[0]
+                params = endpoint.params(rng, self.context)
+                self.limiter.wait()
+
+                start = time.perf_counter()
+                try:
+                    response = session.get(self.base_url + endpoint.path(), params=params, timeout=self.timeout)
+                    status = response.status_code
+                except requests.RequestException:
+                    status = None
+                self.record(endpoint, time.perf_counter() - start, status)
+
+                if self.think_time:
+                    self.stop_event.wait(rng.uniform(0, 2 * self.think_time))
+        finally:
+            session.close()
+
+    def prepare(self):
+        if any(endpoint.params is item_details_params for endpoint in self.scenario):
+            with create_session(self.base_url, timeout=self.timeout, **self.auth) as session:
+                self.context["item_ids"] = discover_item_ids(session, self.base_url, timeout=self.timeout)
+
+    def run(self):
+        """
+        Run the load test
+
+        Returns:
+            dict: settings, overall and per-endpoint results
+        """
+        self.prepare()
+
+        # with a request budget the run ends when the budget is spent
+        deadline = time.monotonic() + (self.duration if self.max_requests is None else 24 * 60 * 60)
+        threads = []
+        start = time.perf_counter()
+
+        try:
+            for index in range(self.users):
+                thread = threading.Thread(target=self.user_loop, args=(index, deadline),
+                                          name=f"pim-load-{index}", daemon=True)
+                thread.start()
+                threads.append(thread)
+                if self.ramp_up and index < self.users - 1:
+                    time.sleep(self.ramp_up / self.users)
+
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            self.stop_event.set()
+            for thread in threads:
+                thread.join()
+
+        elapsed = time.perf_counter() - start
+        all_samples = [sample for samples in self.samples.values() for sample in samples]
+
+        return {
+            "base_url": self.base_url,
+            "users": self.users,
+            "seconds": round(elapsed, 2),
+            "overall": summarize(all_samples, elapsed),
+            "status_codes": self.status_codes,
+            "endpoints": {
+                name: summarize(samples, elapsed)
+                for name, samples in self.samples.items()
+            }
+        }
+
+
+def run(url="http://localhost:8000", scenario="frontend", users=10, duration=30, total_requests=None, ramp_up=0,
+        think_time=0, rate=0, timeout=30, seed=None, api_key=None, api_secret=None, user=None, password=None):
+    """Run a named scenario; see LoadTest for the arguments"""
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Unknown scenario {scenario}, expected one of {', '.join(SCENARIOS)}")
+
+    auth = {"api_key": api_key, "api_secret": api_secret, "user": user, "password": password}
+    report = LoadTest(
+        url, SCENARIOS[scenario], users=users, duration=duration, total_requests=total_requests, ramp_up=ramp_up,
+        think_time=think_time, rate=rate, timeout=timeout, seed=seed, auth=auth
+    ).run()
+    report["scenario"] = scenario
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--scenario", choices=list(SCENARIOS), default="frontend")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--requests", type=int, help="total requests; overrides --duration")
+    parser.add_argument("--ramp-up", type=float, default=0)
+    parser.add_argument("--think-time", type=float, default=0)
+    parser.add_argument("--rate", type=float, default=0, help="requests per second across all users")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--api-key")
+    parser.add_argument("--api-secret")
+    parser.add_argument("--user")
+    parser.add_argument("--password")
+    parser.add_argument("--output", help="write the report to this file")
+    args = parser.parse_args()
+
+    report = run(
+        url=args.url,
+        scenario=args.scenario,
+        users=args.users,
+        duration=args.duration,
+        total_requests=args.requests,
+        ramp_up=args.ramp_up,
+        think_time=args.think_time,
+        rate=args.rate,
+        timeout=args.timeout,
+        seed=args.seed,
+        api_key=args.api_key,
+        api_secret=args.api_secret,
+        user=args.user,
+        password=args.password
+    )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
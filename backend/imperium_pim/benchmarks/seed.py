@@ -0,0 +1,379 @@
+"""
+Synthetic catalog generator
+
+Seeds realistic PIM volumes for benchmarking: vendors, items, PIM
+attributes and values, the attribute values of items, vendor attributes and
+values, and the mappings between them. Rows are generated deterministically
+and written with multi-row INSERTs (frappe.db.bulk_insert) in chunks,
+committing after each chunk, so a million items take minutes rather than
+hours. Controllers are bypassed; names follow the same conventions they
+generate.
+
+Every seeded record is recognisable by its prefix (vendor codes SEED0001...,
+attribute codes seed-...), so cleanup() removes exactly what was seeded.
+
+Presets:
+    small    5 vendors,     10k items,    200 attributes,   5k vendor attribute values
+    medium   20 vendors,   100k items,  1,000 attributes,  50k vendor attribute values
+    large    50 vendors,     1M items,  5,000 attributes, 200k vendor attribute values
+
+Usage:
+    bench --site [site-name] execute imperium_pim.benchmarks.seed.seed --kwargs "{'size': 'medium'}"
+    bench --site [site-name] execute imperium_pim.benchmarks.seed.cleanup
+    python -m imperium_pim.benchmarks.seed --site [site-name] --size large --items 250000
+"""
+
+import argparse
+import json
+import random
+import time
+
+import frappe
+from frappe.utils import now
+
+from imperium_pim.catalog.changes import reset_item_changes
+from imperium_pim.catalog.logistics import METRIC_FIELDS, compute_metrics
+from imperium_pim.vendor_sync.mapping import invalidate_all_mapping_tables
+
+VENDOR_PREFIX = "SEED"
+ATTRIBUTE_PREFIX = "seed-"
+
+PRESETS = {
+    "small": {
+        "vendors": 5,
+        "items": 10000,
+        "attributes": 200,
+        "values_per_attribute": 8,
+        "attributes_per_item": 3,
+        "vendor_attributes_per_vendor": 40,
+        "vendor_attribute_values": 5000
+    },
+    "medium": {
+        "vendors": 20,
+        "items": 100000,
+        "attributes": 1000,
+        "values_per_attribute": 10,
+        "attributes_per_item": 4,
+        "vendor_attributes_per_vendor": 100,
+        "vendor_attribute_values": 50000
+    },
+    "large": {
+        "vendors": 50,
+        "items": 1000000,
+        "attributes": 5000,
+        "values_per_attribute": 10,
+        "attributes_per_item": 5,
+        "vendor_attributes_per_vendor": 200,
+        "vendor_attribute_values": 200000
+    }
+}
+
+# Share of vendor attributes and values that get a mapping
+MAPPED_RATIO = 0.7
+
+CHUNK_SIZE = 10000
+
+# Items draw their attribute values from the first attributes only, like the
+# handful of color/material/style attributes shoppers actually filter on
+FILTERABLE_ATTRIBUTES = 20
+
+ATTRIBUTE_TYPES = ("ShortText", "Select", "MultiSelect", "Boolean", "Decimal", "Integer")
+ITEM_STATUSES = ("New", "Current", "Current", "Current", "Discontinued")
+ITEM_TYPES = ("Component", "Item", "Item", "Kit")
+BRAND_WORDS = ("Oak", "Stone", "River", "Summit", "Harbor", "Maple", "Iron", "Willow", "Cedar", "Aspen")
+PRODUCT_WORDS = ("Chair", "Table", "Sofa", "Lamp", "Desk", "Bench", "Rug", "Cabinet", "Shelf", "Bed")
+
+
+def vendor_code(index):
+    return f"{VENDOR_PREFIX}{index:04d}"
+
+
+def attribute_code(index):
+    return f"{ATTRIBUTE_PREFIX}attr-{index:05d}"
+
+
+def standard_values(user, timestamp):
+    return [timestamp, timestamp, user, user, 0]
+
+
+STANDARD_FIELDS = ["creation", "modified", "owner", "modified_by", "docstatus"]
+
+
+def insert_rows(doctype, fields, rows, chunk_size=CHUNK_SIZE):
+    """
+    Bulk insert generated rows in chunks, committing after each chunk
+
+    Returns:
+        int: rows written
+    """
+    user = frappe.session.user
+    count = 0
+    chunk = []
+
+    for row in rows:
+        chunk.append(row + standard_values(user, now()))
+        if len(chunk) >= chunk_size:
+            frappe.db.bulk_insert(doctype, fields=fields + STANDARD_FIELDS, values=chunk, ignore_duplicates=True)
+            frappe.db.commit()
+            count += len(chunk)
+            chunk = []
+
+    if chunk:
+        frappe.db.bulk_insert(doctype, fields=fields + STANDARD_FIELDS, values=chunk, ignore_duplicates=True)
+        frappe.db.commit()
+        count += len(chunk)
+
+    return count
+
+
+def generate_vendors(config):
+    for v in range(1, config["vendors"] + 1):
+        code = vendor_code(v)
+        yield [code, code, f"Seed Vendor {v}", 1, 0, 500, 4, 24]
+
+
+def generate_items(config, rng):
+    vendors = config["vendors"]
+    per_vendor = -(-config["items"] // vendors)
+    written = 0
+
+    for v in range(1, vendors + 1):
+        code = vendor_code(v)
+        brand = f"{rng.choice(BRAND_WORDS)} {rng.choice(BRAND_WORDS)}"
+        for i in range(per_vendor):
+            if written >= config["items"]:
+                return
+            written += 1
+            vendor_sku = f"{i:07d}"
+            sku = f"{code}-{vendor_sku}"
+            width, depth, height = (round(rng.uniform(6, 90), 1) for _ in range(3))
+            weight = round(rng.uniform(1, 250), 1)
+            carton = (round(width + 2, 1), round(depth + 2, 1), round(height + 2, 1), round(weight * 1.1, 1))
+            metrics = compute_metrics(*carton)
+            yield [
+                sku, sku, f"{brand} {rng.choice(PRODUCT_WORDS)} {i}", brand,
+                rng.choice(ITEM_STATUSES), rng.choice(ITEM_TYPES),
+                width, depth, height, weight, *carton,
+                f"{(written * 7919) % 10 ** 12:012d}", code, vendor_sku,
+                *(metrics[field] for field in METRIC_FIELDS)
+            ]
+
+
+ITEM_FIELDS = [
+    "name", "sku", "name1", "brand", "status", "item_type",
+    "item_width_inches", "item_depth_inches", "item_height_inches", "item_weight_lbs",
+    "carton_width_inches", "carton_depth_inches", "carton_height_inches", "carton_weight_lbs",
+    "upc", "vendor_code", "vendor_sku", *METRIC_FIELDS
+]
+
+
+def generate_attributes(config, rng):
+    for a in range(1, config["attributes"] + 1):
+        code = attribute_code(a)
+        yield [code, code, f"Seed Attribute {a}", rng.choice(ATTRIBUTE_TYPES), 0]
+
+
+def generate_attribute_values(config):
+    for a in range(1, config["attributes"] + 1):
+        attribute = attribute_code(a)
+        for n in range(1, config["values_per_attribute"] + 1):
+            code = f"{attribute}-value-{n}"
+            yield [code, attribute, code, f"Value {n}"]
+
+
+def generate_item_attributes(config, rng):
+    """Rows of PIM Item Attribute, the same item names generate_items produces"""
+    vendors = config["vendors"]
+    per_vendor = -(-config["items"] // vendors)
+    filterable = min(FILTERABLE_ATTRIBUTES, config["attributes"])
+    per_item = min(config["attributes_per_item"], filterable)
+    written = 0
+
+    for v in range(1, vendors + 1):
+        code = vendor_code(v)
+        for i in range(per_vendor):
+            if written >= config["items"]:
+                return
+            written += 1
+            sku = f"{code}-{i:07d}"
+            for idx, a in enumerate(sorted(rng.sample(range(1, filterable + 1), per_item)), 1):
+                attribute = attribute_code(a)
+                n = rng.randint(1, config["values_per_attribute"])
+                yield [f"{sku}-{idx}", sku, "PIM Item", "item_attributes", idx,
+                       f"{attribute}-value-{n}", f"Value {n}", attribute]
+
+
+def get_vendor_attributes(config):
+    """[(vendor code, vendor attribute code)] in a stable order"""
+    return [
+        (vendor_code(v), f"{vendor_code(v)}-seed-attribute-{n}")
+        for v in range(1, config["vendors"] + 1)
+        for n in range(1, config["vendor_attributes_per_vendor"] + 1)
+    ]
+
+
+def generate_vendor_attributes(vendor_attributes):
+    for vendor, code in vendor_attributes:
+        yield [code, vendor, code, f"Seed Attribute {code.rsplit('-', 1)[1]}"]
+
+
+def get_attribute_map(config, vendor_attributes, rng):
+    """Vendor attribute code -> PIM attribute code for the mapped share"""
+    return {
+        code: attribute_code(rng.randint(1, config["attributes"]))
+        for _vendor, code in vendor_attributes
+        if rng.random() < MAPPED_RATIO
+    }
+
+
+def generate_attribute_mappings(vendor_attributes, attribute_map, rng):
+    for vendor, code in vendor_attributes:
+        if code in attribute_map:
+            yield [f"{code}-map", vendor, code, attribute_map[code], round(rng.uniform(0.6, 1), 2), 1]
+
+
+def generate_vendor_values(config, vendor_attributes, attribute_map, rng):
+    """Yield (row, value mapping row or None) for each vendor attribute value"""
+    per_attribute = max(1, config["vendor_attribute_values"] // len(vendor_attributes))
+    written = 0
+
+    for vendor, attribute in vendor_attributes:
+        pim_attribute = attribute_map.get(attribute)
+        for n in range(1, per_attribute + 1):
+            if written >= config["vendor_attribute_values"]:
+                return
+            written += 1
+            code = f"{attribute}-value-{n}"
+            row = [code, vendor, attribute, code, f"Value {n}"]
+
+            mapping = None
+            if pim_attribute and rng.random() < MAPPED_RATIO:
+                pim_value = f"{pim_attribute}-value-{rng.randint(1, config['values_per_attribute'])}"
+                mapping = [f"{code}-map", vendor, code, pim_value, attribute, pim_attribute, round(rng.uniform(0.6, 1), 2)]
+            yield row, mapping
+
+
+def get_config(size="small", **overrides):
+    if size not in PRESETS:
+        frappe.throw(f"Unknown size {size}, expected one of {', '.join(PRESETS)}")
+    config = dict(PRESETS[size])
+    config.update({key: int(value) for key, value in overrides.items() if value is not None})
+    return config
+
+
+def seed(size="small", seed=42, **overrides):
+    """
+    Seed a synthetic catalog
+
+    Args:
+        size (str): preset name
+        seed (int): random seed; the same seed produces the same catalog
+        **overrides: preset values to override, e.g. items=250000
+
+    Returns:
+        dict: rows written and seconds per doctype
+    """
+    config = get_config(size, **overrides)
+    rng = random.Random(seed)
+    report = {"size": size, "config": config, "doctypes": {}}
+
+    def timed(doctype, fields, rows):
+        start = time.perf_counter()
+        count = insert_rows(doctype, fields, rows)
+        elapsed = time.perf_counter() - start
+        report["doctypes"][doctype] = {
+            "rows": count,
+            "seconds": round(elapsed, 2),
+            "rows_per_second": round(count / elapsed) if elapsed else 0
+        }
+
+    timed("PIM Vendor", [
+        "name", "vendor_code", "vendor_name", "vendor_active", "vendor_integration_enabled",
+        "vendor_page_size", "vendor_max_concurrency", "vendor_sync_interval_hours"
+    ], generate_vendors(config))
+    timed("PIM Item", ITEM_FIELDS, generate_items(config, rng))
+    timed("PIM Attribute", ["name", "attribute_code", "attribute_name", "attribute_type", "is_required"],
+          generate_attributes(config, rng))
+    timed("PIM Attribute Value", ["name", "pim_attribute", "attribute_value_code", "attribute_value_name"],
+          generate_attribute_values(config))
+    timed("PIM Item Attribute",
+          ["name", "parent", "parenttype", "parentfield", "idx", "pim_attribute_value", "attribute_value_name",
+           "pim_attribute"],
+          generate_item_attributes(config, rng))
+
+    vendor_attributes = get_vendor_attributes(config)
+    attribute_map = get_attribute_map(config, vendor_attributes, rng)
+    timed("PIM Vendor Attribute", ["name", "pim_vendor", "vendor_attribute_code", "vendor_attribute_name"],
+          generate_vendor_attributes(vendor_attributes))
+    timed("PIM Vendor Attribute Mapping",
+          ["name", "pim_vendor", "vendor_attribute", "pim_attribute", "mapping_confidence", "approved"],
+          generate_attribute_mappings(vendor_attributes, attribute_map, rng))
+
+    value_mappings = []
+    value_rows = generate_vendor_values(config, vendor_attributes, attribute_map, rng)
+
+    def values():
+        for row, mapping in value_rows:
+            if mapping:
+                value_mappings.append(mapping)
+            yield row
+
+    timed("PIM Vendor Attribute Value",
+          ["name", "pim_vendor", "pim_vendor_attribute", "vendor_attribute_value_code", "vendor_attribute_value_name"],
+          values())
+    timed("PIM Vendor Attribute Value Mapping",
+          ["name", "pim_vendor", "vendor_attribute_value", "pim_attribute_value", "pim_vendor_attribute",
+           "pim_attribute", "mapping_confidence"],
+          iter(value_mappings))
+
+    invalidate_all_mapping_tables()
+    reset_item_changes()
+    report["total_seconds"] = round(sum(d["seconds"] for d in report["doctypes"].values()), 2)
+    return report
+
+
+def cleanup():
+    """Delete everything seed() wrote"""
+    vendor_filter = {"pim_vendor": ["like", f"{VENDOR_PREFIX}%"]}
+    for doctype in ("PIM Vendor Attribute Value Mapping", "PIM Vendor Attribute Value",
+                    "PIM Vendor Attribute Mapping", "PIM Vendor Attribute"):
+        frappe.db.delete(doctype, vendor_filter)
+        frappe.db.commit()
+
+    frappe.db.delete("PIM Item Attribute", {"parent": ["like", f"{VENDOR_PREFIX}%"]})
+    frappe.db.delete("PIM Item", {"vendor_code": ["like", f"{VENDOR_PREFIX}%"]})
+    frappe.db.delete("PIM Attribute Value", {"pim_attribute": ["like", f"{ATTRIBUTE_PREFIX}%"]})
+    frappe.db.delete("PIM Attribute", {"name": ["like", f"{ATTRIBUTE_PREFIX}%"]})
+    frappe.db.delete("PIM Vendor", {"name": ["like", f"{VENDOR_PREFIX}%"]})
+    frappe.db.commit()
+    invalidate_all_mapping_tables()
+    reset_item_changes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--site", required=True)
+    parser.add_argument("--size", choices=list(PRESETS), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    for key in PRESETS["small"]:
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, type=int)
+    parser.add_argument("--cleanup", action="store_true", help="delete seeded records instead of seeding")
+    args = parser.parse_args()
+
+    overrides = {key: getattr(args, key) for key in PRESETS["small"]}
+    frappe.init(site=args.site)
+    frappe.connect()
+    try:
+        if args.cleanup:
+            cleanup()
+            report = {"cleaned": True}
+        else:
+            report = seed(size=args.size, seed=args.seed, **overrides)
+    finally:
+        frappe.destroy()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from imperium_pim.benchmarks.load_test import SCENARIOS, LoadTest, percentile, summarize
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers item list requests with two items and everything else with {}"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.paths.append((url.path, parse_qs(url.query)))
+        if url.path.endswith("get_item_details") and parse_qs(url.query).get("item_id") == ["MISSING"]:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        message = [{"id": "A-1"}, {"id": "A-2"}] if url.path.endswith("get_item_list") else {}
+        body = json.dumps({"message": message}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestLoadTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.paths = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_request_budget_and_mix(self):
+        """A request budget is spent exactly and every endpoint of the mix is hit"""
+        report = LoadTest(self.base_url, SCENARIOS["frontend"], users=4, total_requests=200, seed=1).run()
+
+        self.assertEqual(report["overall"]["requests"], 200)
+        self.assertEqual(report["overall"]["errors"], 0)
+        self.assertEqual(set(report["endpoints"]), {"get_dashboard_data", "get_item_list", "get_item_details", "get_recent_items"})
+        self.assertTrue(all(result["requests"] > 0 for result in report["endpoints"].values()))
+
+        detail_ids = {
+            params["item_id"][0] for path, params in self.server.paths if path.endswith("get_item_details")
+        }
+        self.assertEqual(detail_ids, {"A-1", "A-2"})
+
+    def test_errors_are_counted(self):
+        """Error responses count against the endpoint's error rate"""
+        test = LoadTest(self.base_url, SCENARIOS["browse"], users=2, total_requests=20, seed=3)
+        test.prepare = lambda: test.context.update(item_ids=["MISSING"])
+        report = test.run()
+
+        details = report["endpoints"]["get_item_details"]
+        self.assertEqual(details["errors"], details["requests"])
+        self.assertEqual(report["endpoints"]["get_item_list"]["errors"], 0)
+        self.assertEqual(report["status_codes"].get("404"), details["requests"])
+
+
+class TestSummaries(unittest.TestCase):
+    def test_percentile(self):
+        timings = list(range(1, 101))
+        self.assertEqual(percentile(timings, 0.5), 50)
+        self.assertEqual(percentile(timings, 0.95), 95)
+        self.assertEqual(percentile(timings, 0.99), 99)
+        self.assertIsNone(percentile([], 0.5))
+
+    def test_summarize(self):
+        samples = [(0.010, True), (0.020, True), (0.030, False), (0.040, True)]
+        summary = summarize(samples, elapsed=2)
+
+        self.assertEqual(summary["requests"], 4)
+        self.assertEqual(summary["errors"], 1)
+        self.assertEqual(summary["requests_per_second"], 2)
+        self.assertEqual(summary["p50_ms"], 20)
+        self.assertEqual(summary["max_ms"], 40)
@@ -0,0 +1,200 @@
+"""
+End-to-end vendor sync benchmark
+
+Starts the local vendor API simulator (vendor_sync.simulator), points a
+throwaway PIM Vendor at it and measures the sync engine in four passes:
+
+    fetch_only    HTTP fetch and parsing only, no handlers
+    full          full sync into an empty catalog (inserts)
+    unchanged     full sync again, every record dropped by content hash
+    incremental   modified-since sync after touching a fraction of the catalog
+
+Each pass reports records/sec together with the simulator's request and
+error counts. Requires a site, since the sync writes to the database.
+
+Usage:
+    bench --site [site-name] execute imperium_pim.benchmarks.vendor_sync.run --kwargs "{'records': 50000, 'latency': 0.05}"
+    python -m imperium_pim.benchmarks.vendor_sync --site [site-name] --records 50000 --error-rate 0.02
+"""
+
+import argparse
+import json
+import time
+
+import frappe
+
+from imperium_pim.vendor_sync.engine import ENDPOINT_FIELDS, sync_vendor
+from imperium_pim.vendor_sync.hashing import clear_record_hashes
+from imperium_pim.vendor_sync.simulator import ENDPOINTS, MODIFIED_SINCE_PARAM, VendorSimulator
+
+VENDOR_CODE = "BENCHSIM"
+
+API_KEY = "benchmark-token"
+USERNAME = "benchmark"
+PASSWORD = "benchmark-password"
+
+
+def setup_vendor(simulator, auth_type, concurrency, rate_limit, page_size, endpoints):
+    """Create or reset the benchmark vendor and point it at the simulator"""
+    if frappe.db.exists("PIM Vendor", VENDOR_CODE):
+        vendor = frappe.get_doc("PIM Vendor", VENDOR_CODE)
+    else:
+        vendor = frappe.new_doc("PIM Vendor")
+        vendor.vendor_code = VENDOR_CODE
+
+    vendor.update({
+        "vendor_name": "Sync Benchmark Vendor",
+        "vendor_active": 1,
+        # keep the scheduler away from the benchmark vendor
+        "vendor_integration_enabled": 0,
+        "vendor_api_base_url": simulator.base_url,
+        "vendor_api_auth_type": auth_type,
+        "vendor_api_key": API_KEY if auth_type == "Bearer" else None,
+        "vendor_api_username": USERNAME if auth_type == "Basic" else None,
+        "vendor_api_password": PASSWORD if auth_type == "Basic" else None,
+        "vendor_max_concurrency": concurrency,
+        "vendor_rate_limit": rate_limit,
+        "vendor_page_size": page_size,
+        "vendor_modified_since_param": MODIFIED_SINCE_PARAM,
+        "vendor_last_sync": None,
+        "vendor_sync_checkpoint": None
+    })
+    for key, field in ENDPOINT_FIELDS.items():
+        vendor.set(field, ENDPOINTS[key] if key in endpoints else None)
+
+    vendor.save(ignore_permissions=True)
+    frappe.db.commit()
+
+
+def cleanup():
+    """Remove everything the benchmark wrote"""
+    frappe.db.delete("PIM Item", {"vendor_code": VENDOR_CODE})
+    clear_record_hashes(VENDOR_CODE)
+    if frappe.db.exists("PIM Vendor", VENDOR_CODE):
+        frappe.delete_doc("PIM Vendor", VENDOR_CODE, ignore_permissions=True, force=True)
+    frappe.db.commit()
+
+
+def run_pass(simulator, **kwargs):
+    simulator.reset_counters()
+    start = time.perf_counter()
+    result = sync_vendor(VENDOR_CODE, **kwargs)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "success": result["success"],
+        "records": result["records"],
+        "changed_records": result["changed_records"],
+        "seconds": round(elapsed, 2),
+        "records_per_second": round(result["records"] / elapsed) if elapsed else 0,
+        "requests": simulator.counters["requests"],
+        "injected_errors": simulator.counters["errors"],
+        "errors": result["errors"]
+    }
+
+
+def run(records=20000, page_size=500, latency=0.0, error_rate=0.0, concurrency=4, rate_limit=0,
+        auth_type="Bearer", pagination="page", endpoints=None, touch=0.05, keep=False):
+    """
+    Run the benchmark against a fresh simulator
+
+    Args:
+        records (int): records per endpoint
+        page_size (int): records per page requested by the vendor client
+        latency (float): simulated seconds per response
+        error_rate (float): fraction of requests failing with 429/503
+        concurrency (int): endpoints fetched concurrently
+        rate_limit (float): client requests per second, 0 for unlimited
+        auth_type (str): "Bearer" or "Basic"
+        pagination (str): "page" or "link"
+        endpoints (list): endpoint keys to sync, defaults to all eight
+        touch (float): fraction of records changed before the incremental pass
+        keep (bool): keep the benchmark vendor and its items afterwards
+
+    Returns:
+        dict: settings and per-pass results
+    """
+    endpoints = endpoints or list(ENDPOINTS)
+    report = {
+        "records_per_endpoint": records,
+        "endpoints": endpoints,
+        "page_size": page_size,
+        "latency": latency,
+        "error_rate": error_rate,
+        "concurrency": concurrency,
+        "passes": {}
+    }
+
+    simulator = VendorSimulator(
+        records=records,
+        max_page_size=max(page_size, 1000),
+        pagination=pagination,
+        latency=latency,
+        error_rate=error_rate,
+        auth_type=auth_type,
+        api_key=API_KEY,
+        username=USERNAME,
+        password=PASSWORD
+    )
+
+    with simulator:
+        cleanup()
+        setup_vendor(simulator, auth_type, concurrency, rate_limit, page_size, endpoints)
+
+        try:
+            passes = report["passes"]
+            passes["fetch_only"] = run_pass(simulator, endpoints=endpoints, handlers={}, full=True)
+            passes["full"] = run_pass(simulator, endpoints=endpoints, full=True)
+            passes["unchanged"] = run_pass(simulator, endpoints=endpoints, full=True)
+
+            # modified-since values have whole-second precision
+            time.sleep(1)
+            simulator.touch(touch)
+            passes["incremental"] = run_pass(simulator, endpoints=endpoints)
+        finally:
+            if not keep:
+                cleanup()
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--site", required=True)
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate-limit", type=float, default=0)
+    parser.add_argument("--auth-type", choices=("Bearer", "Basic"), default="Bearer")
+    parser.add_argument("--pagination", choices=("page", "link"), default="page")
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS))
+    parser.add_argument("--touch", type=float, default=0.05)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark vendor and items")
+    args = parser.parse_args()
+
+    frappe.init(site=args.site)
+    frappe.connect()
+    try:
+        report = run(
+            records=args.records,
+            page_size=args.page_size,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            concurrency=args.concurrency,
+            rate_limit=args.rate_limit,
+            auth_type=args.auth_type,
+            pagination=args.pagination,
+            endpoints=args.endpoints,
+            touch=args.touch,
+            keep=args.keep
+        )
+    finally:
+        frappe.destroy()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
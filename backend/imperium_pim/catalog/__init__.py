@@ -0,0 +1,4 @@
+# Catalog read services for Imperium PIM
+#
+# Read paths over the item catalog that are too hot for per-request ORM
+# queries: batch code resolution and the caches behind it.
@@ -0,0 +1,209 @@
+"""
+Attribute values of PIM Items and filtering by them
+
+Items carry attribute values in the `item_attributes` table of PIM Item, one
+PIM Item Attribute row per (item, value) with the value's attribute copied
+onto the row. The table is indexed on (pim_attribute_value, parenttype,
+parent), so the items holding any of a few values are read straight from the
+index without touching item rows.
+
+Attribute filters are given per attribute; values of one attribute are
+alternatives and different attributes must all match:
+
+    {"color": ["color-black", "color-white"], "material": "material-oak"}
+
+    -> name IN (items with color-black or color-white)
+       AND name IN (items with material-oak)
+
+Each attribute becomes one semi-join subquery next to the standard item
+filters in a single statement, so the database intersects them, picks the
+most selective side first and stops at the page limit, instead of the app
+pulling item names into Python.
+
+The semi-joins are plain queries without frappe.get_list's permission
+conditions. Endpoints use query_permitted_items and count_permitted_items,
+which read through get_list for users it would restrict (catalog.permissions).
+"""
+
+from collections import defaultdict
+
+import frappe
+from frappe.query_builder.functions import Count
+from frappe.utils import cint
+
+from imperium_pim.catalog.permissions import has_unrestricted_read
+
+ASSIGNMENT_DOCTYPE = "PIM Item Attribute"
+
+# Attribute types whose items may hold several values at once
+MULTI_VALUE_TYPES = ("MultiSelect",)
+
+MAX_FILTER_VALUES = 1000
+
+
+def parse_attribute_filters(attributes):
+    """
+    Attribute filters as {attribute: [values]}
+
+    Args:
+        attributes: {attribute: value or [values]}, a list of attribute value
+            names or their JSON; a list is grouped by each value's attribute
+
+    Returns:
+        dict: attribute -> list of attribute value names
+    """
+    if isinstance(attributes, str):
+        attributes = frappe.parse_json(attributes)
+    if not attributes:
+        return {}
+
+    if isinstance(attributes, dict):
+        groups = {
+            attribute: [values] if isinstance(values, str) else list(values)
+            for attribute, values in attributes.items()
+            if values
+        }
+    else:
+        values = list(dict.fromkeys(attributes))
+        known = dict(frappe.get_all(
+            "PIM Attribute Value",
+            filters={"name": ["in", values]},
+            fields=["name", "pim_attribute"],
+            as_list=True
+        ))
+        groups = defaultdict(list)
+        for value in values:
+            # an unknown value gets a group of its own, which matches nothing
+            groups[known.get(value, value)].append(value)
+        groups = dict(groups)
+
+    count = sum(len(values) for values in groups.values())
+    if count > MAX_FILTER_VALUES:
+        frappe.throw(f"At most {MAX_FILTER_VALUES} attribute values can be filtered on, got {count}")
+    return groups
+
+
+def get_attribute_conditions(groups):
+    """One `name IN (subquery)` condition on PIM Item per attribute"""
+    item = frappe.qb.DocType("PIM Item")
+    assignment = frappe.qb.DocType(ASSIGNMENT_DOCTYPE)
+
+    return [
+        item.name.isin(
+            frappe.qb.from_(assignment)
+            .select(assignment.parent)
+            .where(assignment.pim_attribute_value.isin(values))
+            .where(assignment.parenttype == "PIM Item")
+        )
+        for values in groups.values()
+    ]
+
+
+def query_items(filters=None, attributes=None, fields=None, order_by="modified desc", limit=100, offset=0):
+    """
+    PIM Items matching standard filters and attribute filters
+
+    Args:
+        filters (dict): PIM Item filters as for frappe.get_all
+        attributes: attribute filters, see parse_attribute_filters
+
+    Returns:
+        list: item dicts with the requested fields
+    """
+    query = frappe.qb.get_query(
+        "PIM Item",
+        fields=fields or ["name"],
+        filters=filters or {},
+        order_by=order_by,
+        limit=cint(limit) or None,
+        offset=cint(offset)
+    )
+    for condition in get_attribute_conditions(parse_attribute_filters(attributes)):
+        query = query.where(condition)
+    return query.run(as_dict=True)
+
+
+def count_items(filters=None, attributes=None):
+    """Number of PIM Items matching standard filters and attribute filters"""
+    query = frappe.qb.get_query("PIM Item", fields=[Count("*").as_("count")], filters=filters or {})
+    for condition in get_attribute_conditions(parse_attribute_filters(attributes)):
+        query = query.where(condition)
+    return query.run()[0][0]
+
+
+def validate_assignments(doc):
+    """Reject repeated values and several values of a single-value attribute"""
+    values = [row.pim_attribute_value for row in doc.get("item_attributes") or []]
+    if not values:
+        return
+
+    repeated = sorted({value for value in values if values.count(value) > 1})
+    if repeated:
+        frappe.throw(f"Attribute values are listed more than once: {', '.join(repeated)}")
+
+    # fetch_from fills pim_attribute only after before_save, so read it here
+    by_attribute = defaultdict(list)
+    for value, attribute in frappe.get_all(
+        "PIM Attribute Value",
+        filters={"name": ["in", values]},
+        fields=["name", "pim_attribute"],
+        as_list=True
+    ):
+        by_attribute[attribute].append(value)
+
+    multi_value = set(frappe.get_all(
+        "PIM Attribute",
+        filters={"name": ["in", list(by_attribute)], "attribute_type": ["in", MULTI_VALUE_TYPES]},
+        pluck="name"
+    ))
+
+    for attribute, attribute_values in by_attribute.items():
+        if len(attribute_values) > 1 and attribute not in multi_value:
+            frappe.throw(f"Attribute {attribute} takes a single value, got {', '.join(attribute_values)}")
+
+
+def get_permitted_names(filters=None, attributes=None):
+    """Names of every matching item, for users whose rows frappe.get_list filters"""
+    return [row.name for row in query_items(filters=filters, attributes=attributes, order_by=None, limit=0)]
+
+
+def query_permitted_items(filters=None, attributes=None, fields=None, order_by="modified desc", limit=100, offset=0):
+    """
+    query_items limited to the items the session user may read
+
+    Users frappe.get_list adds no conditions for get the single statement of
+    query_items. For others the semi-joins pick the matching names and
+    get_list reads the page among them with its permission conditions.
+    """
+    frappe.has_permission("PIM Item", "read", throw=True)
+    if has_unrestricted_read("PIM Item"):
+        return query_items(filters, attributes, fields, order_by=order_by, limit=limit, offset=offset)
+
+    names = get_permitted_names(filters, attributes)
+    if not names:
+        return []
+    return frappe.get_list(
+        "PIM Item",
+        filters={"name": ["in", names]},
+        fields=fields or ["name"],
+        order_by=order_by,
+        limit_start=cint(offset),
+        limit_page_length=cint(limit)
+    )
+
+
+def count_permitted_items(filters=None, attributes=None):
+    """count_items limited to the items the session user may read"""
+    frappe.has_permission("PIM Item", "read", throw=True)
+    if has_unrestricted_read("PIM Item"):
+        return count_items(filters, attributes)
+
+    names = get_permitted_names(filters, attributes)
+    if not names:
+        return 0
+    return frappe.get_list(
+        "PIM Item",
+        filters={"name": ["in", names]},
+        fields=["count(name) as total"],
+        limit_page_length=0
+    )[0].total
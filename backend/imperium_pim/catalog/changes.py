@@ -0,0 +1,115 @@
+"""
+Change log of PIM Items for in-memory read models
+
+Per-worker structures derived from PIM Item, like the facet index, stay
+current by re-reading the items changed since they were built instead of
+rebuilding. The log is a Redis stream of item names:
+
+    - the PIM Item controller and the feed ingest record changed names, which
+      are appended once the transaction commits, so readers never re-read an
+      item before its new values are visible;
+    - bulk loads that bypass both (the benchmark seeders) append a reset
+      entry instead;
+    - appending either kind of entry also invalidates the shared endpoint
+      cache (performance.cache) and pushes the change to open clients
+      (catalog.realtime);
+    - every reader keeps a ChangeCursor, the id of the last entry it applied.
+
+The stream is capped at MAX_LENGTH entries. A reader more than MAX_REPLAY
+entries behind, which includes every reader whose position was trimmed
+away, is told to rebuild, as is one that reaches a reset entry.
+"""
+
+import frappe
+
+from imperium_pim.catalog.realtime import queue_changes
+from imperium_pim.performance.cache import invalidate_cache
+
+STREAM_KEY = "imperium_pim:item_changes"
+
+MAX_LENGTH = 100000
+
+# Changes replayed at once; further behind, rebuilding is cheaper
+MAX_REPLAY = 50000
+
+
+def get_stream_key():
+    return frappe.cache().make_key(STREAM_KEY)
+
+
+def append_entries(entries):
+    """Append entries to the stream in one round-trip"""
+    key = get_stream_key()
+    pipeline = frappe.cache().pipeline(transaction=False)
+    for entry in entries:
+        pipeline.xadd(key, entry, maxlen=MAX_LENGTH, approximate=True)
+    pipeline.execute()
+
+
+def record_item_changes(names):
+    """Log item names as changed when the current transaction commits"""
+    pending = getattr(frappe.local, "pim_item_changes", None)
+    if pending is None:
+        pending = frappe.local.pim_item_changes = set()
+        frappe.db.after_commit.add(flush_item_changes)
+        frappe.db.after_rollback.add(discard_item_changes)
+    pending.update(name for name in names if name)
+
+
+def flush_item_changes():
+    pending = getattr(frappe.local, "pim_item_changes", None)
+    frappe.local.pim_item_changes = None
+    if pending:
+        append_entries([{"item": name} for name in sorted(pending)])
+        invalidate_cache()
+        queue_changes("PIM Item", pending)
+
+
+def discard_item_changes():
+    frappe.local.pim_item_changes = None
+
+
+def reset_item_changes():
+    """Make every reader rebuild; call after bulk writes that bypass the controllers"""
+    append_entries([{"reset": 1}])
+    invalidate_cache()
+    queue_changes("PIM Item", None)
+
+
+class ChangeCursor:
+    """Position of one reader in the item change log"""
+
+    __slots__ = ("last_id",)
+
+    def __init__(self, last_id=None):
+        self.last_id = last_id
+
+    def start(self):
+        """Move to the end of the log; call before reading the items a model is built from"""
+        latest = frappe.cache().xrevrange(get_stream_key(), count=1)
+        self.last_id = frappe.safe_decode(latest[0][0]) if latest else "0-0"
+
+    def read(self):
+        """
+        Changes since the last read
+
+        Returns:
+            tuple: (set of changed item names, whether the reader must rebuild)
+        """
+        if self.last_id is None:
+            return set(), True
+
+        entries = frappe.cache().xrange(get_stream_key(), min=f"({self.last_id}", count=MAX_REPLAY + 1)
+        if len(entries) > MAX_REPLAY:
+            return set(), True
+
+        names = set()
+        rebuild = False
+        for entry_id, fields in entries:
+            self.last_id = frappe.safe_decode(entry_id)
+            item = fields.get(b"item")
+            if item is None:
+                rebuild = True
+            else:
+                names.add(frappe.safe_decode(item))
+        return names, rebuild
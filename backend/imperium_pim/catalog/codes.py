@@ -0,0 +1,181 @@
+"""
+Batch resolution of item codes
+
+Integrations look items up by UPC, PIM SKU or vendor SKU thousands at a time.
+resolve_codes answers a whole batch with one `IN` query per CHUNK_SIZE codes
+against the indexed column, instead of one list query per code.
+
+Codes that resolved to nothing are remembered per worker in a negative cache,
+so feeds that keep sending the same unknown codes do not hit the database
+again. The cache is dropped on every worker through a version token in Redis
+whenever items are created or their codes change (see
+invalidate_missing_codes), and entries also expire after MISSING_TTL seconds
+as a safety net for writes that bypass the controllers.
+
+Users whose rows frappe.get_list filters (see catalog.permissions) are
+answered through get_list, and the codes they cannot see are not added to the
+shared negative cache.
+"""
+
+import time
+
+import frappe
+
+from imperium_pim.catalog.permissions import has_unrestricted_read
+
+# Column looked up for each kind of code
+CODE_COLUMNS = {
+    "upc": "upc",
+    "sku": "name",
+    "vendor_sku": "vendor_sku"
+}
+
+RESOLVED_FIELDS = ["name", "sku", "name1", "status", "upc", "vendor_code", "vendor_sku"]
+
+MAX_CODES = 10000
+CHUNK_SIZE = 1000
+
+MISSING_TTL = 300
+
+# Entries kept per kind before the negative cache starts over
+MISSING_LIMIT = 100000
+
+MISSING_VERSION_KEY = "imperium_pim:item_codes_version"
+
+
+class MissingCodes:
+    """
+    Per-worker negative cache of codes that did not resolve
+
+    Args:
+        ttl (float): seconds an entry is trusted
+        limit (int): entries per kind before the cache is cleared
+    """
+
+    def __init__(self, ttl=MISSING_TTL, limit=MISSING_LIMIT):
+        self.ttl = ttl
+        self.limit = limit
+        self.version = None
+        self.entries = {}
+
+    def sync(self, version):
+        """Drop everything if items changed since the entries were cached"""
+        if version != self.version:
+            self.entries = {}
+            self.version = version
+
+    def split(self, kind, codes, now=None):
+        """
+        Separate codes known to be missing from those to look up
+
+        Returns:
+            tuple: (codes to query, codes known to be missing)
+        """
+        now = now or time.monotonic()
+        entries = self.entries.get(kind, {})
+        lookup, missing = [], []
+        for code in codes:
+            expires = entries.get(code)
+            if expires and expires > now:
+                missing.append(code)
+            else:
+                lookup.append(code)
+        return lookup, missing
+
+    def add(self, kind, codes, now=None):
+        entries = self.entries.setdefault(kind, {})
+        if len(entries) + len(codes) > self.limit:
+            entries.clear()
+        expires = (now or time.monotonic()) + self.ttl
+        for code in codes:
+            entries[code] = expires
+
+    def clear(self):
+        self.entries = {}
+
+
+_missing_codes = MissingCodes()
+
+
+def get_codes_version():
+    return frappe.cache().get_value(MISSING_VERSION_KEY)
+
+
+def invalidate_missing_codes():
+    """Forget negative cache entries on every worker; call when items gain codes"""
+    frappe.cache().set_value(MISSING_VERSION_KEY, frappe.generate_hash(length=10))
+    _missing_codes.clear()
+
+
+def normalize_codes(codes):
+    """Deduplicated, stripped codes in their original order"""
+    if isinstance(codes, str):
+        codes = frappe.parse_json(codes) if codes.lstrip().startswith("[") else codes.split(",")
+
+    seen = {}
+    for code in codes or []:
+        code = str(code).strip()
+        if code:
+            seen.setdefault(code, None)
+    return list(seen)
+
+
+def query_codes(kind, codes, vendor=None, unrestricted=True):
+    """
+    Items matching codes of one kind, grouped by code
+
+    Args:
+        unrestricted (bool): whether the user may read every item; otherwise
+                             only the items get_list returns for them match
+    """
+    column = CODE_COLUMNS[kind]
+    matches = {}
+    get_items = frappe.get_all if unrestricted else frappe.get_list
+
+    for start in range(0, len(codes), CHUNK_SIZE):
+        filters = {column: ["in", codes[start:start + CHUNK_SIZE]]}
+        if vendor:
+            filters["vendor_code"] = vendor
+        for item in get_items("PIM Item", filters=filters, fields=RESOLVED_FIELDS, limit_page_length=0):
+            matches.setdefault(item[column], []).append(item)
+
+    return matches
+
+
+def resolve(codes, kind="upc", vendor=None):
+    """
+    Resolve a batch of codes to PIM Items
+
+    Args:
+        codes (list): codes to resolve
+        kind (str): "upc", "sku" or "vendor_sku"
+        vendor (str): limit matches to one vendor, mostly useful for vendor SKUs
+
+    Returns:
+        dict: resolved (code -> list of items), missing codes, ambiguous codes
+              matching more than one item, and the number of codes answered
+              from the negative cache
+    """
+    if kind not in CODE_COLUMNS:
+        frappe.throw(f"Unknown code kind {kind}, expected one of {', '.join(CODE_COLUMNS)}")
+
+    codes = normalize_codes(codes)
+    if len(codes) > MAX_CODES:
+        frappe.throw(f"At most {MAX_CODES} codes can be resolved per call, got {len(codes)}")
+
+    cache_kind = f"{kind}:{vendor}" if vendor else kind
+    _missing_codes.sync(get_codes_version())
+    lookup, cached_missing = _missing_codes.split(cache_kind, codes)
+
+    unrestricted = has_unrestricted_read("PIM Item") if lookup else True
+    matches = query_codes(kind, lookup, vendor, unrestricted) if lookup else {}
+    if unrestricted:
+        # a restricted user's misses may be items they cannot read
+        _missing_codes.add(cache_kind, [code for code in lookup if code not in matches])
+
+    return {
+        "resolved": {code: matches[code] for code in codes if code in matches},
+        "missing": [code for code in codes if code not in matches],
+        "ambiguous": [code for code in codes if len(matches.get(code, ())) > 1],
+        "cached_missing": len(cached_missing)
+    }
@@ -0,0 +1,386 @@
+"""
+In-memory bitmap index of PIM Item facets
+
+Facet filters on low-cardinality item columns are answered per worker from
+bitsets instead of SQL. Every item gets an ordinal, and every (field, value)
+pair a Python int whose bit n is set when item n has that value:
+
+    status = Current AND (brand = Oak OR brand = Maple)
+    -> bitmaps["status"]["Current"] & (bitmaps["brand"]["Oak"] | bitmaps["brand"]["Maple"])
+
+Python ints are arbitrary-length bitsets with native AND/OR and bit_count(),
+so combinations and counts over a million items take microseconds to a few
+hundred microseconds. Memory is one bit per item per distinct value, e.g.
+125 KB per value for a million items, which is why only low-cardinality
+fields belong in FACET_FIELDS.
+
+Ordinals follow `modified`: the index is built in modified order and an
+updated item moves to a fresh ordinal at the top, so walking set bits from
+the highest down lists items newest first, like the list endpoints do. Holes
+left by moved and deleted items are compacted away once they outnumber the
+live items.
+
+The index is built on first use in each worker and kept current from the
+item change log (catalog.changes): every use replays the names changed since
+the last one and re-reads just those items.
+"""
+
+import sys
+from array import array
+
+import frappe
+
+from imperium_pim.catalog.changes import ChangeCursor
+from imperium_pim.catalog.read_model import get_read_model
+
+FACET_FIELDS = ("status", "item_type", "dropship", "assembly_required", "vendor_code", "brand")
+
+BUILD_BATCH_SIZE = 50000
+
+# Ordinals per block when walking set bits
+BLOCK_BITS = 4096
+
+
+def normalize(value):
+    """Facet key of a value; filters arrive as strings, so everything but NULL is one"""
+    return None if value is None or value == "" else sys.intern(str(value))
+
+
+def to_bitmap(ordinals):
+    """Bitmap with the given ordinals set"""
+    if len(ordinals) < 64:
+        bitmap = 0
+        for ordinal in ordinals:
+            bitmap |= 1 << ordinal
+        return bitmap
+
+    import numpy as np
+
+    flags = np.zeros(max(ordinals) + 1, dtype=bool)
+    flags[ordinals] = True
+    return int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
+
+
+class FacetIndex:
+    """
+    Bitmap index over facet fields of PIM Item
+
+    Args:
+        fields (tuple): facet fields
+
+    Each field keeps its distinct values as small integer codes and a column
+    of codes per ordinal, so moving or removing an item knows which bitmaps
+    to clear without keeping its row.
+    """
+
+    __slots__ = ("fields", "names", "ordinals", "keys", "codes", "columns", "bitmaps", "alive")
+
+    def __init__(self, fields=FACET_FIELDS):
+        self.fields = tuple(fields)
+        self.load([])
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def encode(self, position, value):
+        key = normalize(value)
+        codes = self.codes[position]
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = len(self.keys[position])
+            self.keys[position].append(key)
+        return code
+
+    def load(self, rows):
+        """Replace the contents with rows of (name, value per field), oldest first"""
+        import numpy as np
+
+        self.names = []
+        self.ordinals = {}
+        self.keys = [[] for _field in self.fields]
+        self.codes = [{} for _field in self.fields]
+        self.columns = [array("i") for _field in self.fields]
+
+        encode = self.encode
+        for name, *values in rows:
+            self.ordinals[name] = len(self.names)
+            self.names.append(name)
+            for position, value in enumerate(values):
+                self.columns[position].append(encode(position, value))
+
+        self.alive = (1 << len(self.names)) - 1
+        self.bitmaps = {}
+        for position, field in enumerate(self.fields):
+            column = np.frombuffer(self.columns[position], dtype=np.int32)
+            self.bitmaps[field] = {
+                key: int.from_bytes(np.packbits(column == code, bitorder="little").tobytes(), "little")
+                for code, key in enumerate(self.keys[position])
+            }
+
+    def apply(self, rows, removed=()):
+        """
+        Move changed items to fresh ordinals and drop removed ones
+
+        Args:
+            rows: (name, value per field) of items created or changed, oldest first
+            removed: names of deleted items
+        """
+        rows = list(rows)
+        cleared = []
+        cleared_keys = [set() for _field in self.fields]
+        for name in [*removed, *(row[0] for row in rows)]:
+            ordinal = self.ordinals.pop(name, None)
+            if ordinal is None:
+                continue
+            cleared.append(ordinal)
+            self.names[ordinal] = None
+            for position, column in enumerate(self.columns):
+                cleared_keys[position].add(self.keys[position][column[ordinal]])
+                column[ordinal] = -1
+
+        added = []
+        added_keys = [{} for _field in self.fields]
+        for name, *values in rows:
+            ordinal = len(self.names)
+            added.append(ordinal)
+            self.ordinals[name] = ordinal
+            self.names.append(name)
+            for position, value in enumerate(values):
+                code = self.encode(position, value)
+                self.columns[position].append(code)
+                added_keys[position].setdefault(self.keys[position][code], []).append(ordinal)
+
+        # one pass over each touched bitmap, however many items changed
+        keep = ~to_bitmap(cleared)
+        self.alive = (self.alive & keep) | to_bitmap(added)
+        for position, field in enumerate(self.fields):
+            bitmaps = self.bitmaps[field]
+            for key in cleared_keys[position]:
+                bitmaps[key] &= keep
+            for key, ordinals in added_keys[position].items():
+                bitmaps[key] = bitmaps.get(key, 0) | to_bitmap(ordinals)
+
+        if len(self.names) > 2 * len(self.ordinals) + BLOCK_BITS:
+            self.compact()
+
+    def compact(self):
+        """Renumber live items without the holes left by updates and deletes"""
+        self.load([
+            (name, *(self.keys[position][column[ordinal]] for position, column in enumerate(self.columns)))
+            for ordinal, name in enumerate(self.names)
+            if name is not None
+        ])
+
+    def match(self, expression):
+        """
+        Bitmap of the items matching a facet expression
+
+        An expression is a dict. Field keys AND together, a list of values
+        for one field ORs them; "$and", "$or" and "$not" combine nested
+        expressions:
+
+            {"status": "Current", "$or": [{"brand": "Oak"}, {"vendor_code": ["V1", "V2"]}]}
+
+        Returns:
+            int: bitmap of matching ordinals
+        """
+        result = self.alive
+        for key, value in (expression or {}).items():
+            if key == "$and":
+                for child in value:
+                    result &= self.match(child)
+            elif key == "$or":
+                combined = 0
+                for child in value:
+                    combined |= self.match(child)
+                result &= combined
+            elif key == "$not":
+                result &= ~self.match(value)
+            elif key in self.bitmaps:
+                bitmaps = self.bitmaps[key]
+                combined = 0
+                for item in value if isinstance(value, (list, tuple, set)) else [value]:
+                    combined |= bitmaps.get(normalize(item), 0)
+                result &= combined
+            else:
+                frappe.throw(f"{key} is not a facet field, expected one of {', '.join(self.fields)}")
+        return result
+
+    def count(self, expression=None):
+        return self.match(expression).bit_count()
+
+    def facet_counts(self, expression=None, fields=None):
+        """
+        Item counts per value of each facet field
+
+        A field's own condition is left out when counting its values, so the
+        counts show what selecting another value of that field would return.
+
+        Returns:
+            dict: field -> {value: count}, values with no items left out
+        """
+        expression = expression or {}
+        counts = {}
+        for field in fields or self.fields:
+            base = self.match({key: value for key, value in expression.items() if key != field})
+            field_counts = {}
+            for key, bits in self.bitmaps[field].items():
+                count = (base & bits).bit_count()
+                if count:
+                    field_counts[key] = count
+            counts[field] = field_counts
+        return counts
+
+    def page(self, bitmap, limit=50, offset=0):
+        """Names of the items in a bitmap, newest first"""
+        names = []
+        if limit <= 0 or not bitmap:
+            return names
+
+        block_bytes = BLOCK_BITS // 8
+        data = bitmap.to_bytes(-(-bitmap.bit_length() // BLOCK_BITS) * block_bytes, "little")
+        skip = offset
+        for start in range(len(data) - block_bytes, -1, -block_bytes):
+            block = int.from_bytes(data[start:start + block_bytes], "little")
+            if not block:
+                continue
+            count = block.bit_count()
+            if skip >= count:
+                skip -= count
+                continue
+            while block:
+                bit = block.bit_length() - 1
+                block ^= 1 << bit
+                if skip:
+                    skip -= 1
+                    continue
+                names.append(self.names[start * 8 + bit])
+                if len(names) >= limit:
+                    return names
+        return names
+
+
+def read_rows(names=None, batch_size=BUILD_BATCH_SIZE):
+    """
+    (name, value per facet field) of all items, or of the given names,
+    oldest first
+    """
+    fields = ["name", "modified", *FACET_FIELDS]
+    rows = []
+    if names is not None:
+        names = sorted(names)
+        for start in range(0, len(names), batch_size):
+            rows.extend(frappe.get_all(
+                "PIM Item",
+                filters={"name": ["in", names[start:start + batch_size]]},
+                fields=fields,
+                as_list=True
+            ))
+    else:
+        last_name = ""
+        while True:
+            batch = frappe.get_all(
+                "PIM Item",
+                filters={"name": [">", last_name]},
+                fields=fields,
+                order_by="name asc",
+                limit=batch_size,
+                as_list=True
+            )
+            if not batch:
+                break
+            rows.extend(batch)
+            last_name = batch[-1][0]
+
+    rows.sort(key=lambda row: (row[1], row[0]))
+    return [(row[0], *row[2:]) for row in rows]
+
+
+# Per-worker index and its position in the item change log
+_index = None
+_cursor = None
+
+
+def get_facet_index():
+    """
+    The worker's facet index, built on first use and brought up to date with
+    the item change log on every call (one Redis round-trip)
+    """
+    global _index, _cursor
+    if _index is not None:
+        names, rebuild = _cursor.read()
+        if not rebuild:
+            if names:
+                rows = read_rows(names)
+                _index.apply(rows, removed=names - {row[0] for row in rows})
+            return _index
+
+    # position the cursor first, so changes committed during the build are replayed
+    cursor = ChangeCursor()
+    cursor.start()
+    index = FacetIndex()
+    index.load(read_rows())
+    _index, _cursor = index, cursor
+    return index
+
+
+def clear_facet_index():
+    """Drop this worker's index; the next use rebuilds it"""
+    global _index, _cursor
+    _index = _cursor = None
+
+
+def parse_filters(filters):
+    """
+    Facet expression equivalent to frappe.get_all style filters
+
+    Returns:
+        dict: the expression, or None when a filter is not an equality or
+              `in` on a facet field, so SQL must answer the query
+    """
+    expression = {}
+    for field, value in (filters or {}).items():
+        if field not in FACET_FIELDS:
+            return None
+        if isinstance(value, (list, tuple)):
+            if len(value) != 2 or str(value[0]).lower() not in ("=", "in"):
+                return None
+            operator, value = str(value[0]).lower(), value[1]
+            if operator == "in" and isinstance(value, str):
+                value = [part.strip() for part in value.split(",")]
+        expression[field] = value
+    return expression
+
+
+def query_page(filters, fields, limit=50, offset=0):
+    """
+    A page of PIM Items, newest first, and their total for facet-only filters
+
+    The index picks the names; their rows come from the catalog read model
+    when it is enabled, otherwise from one primary key query.
+
+    Returns:
+        tuple: (rows, total count), or None when the filters need SQL
+    """
+    expression = parse_filters(filters)
+    if expression is None:
+        return None
+
+    index = get_facet_index()
+    bitmap = index.match(expression)
+    total = bitmap.bit_count()
+    names = index.page(bitmap, limit=int(limit), offset=int(offset or 0))
+    if not names:
+        return [], total
+
+    if isinstance(fields, str):
+        fields = frappe.parse_json(fields) if fields.lstrip().startswith("[") else fields.split(",")
+    fields = [field.strip() for field in fields]
+    model = get_read_model()
+    if model is not None:
+        return model.get_rows(names, fields), total
+
+    if "name" not in fields:
+        fields.append("name")
+    rows = {row.name: row for row in frappe.get_all("PIM Item", filters={"name": ["in", names]}, fields=fields)}
+    return [rows[name] for name in names if name in rows], total
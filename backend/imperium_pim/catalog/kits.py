@@ -0,0 +1,226 @@
+"""
+Kit composition and its closure table
+
+A kit lists its direct components in the `kit_components` table of PIM Item;
+components may be kits themselves. PIM Kit Closure materializes every
+(ancestor, descendant) pair reachable through those tables with the depth of
+the shortest path and the quantity of the descendant in one ancestor, summed
+over all paths. Both directions are then a single indexed lookup:
+
+    all components of kit X, at every level      ancestor = X
+    all kits containing component Y             descendant = Y
+
+The closure of a kit is rebuilt from its direct components and their own,
+already materialized closures, so a change costs one query per affected kit:
+the changed kit and then its ancestors, children before parents.
+"""
+
+import hashlib
+from collections import defaultdict
+
+import frappe
+from frappe.utils import flt, now
+
+CLOSURE_DOCTYPE = "PIM Kit Closure"
+COMPONENT_DOCTYPE = "PIM Kit Component"
+
+CLOSURE_FIELDS = ["name", "ancestor", "descendant", "depth", "quantity",
+                  "creation", "modified", "owner", "modified_by", "docstatus"]
+
+
+def closure_name(ancestor, descendant):
+    """Deterministic row name, so concurrent rebuilds cannot duplicate a pair"""
+    return hashlib.md5(f"{ancestor}\x00{descendant}".encode()).hexdigest()[:20]
+
+
+def get_component_pairs(doc):
+    """(component, quantity) pairs of a PIM Item document's kit components"""
+    return [(row.component, flt(row.quantity) or 1) for row in doc.get("kit_components") or []]
+
+
+def get_direct_components(kits):
+    """kit -> [(component, quantity)] for a list of kits"""
+    components = defaultdict(list)
+    if not kits:
+        return components
+
+    for row in frappe.get_all(
+        COMPONENT_DOCTYPE,
+        filters={"parent": ["in", list(kits)], "parenttype": "PIM Item", "parentfield": "kit_components"},
+        fields=["parent", "component", "quantity"],
+        order_by="idx asc"
+    ):
+        components[row.parent].append((row.component, flt(row.quantity) or 1))
+    return components
+
+
+def get_ancestors(item):
+    """Names of every kit containing item at any depth"""
+    return frappe.get_all(CLOSURE_DOCTYPE, filters={"descendant": item}, pluck="ancestor")
+
+
+def compute_closure(direct, closures):
+    """
+    Closure rows of one kit
+
+    Args:
+        direct (list): (component, quantity) pairs of the kit
+        closures (dict): component -> its own closure rows as
+            {descendant: (depth, quantity)}
+
+    Returns:
+        dict: descendant -> (depth, quantity)
+    """
+    rows = {}
+
+    def add(descendant, depth, quantity):
+        current = rows.get(descendant)
+        if current is None:
+            rows[descendant] = (depth, quantity)
+        else:
+            rows[descendant] = (min(current[0], depth), current[1] + quantity)
+
+    for component, quantity in direct:
+        add(component, 1, quantity)
+        for descendant, (depth, per_unit) in closures.get(component, {}).items():
+            add(descendant, depth + 1, quantity * per_unit)
+
+    return rows
+
+
+def load_closures(items):
+    """item -> {descendant: (depth, quantity)} from the closure table"""
+    closures = defaultdict(dict)
+    if not items:
+        return closures
+
+    for row in frappe.get_all(
+        CLOSURE_DOCTYPE,
+        filters={"ancestor": ["in", list(items)]},
+        fields=["ancestor", "descendant", "depth", "quantity"]
+    ):
+        closures[row.ancestor][row.descendant] = (row.depth, flt(row.quantity))
+    return closures
+
+
+def write_closure(kit, rows):
+    """Replace the closure rows of one kit"""
+    frappe.db.delete(CLOSURE_DOCTYPE, {"ancestor": kit})
+    if not rows:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+    frappe.db.bulk_insert(CLOSURE_DOCTYPE, fields=CLOSURE_FIELDS, values=[
+        [closure_name(kit, descendant), kit, descendant, depth, quantity, timestamp, timestamp, user, user, 0]
+        for descendant, (depth, quantity) in rows.items()
+    ])
+
+
+def order_children_first(kits, components):
+    """Kits sorted so every kit comes after the kits among its components"""
+    kits = set(kits)
+    ordered, visited = [], set()
+
+    def visit(kit):
+        if kit in visited:
+            return
+        visited.add(kit)
+        for component, _quantity in components.get(kit, ()):
+            if component in kits:
+                visit(component)
+        ordered.append(kit)
+
+    for kit in sorted(kits):
+        visit(kit)
+    return ordered
+
+
+def rebuild_closure(kit):
+    """
+    Rebuild the closure of a kit whose components changed, then of every kit
+    containing it
+
+    Returns:
+        int: kits rebuilt
+    """
+    affected = [kit, *get_ancestors(kit)]
+    components = get_direct_components(affected)
+    ordered = order_children_first(affected, components)
+    rebuilt = set(ordered)
+
+    # closures of components outside the affected set do not change
+    outside = {
+        component
+        for direct in components.values()
+        for component, _quantity in direct
+        if component not in rebuilt
+    }
+    closures = load_closures(outside)
+
+    for current in ordered:
+        rows = compute_closure(components.get(current, []), closures)
+        write_closure(current, rows)
+        closures[current] = rows
+
+    return len(ordered)
+
+
+def rebuild_all():
+    """Rebuild the whole closure table from the kit component tables"""
+    kits = frappe.get_all(
+        COMPONENT_DOCTYPE,
+        filters={"parenttype": "PIM Item", "parentfield": "kit_components"},
+        pluck="parent",
+        distinct=True
+    )
+    components = get_direct_components(kits)
+    closures = {}
+
+    frappe.db.delete(CLOSURE_DOCTYPE)
+    for kit in order_children_first(kits, components):
+        closures[kit] = compute_closure(components[kit], closures)
+        write_closure(kit, closures[kit])
+
+    return {"kits": len(kits), "rows": sum(len(rows) for rows in closures.values())}
+
+
+def validate_components(kit, components):
+    """Reject components that would make a kit contain itself"""
+    names = [component for component, _quantity in components]
+    if kit in names:
+        frappe.throw(f"Kit {kit} cannot contain itself")
+
+    ancestors = set(get_ancestors(kit))
+    cycles = [name for name in names if name in ancestors]
+    if cycles:
+        frappe.throw(f"Kit {kit} cannot contain {', '.join(cycles)}, which already contain {kit}")
+
+
+def get_components(kit, max_depth=None):
+    """
+    Every component of a kit, any depth
+
+    Returns:
+        list: dicts with component, depth and quantity, shallowest first
+    """
+    filters = {"ancestor": kit}
+    if max_depth:
+        filters["depth"] = ["<=", int(max_depth)]
+
+    return frappe.get_all(
+        CLOSURE_DOCTYPE,
+        filters=filters,
+        fields=["descendant as component", "depth", "quantity"],
+        order_by="depth asc, descendant asc"
+    )
+
+
+def get_containing_kits(component):
+    """Every kit containing a component, any depth, closest first"""
+    return frappe.get_all(
+        CLOSURE_DOCTYPE,
+        filters={"descendant": component},
+        fields=["ancestor as kit", "depth", "quantity"],
+        order_by="depth asc, ancestor asc"
+    )
@@ -0,0 +1,215 @@
+"""
+Derived logistics metrics of PIM Items
+
+Shipping rules work on numbers derived from the carton dimensions rather than
+the raw dimensions themselves: cubic volume, dimensional weight, the longest
+side and girth. They are stored on PIM Item as indexed columns so carrier
+eligibility becomes a range query in the database, e.g.
+
+    {"carton_billable_weight_lbs": ["<=", 70], "carton_length_girth_inches": ["<=", 165]}
+
+Metrics are computed
+    - on save by the PIM Item controller (compute_metrics),
+    - by the bulk feed ingest, which bypasses the controller, and
+    - for the whole catalog by backfill(), vectorized with NumPy.
+
+Dimensional weight follows the common parcel carrier rule: each dimension is
+rounded up to a whole inch, the product divided by the carrier's divisor
+(`pim_dim_weight_divisor` in site config, default 139) and the result rounded
+up to a whole pound. Items without a complete set of carton dimensions get no
+metrics.
+"""
+
+import math
+
+import frappe
+from frappe.utils import flt
+
+CARTON_DIMENSION_FIELDS = ("carton_width_inches", "carton_depth_inches", "carton_height_inches")
+CARTON_WEIGHT_FIELD = "carton_weight_lbs"
+
+METRIC_FIELDS = (
+    "carton_cubic_feet",
+    "carton_dim_weight_lbs",
+    "carton_billable_weight_lbs",
+    "carton_longest_side_inches",
+    "carton_middle_side_inches",
+    "carton_shortest_side_inches",
+    "carton_girth_inches",
+    "carton_length_girth_inches"
+)
+
+DIM_WEIGHT_DIVISOR = 139
+
+CUBIC_INCHES_PER_FOOT = 1728
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def get_divisor():
+    return flt(frappe.conf.get("pim_dim_weight_divisor")) or DIM_WEIGHT_DIVISOR
+
+
+def empty_metrics():
+    return {field: None for field in METRIC_FIELDS}
+
+
+def compute_metrics(width, depth, height, weight=None, divisor=DIM_WEIGHT_DIVISOR):
+    """
+    Logistics metrics of one carton
+
+    Returns:
+        dict: METRIC_FIELDS values, all None unless every dimension is positive
+    """
+    dimensions = [flt(width), flt(depth), flt(height)]
+    if min(dimensions) <= 0:
+        return empty_metrics()
+
+    shortest, middle, longest = sorted(dimensions)
+    dim_weight = math.ceil(
+        math.ceil(shortest) * math.ceil(middle) * math.ceil(longest) / divisor
+    )
+    girth = 2 * (shortest + middle)
+
+    return {
+        "carton_cubic_feet": round(shortest * middle * longest / CUBIC_INCHES_PER_FOOT, 4),
+        "carton_dim_weight_lbs": dim_weight,
+        "carton_billable_weight_lbs": max(dim_weight, flt(weight)),
+        "carton_longest_side_inches": longest,
+        "carton_middle_side_inches": middle,
+        "carton_shortest_side_inches": shortest,
+        "carton_girth_inches": round(girth, 2),
+        "carton_length_girth_inches": round(longest + girth, 2)
+    }
+
+
+def compute_metrics_array(dimensions, weights, divisor=DIM_WEIGHT_DIVISOR):
+    """
+    Vectorized compute_metrics for many cartons
+
+    Args:
+        dimensions: (n, 3) array of width, depth and height; NaN for missing
+        weights: (n,) array of carton weights; NaN for missing
+
+    Returns:
+        tuple: (valid mask, {metric field: (n,) array})
+    """
+    import numpy as np
+
+    dimensions = np.asarray(dimensions, dtype=float)
+    weights = np.nan_to_num(np.asarray(weights, dtype=float))
+    valid = np.all(dimensions > 0, axis=1)
+
+    ordered = np.sort(np.where(valid[:, None], dimensions, 1.0), axis=1)
+    shortest, middle, longest = ordered[:, 0], ordered[:, 1], ordered[:, 2]
+    dim_weight = np.ceil(np.prod(np.ceil(ordered), axis=1) / divisor)
+    girth = 2 * (shortest + middle)
+
+    return valid, {
+        "carton_cubic_feet": np.round(shortest * middle * longest / CUBIC_INCHES_PER_FOOT, 4),
+        "carton_dim_weight_lbs": dim_weight,
+        "carton_billable_weight_lbs": np.maximum(dim_weight, weights),
+        "carton_longest_side_inches": longest,
+        "carton_middle_side_inches": middle,
+        "carton_shortest_side_inches": shortest,
+        "carton_girth_inches": np.round(girth, 2),
+        "carton_length_girth_inches": np.round(longest + girth, 2)
+    }
+
+
+def get_item_metrics(values, divisor=None):
+    """Metrics of a PIM Item document or dict of its carton fields"""
+    get = values.get
+    return compute_metrics(
+        *(get(field) for field in CARTON_DIMENSION_FIELDS),
+        weight=get(CARTON_WEIGHT_FIELD),
+        divisor=divisor or get_divisor()
+    )
+
+
+def parse_box(box):
+    """
+    Sorted inner dimensions of a box given as "LxWxH", a list or a dict
+
+    Returns:
+        list: [shortest, middle, longest]
+    """
+    if isinstance(box, str):
+        box = box.lower().replace("*", "x").split("x")
+    elif isinstance(box, dict):
+        box = [box.get("length"), box.get("width"), box.get("height")]
+
+    dimensions = sorted(flt(side) for side in box or [])
+    if len(dimensions) != 3 or dimensions[0] <= 0:
+        frappe.throw(f"Box dimensions must be three positive numbers like 24x18x12, got {box}")
+    return dimensions
+
+
+def get_box_filters(box):
+    """
+    Filters for items whose carton fits in a box
+
+    A carton fits when, sides sorted, each side is at most the matching side
+    of the box (rotations in 90 degree steps only).
+    """
+    shortest, middle, longest = parse_box(box)
+    return {
+        "carton_longest_side_inches": ["<=", longest],
+        "carton_middle_side_inches": ["<=", middle],
+        "carton_shortest_side_inches": ["<=", shortest]
+    }
+
+
+def backfill(batch_size=BACKFILL_BATCH_SIZE, only_missing=False):
+    """
+    Recompute the metrics of every PIM Item
+
+    Items are read in name order in batches, computed with NumPy and written
+    back with bulk CASE updates. `modified` is left alone, so a backfill does
+    not look like a catalog change to incremental consumers.
+
+    Args:
+        batch_size (int): items per batch
+        only_missing (bool): skip items that already have metrics
+
+    Returns:
+        dict: items read and updated
+    """
+    import numpy as np
+
+    divisor = get_divisor()
+    fields = ["name", *CARTON_DIMENSION_FIELDS, CARTON_WEIGHT_FIELD]
+    stats = {"items": 0, "updated": 0}
+    last_name = ""
+
+    while True:
+        filters = {"name": [">", last_name]}
+        if only_missing:
+            filters["carton_cubic_feet"] = ["is", "not set"]
+
+        rows = frappe.get_all(
+            "PIM Item", filters=filters, fields=fields, order_by="name asc", limit=batch_size, as_list=True
+        )
+        if not rows:
+            break
+
+        names = [row[0] for row in rows]
+        values = np.array([row[1:] for row in rows], dtype=float)
+        valid, metrics = compute_metrics_array(values[:, :3], values[:, 3], divisor)
+
+        updates = {}
+        for index, name in enumerate(names):
+            if valid[index]:
+                updates[name] = {field: float(metrics[field][index]) for field in METRIC_FIELDS}
+            elif not only_missing:
+                updates[name] = empty_metrics()
+
+        if updates:
+            frappe.db.bulk_update("PIM Item", updates, chunk_size=1000, update_modified=False)
+        frappe.db.commit()
+
+        stats["items"] += len(rows)
+        stats["updated"] += len(updates)
+        last_name = names[-1]
+
+    return stats
@@ -0,0 +1,21 @@
+"""
+Row-level read permissions for catalog queries outside frappe.get_list
+
+The facet index, the catalog read models and the attribute semi-joins pick
+items without frappe.get_list, so they cannot apply the conditions it adds
+to a user's queries: User Permissions on PIM Item or the doctypes it links
+to (PIM Vendor), "if owner" roles and permission_query_conditions hooks.
+Those paths only serve users for whom get_list adds no conditions at all;
+everyone else is answered through frappe.get_list.
+"""
+
+import frappe
+
+
+def has_unrestricted_read(doctype):
+    """Whether the session user may read every record of doctype, so frappe.get_list would not filter rows"""
+    from frappe.desk.reportview import get_match_cond
+
+    if not frappe.has_permission(doctype, "read"):
+        return False
+    return not get_match_cond(doctype)
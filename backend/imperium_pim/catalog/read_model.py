@@ -0,0 +1,375 @@
+"""
+Columnar in-memory read model of the PIM Item catalog
+
+Reads outnumber writes by orders of magnitude, yet every read turns SQL rows
+into frappe._dict objects again. With `pim_item_read_model` set in site
+config, each worker keeps the catalog in columns instead and the item list
+and detail endpoints read from memory:
+
+    low-cardinality text    array of int32 codes + list of interned values
+    other text              list of str (sku shares the name object)
+    numbers                 array of float64, NaN for NULL
+    creation, modified      array of int64 microseconds since the epoch
+    item attributes         one shared array of value codes, with each item's
+                            start and count
+
+Rows are read through ItemRow, a __slots__ view of (model, ordinal) that
+materializes nothing until a field is asked for. memory_usage() reports the
+footprint, which is what decides whether the model fits a worker.
+
+Like the facet index, the model is built on first use in a worker and kept
+current from the item change log (catalog.changes). Changed items are
+re-read and overwritten in place, deleted ones leave a hole until the next
+compaction. To share one copy between the workers of a host, set
+`pim_catalog_snapshot` instead (catalog.snapshot).
+"""
+
+import math
+import sys
+from array import array
+from datetime import datetime, timedelta
+
+import frappe
+
+from imperium_pim.catalog.changes import ChangeCursor
+from imperium_pim.catalog.logistics import METRIC_FIELDS
+
+CODED_FIELDS = ("brand", "status", "item_type", "dropship", "assembly_required", "vendor_code")
+TEXT_FIELDS = ("sku", "name1", "upc", "vendor_sku")
+NUMBER_FIELDS = (
+    "item_width_inches", "item_depth_inches", "item_height_inches", "item_weight_lbs",
+    "carton_width_inches", "carton_depth_inches", "carton_height_inches", "carton_weight_lbs",
+    *METRIC_FIELDS
+)
+DATETIME_FIELDS = ("creation", "modified")
+
+FIELDS = ("name", *CODED_FIELDS, *TEXT_FIELDS, *NUMBER_FIELDS, *DATETIME_FIELDS)
+
+ATTRIBUTE_FIELDS = ("pim_attribute", "pim_attribute_value", "attribute_value_name")
+
+BUILD_BATCH_SIZE = 50000
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+NULL_DATETIME = -(2 ** 63)
+
+
+def to_micros(value):
+    return NULL_DATETIME if value is None else (value - EPOCH) // MICROSECOND
+
+
+def from_micros(value):
+    return None if value == NULL_DATETIME else EPOCH + timedelta(microseconds=value)
+
+
+def split_fields(fields):
+    """(column, alias) of each field, which may be aliased as in frappe.get_all"""
+    selected = []
+    for field in fields:
+        column, _as, alias = field.strip().partition(" as ")
+        selected.append((column.strip(), (alias or column).strip()))
+    return selected
+
+
+class ItemRow:
+    """Read-only view of one item in a CatalogReadModel"""
+
+    __slots__ = ("model", "ordinal")
+
+    def __init__(self, model, ordinal):
+        self.model = model
+        self.ordinal = ordinal
+
+    def __getattr__(self, field):
+        try:
+            return self.model.value(field, self.ordinal)
+        except KeyError:
+            raise AttributeError(field) from None
+
+    def get(self, field, default=None):
+        try:
+            return self.model.value(field, self.ordinal)
+        except KeyError:
+            return default
+
+    def as_dict(self, fields=FIELDS):
+        return frappe._dict({field: self.model.value(field, self.ordinal) for field in fields})
+
+
+class CatalogReadModel:
+    """Column store of PIM Items; see the module docstring for the layout"""
+
+    __slots__ = (
+        "names", "ordinals", "keys", "codes", "columns",
+        "attribute_values", "attribute_codes", "attribute_data", "attribute_start", "attribute_count"
+    )
+
+    def __init__(self):
+        self.names = []
+        self.ordinals = {}
+        self.keys = {field: [] for field in CODED_FIELDS}
+        self.codes = {field: {} for field in CODED_FIELDS}
+        self.columns = {
+            **{field: array("i") for field in CODED_FIELDS},
+            **{field: [] for field in TEXT_FIELDS},
+            **{field: array("d") for field in NUMBER_FIELDS},
+            **{field: array("q") for field in DATETIME_FIELDS}
+        }
+        self.attribute_values = []
+        self.attribute_codes = {}
+        self.attribute_data = array("i")
+        self.attribute_start = array("q")
+        self.attribute_count = array("i")
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def encode(self, field, value):
+        codes = self.codes[field]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.keys[field])
+            self.keys[field].append(None if value is None else sys.intern(value))
+        return code
+
+    def encode_attributes(self, rows):
+        """Append an item's attribute rows to attribute_data, returning (start, count)"""
+        start = len(self.attribute_data)
+        for row in rows:
+            code = self.attribute_codes.get(row)
+            if code is None:
+                code = self.attribute_codes[row] = len(self.attribute_values)
+                self.attribute_values.append(frappe._dict(zip(ATTRIBUTE_FIELDS, row)))
+            self.attribute_data.append(code)
+        return start, len(self.attribute_data) - start
+
+    def set_row(self, ordinal, row, attributes):
+        """Write one item, a tuple in FIELDS order, at an ordinal; len(self.names) appends"""
+        values = dict(zip(FIELDS, row))
+        name = values["name"]
+        column_values = {}
+        for field in CODED_FIELDS:
+            column_values[field] = self.encode(field, values[field])
+        for field in TEXT_FIELDS:
+            value = values[field]
+            column_values[field] = name if value == name else value
+        for field in NUMBER_FIELDS:
+            value = values[field]
+            column_values[field] = math.nan if value is None else float(value)
+        for field in DATETIME_FIELDS:
+            column_values[field] = to_micros(values[field])
+        start, count = self.encode_attributes(attributes)
+
+        if ordinal == len(self.names):
+            self.names.append(name)
+            for field, value in column_values.items():
+                self.columns[field].append(value)
+            self.attribute_start.append(start)
+            self.attribute_count.append(count)
+        else:
+            self.names[ordinal] = name
+            for field, value in column_values.items():
+                self.columns[field][ordinal] = value
+            self.attribute_start[ordinal] = start
+            self.attribute_count[ordinal] = count
+        self.ordinals[name] = ordinal
+
+    def load(self, rows, attributes):
+        """
+        Args:
+            rows: tuples of FIELDS values
+            attributes (dict): name -> tuples of ATTRIBUTE_FIELDS values
+        """
+        for row in rows:
+            self.set_row(len(self.names), row, attributes.get(row[0], ()))
+
+    def apply(self, rows, attributes, removed=()):
+        """Overwrite changed items in place, append new ones and drop removed ones"""
+        for name in removed:
+            ordinal = self.ordinals.pop(name, None)
+            if ordinal is not None:
+                self.names[ordinal] = None
+                self.attribute_count[ordinal] = 0
+        for row in rows:
+            self.set_row(self.ordinals.get(row[0], len(self.names)), row, attributes.get(row[0], ()))
+
+    def needs_compaction(self):
+        holes = len(self.names) - len(self.ordinals)
+        return holes > len(self.ordinals) or len(self.attribute_data) > 2 * sum(self.attribute_count) + 100000
+
+    def value(self, field, ordinal):
+        if field == "name":
+            return self.names[ordinal]
+        if field == "item_attributes":
+            start = self.attribute_start[ordinal]
+            return [
+                self.attribute_values[code]
+                for code in self.attribute_data[start:start + self.attribute_count[ordinal]]
+            ]
+        column = self.columns[field]
+        if field in CODED_FIELDS:
+            return self.keys[field][column[ordinal]]
+        if field in NUMBER_FIELDS:
+            value = column[ordinal]
+            return None if value != value else value
+        if field in DATETIME_FIELDS:
+            return from_micros(column[ordinal])
+        return column[ordinal]
+
+    def get(self, name):
+        """ItemRow of an item, or None"""
+        ordinal = self.ordinals.get(name)
+        return None if ordinal is None else ItemRow(self, ordinal)
+
+    def get_rows(self, names, fields):
+        """
+        Rows of the given items as frappe.get_all would return them
+
+        Args:
+            names (list): item names; unknown names are skipped
+            fields (list): fields, optionally aliased as in "name1 as item_name"
+
+        Returns:
+            list: frappe._dict rows in the order of names
+        """
+        selected = split_fields(fields)
+        value = self.value
+        rows = []
+        for name in names:
+            ordinal = self.ordinals.get(name)
+            if ordinal is not None:
+                rows.append(frappe._dict({alias: value(column, ordinal) for column, alias in selected}))
+        return rows
+
+    def memory_usage(self):
+        """
+        Approximate bytes held, per column and per 100k items
+
+        Strings are counted once however many rows share them.
+        """
+        columns = {}
+        for field, column in self.columns.items():
+            if isinstance(column, array):
+                size = sys.getsizeof(column)
+            else:
+                size = sys.getsizeof(column) + sum(
+                    sys.getsizeof(value) for value, name in zip(column, self.names)
+                    if value is not None and value is not name
+                )
+            if field in CODED_FIELDS:
+                size += sys.getsizeof(self.keys[field]) + sum(sys.getsizeof(key) for key in self.keys[field])
+            columns[field] = size
+
+        columns["name"] = sys.getsizeof(self.names) + sys.getsizeof(self.ordinals) + sum(
+            sys.getsizeof(name) for name in self.names if name is not None
+        )
+        columns["item_attributes"] = (
+            sum(sys.getsizeof(column) for column in (self.attribute_data, self.attribute_start, self.attribute_count))
+            + sys.getsizeof(self.attribute_values)
+            + sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values())
+                  for row in self.attribute_values)
+        )
+
+        total = sum(columns.values())
+        return {
+            "items": len(self),
+            "bytes": total,
+            "bytes_per_100k_items": round(total / len(self) * 100000) if len(self) else 0,
+            "columns": dict(sorted(columns.items(), key=lambda item: -item[1]))
+        }
+
+
+def read_items(names=None, batch_size=BUILD_BATCH_SIZE):
+    """
+    Rows and attribute rows of all items, or of the given names
+
+    Returns:
+        tuple: (list of FIELDS tuples, name -> list of ATTRIBUTE_FIELDS tuples)
+    """
+    rows = []
+    if names is not None:
+        names = sorted(names)
+        for start in range(0, len(names), batch_size):
+            rows.extend(frappe.get_all(
+                "PIM Item",
+                filters={"name": ["in", names[start:start + batch_size]]},
+                fields=list(FIELDS),
+                as_list=True
+            ))
+    else:
+        last_name = ""
+        while True:
+            batch = frappe.get_all(
+                "PIM Item",
+                filters={"name": [">", last_name]},
+                fields=list(FIELDS),
+                order_by="name asc",
+                limit=batch_size,
+                as_list=True
+            )
+            if not batch:
+                break
+            rows.extend(batch)
+            last_name = batch[-1][0]
+
+    attributes = {}
+    item_names = [row[0] for row in rows]
+    for start in range(0, len(item_names), batch_size):
+        for parent, *values in frappe.get_all(
+            "PIM Item Attribute",
+            filters={"parent": ["in", item_names[start:start + batch_size]], "parenttype": "PIM Item"},
+            fields=["parent", *ATTRIBUTE_FIELDS],
+            order_by="parent asc, idx asc",
+            as_list=True
+        ):
+            attributes.setdefault(parent, []).append(tuple(values))
+
+    return rows, attributes
+
+
+# Per-worker model and its position in the item change log
+_model = None
+_cursor = None
+
+
+def is_enabled():
+    return bool(frappe.conf.get("pim_item_read_model") or frappe.conf.get("pim_catalog_snapshot"))
+
+
+def get_read_model():
+    """
+    The worker's read model, built on first use and brought up to date with
+    the item change log on every call; None unless enabled in site config
+
+    With pim_catalog_snapshot set, the model is the host's shared snapshot
+    instead (catalog.snapshot).
+    """
+    global _model, _cursor
+    if not is_enabled():
+        return None
+    if frappe.conf.get("pim_catalog_snapshot"):
+        from imperium_pim.catalog.snapshot import get_snapshot_model
+
+        return get_snapshot_model()
+
+    if _model is not None:
+        names, rebuild = _cursor.read()
+        if not rebuild and not _model.needs_compaction():
+            if names:
+                rows, attributes = read_items(names)
+                _model.apply(rows, attributes, removed=names - {row[0] for row in rows})
+            return _model
+
+    # position the cursor first, so changes committed during the build are replayed
+    cursor = ChangeCursor()
+    cursor.start()
+    model = CatalogReadModel()
+    model.load(*read_items())
+    _model, _cursor = model, cursor
+    return model
+
+
+def clear_read_model():
+    """Drop this worker's model; the next use rebuilds it"""
+    global _model, _cursor
+    _model = _cursor = None
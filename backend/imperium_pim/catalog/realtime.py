@@ -0,0 +1,217 @@
+"""
+Realtime push of catalog changes
+
+Open dashboards and product tables re-poll whole endpoints to notice
+changes. Instead, committed changes to PIM Items, Vendors, Attributes and
+Attribute Values are published as compact deltas over Frappe's socket.io
+channel, one message per doctype:
+
+    {"id": "1718000000000-0", "doctype": "PIM Item",
+     "updated": [{"name": "ACME-1", "sku": "ACME-1", "status": "Current", ...}],
+     "deleted": ["ACME-2"]}
+
+Changes are coalesced: names are buffered per process after commit, an item
+changed many times appears once with its latest values, and a process
+publishes at most once per DEBOUNCE_SECONDS window while it keeps
+committing, as a vendor sync does. Whatever is still buffered is published
+at the end of the request or background job (after_request and after_job
+hooks). More than MAX_DELTA_ROWS changed names are sent as a reset, telling
+clients to refetch what they show.
+
+Deltas go to the doctype room of their doctype (`doctype:PIM Item`), which
+socket.io clients join with `doctype_subscribe` once Frappe has checked
+their read permission. That check ignores row-level permissions, so room
+messages carry only the names of updated records (strip_fields). Deltas
+are kept with their field values in a capped Redis stream: get_changes(since)
+returns them to users whose rows frappe.get_list would not filter (see
+catalog.permissions) and names only to everyone else, who refetch what they
+show through the permission-checked endpoints. A reconnecting client
+catches up the same way instead of refetching everything.
+"""
+
+import time
+
+import frappe
+
+EVENT = "pim_catalog_changes"
+
+EVENTS_KEY = "imperium_pim:catalog_events"
+
+# Deltas kept for clients catching up, and returned by one get_changes call
+MAX_EVENTS = 10000
+MAX_CATCHUP = 1000
+
+DEBOUNCE_SECONDS = 0.25
+
+MAX_DELTA_ROWS = 500
+
+# Compact fields sent for each changed record
+DELTA_FIELDS = {
+    "PIM Item": ["name", "sku", "name1", "brand", "status", "item_type", "vendor_code", "vendor_sku", "upc", "modified"],
+    "PIM Vendor": ["name", "vendor_name", "vendor_code", "vendor_active", "vendor_integration_enabled", "modified"],
+    "PIM Attribute": ["name", "attribute_code", "attribute_name", "attribute_type", "modified"],
+    "PIM Attribute Value": ["name", "pim_attribute", "attribute_value_code", "attribute_value_name", "modified"]
+}
+
+# Per-process buffer: site -> doctype -> set of names, or None for a reset
+_pending = {}
+_last_published = {}
+
+
+def get_events_key():
+    return frappe.cache().make_key(EVENTS_KEY)
+
+
+def get_room(doctype):
+    from frappe.realtime import get_doctype_room
+
+    return get_doctype_room(doctype)
+
+
+def record_changes(doctype, names):
+    """Publish names of a doctype as changed once the current transaction commits"""
+    pending = getattr(frappe.local, "pim_realtime_changes", None)
+    if pending is None:
+        pending = frappe.local.pim_realtime_changes = {}
+        frappe.db.after_commit.add(commit_changes)
+        frappe.db.after_rollback.add(discard_changes)
+    pending.setdefault(doctype, set()).update(name for name in names if name)
+
+
+def commit_changes():
+    pending = getattr(frappe.local, "pim_realtime_changes", None)
+    frappe.local.pim_realtime_changes = None
+    for doctype, names in (pending or {}).items():
+        queue_changes(doctype, names)
+
+
+def discard_changes():
+    frappe.local.pim_realtime_changes = None
+
+
+def queue_changes(doctype, names):
+    """
+    Buffer committed changes, publishing the buffer when the debounce
+    window has passed
+
+    Args:
+        names: changed names, or None when the doctype was bulk loaded and
+               clients should refetch
+    """
+    buffer = _pending.setdefault(frappe.local.site, {})
+    if names is None or buffer.get(doctype, set()) is None:
+        buffer[doctype] = None
+    else:
+        buffer.setdefault(doctype, set()).update(names)
+
+    if time.monotonic() - _last_published.get(frappe.local.site, 0) >= DEBOUNCE_SECONDS:
+        flush_pending()
+
+
+def build_delta(doctype, names, rows):
+    """
+    Delta message of changed names, given the rows of those that still exist
+
+    Returns:
+        dict: doctype with updated rows and deleted names, or a reset
+    """
+    if names is None or len(names) > MAX_DELTA_ROWS:
+        return {"doctype": doctype, "reset": True, "count": len(names) if names else None}
+
+    found = {row["name"] for row in rows}
+    return {
+        "doctype": doctype,
+        "updated": sorted(rows, key=lambda row: row["name"]),
+        "deleted": sorted(name for name in names if name not in found)
+    }
+
+
+def strip_fields(delta):
+    """Delta without the field values of updated records, safe for any reader of the doctype"""
+    if "updated" not in delta:
+        return delta
+    return {**delta, "updated": [{"name": row["name"]} for row in delta["updated"]]}
+
+
+def publish_pending():
+    """Publish this site's buffered changes, one delta per doctype"""
+    site = frappe.local.site
+    buffer = _pending.pop(site, None)
+    _last_published[site] = time.monotonic()
+    if not buffer:
+        return
+
+    cache = frappe.cache()
+    for doctype, names in buffer.items():
+        rows = []
+        if names and len(names) <= MAX_DELTA_ROWS:
+            rows = frappe.get_all(doctype, filters={"name": ["in", list(names)]}, fields=DELTA_FIELDS[doctype])
+        delta = build_delta(doctype, names, rows)
+        delta["id"] = frappe.safe_decode(cache.xadd(
+            get_events_key(),
+            {"doctype": doctype, "delta": frappe.as_json(delta)},
+            maxlen=MAX_EVENTS,
+            approximate=True
+        ))
+        frappe.publish_realtime(EVENT, strip_fields(delta), room=get_room(doctype))
+
+
+def flush_pending():
+    """Publish whatever this site still has buffered"""
+    if getattr(frappe.local, "site", None) not in _pending:
+        return
+    try:
+        publish_pending()
+    except Exception:
+        # pushing changes must never fail a request or job; clients catch up on reconnect
+        frappe.logger("imperium_pim").warning("Could not publish catalog changes", exc_info=True)
+
+
+def end_request(response=None, request=None):
+    """after_request hook: publish what the request committed"""
+    flush_pending()
+
+
+def end_job(*args, **kwargs):
+    """after_job hook: publish what the job committed since its last window"""
+    flush_pending()
+
+
+def get_latest_id():
+    latest = frappe.cache().xrevrange(get_events_key(), count=1)
+    return frappe.safe_decode(latest[0][0]) if latest else "0-0"
+
+
+def get_changes(since, doctypes, limit=MAX_CATCHUP, full_doctypes=()):
+    """
+    Deltas of the given doctypes published after a stream id
+
+    Args:
+        full_doctypes: doctypes whose deltas keep their field values; the
+                       others carry names only (strip_fields)
+
+    Returns:
+        dict: deltas, the cursor to continue from and reset, set when the
+              client is more than limit deltas behind or its position may
+              have been trimmed away, so it must refetch instead
+    """
+    cache = frappe.cache()
+    key = get_events_key()
+    if not since:
+        return {"deltas": [], "cursor": get_latest_id(), "reset": True}
+
+    entries = cache.xrange(key, min=f"({since}", count=limit + 1)
+    oldest = cache.xrange(key, count=1)
+    trimmed = oldest and oldest[0][0] == (entries[0][0] if entries else None) and cache.xlen(key) >= MAX_EVENTS
+    if len(entries) > limit or trimmed:
+        return {"deltas": [], "cursor": get_latest_id(), "reset": True}
+
+    deltas = []
+    cursor = since
+    for entry_id, fields in entries:
+        cursor = frappe.safe_decode(entry_id)
+        if frappe.safe_decode(fields.get(b"doctype")) in doctypes:
+            delta = frappe.parse_json(frappe.safe_decode(fields[b"delta"]))
+            delta["id"] = cursor
+            deltas.append(delta if delta["doctype"] in full_doctypes else strip_fields(delta))
+    return {"deltas": deltas, "cursor": cursor, "reset": False}
@@ -0,0 +1,308 @@
+"""
+Nested catalog queries, resolved one relation level at a time
+
+A query selects fields of a root doctype and, under relation names, fields
+of related records, to any depth up to MAX_DEPTH:
+
+    {
+        "fields": ["name", "sku", "name1"],
+        "filters": {"status": "Current"},
+        "limit": 50,
+        "vendor": {"fields": ["vendor_name", "vendor_active"]},
+        "attributes": {
+            "fields": ["attribute_value_name"],
+            "attribute": {"fields": ["attribute_name", "attribute_type"]}
+        }
+    }
+
+Like a GraphQL dataloader, a relation is loaded for all parent rows at once:
+the join keys of every parent row are collected and fetched with one `IN`
+query per CHUNK_SIZE keys, then the rows are grouped back onto their
+parents. The query above costs four queries (items, vendors, attribute rows,
+attributes) whether it returns one item or five hundred. The Loader also
+remembers the rows of a query, so a relation reached through two paths with
+the same fields is read once.
+
+Relations are declared in RELATIONS. Join keys are read even when they are
+not selected, and are left out of the result.
+
+Every level is read with the user's row-level permissions: through
+frappe.get_list, or frappe.get_all for doctypes get_list would not filter
+for the user (see catalog.permissions). Child table rows are only reached
+from parent rows read that way, so they are read with get_all.
+"""
+
+from collections import namedtuple
+
+import frappe
+from frappe.model import no_value_fields, table_fields
+from frappe.utils import cint
+
+from imperium_pim.catalog.permissions import has_unrestricted_read
+
+# Doctypes a query can start from
+ROOTS = {
+    "items": "PIM Item",
+    "vendors": "PIM Vendor",
+    "attributes": "PIM Attribute",
+    "attribute_values": "PIM Attribute Value"
+}
+
+# Rows of `doctype` whose `remote` field equals the parent's `local` field;
+# `many` relations return a list, the others one row or None
+Relation = namedtuple("Relation", ["doctype", "local", "remote", "many", "filters", "order_by"],
+                      defaults=(None, None))
+
+RELATIONS = {
+    "PIM Item": {
+        "vendor": Relation("PIM Vendor", "vendor_code", "name", False),
+        "attributes": Relation("PIM Item Attribute", "name", "parent", True,
+                               {"parenttype": "PIM Item", "parentfield": "item_attributes"}, "idx asc"),
+        "components": Relation("PIM Kit Component", "name", "parent", True,
+                               {"parenttype": "PIM Item", "parentfield": "kit_components"}, "idx asc")
+    },
+    "PIM Item Attribute": {
+        "attribute": Relation("PIM Attribute", "pim_attribute", "name", False),
+        "value": Relation("PIM Attribute Value", "pim_attribute_value", "name", False)
+    },
+    "PIM Kit Component": {
+        "component": Relation("PIM Item", "component", "name", False)
+    },
+    "PIM Vendor": {
+        "attributes": Relation("PIM Vendor Attribute", "name", "pim_vendor", True),
+        "mappings": Relation("PIM Vendor Attribute Mapping", "name", "pim_vendor", True),
+        "value_mappings": Relation("PIM Vendor Attribute Value Mapping", "name", "pim_vendor", True)
+    },
+    "PIM Vendor Attribute Mapping": {
+        "vendor_attribute": Relation("PIM Vendor Attribute", "vendor_attribute", "name", False),
+        "attribute": Relation("PIM Attribute", "pim_attribute", "name", False)
+    },
+    "PIM Vendor Attribute Value Mapping": {
+        "vendor_attribute": Relation("PIM Vendor Attribute", "pim_vendor_attribute", "name", False),
+        "attribute_value": Relation("PIM Attribute Value", "pim_attribute_value", "name", False)
+    },
+    "PIM Attribute": {
+        "values": Relation("PIM Attribute Value", "name", "pim_attribute", True)
+    },
+    "PIM Attribute Value": {
+        "attribute": Relation("PIM Attribute", "pim_attribute", "name", False)
+    }
+}
+
+# Child tables are readable by whoever can read their parent
+PERMISSION_DOCTYPES = {
+    "PIM Item Attribute": "PIM Item",
+    "PIM Kit Component": "PIM Item"
+}
+
+STANDARD_FIELDS = ("name", "creation", "modified")
+CHILD_FIELDS = ("parent", "idx")
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+MAX_DEPTH = 4
+CHUNK_SIZE = 1000
+
+# Rows one relation may load for a whole query
+MAX_RELATED_ROWS = 50000
+
+# Parsed selection: fields returned, fields queried, extra filters and
+# {relation name: (Relation, Selection)}
+Selection = namedtuple("Selection", ["doctype", "fields", "query_fields", "filters", "relations"])
+
+
+def get_selectable_fields(doctype):
+    """Fields of a doctype a query may select; passwords and layout fields are not"""
+    meta = frappe.get_meta(doctype)
+    fields = set(STANDARD_FIELDS)
+    if meta.istable:
+        fields.update(CHILD_FIELDS)
+    fields.update(
+        df.fieldname for df in meta.fields
+        if df.fieldtype not in no_value_fields and df.fieldtype not in table_fields and df.fieldtype != "Password"
+    )
+    return fields
+
+
+def parse_selection(doctype, selection, depth=0):
+    """
+    Validate a selection and check read permission on every doctype it reaches
+
+    Returns:
+        Selection
+    """
+    if depth > MAX_DEPTH:
+        frappe.throw(f"Relations can be nested at most {MAX_DEPTH} levels deep")
+    if not isinstance(selection, dict):
+        frappe.throw(f"Selection of {doctype} must be an object")
+
+    frappe.has_permission(PERMISSION_DOCTYPES.get(doctype, doctype), "read", throw=True)
+
+    selectable = get_selectable_fields(doctype)
+    fields = list(dict.fromkeys(selection.get("fields") or ["name"]))
+    unknown = [field for field in fields if field not in selectable]
+    if unknown:
+        frappe.throw(f"Unknown fields of {doctype}: {', '.join(map(str, unknown))}")
+
+    relations = {}
+    query_fields = dict.fromkeys(fields)
+    available = RELATIONS.get(doctype, {})
+    for key, value in selection.items():
+        if key in ("fields", "filters", "limit", "offset", "order_by"):
+            continue
+        relation = available.get(key)
+        if relation is None:
+            frappe.throw(
+                f"{key} is not a relation of {doctype}, expected one of {', '.join(available) or 'none'}"
+            )
+        relations[key] = (relation, parse_selection(relation.doctype, value, depth + 1))
+        query_fields[relation.local] = None
+
+    filters = selection.get("filters") or {}
+    if not isinstance(filters, dict):
+        frappe.throw(f"Filters of {doctype} must be an object")
+    unknown = [field for field in filters if field not in selectable]
+    if unknown:
+        frappe.throw(f"Unknown filter fields of {doctype}: {', '.join(map(str, unknown))}")
+
+    return Selection(doctype, fields, list(query_fields), filters, relations)
+
+
+def parse_order_by(doctype, order_by):
+    """`field asc|desc` on a selectable field, modified desc by default"""
+    if not order_by:
+        return "modified desc"
+    field, _space, direction = str(order_by).strip().partition(" ")
+    direction = direction.strip().lower() or "asc"
+    if field not in get_selectable_fields(doctype) or direction not in ("asc", "desc"):
+        frappe.throw(f"Cannot order {doctype} by {order_by}")
+    return f"{field} {direction}"
+
+
+class Loader:
+    """
+    Batched, memoized reads of related rows for one query
+
+    Attributes:
+        queries (int): database queries run so far
+    """
+
+    __slots__ = ("groups", "queries", "unrestricted")
+
+    def __init__(self):
+        self.groups = {}
+        self.queries = 0
+        self.unrestricted = {}
+
+    def get_reader(self, doctype):
+        """frappe.get_all where the user may read every row reached, frappe.get_list otherwise"""
+        if doctype in PERMISSION_DOCTYPES:
+            return frappe.get_all
+        if doctype not in self.unrestricted:
+            self.unrestricted[doctype] = has_unrestricted_read(doctype)
+        return frappe.get_all if self.unrestricted[doctype] else frappe.get_list
+
+    def load(self, doctype, key_field, keys, fields, filters=None, order_by=None):
+        """
+        Rows of a doctype whose key_field is one of keys
+
+        Only keys not loaded by an earlier call with the same arguments are
+        queried, CHUNK_SIZE per query.
+
+        Returns:
+            dict: key -> list of rows
+        """
+        fields = list(dict.fromkeys([*fields, key_field]))
+        groups = self.groups.setdefault(
+            (doctype, key_field, tuple(fields), frappe.as_json(filters or {}), order_by), {}
+        )
+        missing = [key for key in keys if key not in groups]
+        loaded = sum(len(rows) for rows in groups.values())
+        read = self.get_reader(doctype) if missing else None
+        for start in range(0, len(missing), CHUNK_SIZE):
+            chunk = missing[start:start + CHUNK_SIZE]
+            rows = read(
+                doctype,
+                filters={**(filters or {}), key_field: ["in", chunk]},
+                fields=fields,
+                order_by=order_by or "name asc",
+                limit_page_length=0
+            )
+            self.queries += 1
+            loaded += len(rows)
+            if loaded > MAX_RELATED_ROWS:
+                frappe.throw(f"The query reads more than {MAX_RELATED_ROWS} rows of {doctype}, select fewer parents")
+
+            for key in chunk:
+                groups[key] = []
+            for row in rows:
+                groups.setdefault(row[key_field], []).append(row)
+        return groups
+
+
+def resolve(loader, rows, selection):
+    """
+    Result dicts of rows with their relations, loading each relation once
+    for all rows
+
+    Returns:
+        list: one dict per row with the selected fields and relations
+    """
+    nested = {}
+    for name, (relation, child) in selection.relations.items():
+        keys = list(dict.fromkeys(row[relation.local] for row in rows if row.get(relation.local)))
+        groups = loader.load(
+            relation.doctype,
+            relation.remote,
+            keys,
+            child.query_fields,
+            filters={**(relation.filters or {}), **child.filters},
+            order_by=relation.order_by
+        )
+        related = [row for key in keys for row in groups.get(key, [])]
+        results = {id(row): result for row, result in zip(related, resolve(loader, related, child))}
+        nested[name] = (relation, groups, results)
+
+    output = []
+    for row in rows:
+        result = {field: row.get(field) for field in selection.fields}
+        for name, (relation, groups, results) in nested.items():
+            key = row.get(relation.local)
+            matches = [results[id(related)] for related in groups.get(key, [])] if key else []
+            result[name] = matches if relation.many else (matches[0] if matches else None)
+        output.append(result)
+    return output
+
+
+def run_query(root, selection):
+    """
+    Run a nested query
+
+    Args:
+        root (str): one of ROOTS
+        selection (dict): see the module docstring; the root selection may
+                          also set limit, offset and order_by
+
+    Returns:
+        dict: data (list of result dicts) and queries (database queries run)
+    """
+    doctype = ROOTS.get(root)
+    if doctype is None:
+        frappe.throw(f"Unknown query root {root}, expected one of {', '.join(ROOTS)}")
+
+    parsed = parse_selection(doctype, selection)
+    rows = frappe.get_list(
+        doctype,
+        fields=parsed.query_fields,
+        filters=parsed.filters,
+        order_by=parse_order_by(doctype, selection.get("order_by")),
+        limit_start=cint(selection.get("offset")),
+        limit_page_length=min(cint(selection.get("limit")) or DEFAULT_LIMIT, MAX_LIMIT)
+    )
+
+    loader = Loader()
+    data = resolve(loader, rows, parsed)
+    return {
+        "data": data,
+        "queries": loader.queries + 1
+    }
@@ -0,0 +1,459 @@
+"""
+Memory-mapped catalog snapshot shared by the workers of a host
+
+The per-worker read model (catalog.read_model) gives every gunicorn worker
+its own copy of the catalog. A snapshot writes the same columns to a file
+once, and every worker maps it read-only, so the page cache holds one copy
+whatever the number of workers:
+
+    sites/<site>/private/catalog_snapshot/
+        catalog-<version>.snap    immutable snapshot files
+        CURRENT                   file name of the snapshot in use
+
+build_snapshot writes a new file next to the old ones and swaps CURRENT with
+os.replace, so a worker sees the old snapshot or the new one, never a partial
+file. Workers notice the swap on their next read and remap; the previous
+KEEP_VERSIONS files stay on disk for workers still reading them.
+
+A snapshot records the item change log position (catalog.changes) it was
+built at. Each worker replays the changes since then into a small
+CatalogReadModel overlay, so reads stay current without rewriting the file.
+When the overlay grows past MAX_OVERLAY items, or the log can no longer be
+replayed, a rebuild is queued; in the latter case workers read from the
+database until the new snapshot lands.
+
+File layout, integers little-endian:
+
+    MAGIC | uint64 header length | JSON header | padding to 8 bytes | sections
+
+The header holds the section offsets, the values of coded columns and the
+distinct item attribute rows. Sections
+are arrays: int32 codes, float64 numbers, int64 timestamps, and for text an
+int64 offsets array into a UTF-8 blob plus a NULL mask. Items are sorted by
+name, so finding one is a binary search of the name column.
+"""
+
+import json
+import mmap
+import os
+import struct
+from bisect import bisect_left
+
+import frappe
+from frappe.utils import now_datetime
+from frappe.utils.background_jobs import is_job_enqueued
+
+from imperium_pim.catalog.changes import ChangeCursor
+from imperium_pim.catalog.read_model import (
+    ATTRIBUTE_FIELDS,
+    CODED_FIELDS,
+    DATETIME_FIELDS,
+    NUMBER_FIELDS,
+    TEXT_FIELDS,
+    CatalogReadModel,
+    ItemRow,
+    from_micros,
+    read_items,
+    split_fields
+)
+
+SNAPSHOT_DIR = "catalog_snapshot"
+POINTER_FILE = "CURRENT"
+
+# Bumped whenever the file layout changes
+MAGIC = b"PIMCAT01"
+
+# Snapshots kept besides the current one, for workers that have not remapped yet
+KEEP_VERSIONS = 2
+
+# Items in a worker's overlay before a rebuild is queued
+MAX_OVERLAY = 20000
+
+BUILD_JOB_ID = "pim_catalog_snapshot"
+BUILD_TIMEOUT = 60 * 60
+
+
+def align(offset):
+    return -(-offset // 8) * 8
+
+
+def get_snapshot_dir():
+    return frappe.get_site_path("private", SNAPSHOT_DIR)
+
+
+def encode_text(values):
+    """(offsets, blob, NULL mask) arrays of a text column"""
+    import numpy as np
+
+    encoded = [b"" if value is None else value.encode() for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    nulls = np.fromiter((value is None for value in values), dtype="u1", count=len(values))
+    return offsets, np.frombuffer(b"".join(encoded), dtype="u1"), nulls
+
+
+def write_snapshot(path, rows, attributes, change_id=None, version=None):
+    """
+    Write items to a snapshot file
+
+    Args:
+        path (str): file to create; written under a temporary name and renamed
+        rows: tuples of read_model.FIELDS values
+        attributes (dict): name -> tuples of ATTRIBUTE_FIELDS values
+        change_id (str): change log position the rows were read at
+        version (str): snapshot version
+    """
+    import numpy as np
+
+    model = CatalogReadModel()
+    model.load(sorted(rows, key=lambda row: row[0]), attributes)
+
+    sections = []
+
+    def add_text(key, values, nullable=True):
+        offsets, blob, nulls = encode_text(values)
+        sections.append((f"{key}.offsets", offsets))
+        sections.append((f"{key}.data", blob))
+        if nullable:
+            sections.append((f"{key}.nulls", nulls))
+
+    add_text("name", model.names, nullable=False)
+    for field in CODED_FIELDS:
+        sections.append((field, np.frombuffer(model.columns[field], dtype="<i4")))
+    for field in TEXT_FIELDS:
+        add_text(field, model.columns[field])
+    for field in NUMBER_FIELDS:
+        sections.append((field, np.frombuffer(model.columns[field], dtype="<f8")))
+    for field in DATETIME_FIELDS:
+        sections.append((field, np.frombuffer(model.columns[field], dtype="<i8")))
+    sections.append(("attribute_data", np.frombuffer(model.attribute_data, dtype="<i4")))
+    sections.append(("attribute_start", np.frombuffer(model.attribute_start, dtype="<i8")))
+    sections.append(("attribute_count", np.frombuffer(model.attribute_count, dtype="<i4")))
+
+    layout = {}
+    offset = 0
+    for key, data in sections:
+        layout[key] = [offset, data.dtype.str, len(data)]
+        offset += align(data.nbytes)
+
+    header = json.dumps({
+        "version": version,
+        "change_id": change_id,
+        "items": len(model),
+        "sections": layout,
+        "keys": model.keys,
+        "attribute_values": [[row[field] for field in ATTRIBUTE_FIELDS] for row in model.attribute_values]
+    }).encode()
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(b"\0" * (align(f.tell()) - f.tell()))
+        for _key, data in sections:
+            f.write(data.tobytes())
+            f.write(b"\0" * (align(data.nbytes) - data.nbytes))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, path)
+
+
+def swap_pointer(directory, filename):
+    """Atomically point CURRENT at a snapshot file"""
+    pointer = os.path.join(directory, POINTER_FILE)
+    temporary_path = f"{pointer}.{os.getpid()}.tmp"
+    with open(temporary_path, "w") as f:
+        f.write(filename)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, pointer)
+
+
+def remove_old_snapshots(directory, current, keep=KEEP_VERSIONS):
+    """Delete snapshot files older than the current one and the `keep` before it"""
+    filenames = sorted(
+        (filename for filename in os.listdir(directory)
+         if filename.startswith("catalog-") and filename.endswith(".snap") and filename != current),
+        reverse=True
+    )
+    for filename in filenames[keep:]:
+        try:
+            os.remove(os.path.join(directory, filename))
+        except FileNotFoundError:
+            pass
+
+
+def build_snapshot():
+    """
+    Write a snapshot of all items and make it current
+
+    Returns:
+        str: path of the new snapshot
+    """
+    # position the cursor first, so changes committed during the build are replayed
+    cursor = ChangeCursor()
+    cursor.start()
+    rows, attributes = read_items()
+
+    directory = get_snapshot_dir()
+    os.makedirs(directory, exist_ok=True)
+    version = now_datetime().strftime("%Y%m%d%H%M%S%f")
+    filename = f"catalog-{version}.snap"
+    path = os.path.join(directory, filename)
+    write_snapshot(path, rows, attributes, change_id=cursor.last_id, version=version)
+    swap_pointer(directory, filename)
+    remove_old_snapshots(directory, filename)
+    return path
+
+
+def enqueue_snapshot_build():
+    """Queue a snapshot build unless one is already queued"""
+    if is_job_enqueued(BUILD_JOB_ID):
+        return False
+    frappe.enqueue(
+        "imperium_pim.catalog.snapshot.build_snapshot",
+        queue="long",
+        timeout=BUILD_TIMEOUT,
+        job_id=BUILD_JOB_ID,
+        deduplicate=True
+    )
+    return True
+
+
+def build_scheduled_snapshot():
+    """Scheduler entry point: rebuild the snapshot when items changed since the last one"""
+    if not frappe.conf.get("pim_catalog_snapshot"):
+        return
+    path = get_current_path()
+    if path is not None:
+        names, rebuild = ChangeCursor(CatalogSnapshot(path).change_id).read()
+        if not names and not rebuild:
+            return
+    enqueue_snapshot_build()
+
+
+class TextColumn:
+    """Strings of a text section, decoded on access"""
+
+    __slots__ = ("buffer", "offsets", "start", "nulls")
+
+    def __init__(self, buffer, offsets, start, nulls=None):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.start = start
+        self.nulls = nulls
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, ordinal):
+        if self.nulls is not None and self.nulls[ordinal]:
+            return None
+        return self.buffer[self.start + int(self.offsets[ordinal]):self.start + int(self.offsets[ordinal + 1])].decode()
+
+
+class CatalogSnapshot:
+    """
+    Read-only view of a snapshot file
+
+    Columns are numpy arrays over the mapping, so opening a snapshot reads
+    only its header; pages are loaded, and shared, as items are read.
+    """
+
+    __slots__ = (
+        "path", "buffer", "version", "change_id", "names", "keys", "columns",
+        "attribute_values", "attribute_data", "attribute_start", "attribute_count"
+    )
+
+    def __init__(self, path):
+        import numpy as np
+
+        self.path = path
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.buffer[:len(MAGIC)] != MAGIC:
+            frappe.throw(f"{path} is not a catalog snapshot")
+
+        (length,) = struct.unpack_from("<Q", self.buffer, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(self.buffer[header_start:header_start + length])
+        data_start = align(header_start + length)
+        layout = header["sections"]
+
+        def section(key):
+            offset, dtype, count = layout[key]
+            return np.frombuffer(self.buffer, dtype=dtype, count=count, offset=data_start + offset)
+
+        def text(key, nullable=True):
+            return TextColumn(
+                self.buffer,
+                section(f"{key}.offsets"),
+                data_start + layout[f"{key}.data"][0],
+                section(f"{key}.nulls") if nullable else None
+            )
+
+        self.version = header["version"]
+        self.change_id = header["change_id"]
+        self.names = text("name", nullable=False)
+        self.keys = header["keys"]
+        self.columns = {
+            **{field: section(field) for field in CODED_FIELDS},
+            **{field: text(field) for field in TEXT_FIELDS},
+            **{field: section(field) for field in NUMBER_FIELDS},
+            **{field: section(field) for field in DATETIME_FIELDS}
+        }
+        self.attribute_values = [frappe._dict(zip(ATTRIBUTE_FIELDS, row)) for row in header["attribute_values"]]
+        self.attribute_data = section("attribute_data")
+        self.attribute_start = section("attribute_start")
+        self.attribute_count = section("attribute_count")
+
+    def __len__(self):
+        return len(self.names)
+
+    def find(self, name):
+        """Ordinal of an item, or None"""
+        ordinal = bisect_left(self.names, name)
+        if ordinal < len(self.names) and self.names[ordinal] == name:
+            return ordinal
+        return None
+
+    def value(self, field, ordinal):
+        if field == "name":
+            return self.names[ordinal]
+        if field == "item_attributes":
+            start = int(self.attribute_start[ordinal])
+            return [
+                self.attribute_values[code]
+                for code in self.attribute_data[start:start + int(self.attribute_count[ordinal])].tolist()
+            ]
+        column = self.columns[field]
+        if field in CODED_FIELDS:
+            return self.keys[field][column[ordinal]]
+        if field in NUMBER_FIELDS:
+            value = float(column[ordinal])
+            return None if value != value else value
+        if field in DATETIME_FIELDS:
+            return from_micros(int(column[ordinal]))
+        return column[ordinal]
+
+
+class SnapshotReadModel:
+    """
+    A snapshot plus the items changed since it was built
+
+    Serves the same get/get_rows interface as CatalogReadModel.
+    """
+
+    __slots__ = ("snapshot", "overlay", "removed", "cursor", "stale", "rebuild_queued")
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.overlay = CatalogReadModel()
+        self.removed = set()
+        self.cursor = ChangeCursor(snapshot.change_id)
+        self.stale = False
+        self.rebuild_queued = False
+
+    def apply(self, rows, attributes, removed=()):
+        self.overlay.apply(rows, attributes, removed)
+        self.removed.update(removed)
+        self.removed.difference_update(row[0] for row in rows)
+
+    def overlay_size(self):
+        return len(self.overlay.names) + len(self.removed)
+
+    def locate(self, name):
+        """(model, ordinal) holding an item; ordinal is None when there is no such item"""
+        ordinal = self.overlay.ordinals.get(name)
+        if ordinal is not None:
+            return self.overlay, ordinal
+        if name in self.removed:
+            return None, None
+        return self.snapshot, self.snapshot.find(name)
+
+    def get(self, name):
+        """ItemRow of an item, or None"""
+        model, ordinal = self.locate(name)
+        return None if ordinal is None else ItemRow(model, ordinal)
+
+    def get_rows(self, names, fields):
+        """Rows of the given items as frappe.get_all would return them, see CatalogReadModel.get_rows"""
+        selected = split_fields(fields)
+        rows = []
+        for name in names:
+            model, ordinal = self.locate(name)
+            if ordinal is not None:
+                rows.append(frappe._dict({alias: model.value(column, ordinal) for column, alias in selected}))
+        return rows
+
+    def memory_usage(self):
+        """
+        Mapped snapshot bytes, shared by every worker on the host, and the
+        worker's own overlay
+        """
+        return {
+            "snapshot": {
+                "path": self.snapshot.path,
+                "version": self.snapshot.version,
+                "items": len(self.snapshot),
+                "mapped_bytes": len(self.snapshot.buffer)
+            },
+            "overlay": self.overlay.memory_usage(),
+            "removed": len(self.removed),
+            "stale": self.stale
+        }
+
+
+# Per-worker snapshot model and the CURRENT pointer it was opened from
+_model = None
+_pointer = None
+
+
+def get_current_path():
+    """Path of the current snapshot, or None before the first build"""
+    global _pointer
+    pointer = os.path.join(get_snapshot_dir(), POINTER_FILE)
+    try:
+        stat = os.stat(pointer)
+        if _pointer is None or _pointer[0] != (stat.st_ino, stat.st_mtime_ns):
+            with open(pointer) as f:
+                _pointer = ((stat.st_ino, stat.st_mtime_ns), os.path.join(os.path.dirname(pointer), f.read().strip()))
+    except FileNotFoundError:
+        _pointer = None
+    return _pointer[1] if _pointer else None
+
+
+def get_snapshot_model():
+    """
+    The worker's snapshot model, remapped when CURRENT changes and brought up
+    to date with the item change log on every call; None while there is no
+    usable snapshot, with a build queued
+    """
+    global _model
+    path = get_current_path()
+    if path is None:
+        enqueue_snapshot_build()
+        return None
+
+    if _model is None or _model.snapshot.path != path:
+        _model = SnapshotReadModel(CatalogSnapshot(path))
+
+    if not _model.stale:
+        names, rebuild = _model.cursor.read()
+        if rebuild:
+            _model.stale = True
+        elif names:
+            rows, attributes = read_items(names)
+            _model.apply(rows, attributes, removed=names - {row[0] for row in rows})
+
+    if (_model.stale or _model.overlay_size() > MAX_OVERLAY) and not _model.rebuild_queued:
+        enqueue_snapshot_build()
+        _model.rebuild_queued = True
+    return None if _model.stale else _model
+
+
+def clear_snapshot_model():
+    """Drop this worker's mapping; the next use reopens the current snapshot"""
+    global _model, _pointer
+    _model = _pointer = None
@@ -0,0 +1,162 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import unittest
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from imperium_pim.api.items import get_item_list
+from imperium_pim.catalog.attributes import (
+    count_items,
+    count_permitted_items,
+    parse_attribute_filters,
+    query_items,
+    query_permitted_items
+)
+
+
+class TestParseAttributeFilters(unittest.TestCase):
+    def test_dict_values_become_lists(self):
+        self.assertEqual(
+            parse_attribute_filters({"color": "color-black", "material": ["material-oak", "material-ash"], "size": []}),
+            {"color": ["color-black"], "material": ["material-oak", "material-ash"]}
+        )
+
+    def test_json(self):
+        self.assertEqual(parse_attribute_filters('{"color": "color-black"}'), {"color": ["color-black"]})
+        self.assertEqual(parse_attribute_filters(None), {})
+
+
+class TestAttributeFiltering(FrappeTestCase):
+    def setUp(self):
+        """Set up test data: three chairs with colors and materials"""
+        if not frappe.db.exists("PIM Vendor", "ATTRV"):
+            frappe.get_doc({
+                "doctype": "PIM Vendor",
+                "vendor_name": "Attribute Test Vendor",
+                "vendor_code": "ATTRV",
+                "vendor_active": 1
+            }).insert(ignore_permissions=True)
+
+        for code, attribute_type, values in (
+            ("test_color", "Select", ("Black", "White")),
+            ("test_material", "MultiSelect", ("Oak", "Steel"))
+        ):
+            if not frappe.db.exists("PIM Attribute", code):
+                frappe.get_doc({
+                    "doctype": "PIM Attribute",
+                    "attribute_code": code,
+                    "attribute_name": code.replace("_", " ").title(),
+                    "attribute_type": attribute_type
+                }).insert(ignore_permissions=True)
+            for value in values:
+                if not frappe.db.exists("PIM Attribute Value", f"{code}-{value.lower()}"):
+                    frappe.get_doc({
+                        "doctype": "PIM Attribute Value",
+                        "pim_attribute": code,
+                        "attribute_value_name": value
+                    }).insert(ignore_permissions=True)
+
+        self.make_item("1", ["test_color-black", "test_material-oak"])
+        self.make_item("2", ["test_color-white", "test_material-oak", "test_material-steel"])
+        self.make_item("3", ["test_color-black", "test_material-steel"])
+
+    def tearDown(self):
+        """Clean up test data"""
+        for name in frappe.get_all("PIM Item", filters={"vendor_code": "ATTRV"}, pluck="name"):
+            frappe.delete_doc("PIM Item", name, ignore_permissions=True, force=True)
+        frappe.db.delete("PIM Attribute Value", {"pim_attribute": ["in", ["test_color", "test_material"]]})
+        frappe.db.delete("PIM Attribute", {"name": ["in", ["test_color", "test_material"]]})
+        frappe.db.delete("PIM Vendor", {"vendor_code": "ATTRV"})
+        frappe.db.commit()
+
+    def make_item(self, vendor_sku, values):
+        if frappe.db.exists("PIM Item", f"ATTRV-{vendor_sku}"):
+            return
+        frappe.get_doc({
+            "doctype": "PIM Item",
+            "name1": f"Chair {vendor_sku}",
+            "vendor_code": "ATTRV",
+            "vendor_sku": vendor_sku,
+            "item_attributes": [{"pim_attribute_value": value} for value in values]
+        }).insert(ignore_permissions=True)
+
+    def names(self, attributes, filters=None):
+        filters = {"vendor_code": "ATTRV", **(filters or {})}
+        return sorted(item.name for item in query_items(filters=filters, attributes=attributes))
+
+    def test_attributes_must_all_match(self):
+        self.assertEqual(
+            self.names({"test_color": "test_color-black", "test_material": "test_material-steel"}),
+            ["ATTRV-3"]
+        )
+
+    def test_values_of_one_attribute_are_alternatives(self):
+        self.assertEqual(
+            self.names({"test_material": ["test_material-oak", "test_material-steel"]}),
+            ["ATTRV-1", "ATTRV-2", "ATTRV-3"]
+        )
+        self.assertEqual(
+            count_items({"vendor_code": "ATTRV"}, {"test_material": ["test_material-oak", "test_material-steel"]}),
+            3
+        )
+
+    def test_value_list_is_grouped_by_attribute(self):
+        self.assertEqual(
+            self.names(["test_color-black", "test_color-white", "test_material-steel"]),
+            ["ATTRV-2", "ATTRV-3"]
+        )
+        self.assertEqual(self.names(["test_color-black", "test_color-green"]), [])
+
+    def test_combined_with_item_filters(self):
+        frappe.db.set_value("PIM Item", "ATTRV-1", "status", "Discontinued")
+        self.assertEqual(self.names({"test_color": "test_color-black"}, {"status": "Discontinued"}), ["ATTRV-1"])
+
+        items = get_item_list(filters={"vendor_code": "ATTRV"}, attributes={"test_color": "test_color-white"})
+        self.assertEqual([item["id"] for item in items], ["ATTRV-2"])
+
+    def test_single_value_attributes(self):
+        item = frappe.get_doc("PIM Item", "ATTRV-1")
+        item.append("item_attributes", {"pim_attribute_value": "test_color-white"})
+        self.assertRaises(frappe.ValidationError, item.save)
+
+        item.reload()
+        item.append("item_attributes", {"pim_attribute_value": "test_material-oak"})
+        self.assertRaises(frappe.ValidationError, item.save)
+
+    def test_user_permissions_apply(self):
+        """A user restricted to another vendor sees none of the matching items"""
+        if not frappe.db.exists("PIM Vendor", "ATTRW"):
+            frappe.get_doc({
+                "doctype": "PIM Vendor",
+                "vendor_name": "Other Attribute Test Vendor",
+                "vendor_code": "ATTRW",
+                "vendor_active": 1
+            }).insert(ignore_permissions=True)
+        user = "attribute-restricted@example.com"
+        if not frappe.db.exists("User", user):
+            frappe.get_doc({
+                "doctype": "User",
+                "email": user,
+                "first_name": "Restricted",
+                "send_welcome_email": 0,
+                "roles": [{"role": "System Manager"}]
+            }).insert(ignore_permissions=True)
+        frappe.get_doc({
+            "doctype": "User Permission",
+            "user": user,
+            "allow": "PIM Vendor",
+            "for_value": "ATTRW"
+        }).insert(ignore_permissions=True)
+
+        attributes = {"test_color": "test_color-black"}
+        self.assertEqual(len(query_permitted_items({"vendor_code": "ATTRV"}, attributes)), 2)
+
+        frappe.set_user(user)
+        try:
+            self.assertEqual(query_permitted_items({"vendor_code": "ATTRV"}, attributes), [])
+            self.assertEqual(count_permitted_items({"vendor_code": "ATTRV"}, attributes), 0)
+        finally:
+            frappe.set_user("Administrator")
+            frappe.db.delete("User Permission", {"user": user})
+            frappe.db.delete("PIM Vendor", {"vendor_code": "ATTRW"})
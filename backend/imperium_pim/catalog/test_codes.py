@@ -0,0 +1,140 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import unittest
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from imperium_pim.api.items import resolve_codes
+from imperium_pim.catalog.codes import MissingCodes, normalize_codes, resolve
+from imperium_pim.performance.query_log import assert_max_queries
+
+
+class TestMissingCodes(unittest.TestCase):
+    def test_entries_expire(self):
+        cache = MissingCodes(ttl=10)
+        cache.add("upc", ["111", "222"], now=100)
+
+        self.assertEqual(cache.split("upc", ["111", "333"], now=105), (["333"], ["111"]))
+        self.assertEqual(cache.split("upc", ["111"], now=111), (["111"], []))
+        self.assertEqual(cache.split("sku", ["111"], now=105), (["111"], []))
+
+    def test_version_change_clears(self):
+        cache = MissingCodes()
+        cache.sync("a")
+        cache.add("upc", ["111"])
+        cache.sync("a")
+        self.assertEqual(cache.split("upc", ["111"])[1], ["111"])
+
+        cache.sync("b")
+        self.assertEqual(cache.split("upc", ["111"])[1], [])
+
+    def test_limit(self):
+        cache = MissingCodes(limit=3)
+        cache.add("upc", ["1", "2", "3"])
+        cache.add("upc", ["4"])
+        self.assertEqual(cache.split("upc", ["1", "4"]), (["1"], ["4"]))
+
+    def test_normalize_codes(self):
+        self.assertEqual(normalize_codes([" 111", "222", "111", "", 333]), ["111", "222", "333"])
+        self.assertEqual(normalize_codes("111, 222,,111"), ["111", "222"])
+
+
+class TestResolveCodes(FrappeTestCase):
+    def setUp(self):
+        """Set up test data"""
+        for vendor in ("RESOLVA", "RESOLVB"):
+            if not frappe.db.exists("PIM Vendor", vendor):
+                frappe.get_doc({
+                    "doctype": "PIM Vendor",
+                    "vendor_name": f"Resolve Vendor {vendor}",
+                    "vendor_code": vendor,
+                    "vendor_active": 1
+                }).insert(ignore_permissions=True)
+
+        for vendor, vendor_sku, upc in (
+            ("RESOLVA", "100", "900000000001"),
+            ("RESOLVA", "101", "900000000002"),
+            ("RESOLVB", "100", "900000000003")
+        ):
+            if not frappe.db.exists("PIM Item", f"{vendor}-{vendor_sku}"):
+                frappe.get_doc({
+                    "doctype": "PIM Item",
+                    "name1": f"Resolve Item {vendor_sku}",
+                    "vendor_code": vendor,
+                    "vendor_sku": vendor_sku,
+                    "upc": upc
+                }).insert(ignore_permissions=True)
+
+    def tearDown(self):
+        """Clean up test data"""
+        frappe.db.delete("PIM Item", {"vendor_code": ["in", ["RESOLVA", "RESOLVB"]]})
+        frappe.db.delete("PIM Vendor", {"vendor_code": ["in", ["RESOLVA", "RESOLVB"]]})
+        frappe.db.commit()
+
+    def test_resolve_upcs(self):
+        result = resolve_codes(["900000000001", "900000000003", "900000009999"], kind="upc")
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["resolved"]["900000000001"][0]["name"], "RESOLVA-100")
+        self.assertEqual(result["resolved"]["900000000003"][0]["name"], "RESOLVB-100")
+        self.assertEqual(result["missing"], ["900000009999"])
+
+    def test_vendor_skus_can_be_ambiguous(self):
+        result = resolve_codes(["100", "101"], kind="vendor_sku")
+        self.assertEqual(result["ambiguous"], ["100"])
+        self.assertEqual(len(result["resolved"]["100"]), 2)
+
+        result = resolve_codes(["100"], kind="vendor_sku", vendor="RESOLVB")
+        self.assertEqual([item["name"] for item in result["resolved"]["100"]], ["RESOLVB-100"])
+
+    def test_missing_codes_are_cached_until_items_change(self):
+        resolve_codes(["RESOLVA-102"], kind="sku")
+        with assert_max_queries(0):
+            result = resolve(["RESOLVA-102"], kind="sku")
+        self.assertEqual(result["cached_missing"], 1)
+
+        frappe.get_doc({
+            "doctype": "PIM Item",
+            "name1": "Resolve Item 102",
+            "vendor_code": "RESOLVA",
+            "vendor_sku": "102"
+        }).insert(ignore_permissions=True)
+
+        result = resolve_codes(["RESOLVA-102"], kind="sku")
+        self.assertIn("RESOLVA-102", result["resolved"])
+
+    def test_user_permissions_apply(self):
+        """A user restricted to one vendor cannot resolve another vendor's codes"""
+        user = "codes-restricted@example.com"
+        if not frappe.db.exists("User", user):
+            frappe.get_doc({
+                "doctype": "User",
+                "email": user,
+                "first_name": "Restricted",
+                "send_welcome_email": 0,
+                "roles": [{"role": "System Manager"}]
+            }).insert(ignore_permissions=True)
+        frappe.get_doc({
+            "doctype": "User Permission",
+            "user": user,
+            "allow": "PIM Vendor",
+            "for_value": "RESOLVB"
+        }).insert(ignore_permissions=True)
+
+        frappe.set_user(user)
+        try:
+            result = resolve_codes(["900000000001", "900000000003"], kind="upc")
+            self.assertEqual(list(result["resolved"]), ["900000000003"])
+            self.assertEqual(result["missing"], ["900000000001"])
+        finally:
+            frappe.set_user("Administrator")
+            frappe.db.delete("User Permission", {"user": user})
+
+        # the restricted miss was not cached for everyone
+        result = resolve_codes(["900000000001"], kind="upc")
+        self.assertIn("900000000001", result["resolved"])
+
+    def test_rejects_unknown_kind(self):
+        result = resolve_codes(["1"], kind="gtin")
+        self.assertFalse(result["success"])
@@ -0,0 +1,68 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import unittest
+
+from imperium_pim.catalog.facets import FacetIndex, parse_filters
+
+FIELDS = ("status", "brand", "dropship")
+
+ROWS = [
+    ("A-1", "Current", "Oak", "No Dropship"),
+    ("A-2", "Current", "Maple", "Always Dropship"),
+    ("A-3", "New", "Oak", "No Dropship"),
+    ("A-4", "Discontinued", None, "No Dropship"),
+    ("A-5", "Current", "Oak", "Always Dropship")
+]
+
+
+def names(index, expression=None):
+    return sorted(index.page(index.match(expression), limit=100))
+
+
+class TestFacetIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = FacetIndex(FIELDS)
+        self.index.load(ROWS)
+
+    def test_and_or_not(self):
+        self.assertEqual(names(self.index, {"status": "Current", "brand": "Oak"}), ["A-1", "A-5"])
+        self.assertEqual(names(self.index, {"status": ["New", "Discontinued"]}), ["A-3", "A-4"])
+        self.assertEqual(
+            names(self.index, {"$or": [{"brand": "Maple"}, {"status": "New"}], "$not": {"dropship": "No Dropship"}}),
+            ["A-2"]
+        )
+        self.assertEqual(names(self.index, {"brand": None}), ["A-4"])
+        self.assertEqual(self.index.count({"brand": "Walnut"}), 0)
+
+    def test_page_is_newest_first(self):
+        bitmap = self.index.match({})
+        self.assertEqual(self.index.page(bitmap, limit=2), ["A-5", "A-4"])
+        self.assertEqual(self.index.page(bitmap, limit=2, offset=3), ["A-2", "A-1"])
+
+    def test_facet_counts_leave_out_own_field(self):
+        counts = self.index.facet_counts({"status": "Current"})
+        self.assertEqual(counts["status"], {"Current": 3, "New": 1, "Discontinued": 1})
+        self.assertEqual(counts["brand"], {"Oak": 2, "Maple": 1})
+
+    def test_apply_moves_changed_items_to_the_top(self):
+        self.index.apply([("A-1", "Discontinued", "Maple", "No Dropship"), ("A-6", "New", "Ash", "No Dropship")],
+                         removed=["A-3"])
+
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(self.index.page(self.index.match({}), limit=2), ["A-6", "A-1"])
+        self.assertEqual(names(self.index, {"brand": "Oak"}), ["A-5"])
+        self.assertEqual(names(self.index, {"status": "Discontinued"}), ["A-1", "A-4"])
+        self.assertEqual(names(self.index, {"status": "New"}), ["A-6"])
+
+        self.index.compact()
+        self.assertEqual(len(self.index.names), 5)
+        self.assertEqual(names(self.index, {"brand": "Maple"}), ["A-1", "A-2"])
+
+    def test_parse_filters(self):
+        self.assertEqual(
+            parse_filters({"status": "Current", "brand": ["in", "Oak, Maple"]}),
+            {"status": "Current", "brand": ["Oak", "Maple"]}
+        )
+        self.assertIsNone(parse_filters({"status": ["!=", "Current"]}))
+        self.assertIsNone(parse_filters({"name1": "Chair"}))
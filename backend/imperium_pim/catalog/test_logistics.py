@@ -0,0 +1,58 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import unittest
+
+import numpy as np
+
+from imperium_pim.catalog.logistics import (
+    METRIC_FIELDS,
+    compute_metrics,
+    compute_metrics_array,
+    get_box_filters,
+    parse_box
+)
+
+
+class TestLogisticsMetrics(unittest.TestCase):
+    def test_compute_metrics(self):
+        metrics = compute_metrics(20, 30.5, 10, weight=12)
+
+        self.assertEqual(metrics["carton_longest_side_inches"], 30.5)
+        self.assertEqual(metrics["carton_shortest_side_inches"], 10)
+        self.assertEqual(metrics["carton_girth_inches"], 60)
+        self.assertEqual(metrics["carton_length_girth_inches"], 90.5)
+        # 10 x 20 x 31 / 139 = 44.6 -> 45
+        self.assertEqual(metrics["carton_dim_weight_lbs"], 45)
+        self.assertEqual(metrics["carton_billable_weight_lbs"], 45)
+        self.assertAlmostEqual(metrics["carton_cubic_feet"], 3.5301, places=4)
+
+    def test_actual_weight_wins_when_heavier(self):
+        self.assertEqual(compute_metrics(10, 10, 10, weight=80)["carton_billable_weight_lbs"], 80)
+
+    def test_incomplete_dimensions(self):
+        self.assertTrue(all(value is None for value in compute_metrics(10, None, 5).values()))
+
+    def test_vectorized_matches_scalar(self):
+        cartons = [(20, 30.5, 10, 12), (12.2, 8, 4.5, None), (10, 0, 5, 3), (48, 40, 36, 150)]
+        dimensions = np.array([carton[:3] for carton in cartons], dtype=float)
+        weights = np.array([carton[3] for carton in cartons], dtype=float)
+
+        valid, metrics = compute_metrics_array(dimensions, weights, divisor=139)
+
+        self.assertEqual(valid.tolist(), [True, True, False, True])
+        for index, carton in enumerate(cartons):
+            expected = compute_metrics(*carton[:3], weight=carton[3], divisor=139)
+            if not valid[index]:
+                continue
+            for field in METRIC_FIELDS:
+                self.assertAlmostEqual(float(metrics[field][index]), expected[field], places=4, msg=field)
+
+    def test_box_filters(self):
+        self.assertEqual(parse_box("24x12X18"), [12, 18, 24])
+        self.assertEqual(parse_box({"length": 5, "width": 4, "height": 3}), [3, 4, 5])
+        self.assertEqual(get_box_filters([24, 18, 12]), {
+            "carton_longest_side_inches": ["<=", 24],
+            "carton_middle_side_inches": ["<=", 18],
+            "carton_shortest_side_inches": ["<=", 12]
+        })
@@ -0,0 +1,65 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import unittest
+from datetime import datetime
+
+from imperium_pim.catalog.read_model import FIELDS, CatalogReadModel
+
+
+def make_row(name, **values):
+    row = {field: None for field in FIELDS}
+    row.update({
+        "name": name,
+        "sku": name,
+        "name1": f"Item {name}",
+        "status": "Current",
+        "vendor_code": "RMV",
+        "item_width_inches": 12.5,
+        "modified": datetime(2025, 7, 1, 9, 30, 0, 250)
+    })
+    row.update(values)
+    return tuple(row[field] for field in FIELDS)
+
+
+class TestCatalogReadModel(unittest.TestCase):
+    def setUp(self):
+        self.model = CatalogReadModel()
+        self.model.load(
+            [make_row("RMV-1"), make_row("RMV-2", brand="Oak", carton_weight_lbs=40)],
+            {"RMV-2": [("color", "color-black", "Black")]}
+        )
+
+    def test_row_view(self):
+        item = self.model.get("RMV-2")
+        self.assertEqual(item.name, "RMV-2")
+        self.assertEqual(item.brand, "Oak")
+        self.assertEqual(item.carton_weight_lbs, 40.0)
+        self.assertIsNone(item.item_weight_lbs)
+        self.assertEqual(item.modified, datetime(2025, 7, 1, 9, 30, 0, 250))
+        self.assertEqual(item.item_attributes[0].pim_attribute_value, "color-black")
+        self.assertIsNone(self.model.get("RMV-3"))
+        with self.assertRaises(AttributeError):
+            item.price
+
+    def test_get_rows_with_aliases(self):
+        rows = self.model.get_rows(["RMV-2", "RMV-9", "RMV-1"], ["name", "name1 as item_name", "status"])
+        self.assertEqual(rows, [
+            {"name": "RMV-2", "item_name": "Item RMV-2", "status": "Current"},
+            {"name": "RMV-1", "item_name": "Item RMV-1", "status": "Current"}
+        ])
+
+    def test_apply(self):
+        self.model.apply([make_row("RMV-2", brand="Maple"), make_row("RMV-3")], {}, removed=["RMV-1"])
+
+        self.assertEqual(len(self.model), 2)
+        self.assertIsNone(self.model.get("RMV-1"))
+        self.assertEqual(self.model.get("RMV-2").brand, "Maple")
+        self.assertEqual(self.model.get("RMV-2").item_attributes, [])
+        self.assertEqual(self.model.get("RMV-3").status, "Current")
+
+    def test_memory_usage(self):
+        usage = self.model.memory_usage()
+        self.assertEqual(usage["items"], 2)
+        self.assertEqual(usage["bytes"], sum(usage["columns"].values()))
+        self.assertEqual(usage["bytes_per_100k_items"], round(usage["bytes"] / 2 * 100000))
@@ -0,0 +1,65 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import time
+import unittest
+from unittest.mock import patch
+
+import frappe
+from imperium_pim.catalog import realtime
+
+
+class TestCatalogRealtime(unittest.TestCase):
+    def setUp(self):
+        self.site = getattr(frappe.local, "site", None)
+        frappe.local.site = "realtime.test"
+
+    def tearDown(self):
+        realtime._pending.pop("realtime.test", None)
+        realtime._last_published.pop("realtime.test", None)
+        frappe.local.site = self.site
+
+    def test_delta(self):
+        rows = [{"name": "RTV-2", "status": "Current"}, {"name": "RTV-1", "status": "Discontinued"}]
+        delta = realtime.build_delta("PIM Item", {"RTV-1", "RTV-2", "RTV-3"}, rows)
+
+        self.assertEqual(delta["doctype"], "PIM Item")
+        self.assertEqual([row["name"] for row in delta["updated"]], ["RTV-1", "RTV-2"])
+        self.assertEqual(delta["deleted"], ["RTV-3"])
+
+    def test_strip_fields(self):
+        delta = {"id": "1-0", "doctype": "PIM Item", "updated": [{"name": "RTV-1", "upc": "1"}], "deleted": ["RTV-2"]}
+
+        self.assertEqual(realtime.strip_fields(delta)["updated"], [{"name": "RTV-1"}])
+        self.assertEqual(realtime.strip_fields(delta)["deleted"], ["RTV-2"])
+        self.assertEqual(realtime.strip_fields({"doctype": "PIM Item", "reset": True}), {"doctype": "PIM Item", "reset": True})
+
+    def test_large_and_bulk_changes_reset(self):
+        names = {f"RTV-{i}" for i in range(realtime.MAX_DELTA_ROWS + 1)}
+        self.assertEqual(
+            realtime.build_delta("PIM Item", names, []),
+            {"doctype": "PIM Item", "reset": True, "count": realtime.MAX_DELTA_ROWS + 1}
+        )
+        self.assertTrue(realtime.build_delta("PIM Item", None, [])["reset"])
+
+    def test_changes_within_window_are_coalesced(self):
+        realtime._last_published["realtime.test"] = time.monotonic()
+        with patch.object(realtime, "publish_pending") as publish:
+            realtime.queue_changes("PIM Item", {"RTV-1"})
+            realtime.queue_changes("PIM Item", {"RTV-1", "RTV-2"})
+            realtime.queue_changes("PIM Vendor", {"RTV"})
+            publish.assert_not_called()
+
+            realtime._last_published["realtime.test"] -= realtime.DEBOUNCE_SECONDS
+            realtime.queue_changes("PIM Item", {"RTV-3"})
+            publish.assert_called_once()
+
+        self.assertEqual(realtime._pending["realtime.test"], {"PIM Item": {"RTV-1", "RTV-2", "RTV-3"}, "PIM Vendor": {"RTV"}})
+
+    def test_reset_absorbs_names(self):
+        realtime._last_published["realtime.test"] = time.monotonic()
+        realtime.queue_changes("PIM Item", {"RTV-1"})
+        realtime.queue_changes("PIM Item", None)
+        realtime.queue_changes("PIM Item", {"RTV-2"})
+
+        self.assertIsNone(realtime._pending["realtime.test"]["PIM Item"])
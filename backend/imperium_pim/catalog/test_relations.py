@@ -0,0 +1,147 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from imperium_pim.catalog.relations import run_query
+
+SELECTION = {
+    "fields": ["name", "vendor_sku"],
+    "filters": {"vendor_code": "RELV"},
+    "order_by": "vendor_sku asc",
+    "vendor": {"fields": ["vendor_name", "vendor_active"]},
+    "attributes": {
+        "fields": ["attribute_value_name"],
+        "attribute": {"fields": ["attribute_name"]}
+    }
+}
+
+
+class TestNestedQuery(FrappeTestCase):
+    def setUp(self):
+        """Set up test data: one vendor, one attribute and three items"""
+        if not frappe.db.exists("PIM Vendor", "RELV"):
+            frappe.get_doc({
+                "doctype": "PIM Vendor",
+                "vendor_name": "Relation Test Vendor",
+                "vendor_code": "RELV",
+                "vendor_active": 1
+            }).insert(ignore_permissions=True)
+        if not frappe.db.exists("PIM Attribute", "rel_color"):
+            frappe.get_doc({
+                "doctype": "PIM Attribute",
+                "attribute_code": "rel_color",
+                "attribute_name": "Rel Color",
+                "attribute_type": "Select"
+            }).insert(ignore_permissions=True)
+        for value in ("Black", "White"):
+            if not frappe.db.exists("PIM Attribute Value", f"rel_color-{value.lower()}"):
+                frappe.get_doc({
+                    "doctype": "PIM Attribute Value",
+                    "pim_attribute": "rel_color",
+                    "attribute_value_name": value
+                }).insert(ignore_permissions=True)
+
+        for vendor_sku, values in (("1", ["rel_color-black"]), ("2", ["rel_color-white"]), ("3", [])):
+            if not frappe.db.exists("PIM Item", f"RELV-{vendor_sku}"):
+                frappe.get_doc({
+                    "doctype": "PIM Item",
+                    "name1": f"Table {vendor_sku}",
+                    "vendor_code": "RELV",
+                    "vendor_sku": vendor_sku,
+                    "item_attributes": [{"pim_attribute_value": value} for value in values]
+                }).insert(ignore_permissions=True)
+
+    def tearDown(self):
+        """Clean up test data"""
+        for name in frappe.get_all("PIM Item", filters={"vendor_code": ["in", ["RELV", "RELW"]]}, pluck="name"):
+            frappe.delete_doc("PIM Item", name, ignore_permissions=True, force=True)
+        frappe.db.delete("PIM Attribute Value", {"pim_attribute": "rel_color"})
+        frappe.db.delete("PIM Attribute", {"name": "rel_color"})
+        frappe.db.delete("PIM Vendor", {"vendor_code": ["in", ["RELV", "RELW"]]})
+        frappe.db.commit()
+
+    def test_nested_relations(self):
+        result = run_query("items", SELECTION)
+
+        self.assertEqual([item["name"] for item in result["data"]], ["RELV-1", "RELV-2", "RELV-3"])
+        first = result["data"][0]
+        self.assertEqual(first["vendor"], {"vendor_name": "Relation Test Vendor", "vendor_active": 1})
+        self.assertEqual(
+            first["attributes"],
+            [{"attribute_value_name": "Black", "attribute": {"attribute_name": "Rel Color"}}]
+        )
+        self.assertEqual(result["data"][2]["attributes"], [])
+        # join keys that were not selected stay out of the result
+        self.assertNotIn("vendor_code", first)
+
+    def test_one_query_per_relation(self):
+        many = run_query("items", SELECTION)
+        one = run_query("items", {**SELECTION, "limit": 1})
+
+        self.assertEqual(len(one["data"]), 1)
+        self.assertEqual(many["queries"], 4)
+        self.assertEqual(one["queries"], 4)
+
+    def test_invalid_selections(self):
+        self.assertRaises(frappe.ValidationError, run_query, "items", {"fields": ["not_a_field"]})
+        self.assertRaises(frappe.ValidationError, run_query, "items", {"prices": {}})
+        self.assertRaises(frappe.ValidationError, run_query, "vendors", {"fields": ["vendor_api_key"]})
+        self.assertRaises(frappe.ValidationError, run_query, "orders", {})
+
+    def test_user_permissions_apply_to_relations(self):
+        """A user restricted to one vendor sees no components of another vendor"""
+        if not frappe.db.exists("PIM Vendor", "RELW"):
+            frappe.get_doc({
+                "doctype": "PIM Vendor",
+                "vendor_name": "Other Relation Test Vendor",
+                "vendor_code": "RELW",
+                "vendor_active": 1
+            }).insert(ignore_permissions=True)
+        frappe.get_doc({
+            "doctype": "PIM Item",
+            "name1": "Drawer",
+            "vendor_code": "RELW",
+            "vendor_sku": "1"
+        }).insert(ignore_permissions=True)
+        kit = frappe.get_doc("PIM Item", "RELV-3")
+        kit.append("kit_components", {"component": "RELV-1", "quantity": 1})
+        kit.append("kit_components", {"component": "RELW-1", "quantity": 2})
+        kit.save(ignore_permissions=True)
+
+        user = "relation-restricted@example.com"
+        if not frappe.db.exists("User", user):
+            frappe.get_doc({
+                "doctype": "User",
+                "email": user,
+                "first_name": "Restricted",
+                "send_welcome_email": 0,
+                "roles": [{"role": "System Manager"}]
+            }).insert(ignore_permissions=True)
+        frappe.get_doc({
+            "doctype": "User Permission",
+            "user": user,
+            "allow": "PIM Vendor",
+            "for_value": "RELV"
+        }).insert(ignore_permissions=True)
+
+        selection = {
+            "fields": ["name"],
+            "filters": {"name": "RELV-3"},
+            "components": {"fields": ["quantity"], "component": {"fields": ["name"]}}
+        }
+        frappe.set_user(user)
+        try:
+            components = run_query("items", selection)["data"][0]["components"]
+        finally:
+            frappe.set_user("Administrator")
+            frappe.db.delete("User Permission", {"user": user})
+            # kits block deleting their components in tearDown
+            kit.reload()
+            kit.kit_components = []
+            kit.save(ignore_permissions=True)
+
+        self.assertEqual(
+            [(row["quantity"], row["component"]) for row in components],
+            [(1, {"name": "RELV-1"}), (2, None)]
+        )
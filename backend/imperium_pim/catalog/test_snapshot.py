@@ -0,0 +1,71 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from imperium_pim.catalog.snapshot import CatalogSnapshot, SnapshotReadModel, remove_old_snapshots, write_snapshot
+from imperium_pim.catalog.test_read_model import make_row
+
+
+class TestCatalogSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "catalog-1.snap")
+        write_snapshot(
+            self.path,
+            [make_row("SNP-2", brand="Oak", upc=None), make_row("SNP-1", upc="0123", carton_weight_lbs=40)],
+            {"SNP-2": [("color", "color-black", "Black"), ("finish", "finish-matte", "Matte")]},
+            change_id="5-0",
+            version="1"
+        )
+        self.snapshot = CatalogSnapshot(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_columns(self):
+        self.assertEqual(len(self.snapshot), 2)
+        self.assertEqual(self.snapshot.change_id, "5-0")
+        self.assertEqual(self.snapshot.find("SNP-1"), 0)
+        self.assertIsNone(self.snapshot.find("SNP-0"))
+        self.assertIsNone(self.snapshot.find("SNP-3"))
+
+        ordinal = self.snapshot.find("SNP-2")
+        self.assertEqual(self.snapshot.value("brand", ordinal), "Oak")
+        self.assertIsNone(self.snapshot.value("upc", ordinal))
+        self.assertIsNone(self.snapshot.value("carton_weight_lbs", ordinal))
+        self.assertEqual(self.snapshot.value("item_width_inches", ordinal), 12.5)
+        self.assertEqual(self.snapshot.value("modified", ordinal), datetime(2025, 7, 1, 9, 30, 0, 250))
+        self.assertEqual(
+            [row.attribute_value_name for row in self.snapshot.value("item_attributes", ordinal)],
+            ["Black", "Matte"]
+        )
+        self.assertEqual(self.snapshot.value("upc", self.snapshot.find("SNP-1")), "0123")
+
+    def test_overlay(self):
+        model = SnapshotReadModel(self.snapshot)
+        model.apply([make_row("SNP-2", brand="Maple"), make_row("SNP-3")], {}, removed=["SNP-1"])
+
+        self.assertIsNone(model.get("SNP-1"))
+        self.assertEqual(model.get("SNP-2").brand, "Maple")
+        self.assertEqual(model.get("SNP-3").status, "Current")
+        self.assertEqual(
+            model.get_rows(["SNP-3", "SNP-1", "SNP-2"], ["name", "brand as item_brand"]),
+            [{"name": "SNP-3", "item_brand": None}, {"name": "SNP-2", "item_brand": "Maple"}]
+        )
+
+        model.apply([make_row("SNP-1")], {})
+        self.assertEqual(model.get("SNP-1").name, "SNP-1")
+
+    def test_remove_old_snapshots(self):
+        for version in range(2, 6):
+            open(os.path.join(self.directory.name, f"catalog-{version}.snap"), "w").close()
+
+        remove_old_snapshots(self.directory.name, "catalog-5.snap", keep=2)
+        self.assertEqual(
+            sorted(os.listdir(self.directory.name)),
+            ["catalog-3.snap", "catalog-4.snap", "catalog-5.snap"]
+        )
@@ -159,23 +159,12 @@ fixtures = ["Page"]
 # Scheduled Tasks
 # ---------------
 
-# scheduler_events = {
-# 	"all": [
-# 		"imperium_pim.tasks.all"
-# 	],
-# 	"daily": [
-# 		"imperium_pim.tasks.daily"
-# 	],
-# 	"hourly": [
-# 		"imperium_pim.tasks.hourly"
-# 	],
-# 	"weekly": [
-# 		"imperium_pim.tasks.weekly"
-# 	],
-# 	"monthly": [
-# 		"imperium_pim.tasks.monthly"
-# 	],
-# }
+scheduler_events = {
+	"hourly": [
+		"imperium_pim.vendor_sync.jobs.enqueue_scheduled_syncs",
+		"imperium_pim.catalog.snapshot.build_scheduled_snapshot"
+	],
+}
 
 # Testing
 # -------
@@ -207,14 +196,24 @@ fixtures = ["Page"]
 
 # Request Events
 # ----------------
-# Handle CORS for separate frontend deployment
-before_request = ["imperium_pim.utils.handle_cors_preflight"]
-after_request = ["imperium_pim.utils.add_cors_headers"]
+# Handle CORS for separate frontend deployment, collect per-method metrics and
+# run the on-demand profiler
+before_request = [
+	"imperium_pim.utils.handle_cors_preflight",
+	"imperium_pim.performance.metrics.start_request",
+	"imperium_pim.performance.profiler.start_request"
+]
+after_request = [
+	"imperium_pim.utils.add_cors_headers",
+	"imperium_pim.catalog.realtime.end_request",
+	"imperium_pim.performance.profiler.end_request",
+	"imperium_pim.performance.metrics.end_request"
+]
 
 # Job Events
 # ----------
 # before_job = ["imperium_pim.utils.before_job"]
-# after_job = ["imperium_pim.utils.after_job"]
+after_job = ["imperium_pim.catalog.realtime.end_job"]
 
 # User Data Protection
 # --------------------
@@ -267,10 +266,16 @@ workspaces = [
 # Installation hooks
 # ------------------
 # Hook to run after app installation
-after_install = "imperium_pim.utils.setup_module"
+after_install = [
+    "imperium_pim.utils.setup_module",
+    "imperium_pim.performance.indexes.add_composite_indexes"
+]
 
 # Hook to run after migration
-after_migrate = "imperium_pim.utils.sync_desktop_icons"
+after_migrate = [
+    "imperium_pim.utils.sync_desktop_icons",
+    "imperium_pim.performance.warmup.after_migrate"
+]
 
 # App installation hooks
 # ---------------------
@@ -0,0 +1,5 @@
+from imperium_pim.performance.indexes import add_composite_indexes
+
+
+def execute():
+    add_composite_indexes()
@@ -0,0 +1,5 @@
+from imperium_pim.catalog.logistics import backfill
+
+
+def execute():
+    backfill()
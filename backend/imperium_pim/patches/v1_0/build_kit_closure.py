@@ -0,0 +1,8 @@
+import frappe
+
+from imperium_pim.catalog.kits import rebuild_all
+
+
+def execute():
+    rebuild_all()
+    frappe.db.commit()
@@ -0,0 +1,4 @@
+# Performance instrumentation for Imperium PIM
+#
+# Request metrics, database query tracing and profiling helpers. Collected
+# data is kept in Redis so it is shared by all web workers of a site.
@@ -0,0 +1,138 @@
+"""
+Shared cache of hot read endpoints
+
+Dashboard stats, the recent item and vendor lists, the active vendor list
+and item list pages run the same queries for every request. get_cached
+keeps their results in Redis, shared by all workers, tagged with a version
+token that committed item changes (catalog.changes) and the PIM Vendor and
+PIM Attribute controllers bump. Lists that frappe.get_list filters by
+permission are kept per user (get_cache_name). Entries are fresh for
+CACHE_TTL seconds, which bounds how stale they get after writes that bypass
+the controllers, such as new attribute values.
+
+Many clients ask for the same entry at once, above all right after it
+expired or was invalidated. To keep them from all running its queries:
+
+    - single flight: the worker that takes the entry's Redis lock computes
+      it; the others wait up to LOCK_WAIT seconds for its result;
+    - stale-while-revalidate: an entry that expired or has an older version
+      is served for STALE_TTL more seconds while the lock holder recomputes
+      it, so only that one request waits.
+"""
+
+import hashlib
+import time
+
+import frappe
+
+CACHE_KEY = "imperium_pim:cache:{name}"
+LOCK_KEY = "imperium_pim:cache_lock:{name}"
+VERSION_KEY = "imperium_pim:cache_version"
+
+CACHE_TTL = 120
+
+# Seconds an expired or invalidated entry is still served while it is recomputed
+STALE_TTL = 600
+
+# Milliseconds a computing worker holds the lock, should it die while holding it
+LOCK_TIMEOUT = 30000
+
+# Seconds a worker waits for another worker's value before computing it itself
+LOCK_WAIT = 5
+POLL_INTERVAL = 0.05
+
+# Deletes the lock only while it is still ours
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def get_cache_version():
+    return frappe.cache().get_value(VERSION_KEY) or "0"
+
+
+def get_cache_name(name, *args, user=None):
+    """
+    Entry name of a result that depends on arguments
+
+    Args:
+        user (str): for results filtered by the user's permissions, such as
+                    frappe.get_list results; each user gets their own entry
+    """
+    digest = hashlib.sha1(frappe.as_json([user, *args]).encode()).hexdigest()[:16]
+    return f"{name}:{user}:{digest}" if user else f"{name}:{digest}"
+
+
+def read_entry(key):
+    # expires=True reads Redis instead of the request's copy, so waiting sees other workers' writes
+    return frappe.cache().get_value(key, expires=True)
+
+
+def acquire_lock(name):
+    """Lock token of the entry, or None when another worker holds the lock"""
+    token = frappe.generate_hash(length=10)
+    if frappe.cache().set(frappe.cache().make_key(LOCK_KEY.format(name=name)), token, nx=True, px=LOCK_TIMEOUT):
+        return token
+    return None
+
+
+def release_lock(name, token):
+    frappe.cache().eval(RELEASE_SCRIPT, 1, frappe.cache().make_key(LOCK_KEY.format(name=name)), token)
+
+
+def wait_for_entry(key, version):
+    """Entry of the version once the lock holder stored it, None after LOCK_WAIT seconds"""
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = read_entry(key)
+        if entry is not None and entry["version"] == version:
+            return entry
+    return None
+
+
+def get_cached(name, generator, ttl=CACHE_TTL, stale_ttl=STALE_TTL):
+    """
+    Value of generator() shared by all workers
+
+    Args:
+        name (str): cache entry name, see get_cache_name
+        generator (callable): computes the value on a miss
+        ttl (int): seconds the value is fresh
+        stale_ttl (int): further seconds it is served while recomputed
+    """
+    key = CACHE_KEY.format(name=name)
+    version = get_cache_version()
+    entry = read_entry(key)
+    if entry is not None and entry["version"] == version and entry["fresh_until"] > time.time():
+        return entry["value"]
+
+    token = acquire_lock(name)
+    if token is None:
+        if entry is not None:
+            # another worker is revalidating it
+            return entry["value"]
+        entry = wait_for_entry(key, version)
+        if entry is not None:
+            return entry["value"]
+        # the lock holder is slow or gone; compute without sharing the work
+        return generator()
+
+    try:
+        value = generator()
+        frappe.cache().set_value(
+            key,
+            {"value": value, "version": version, "fresh_until": time.time() + ttl},
+            expires_in_sec=ttl + stale_ttl
+        )
+    finally:
+        release_lock(name, token)
+    return value
+
+
+def invalidate_cache():
+    """Mark every get_cached value stale on all workers"""
+    frappe.cache().set_value(VERSION_KEY, frappe.generate_hash(length=10))
@@ -0,0 +1,78 @@
+"""
+Database query tracing
+
+QueryTracer counts and times every statement sent through frappe.db.sql while
+it is active. frappe.db.get_value, get_all, count and friends all go through
+sql(), so a tracer sees every query of a request or block of code.
+
+The tracer replaces `sql` on the database instance only, leaving the Database
+class untouched, and tracers can be nested as long as they are stopped in
+reverse order.
+
+Usage:
+    with QueryTracer() as tracer:
+        get_attribute_list()
+    print(tracer.count, tracer.duration)
+"""
+
+import time
+
+import frappe
+
+
+class QueryTracer:
+    """
+    Counts and times the queries of a database connection
+
+    Args:
+        db: Frappe database connection, defaults to frappe.db
+        capture (bool): also keep (query, values, seconds) for every statement
+    """
+
+    def __init__(self, db=None, capture=False):
+        self.db = db
+        self.capture = capture
+        self.count = 0
+        self.duration = 0.0
+        self.queries = []
+        self._previous = None
+        self._active = False
+
+    def start(self):
+        db = self.db = self.db or frappe.db
+        # an instance-level override means another tracer is already active
+        self._previous = db.__dict__.get("sql")
+        sql = db.sql
+
+        def traced_sql(query, values=(), *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return sql(query, values, *args, **kwargs)
+            finally:
+                self.record(query, values, time.perf_counter() - start)
+
+        db.sql = traced_sql
+        self._active = True
+        return self
+
+    def stop(self):
+        if not self._active:
+            return self
+        if self._previous is None:
+            self.db.__dict__.pop("sql", None)
+        else:
+            self.db.sql = self._previous
+        self._active = False
+        return self
+
+    def record(self, query, values, seconds):
+        self.count += 1
+        self.duration += seconds
+        if self.capture:
+            self.queries.append((str(query), values, seconds))
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
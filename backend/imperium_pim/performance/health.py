@@ -0,0 +1,229 @@
+"""
+Health and capacity checks
+
+Each check returns a dict with a `status` of "ok", "degraded" or "down"
+plus its measurements, and never raises. run_checks combines them into an
+overall status:
+
+    healthy     every check is ok
+    degraded    something is slow or backing up, but requests are served
+    unhealthy   the database or Redis is unreachable
+
+Thresholds can be tuned in site config:
+
+    pim_health_db_latency_ms       DB round trip considered slow (50)
+    pim_health_redis_latency_ms    Redis round trip considered slow (20)
+    pim_health_job_age_seconds     oldest queued job considered stuck (600)
+"""
+
+import statistics
+import time
+from datetime import datetime, timezone
+
+import frappe
+from frappe.utils import cint
+
+DB_LATENCY_MS = 50
+REDIS_LATENCY_MS = 20
+JOB_AGE_SECONDS = 600
+
+# Round trips timed per latency check; the median is reported
+LATENCY_SAMPLES = 3
+
+PIM_TABLE_PREFIX = "tabPIM "
+
+
+def get_threshold(key, default):
+    return cint(frappe.conf.get(key)) or default
+
+
+def time_round_trips(fn, samples=LATENCY_SAMPLES):
+    """Median and max milliseconds of `samples` calls of fn"""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 3), round(max(timings), 3)
+
+
+def check_database():
+    try:
+        median, worst = time_round_trips(lambda: frappe.db.sql("SELECT 1"))
+    except Exception as e:
+        return {"status": "down", "error": str(e)}
+
+    threshold = get_threshold("pim_health_db_latency_ms", DB_LATENCY_MS)
+    return {
+        "status": "ok" if median <= threshold else "degraded",
+        "db_type": frappe.db.db_type,
+        "latency_ms": median,
+        "max_latency_ms": worst,
+        "threshold_ms": threshold
+    }
+
+
+def check_redis():
+    try:
+        cache = frappe.cache()
+        median, worst = time_round_trips(cache.ping)
+    except Exception as e:
+        return {"status": "down", "error": str(e)}
+
+    threshold = get_threshold("pim_health_redis_latency_ms", REDIS_LATENCY_MS)
+    return {
+        "status": "ok" if median <= threshold else "degraded",
+        "latency_ms": median,
+        "max_latency_ms": worst,
+        "threshold_ms": threshold
+    }
+
+
+def get_job_age(job):
+    """Seconds since a job was enqueued; RQ stores UTC timestamps"""
+    enqueued_at = job.enqueued_at
+    if not enqueued_at:
+        return None
+    if enqueued_at.tzinfo is None:
+        enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+    return round((datetime.now(timezone.utc) - enqueued_at).total_seconds(), 1)
+
+
+def check_queues():
+    """Depth, oldest job age and workers of every background queue"""
+    try:
+        from frappe.utils.background_jobs import get_queue, get_queue_list, get_redis_conn
+        from rq import Worker
+        from rq.job import Job
+
+        conn = get_redis_conn()
+        threshold = get_threshold("pim_health_job_age_seconds", JOB_AGE_SECONDS)
+        queues = {}
+        status = "ok"
+
+        for queue_type in get_queue_list():
+            queue = get_queue(queue_type)
+            depth = queue.count
+            oldest_age = None
+
+            job_ids = queue.get_job_ids(0, 0) if depth else []
+            if job_ids:
+                job = Job.fetch(job_ids[0], connection=conn)
+                oldest_age = get_job_age(job)
+
+            queue_status = "degraded" if oldest_age and oldest_age > threshold else "ok"
+            if queue_status != "ok":
+                status = "degraded"
+
+            queues[queue_type] = {
+                "status": queue_status,
+                "depth": depth,
+                "oldest_job_age_seconds": oldest_age,
+                "failed": queue.failed_job_registry.count
+            }
+
+        workers = Worker.all(connection=conn)
+        return {
+            "status": status if workers else "degraded",
+            "workers": len(workers),
+            "busy_workers": sum(1 for worker in workers if worker.get_state() == "busy"),
+            "job_age_threshold_seconds": threshold,
+            "queues": queues
+        }
+    except Exception as e:
+        return {"status": "degraded", "error": str(e)}
+
+
+def check_cache_ratios():
+    """Hit ratios of Redis and of the database buffer cache since server start"""
+    result = {"status": "ok"}
+
+    try:
+        info = frappe.cache().info("stats")
+        hits, misses = int(info.get("keyspace_hits", 0)), int(info.get("keyspace_misses", 0))
+        result["redis_hit_ratio"] = round(hits / (hits + misses), 4) if hits + misses else None
+    except Exception as e:
+        result["redis_error"] = str(e)
+
+    try:
+        if frappe.db.db_type == "postgres":
+            row = frappe.db.sql("""
+                SELECT SUM(blks_hit), SUM(blks_read)
+                FROM pg_stat_database
+                WHERE datname = current_database()
+            """)[0]
+            hits, reads = int(row[0] or 0), int(row[1] or 0)
+            result["db_buffer_hit_ratio"] = round(hits / (hits + reads), 4) if hits + reads else None
+        else:
+            status = dict(frappe.db.sql("SHOW GLOBAL STATUS LIKE 'Innodb_buffer_pool_read%'"))
+            requests = int(status.get("Innodb_buffer_pool_read_requests", 0))
+            disk_reads = int(status.get("Innodb_buffer_pool_reads", 0))
+            result["db_buffer_hit_ratio"] = round(1 - disk_reads / requests, 4) if requests else None
+    except Exception as e:
+        result["db_error"] = str(e)
+
+    return result
+
+
+def check_table_sizes():
+    """
+    Row counts of the PIM tables
+
+    Counts come from the database statistics rather than COUNT(*), so they
+    are estimates but cost nothing on large tables.
+    """
+    try:
+        if frappe.db.db_type == "postgres":
+            rows = frappe.db.sql("""
+                SELECT relname, reltuples::bigint
+                FROM pg_class
+                WHERE relkind = 'r' AND relname LIKE %s
+            """, (PIM_TABLE_PREFIX + "%",))
+        else:
+            rows = frappe.db.sql("""
+                SELECT table_name, table_rows
+                FROM information_schema.tables
+                WHERE table_schema = DATABASE() AND table_name LIKE %s
+            """, (PIM_TABLE_PREFIX + "%",))
+    except Exception as e:
+        return {"status": "degraded", "error": str(e)}
+
+    return {
+        "status": "ok",
+        "estimated": True,
+        "tables": {name[3:]: max(cint(count), 0) for name, count in sorted(rows)}
+    }
+
+
+def check_slow_requests(limit=10):
+    try:
+        from imperium_pim.performance.metrics import get_slow_requests
+
+        return {"status": "ok", "recent": get_slow_requests(limit)}
+    except Exception as e:
+        return {"status": "degraded", "error": str(e)}
+
+
+def overall_status(checks):
+    if any(checks[name]["status"] == "down" for name in ("database", "redis") if name in checks):
+        return "unhealthy"
+    if any(check["status"] != "ok" for check in checks.values()):
+        return "degraded"
+    return "healthy"
+
+
+def run_checks():
+    """
+    Run every check
+
+    Returns:
+        tuple: (overall status, {check name: result})
+    """
+    checks = {"database": check_database(), "redis": check_redis(), "queues": check_queues()}
+    if checks["database"]["status"] != "down":
+        checks["cache"] = check_cache_ratios()
+        checks["tables"] = check_table_sizes()
+    if checks["redis"]["status"] != "down":
+        checks["slow_requests"] = check_slow_requests()
+
+    return overall_status(checks), checks
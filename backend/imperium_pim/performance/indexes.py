@@ -0,0 +1,116 @@
+"""
+Composite indexes matched to the app's query patterns
+
+Doctype JSON only supports single-column `search_index` flags, but every
+list query of the app filters on one column and orders by another, e.g.
+
+    SELECT ... FROM `tabPIM Item` WHERE status = %s ORDER BY modified DESC LIMIT 50
+
+With an index on `status` alone the database reads every matching row and
+sorts them (filesort); with (status, modified) it walks the index in order and
+stops after 50 rows. COMPOSITE_INDEXES lists one index per filter/order pair
+the app uses, and APP_QUERIES the queries they are meant for, so
+test_indexes can EXPLAIN each one and fail on full scans or filesorts.
+
+Indexes are created by the add_composite_indexes patch on migrate and by
+after_install on new sites. Adding an index that already exists is a no-op.
+"""
+
+import frappe
+
+# doctype -> [(index name, columns)]
+COMPOSITE_INDEXES = {
+    "PIM Item": [
+        ("status_modified_index", ["status", "modified"]),
+        ("vendor_code_modified_index", ["vendor_code", "modified"]),
+        ("brand_modified_index", ["brand", "modified"]),
+        ("item_type_modified_index", ["item_type", "modified"])
+    ],
+    "PIM Vendor": [
+        ("vendor_active_modified_index", ["vendor_active", "modified"])
+    ],
+    "PIM Attribute Value": [
+        ("pim_attribute_creation_index", ["pim_attribute", "creation"])
+    ],
+    "PIM Vendor Attribute": [
+        ("pim_vendor_vendor_attribute_name_index", ["pim_vendor", "vendor_attribute_name"])
+    ],
+    "PIM Vendor Attribute Mapping": [
+        ("pim_vendor_approved_index", ["pim_vendor", "approved"])
+    ],
+    "PIM Kit Closure": [
+        ("ancestor_depth_index", ["ancestor", "depth", "descendant"]),
+        ("descendant_depth_index", ["descendant", "depth", "ancestor"])
+    ],
+    "PIM Item Attribute": [
+        ("attribute_value_parent_index", ["pim_attribute_value", "parenttype", "parent"])
+    ]
+}
+
+
+# (label, doctype, get_all kwargs) for the list queries of the API and the
+# vendor mapping screens; string values are placeholders filled in by tests
+APP_QUERIES = [
+    ("items by modified", "PIM Item", {"order_by": "modified desc", "limit": 50}),
+    ("items by status", "PIM Item", {"filters": {"status": "Current"}, "order_by": "modified desc", "limit": 50}),
+    ("items by vendor", "PIM Item", {"filters": {"vendor_code": "{vendor}"}, "order_by": "modified desc", "limit": 50}),
+    ("items by brand", "PIM Item", {"filters": {"brand": "{brand}"}, "order_by": "modified desc", "limit": 50}),
+    ("items by type", "PIM Item", {"filters": {"item_type": "Kit"}, "order_by": "modified desc", "limit": 50}),
+    ("active vendors", "PIM Vendor", {"filters": {"vendor_active": 1}, "order_by": "modified desc", "limit": 50}),
+    ("attribute values", "PIM Attribute Value", {
+        "filters": {"pim_attribute": "{attribute}"}, "order_by": "pim_attribute asc, creation asc", "limit": 100
+    }),
+    ("vendor attributes", "PIM Vendor Attribute", {
+        "filters": {"pim_vendor": "{vendor}"}, "order_by": "vendor_attribute_name asc"
+    }),
+    ("approved attribute mappings", "PIM Vendor Attribute Mapping", {
+        "filters": {"pim_vendor": "{vendor}", "approved": 1}
+    }),
+    ("kit components", "PIM Kit Closure", {
+        "filters": {"ancestor": "{item}"}, "order_by": "depth asc, descendant asc"
+    }),
+    ("kits containing", "PIM Kit Closure", {
+        "filters": {"descendant": "{item}"}, "order_by": "depth asc, ancestor asc"
+    })
+]
+
+
+def add_composite_indexes():
+    """Create every index in COMPOSITE_INDEXES that does not exist yet"""
+    for doctype, indexes in COMPOSITE_INDEXES.items():
+        for index_name, columns in indexes:
+            frappe.db.add_index(doctype, columns, index_name=index_name)
+    frappe.db.commit()
+
+
+def get_query_sql(doctype, kwargs, placeholders=None):
+    """SQL of an APP_QUERIES entry with its placeholders filled in"""
+    kwargs = dict(kwargs)
+    if kwargs.get("filters"):
+        kwargs["filters"] = {
+            key: value.format(**(placeholders or {})) if isinstance(value, str) else value
+            for key, value in kwargs["filters"].items()
+        }
+    return frappe.get_all(doctype, fields=["name"], run=0, **kwargs)
+
+
+def explain(query):
+    """EXPLAIN rows of a query as dicts"""
+    return frappe.db.sql(f"EXPLAIN {query}", as_dict=True)
+
+
+def find_plan_problems(plan):
+    """
+    Full scans and filesorts in a MariaDB EXPLAIN plan
+
+    Returns:
+        list: one description per problem, empty for a good plan
+    """
+    problems = []
+    for row in plan:
+        table = row.get("table")
+        if row.get("type") == "ALL":
+            problems.append(f"full scan of {table}")
+        if "Using filesort" in (row.get("Extra") or ""):
+            problems.append(f"filesort on {table}")
+    return problems
@@ -0,0 +1,330 @@
+"""
+Per-method request metrics
+
+Every /api/method/imperium_pim.* request is timed by the before_request and
+after_request hooks, with a QueryTracer counting its database queries and DB
+time. Results are aggregated per whitelisted method in Redis hashes, so all
+web workers of a site contribute to the same numbers:
+
+    imperium_pim:metrics:methods              set of instrumented methods
+    imperium_pim:metrics:<method>             hash with
+        count, duration, queries, db_duration totals
+        status:2xx / status:4xx / status:5xx  responses per status class
+        latency:<le>                          latency histogram buckets
+        queries:<le>                          queries-per-request buckets
+
+Buckets are stored non-cumulatively and converted to Prometheus' cumulative
+form on export. Writing a sample is one pipelined Redis round trip.
+
+Requests slower than `pim_slow_request_ms` (default 1000) are also kept as
+individual samples in the capped list imperium_pim:metrics:slow_requests.
+"""
+
+import json
+import re
+import time
+
+import frappe
+from frappe.utils import cint, now
+
+METRICS_PREFIX = "imperium_pim:metrics"
+
+# Only methods of this app are instrumented
+METHOD_PREFIX = "imperium_pim."
+
+# Upper bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds in queries per request
+QUERY_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500)
+
+METHOD_PATH = re.compile(r"^/api(?:/v\d+)?/method/([\w.]+)")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SLOW_REQUEST_MS = 1000
+
+# Slow request samples kept
+SLOW_REQUESTS_SIZE = 50
+
+
+def bucket_label(value, bounds):
+    """Label of the histogram bucket a value falls into"""
+    for bound in bounds:
+        if value <= bound:
+            return format_bound(bound)
+    return "+Inf"
+
+
+def format_bound(bound):
+    """Bucket label of a bound, e.g. 0.005 -> 0.005 and 10.0 -> 10"""
+    return repr(float(bound)).rstrip("0").rstrip(".")
+
+
+def get_request_method():
+    """Whitelisted method called by the current request, if it is one of ours"""
+    request = getattr(frappe.local, "request", None)
+    if not request or request.method == "OPTIONS":
+        return None
+
+    match = METHOD_PATH.match(request.path or "")
+    method = match.group(1) if match else None
+    if method and method.startswith(METHOD_PREFIX):
+        return method
+    return None
+
+
+def start_request():
+    """before_request hook: start timing and tracing queries"""
+    from imperium_pim.performance import query_log
+    from imperium_pim.performance.db_tracer import QueryTracer
+
+    method = get_request_method()
+    if not method or not getattr(frappe.local, "db", None):
+        return
+
+    # with the query log enabled every statement is kept for N+1 detection
+    tracer = query_log.QueryLog(frappe.local.db) if query_log.is_enabled() else QueryTracer(frappe.local.db)
+    frappe.local.pim_request_metrics = (method, time.perf_counter(), tracer.start())
+
+
+def end_request(response=None, request=None):
+    """after_request hook: record the sample of the finished request"""
+    state = getattr(frappe.local, "pim_request_metrics", None)
+    if not state:
+        return
+
+    frappe.local.pim_request_metrics = None
+    method, started, tracer = state
+    tracer.stop()
+
+    status = getattr(response, "status_code", 200) or 200
+    # unknown methods would add a series per typo or probe
+    if status == 404:
+        return
+
+    try:
+        record_request(method, time.perf_counter() - started, tracer.count, tracer.duration, status)
+        if tracer.capture:
+            from imperium_pim.performance.query_log import flag_request
+            flag_request(method, tracer, response)
+    except Exception:
+        # metrics must never fail a request
+        frappe.logger("imperium_pim").warning(f"Could not record metrics for {method}", exc_info=True)
+
+
+def record_request(method, duration, queries, db_duration, status=200):
+    """Add one request sample to the method's aggregate"""
+    cache = frappe.cache()
+    key = cache.make_key(f"{METRICS_PREFIX}:{method}")
+
+    pipe = cache.pipeline(transaction=False)
+    pipe.hincrby(key, "count", 1)
+    pipe.hincrbyfloat(key, "duration", duration)
+    pipe.hincrby(key, "queries", queries)
+    pipe.hincrbyfloat(key, "db_duration", db_duration)
+    pipe.hincrby(key, f"status:{status // 100}xx", 1)
+    pipe.hincrby(key, f"latency:{bucket_label(duration, LATENCY_BUCKETS)}", 1)
+    pipe.hincrby(key, f"queries:{bucket_label(queries, QUERY_BUCKETS)}", 1)
+    pipe.sadd(cache.make_key(f"{METRICS_PREFIX}:methods"), method)
+
+    if duration * 1000 >= (cint(frappe.conf.get("pim_slow_request_ms")) or SLOW_REQUEST_MS):
+        slow_key = cache.make_key(f"{METRICS_PREFIX}:slow_requests")
+        pipe.lpush(slow_key, json.dumps({
+            "method": method,
+            "timestamp": now(),
+            "duration_ms": round(duration * 1000, 2),
+            "queries": queries,
+            "db_ms": round(db_duration * 1000, 2),
+            "status": status
+        }))
+        pipe.ltrim(slow_key, 0, SLOW_REQUESTS_SIZE - 1)
+
+    pipe.execute()
+
+
+def get_slow_requests(limit=SLOW_REQUESTS_SIZE):
+    """Most recent slow request samples, newest first"""
+    cache = frappe.cache()
+    key = cache.make_key(f"{METRICS_PREFIX}:slow_requests")
+    return [json.loads(sample) for sample in cache.lrange(key, 0, cint(limit) - 1)]
+
+
+def parse_method_hash(data):
+    """Turn a raw Redis hash into a stats dict"""
+    stats = {
+        "count": 0,
+        "duration": 0.0,
+        "queries": 0,
+        "db_duration": 0.0,
+        "status": {},
+        "latency": {},
+        "query_counts": {}
+    }
+    for field, value in data.items():
+        field = field.decode() if isinstance(field, bytes) else field
+        value = float(value)
+        if field in ("count", "queries"):
+            stats[field] = int(value)
+        elif field in ("duration", "db_duration"):
+            stats[field] = value
+        elif field.startswith("status:"):
+            stats["status"][field[7:]] = int(value)
+        elif field.startswith("latency:"):
+            stats["latency"][field[8:]] = int(value)
+        elif field.startswith("queries:"):
+            stats["query_counts"][field[8:]] = int(value)
+    return stats
+
+
+def get_method_stats():
+    """
+    Aggregated stats of every instrumented method
+
+    Returns:
+        dict: method -> stats dict (see parse_method_hash)
+    """
+    cache = frappe.cache()
+    methods = sorted(
+        method.decode() if isinstance(method, bytes) else method
+        for method in cache.smembers(cache.make_key(f"{METRICS_PREFIX}:methods"))
+    )
+    if not methods:
+        return {}
+
+    pipe = cache.pipeline(transaction=False)
+    for method in methods:
+        pipe.hgetall(cache.make_key(f"{METRICS_PREFIX}:{method}"))
+
+    return {
+        method: parse_method_hash(data)
+        for method, data in zip(methods, pipe.execute())
+        if data
+    }
+
+
+def reset_metrics():
+    """Drop all collected metrics"""
+    cache = frappe.cache()
+    methods_key = cache.make_key(f"{METRICS_PREFIX}:methods")
+    keys = [
+        cache.make_key(f"{METRICS_PREFIX}:{method.decode() if isinstance(method, bytes) else method}")
+        for method in cache.smembers(methods_key)
+    ]
+    cache.delete(methods_key, cache.make_key(f"{METRICS_PREFIX}:slow_requests"), *keys)
+
+
+def cumulative_buckets(counts, bounds):
+    """[(label, cumulative count)] for every bound plus +Inf"""
+    result = []
+    total = 0
+    for bound in bounds:
+        label = format_bound(bound)
+        total += counts.get(label, 0)
+        result.append((label, total))
+    total += counts.get("+Inf", 0)
+    result.append(("+Inf", total))
+    return result
+
+
+def estimate_quantile(counts, bounds, q):
+    """
+    Estimate a quantile from histogram buckets
+
+    Interpolates linearly inside the bucket holding the quantile, like
+    Prometheus' histogram_quantile. Values in the +Inf bucket are reported
+    as the highest finite bound.
+    """
+    buckets = cumulative_buckets(counts, bounds)
+    total = buckets[-1][1]
+    if not total:
+        return 0.0
+
+    rank = q * total
+    lower_bound = 0.0
+    lower_count = 0
+    for (label, cumulative), bound in zip(buckets, tuple(bounds) + (None,)):
+        if cumulative >= rank:
+            if bound is None:
+                return float(bounds[-1])
+            in_bucket = cumulative - lower_count
+            if not in_bucket:
+                return float(bound)
+            return lower_bound + (bound - lower_bound) * (rank - lower_count) / in_bucket
+        lower_bound = float(bound)
+        lower_count = cumulative
+    return float(bounds[-1])
+
+
+def summarize(stats, sort_by="total_seconds"):
+    """
+    Dashboard summary rows, slowest methods first
+
+    Returns:
+        list: one dict per method with call counts, error rate, latency
+            percentiles in ms and average query count and DB time
+    """
+    rows = []
+    for method, data in stats.items():
+        count = data["count"]
+        if not count:
+            continue
+
+        errors = data["status"].get("5xx", 0)
+        rows.append({
+            "method": method,
+            "count": count,
+            "errors": errors,
+            "client_errors": data["status"].get("4xx", 0),
+            "error_rate": round(errors / count, 4),
+            "total_seconds": round(data["duration"], 3),
+            "avg_ms": round(data["duration"] / count * 1000, 2),
+            "p50_ms": round(estimate_quantile(data["latency"], LATENCY_BUCKETS, 0.5) * 1000, 2),
+            "p95_ms": round(estimate_quantile(data["latency"], LATENCY_BUCKETS, 0.95) * 1000, 2),
+            "p99_ms": round(estimate_quantile(data["latency"], LATENCY_BUCKETS, 0.99) * 1000, 2),
+            "avg_queries": round(data["queries"] / count, 2),
+            "p95_queries": round(estimate_quantile(data["query_counts"], QUERY_BUCKETS, 0.95), 1),
+            "avg_db_ms": round(data["db_duration"] / count * 1000, 2),
+            "db_share": round(data["db_duration"] / data["duration"], 4) if data["duration"] else 0
+        })
+
+    rows.sort(key=lambda row: row.get(sort_by) or 0, reverse=True)
+    return rows
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(stats):
+    """Render method stats in the Prometheus text exposition format"""
+    lines = []
+
+    def header(name, kind, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    def histogram(name, field, bounds, total_field):
+        for method, data in stats.items():
+            label = escape_label(method)
+            for le, cumulative in cumulative_buckets(data[field], bounds):
+                lines.append(f'{name}_bucket{{method="{label}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{method="{label}"}} {data[total_field]}')
+            lines.append(f'{name}_count{{method="{label}"}} {data["count"]}')
+
+    header("imperium_pim_request_duration_seconds", "histogram", "Latency of imperium_pim API methods")
+    histogram("imperium_pim_request_duration_seconds", "latency", LATENCY_BUCKETS, "duration")
+
+    header("imperium_pim_request_queries", "histogram", "Database queries per API request")
+    histogram("imperium_pim_request_queries", "query_counts", QUERY_BUCKETS, "queries")
+
+    header("imperium_pim_requests_total", "counter", "API requests by status class")
+    for method, data in stats.items():
+        for status, count in sorted(data["status"].items()):
+            lines.append(f'imperium_pim_requests_total{{method="{escape_label(method)}",status="{status}"}} {count}')
+
+    header("imperium_pim_db_duration_seconds_total", "counter", "Time spent in database queries")
+    for method, data in stats.items():
+        lines.append(f'imperium_pim_db_duration_seconds_total{{method="{escape_label(method)}"}} {data["db_duration"]}')
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,348 @@
+"""
+On-demand request profiler
+
+Profiles a single imperium_pim.* API call in production without redeploying.
+A request is profiled when either
+
+    - it carries an X-PIM-Profile header with a token signed by this site,
+      minted by a System Manager through api.profiler.create_profile_token
+      (the token names its creator and expires), or
+    - the `pim_profiler` site config flag is set and the request's session
+      user is a System Manager. API key authentication is resolved after
+      the profiler starts, so API clients use a token instead.
+
+Two profilers are available, chosen with the X-PIM-Profile-Mode header or the
+value of the site config flag:
+
+    sample    (default) a background thread samples the request thread's
+              stack every `pim_profiler_interval` seconds (default 0.005).
+              Low overhead; produces collapsed stacks for flame graphs.
+    cprofile  deterministic cProfile of the request thread. Exact call counts
+              but slows the request down; produces pstats data.
+
+Profiles are stored in Redis under a generated profile id, returned in the
+X-PIM-Profile-Id response header. The last `pim_profiler_keep` (default 20)
+profiles are listed and can be downloaded through api.profiler.
+"""
+
+import base64
+import cProfile
+import hashlib
+import hmac
+import io
+import json
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+
+import frappe
+from frappe.utils import cint, flt, now
+
+from imperium_pim.performance.metrics import get_request_method
+
+PROFILE_HEADER = "X-PIM-Profile"
+MODE_HEADER = "X-PIM-Profile-Mode"
+PROFILE_ID_HEADER = "X-PIM-Profile-Id"
+
+PROFILES_KEY = "imperium_pim:profiles"
+PROFILE_KEY = "imperium_pim:profile:{}"
+
+MODES = ("sample", "cprofile")
+
+DEFAULT_INTERVAL = 0.005
+DEFAULT_KEEP = 20
+
+# Stored profiles expire after a day even if they are never pushed out
+PROFILE_TTL = 24 * 60 * 60
+
+# Longest lifetime of a profile token
+MAX_TOKEN_SECONDS = 24 * 60 * 60
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for one thread
+
+    A daemon thread captures the target thread's stack at a fixed interval and
+    counts identical stacks, root frame first.
+
+    Args:
+        interval (float): seconds between samples
+        thread_id (int): thread to sample, defaults to the thread calling start()
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.thread_id = self.thread_id or threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="pim-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = collapse_stack(frame)
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Stacks in the collapsed format read by flamegraph.pl and speedscope"""
+        return "\n".join(
+            f"{stack} {count}"
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])
+        )
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def frame_label(code):
+    """Short module-relative label of a code object"""
+    filename = code.co_filename
+    for marker in ("/apps/", "/site-packages/", "/lib/python"):
+        if marker in filename:
+            filename = filename.rsplit(marker, 1)[1]
+            break
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{code.co_name}"
+
+
+def collapse_stack(frame):
+    """Frames from the root to `frame` joined by semicolons"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def pstats_text(profile, limit=60, sort="cumulative"):
+    """Top functions of a cProfile run as text"""
+    stream = io.StringIO()
+    stats = pstats.Stats(profile, stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+def get_secret():
+    from frappe.utils.password import get_encryption_key
+
+    return (frappe.conf.get("pim_profiler_secret") or get_encryption_key()).encode()
+
+
+def sign_token(user, expires, secret):
+    """Token authorizing profiling until `expires` (unix time) on behalf of user"""
+    payload = f"{user}|{int(expires)}"
+    signature = hmac.new(secret, payload.encode(), hashlib.sha256).hexdigest()
+    return f"{payload}|{signature}"
+
+
+def verify_token(token, secret, at=None):
+    """
+    Check a profile token
+
+    Returns:
+        str: the user who minted it, or None if it is invalid or expired
+    """
+    try:
+        user, expires, signature = (token or "").rsplit("|", 2)
+        expires = int(expires)
+    except ValueError:
+        return None
+
+    expected = sign_token(user, expires, secret).rsplit("|", 1)[1]
+    if not hmac.compare_digest(signature, expected):
+        return None
+    if expires < (at or time.time()):
+        return None
+    return user
+
+
+def create_token(expires_in=3600):
+    """Mint a profile token for the session user, who must be a System Manager"""
+    frappe.only_for("System Manager")
+    expires_in = min(max(cint(expires_in), 60), MAX_TOKEN_SECONDS)
+    return sign_token(frappe.session.user, time.time() + expires_in, get_secret())
+
+
+def get_requested_mode():
+    """Profiler mode requested for the current request, or None"""
+    request = frappe.local.request
+    header = request.headers.get(PROFILE_HEADER)
+
+    if header:
+        authorized_by = verify_token(header, get_secret())
+        if not authorized_by:
+            return None, None
+        mode = request.headers.get(MODE_HEADER) or "sample"
+        return (mode if mode in MODES else "sample"), authorized_by
+
+    flag = frappe.conf.get("pim_profiler")
+    # the session cookie is resolved before before_request hooks run; other
+    # users, guests included, must not pay for a profiler
+    if flag and "System Manager" in frappe.get_roles():
+        return (flag if flag in MODES else "sample"), None
+
+    return None, None
+
+
+class RequestProfile:
+    """Profiler state of one request"""
+
+    def __init__(self, method, mode, authorized_by=None):
+        self.method = method
+        self.mode = mode
+        self.authorized_by = authorized_by
+        self.started = time.perf_counter()
+        self.profiler = None
+
+    def start(self):
+        if self.mode == "cprofile":
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            interval = flt(frappe.conf.get("pim_profiler_interval")) or DEFAULT_INTERVAL
+            self.profiler = SamplingProfiler(interval=interval).start()
+        return self
+
+    def stop(self):
+        if self.mode == "cprofile":
+            self.profiler.disable()
+        else:
+            self.profiler.stop()
+        return time.perf_counter() - self.started
+
+    def is_authorized(self):
+        return bool(self.authorized_by) or "System Manager" in frappe.get_roles()
+
+
+def start_request():
+    """before_request hook: start profiling if the request asked for it"""
+    method = get_request_method()
+    if not method:
+        return
+
+    mode, authorized_by = get_requested_mode()
+    if mode:
+        frappe.local.pim_request_profile = RequestProfile(method, mode, authorized_by).start()
+
+
+def end_request(response=None, request=None):
+    """after_request hook: stop profiling and store the profile"""
+    profile = getattr(frappe.local, "pim_request_profile", None)
+    if not profile:
+        return
+
+    frappe.local.pim_request_profile = None
+    duration = profile.stop()
+
+    if not profile.is_authorized():
+        return
+
+    try:
+        profile_id = store_profile(profile, duration, getattr(response, "status_code", None))
+        if response is not None:
+            response.headers[PROFILE_ID_HEADER] = profile_id
+    except Exception:
+        frappe.logger("imperium_pim").warning(f"Could not store profile of {profile.method}", exc_info=True)
+
+
+def store_profile(profile, duration, status_code=None):
+    """Save a finished profile and trim the list to the configured size"""
+    profile_id = frappe.generate_hash(length=12)
+    record = {
+        "id": profile_id,
+        "method": profile.method,
+        "mode": profile.mode,
+        "user": frappe.session.user,
+        "authorized_by": profile.authorized_by or frappe.session.user,
+        "timestamp": now(),
+        "duration_ms": round(duration * 1000, 2),
+        "status_code": status_code
+    }
+
+    if profile.mode == "cprofile":
+        record["text"] = pstats_text(profile.profiler)
+        profile.profiler.create_stats()
+        record["pstats"] = base64.b64encode(marshal.dumps(profile.profiler.stats)).decode()
+    else:
+        record["samples"] = profile.profiler.samples
+        record["interval"] = profile.profiler.interval
+        record["collapsed"] = profile.profiler.collapsed()
+
+    keep = cint(frappe.conf.get("pim_profiler_keep")) or DEFAULT_KEEP
+    cache = frappe.cache()
+    list_key = cache.make_key(PROFILES_KEY)
+
+    pipe = cache.pipeline(transaction=False)
+    pipe.set(cache.make_key(PROFILE_KEY.format(profile_id)), json.dumps(record), ex=PROFILE_TTL)
+    pipe.lpush(list_key, profile_id)
+    pipe.lrange(list_key, keep, -1)
+    pipe.ltrim(list_key, 0, keep - 1)
+    dropped = pipe.execute()[2]
+
+    if dropped:
+        cache.delete(*[
+            cache.make_key(PROFILE_KEY.format(old.decode() if isinstance(old, bytes) else old))
+            for old in dropped
+        ])
+    return profile_id
+
+
+def get_profile(profile_id):
+    cache = frappe.cache()
+    data = cache.get(cache.make_key(PROFILE_KEY.format(profile_id)))
+    return json.loads(data) if data else None
+
+
+def list_profiles(limit=DEFAULT_KEEP):
+    """Metadata of the most recent profiles, newest first"""
+    cache = frappe.cache()
+    ids = [
+        profile_id.decode() if isinstance(profile_id, bytes) else profile_id
+        for profile_id in cache.lrange(cache.make_key(PROFILES_KEY), 0, cint(limit) - 1)
+    ]
+    if not ids:
+        return []
+
+    profiles = []
+    for data in cache.mget([cache.make_key(PROFILE_KEY.format(profile_id)) for profile_id in ids]):
+        if not data:
+            continue
+        record = json.loads(data)
+        for field in ("text", "pstats", "collapsed"):
+            record.pop(field, None)
+        profiles.append(record)
+    return profiles
+
+
+def clear_profiles():
+    cache = frappe.cache()
+    list_key = cache.make_key(PROFILES_KEY)
+    keys = [
+        cache.make_key(PROFILE_KEY.format(profile_id.decode() if isinstance(profile_id, bytes) else profile_id))
+        for profile_id in cache.lrange(list_key, 0, -1)
+    ]
+    cache.delete(list_key, *keys)
@@ -0,0 +1,180 @@
+"""
+N+1 query detection
+
+QueryLog captures every statement sent through frappe.db.sql and groups them
+by normalized shape: literals and placeholders become `?` and IN / VALUES
+lists collapse, so the same query issued once per row of a loop shows up as
+one shape with a high count.
+
+In tests:
+
+    with assert_max_queries(2):
+        get_item_list(limit=50)
+
+    with assert_no_repeated_queries():
+        get_attribute_list()
+
+In development, set `"pim_query_log": 1` in site_config.json and every
+imperium_pim.* request is captured by the metrics hooks. Requests repeating a
+shape at least `pim_query_log_threshold` times (default REPEAT_THRESHOLD) are
+logged to the imperium_pim logger and kept in a short Redis list, readable
+through api.metrics.get_query_log. Captured requests also get an
+X-PIM-Query-Count response header.
+"""
+
+import json
+import re
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import now
+
+from imperium_pim.performance.db_tracer import QueryTracer
+
+# A shape issued this many times in one request or block is flagged
+REPEAT_THRESHOLD = 5
+
+QUERY_LOG_KEY = "imperium_pim:query_log"
+
+# Flagged requests kept in Redis
+QUERY_LOG_SIZE = 100
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+_NUMBER = re.compile(r"(?<![\w`\"])-?\d+(?:\.\d+)?(?![\w`\"])")
+_WHITESPACE = re.compile(r"\s+")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+
+
+def normalize_query(query):
+    """
+    Reduce a statement to its shape
+
+    >>> normalize_query("select * from `tabPIM Item` where name in ('A', 'B') limit 20")
+    'select * from `tabPIM Item` where name in (...) limit ?'
+    """
+    shape = _STRING.sub("?", str(query))
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _WHITESPACE.sub(" ", shape).strip()
+    shape = _LIST.sub("(...)", shape)
+    return _ROWS.sub("(...)", shape)
+
+
+class QueryLog(QueryTracer):
+    """
+    QueryTracer that keeps every statement and groups them by shape
+
+    Args:
+        db: Frappe database connection, defaults to frappe.db
+    """
+
+    def __init__(self, db=None):
+        super().__init__(db, capture=True)
+
+    def shapes(self):
+        """
+        Statements grouped by shape, most frequent first
+
+        Returns:
+            list: dicts with shape, count, seconds and an example statement
+        """
+        groups = {}
+        for query, _values, seconds in self.queries:
+            shape = normalize_query(query)
+            group = groups.get(shape)
+            if group is None:
+                group = groups[shape] = {"shape": shape, "count": 0, "seconds": 0.0, "example": query}
+            group["count"] += 1
+            group["seconds"] += seconds
+
+        return sorted(groups.values(), key=lambda group: (-group["count"], -group["seconds"]))
+
+    def repeated(self, threshold=REPEAT_THRESHOLD):
+        """Shapes issued at least `threshold` times"""
+        return [group for group in self.shapes() if group["count"] >= threshold]
+
+    def report(self, limit=10):
+        """Human readable summary for assertion messages and logs"""
+        lines = [f"{self.count} queries in {self.duration * 1000:.1f} ms"]
+        for group in self.shapes()[:limit]:
+            lines.append(f"  {group['count']:>4} x {group['seconds'] * 1000:8.1f} ms  {group['shape'][:200]}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def assert_max_queries(limit, db=None):
+    """Fail if the block issues more than `limit` queries"""
+    with QueryLog(db) as log:
+        yield log
+
+    if log.count > limit:
+        raise AssertionError(f"Expected at most {limit} queries, got {log.count}\n{log.report()}")
+
+
+@contextmanager
+def assert_no_repeated_queries(threshold=REPEAT_THRESHOLD, db=None):
+    """Fail if the block issues any query shape `threshold` times or more"""
+    with QueryLog(db) as log:
+        yield log
+
+    repeated = log.repeated(threshold)
+    if repeated:
+        shapes = "\n".join(f"  {group['count']} x {group['shape'][:200]}" for group in repeated)
+        raise AssertionError(f"Repeated query shapes (N+1):\n{shapes}\n{log.report()}")
+
+
+def is_enabled():
+    """Whether request capture is switched on in site config"""
+    return bool(frappe.conf.get("pim_query_log"))
+
+
+def get_threshold():
+    return int(frappe.conf.get("pim_query_log_threshold") or REPEAT_THRESHOLD)
+
+
+def flag_request(method, log, response=None):
+    """
+    Inspect the queries of a finished request
+
+    Requests with repeated shapes are logged and pushed to the Redis query
+    log. Returns the flagged entry or None.
+    """
+    if response is not None:
+        response.headers["X-PIM-Query-Count"] = str(log.count)
+
+    repeated = log.repeated(get_threshold())
+    if not repeated:
+        return None
+
+    entry = {
+        "method": method,
+        "timestamp": now(),
+        "queries": log.count,
+        "db_ms": round(log.duration * 1000, 2),
+        "repeated": [
+            {"shape": group["shape"], "count": group["count"], "ms": round(group["seconds"] * 1000, 2)}
+            for group in repeated
+        ]
+    }
+    frappe.logger("imperium_pim").warning(f"Repeated queries in {method}:\n{log.report()}")
+
+    cache = frappe.cache()
+    key = cache.make_key(QUERY_LOG_KEY)
+    pipe = cache.pipeline(transaction=False)
+    pipe.lpush(key, json.dumps(entry))
+    pipe.ltrim(key, 0, QUERY_LOG_SIZE - 1)
+    pipe.execute()
+    return entry
+
+
+def get_flagged_requests(limit=QUERY_LOG_SIZE):
+    """Most recently flagged requests first"""
+    cache = frappe.cache()
+    return [json.loads(entry) for entry in cache.lrange(cache.make_key(QUERY_LOG_KEY), 0, int(limit) - 1)]
+
+
+def clear_flagged_requests():
+    cache = frappe.cache()
+    cache.delete(cache.make_key(QUERY_LOG_KEY))
@@ -0,0 +1,97 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+from imperium_pim.performance import cache
+
+
+class MemoryCache:
+    """The few Redis calls get_cached makes, kept in a dict"""
+
+    def __init__(self):
+        self.values = {}
+
+    def make_key(self, key):
+        return key
+
+    def get_value(self, key, expires=False):
+        return self.values.get(key)
+
+    def set_value(self, key, value, expires_in_sec=None):
+        self.values[key] = value
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def eval(self, script, numkeys, key, token):
+        if self.values.get(key) == token:
+            del self.values[key]
+
+
+class TestGetCached(unittest.TestCase):
+    def setUp(self):
+        self.cache = MemoryCache()
+        patcher = patch.object(frappe, "cache", lambda: self.cache, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        hash_patcher = patch.object(frappe, "generate_hash", lambda length=10: "token", create=True)
+        hash_patcher.start()
+        self.addCleanup(hash_patcher.stop)
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return f"value {self.calls}"
+
+    def test_computes_once_while_fresh(self):
+        self.assertEqual(cache.get_cached("stats", self.compute), "value 1")
+        self.assertEqual(cache.get_cached("stats", self.compute), "value 1")
+        self.assertEqual(self.calls, 1)
+        # the lock is released after computing
+        self.assertNotIn(cache.LOCK_KEY.format(name="stats"), self.cache.values)
+
+    def test_stale_value_served_while_another_worker_revalidates(self):
+        cache.get_cached("stats", self.compute)
+        cache.invalidate_cache()
+        self.cache.set(cache.LOCK_KEY.format(name="stats"), "other worker")
+
+        self.assertEqual(cache.get_cached("stats", self.compute), "value 1")
+        self.assertEqual(self.calls, 1)
+
+    def test_lock_holder_revalidates_stale_value(self):
+        cache.get_cached("stats", self.compute, ttl=-1)
+
+        self.assertEqual(cache.get_cached("stats", self.compute), "value 2")
+
+    def test_waits_for_the_lock_holder_on_a_miss(self):
+        self.cache.set(cache.LOCK_KEY.format(name="stats"), "other worker")
+        version = cache.get_cache_version()
+
+        def store_entry(seconds):
+            # the other worker finishes while this one waits
+            self.cache.set_value(cache.CACHE_KEY.format(name="stats"), {
+                "value": "shared", "version": version, "fresh_until": float("inf")
+            })
+
+        with patch.object(cache.time, "sleep", store_entry):
+            self.assertEqual(cache.get_cached("stats", self.compute), "shared")
+        self.assertEqual(self.calls, 0)
+
+    def test_computes_itself_when_the_lock_holder_is_gone(self):
+        self.cache.set(cache.LOCK_KEY.format(name="stats"), "other worker")
+
+        with patch.object(cache, "LOCK_WAIT", 0):
+            self.assertEqual(cache.get_cached("stats", self.compute), "value 1")
+
+    def test_cache_names_depend_on_arguments_and_user(self):
+        name = cache.get_cache_name("item_list", 50, {"status": "Current"}, user="Guest")
+
+        self.assertEqual(name, cache.get_cache_name("item_list", 50, {"status": "Current"}, user="Guest"))
+        self.assertNotEqual(name, cache.get_cache_name("item_list", 20, {"status": "Current"}, user="Guest"))
+        self.assertNotEqual(name, cache.get_cache_name("item_list", 50, {"status": "Current"}, user="Administrator"))
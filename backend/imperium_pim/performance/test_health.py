@@ -0,0 +1,34 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from imperium_pim.performance.health import get_job_age, overall_status, time_round_trips
+
+
+class TestHealth(unittest.TestCase):
+    def test_overall_status(self):
+        self.assertEqual(overall_status({"database": {"status": "ok"}, "redis": {"status": "ok"}}), "healthy")
+        self.assertEqual(
+            overall_status({"database": {"status": "ok"}, "redis": {"status": "ok"}, "queues": {"status": "degraded"}}),
+            "degraded"
+        )
+        self.assertEqual(
+            overall_status({"database": {"status": "ok"}, "redis": {"status": "down"}, "queues": {"status": "degraded"}}),
+            "unhealthy"
+        )
+
+    def test_job_age_handles_naive_utc(self):
+        """RQ may store naive UTC datetimes"""
+        enqueued = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=90)
+        self.assertAlmostEqual(get_job_age(SimpleNamespace(enqueued_at=enqueued)), 90, delta=2)
+        self.assertIsNone(get_job_age(SimpleNamespace(enqueued_at=None)))
+
+    def test_time_round_trips(self):
+        calls = []
+        median, worst = time_round_trips(lambda: calls.append(1), samples=5)
+
+        self.assertEqual(len(calls), 5)
+        self.assertLessEqual(median, worst)
@@ -0,0 +1,74 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import unittest
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from imperium_pim.benchmarks import seed
+from imperium_pim.performance.indexes import (
+    APP_QUERIES,
+    COMPOSITE_INDEXES,
+    add_composite_indexes,
+    explain,
+    find_plan_problems,
+    get_query_sql
+)
+
+# Enough rows that the optimizer prefers indexes over scanning the table
+SEED_SIZE = {
+    "vendors": 4,
+    "items": 4000,
+    "attributes": 50,
+    "values_per_attribute": 6,
+    "vendor_attributes_per_vendor": 25,
+    "vendor_attribute_values": 400
+}
+
+
+class TestCompositeIndexes(FrappeTestCase):
+    """Every app list query must be served by an index, without filesort"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if frappe.db.db_type != "mariadb":
+            # the Postgres planner prefers sequential scans on test-sized tables
+            raise unittest.SkipTest("EXPLAIN checks target MariaDB plans")
+
+        seed.cleanup()
+        seed.seed(size="small", **SEED_SIZE)
+        add_composite_indexes()
+        for doctype in COMPOSITE_INDEXES:
+            frappe.db.sql(f"ANALYZE TABLE `tab{doctype}`")
+
+        cls.placeholders = {
+            "vendor": seed.vendor_code(1),
+            "attribute": seed.attribute_code(1),
+            "item": f"{seed.vendor_code(1)}-{0:07d}",
+            "brand": frappe.db.get_value("PIM Item", {"vendor_code": seed.vendor_code(1)}, "brand")
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        seed.cleanup()
+        super().tearDownClass()
+
+    def test_indexes_exist(self):
+        for doctype, indexes in COMPOSITE_INDEXES.items():
+            for index_name, _columns in indexes:
+                self.assertTrue(frappe.db.has_index(f"tab{doctype}", index_name), f"{doctype}: {index_name}")
+
+    def test_app_queries_use_indexes(self):
+        for label, doctype, kwargs in APP_QUERIES:
+            with self.subTest(label):
+                query = get_query_sql(doctype, kwargs, self.placeholders)
+                plan = explain(query)
+                self.assertEqual(find_plan_problems(plan), [], f"{label}\n{query}\n{plan}")
+
+    def test_find_plan_problems(self):
+        plan = [
+            {"table": "tabPIM Item", "type": "ALL", "Extra": "Using where; Using filesort"},
+            {"table": "tabPIM Vendor", "type": "ref", "Extra": "Using index"}
+        ]
+        self.assertEqual(find_plan_problems(plan), ["full scan of tabPIM Item", "filesort on tabPIM Item"])
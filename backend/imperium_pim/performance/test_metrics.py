@@ -0,0 +1,99 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import unittest
+
+from imperium_pim.performance.db_tracer import QueryTracer
+from imperium_pim.performance.metrics import (
+    LATENCY_BUCKETS,
+    bucket_label,
+    estimate_quantile,
+    render_prometheus,
+    summarize
+)
+
+
+class FakeDatabase:
+    def sql(self, query, values=(), *args, **kwargs):
+        return [(query,)]
+
+
+def make_stats(latencies, queries_per_request):
+    stats = {
+        "count": len(latencies),
+        "duration": sum(latencies),
+        "queries": sum(queries_per_request),
+        "db_duration": sum(latencies) / 2,
+        "status": {"2xx": len(latencies) - 1, "5xx": 1},
+        "latency": {},
+        "query_counts": {}
+    }
+    for latency, queries in zip(latencies, queries_per_request):
+        label = bucket_label(latency, LATENCY_BUCKETS)
+        stats["latency"][label] = stats["latency"].get(label, 0) + 1
+        label = bucket_label(queries, (1, 2, 5, 10, 25, 50, 100, 250, 500))
+        stats["query_counts"][label] = stats["query_counts"].get(label, 0) + 1
+    return stats
+
+
+class TestQueryTracer(unittest.TestCase):
+    def test_counts_queries_and_restores(self):
+        """Queries are counted while active and sql is restored afterwards"""
+        db = FakeDatabase()
+        with QueryTracer(db, capture=True) as tracer:
+            db.sql("SELECT 1")
+            db.sql("SELECT 2", (1,))
+
+        db.sql("SELECT 3")
+        self.assertEqual(tracer.count, 2)
+        self.assertEqual([query for query, _, _ in tracer.queries], ["SELECT 1", "SELECT 2"])
+        self.assertNotIn("sql", db.__dict__)
+
+    def test_nested_tracers(self):
+        """An inner tracer's queries are seen by the outer one too"""
+        db = FakeDatabase()
+        with QueryTracer(db) as outer:
+            db.sql("SELECT 1")
+            with QueryTracer(db) as inner:
+                db.sql("SELECT 2")
+            db.sql("SELECT 3")
+
+        self.assertEqual((outer.count, inner.count), (3, 1))
+        self.assertNotIn("sql", db.__dict__)
+
+
+class TestMetrics(unittest.TestCase):
+    def test_bucket_label(self):
+        self.assertEqual(bucket_label(0.003, LATENCY_BUCKETS), "0.005")
+        self.assertEqual(bucket_label(0.7, LATENCY_BUCKETS), "1")
+        self.assertEqual(bucket_label(60, LATENCY_BUCKETS), "+Inf")
+
+    def test_estimate_quantile(self):
+        """Quantiles interpolate inside the bucket that holds them"""
+        counts = {"0.01": 50, "0.1": 50}
+        self.assertAlmostEqual(estimate_quantile(counts, LATENCY_BUCKETS, 0.5), 0.01)
+        self.assertAlmostEqual(estimate_quantile(counts, LATENCY_BUCKETS, 0.75), 0.075, places=6)
+        self.assertEqual(estimate_quantile({"+Inf": 3}, LATENCY_BUCKETS, 0.99), 10.0)
+        self.assertEqual(estimate_quantile({}, LATENCY_BUCKETS, 0.5), 0.0)
+
+    def test_summarize_sorts_slowest_first(self):
+        stats = {
+            "imperium_pim.api.items.get_item_list": make_stats([0.02] * 10, [3] * 10),
+            "imperium_pim.api.attributes.get_attribute_list": make_stats([0.3] * 10, [40] * 10)
+        }
+        rows = summarize(stats)
+
+        self.assertEqual(rows[0]["method"], "imperium_pim.api.attributes.get_attribute_list")
+        self.assertEqual(rows[0]["avg_queries"], 40)
+        self.assertEqual(rows[0]["errors"], 1)
+        self.assertEqual(rows[1]["avg_ms"], 20.0)
+
+    def test_render_prometheus(self):
+        """Histogram buckets are cumulative and end with +Inf == count"""
+        text = render_prometheus({"imperium_pim.api.ping.ping": make_stats([0.004, 0.02, 0.02], [1, 1, 3])})
+
+        self.assertIn('imperium_pim_request_duration_seconds_bucket{method="imperium_pim.api.ping.ping",le="0.005"} 1', text)
+        self.assertIn('imperium_pim_request_duration_seconds_bucket{method="imperium_pim.api.ping.ping",le="0.025"} 3', text)
+        self.assertIn('imperium_pim_request_duration_seconds_bucket{method="imperium_pim.api.ping.ping",le="+Inf"} 3', text)
+        self.assertIn('imperium_pim_request_queries_sum{method="imperium_pim.api.ping.ping"} 5', text)
+        self.assertIn('imperium_pim_requests_total{method="imperium_pim.api.ping.ping",status="5xx"} 1', text)
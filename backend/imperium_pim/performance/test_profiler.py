@@ -0,0 +1,47 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import time
+import unittest
+
+from imperium_pim.performance.profiler import SamplingProfiler, sign_token, verify_token
+
+
+def busy_leaf(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def busy_parent(seconds):
+    busy_leaf(seconds)
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_samples_request_thread(self):
+        """Samples of the profiled thread end in the function doing the work"""
+        with SamplingProfiler(interval=0.001) as profiler:
+            busy_parent(0.1)
+
+        self.assertGreater(profiler.samples, 10)
+        top_stack = profiler.collapsed().splitlines()[0]
+        self.assertIn("test_profiler.py:busy_parent;test_profiler.py:busy_leaf", top_stack)
+        self.assertTrue(top_stack.rsplit(" ", 1)[1].isdigit())
+
+
+class TestProfileToken(unittest.TestCase):
+    secret = b"site-secret"
+
+    def test_valid_token(self):
+        token = sign_token("admin@example.com", time.time() + 60, self.secret)
+        self.assertEqual(verify_token(token, self.secret), "admin@example.com")
+
+    def test_rejects_tampered_expired_and_foreign_tokens(self):
+        token = sign_token("admin@example.com", time.time() + 60, self.secret)
+        user, expires, signature = token.split("|")
+
+        self.assertIsNone(verify_token(f"guest@example.com|{expires}|{signature}", self.secret))
+        self.assertIsNone(verify_token(token, b"other-site"))
+        self.assertIsNone(verify_token(token, self.secret, at=int(expires) + 1))
+        self.assertIsNone(verify_token("garbage", self.secret))
+        self.assertIsNone(verify_token(None, self.secret))
@@ -0,0 +1,77 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from imperium_pim.api.attributes import get_attribute_list
+from imperium_pim.api.items import compute_item_list
+from imperium_pim.performance.query_log import assert_max_queries, assert_no_repeated_queries
+
+
+class TestAPIQueryCounts(FrappeTestCase):
+    """List endpoints must issue a fixed number of queries, whatever the page size"""
+
+    def setUp(self):
+        """Set up test data"""
+        if not frappe.db.exists("PIM Vendor", "QCOUNT"):
+            frappe.get_doc({
+                "doctype": "PIM Vendor",
+                "vendor_name": "Query Count Vendor",
+                "vendor_code": "QCOUNT",
+                "vendor_active": 1
+            }).insert(ignore_permissions=True)
+
+        for i in range(12):
+            if not frappe.db.exists("PIM Item", f"QCOUNT-{i}"):
+                frappe.get_doc({
+                    "doctype": "PIM Item",
+                    "name1": f"Query Count Item {i}",
+                    "vendor_code": "QCOUNT",
+                    "vendor_sku": str(i),
+                    "status": "New",
+                    "item_type": "Item"
+                }).insert(ignore_permissions=True)
+
+        for i in range(8):
+            code = f"qcount-attr-{i}"
+            if not frappe.db.exists("PIM Attribute", code):
+                frappe.get_doc({
+                    "doctype": "PIM Attribute",
+                    "attribute_code": code,
+                    "attribute_name": f"Query Count Attribute {i}",
+                    "attribute_type": "Select"
+                }).insert(ignore_permissions=True)
+                frappe.get_doc({
+                    "doctype": "PIM Attribute Value",
+                    "pim_attribute": code,
+                    "attribute_value_name": "Value"
+                }).insert(ignore_permissions=True)
+
+        # warm metadata and permission caches so only the endpoint's own queries count
+        compute_item_list(limit=1)
+        get_attribute_list(limit=1)
+
+    def tearDown(self):
+        """Clean up test data"""
+        frappe.db.delete("PIM Attribute Value", {"pim_attribute": ["like", "qcount-attr-%"]})
+        frappe.db.delete("PIM Attribute", {"attribute_code": ["like", "qcount-attr-%"]})
+        frappe.db.delete("PIM Item", {"vendor_code": "QCOUNT"})
+        frappe.db.delete("PIM Vendor", {"vendor_code": "QCOUNT"})
+        frappe.db.commit()
+
+    def test_item_list_query_count(self):
+        """Item list pages take at most 2 queries regardless of page size"""
+        # get_item_list would answer from performance.cache, so the page is computed directly
+        for limit in (2, 10):
+            with assert_max_queries(2):
+                items = compute_item_list(limit=limit)
+            self.assertEqual(len(items), limit)
+
+    def test_attribute_list_has_no_n_plus_one(self):
+        """Value counts are loaded for the whole page at once"""
+        with assert_no_repeated_queries(threshold=3), assert_max_queries(3):
+            attributes = get_attribute_list(limit=8)
+
+        counts = {attr["id"]: attr["values_count"] for attr in attributes if attr["id"].startswith("qcount-attr-")}
+        self.assertTrue(counts)
+        self.assertTrue(all(count == 1 for count in counts.values()))
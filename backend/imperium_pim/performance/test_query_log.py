@@ -0,0 +1,82 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import unittest
+
+from imperium_pim.performance.query_log import (
+    QueryLog,
+    assert_max_queries,
+    assert_no_repeated_queries,
+    normalize_query
+)
+
+
+class FakeDatabase:
+    def sql(self, query, values=(), *args, **kwargs):
+        return []
+
+
+class TestNormalizeQuery(unittest.TestCase):
+    def test_literals_and_placeholders(self):
+        self.assertEqual(
+            normalize_query("select `name` from `tabPIM Item`\n where sku = 'ASH-1'  and qty > 10"),
+            "select `name` from `tabPIM Item` where sku = ? and qty > ?"
+        )
+        self.assertEqual(
+            normalize_query("select * from `tabPIM Item` where sku = %(sku)s or name = %s"),
+            "select * from `tabPIM Item` where sku = ? or name = ?"
+        )
+
+    def test_lists_collapse(self):
+        """IN lists and multi-row VALUES of any length share one shape"""
+        self.assertEqual(
+            normalize_query("select name from `tabPIM Item` where name in ('a', 'b', 'c')"),
+            normalize_query("select name from `tabPIM Item` where name in ('a')")
+        )
+        self.assertEqual(
+            normalize_query("insert into `tabX` (a, b) values (1, 'x'), (2, 'y'), (3, 'z')"),
+            "insert into `tabX` (a, b) values (...)"
+        )
+
+    def test_identifiers_with_digits_are_kept(self):
+        self.assertEqual(
+            normalize_query("select column_break_1 from `tab2Fa`"),
+            "select column_break_1 from `tab2Fa`"
+        )
+
+
+class TestQueryLog(unittest.TestCase):
+    def test_groups_repeated_shapes(self):
+        """A query issued per row is one shape with a high count"""
+        db = FakeDatabase()
+        with QueryLog(db) as log:
+            db.sql("select name from `tabPIM Attribute`")
+            for name in ("a", "b", "c", "d", "e"):
+                db.sql(f"select count(*) from `tabPIM Attribute Value` where pim_attribute = '{name}'")
+
+        shapes = log.shapes()
+        self.assertEqual(log.count, 6)
+        self.assertEqual(shapes[0]["count"], 5)
+        self.assertEqual(len(log.repeated(5)), 1)
+        self.assertEqual(log.repeated(6), [])
+
+    def test_assert_max_queries(self):
+        db = FakeDatabase()
+        with assert_max_queries(2, db=db):
+            db.sql("select 1")
+            db.sql("select 2")
+
+        with self.assertRaises(AssertionError) as context:
+            with assert_max_queries(1, db=db):
+                db.sql("select 1")
+                db.sql("select 2")
+        self.assertIn("got 2", str(context.exception))
+
+    def test_assert_no_repeated_queries(self):
+        db = FakeDatabase()
+        with self.assertRaises(AssertionError) as context:
+            with assert_no_repeated_queries(threshold=3, db=db):
+                for i in range(3):
+                    db.sql("select * from `tabPIM Item` where name = %s", (i,))
+
+        self.assertIn("3 x select * from `tabPIM Item` where name = ?", str(context.exception))
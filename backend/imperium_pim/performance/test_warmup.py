@@ -0,0 +1,39 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import time
+import unittest
+
+from imperium_pim.performance.warmup import run_steps
+
+
+class TestWarmup(unittest.TestCase):
+    def test_failing_step_does_not_stop_the_rest(self):
+        calls = []
+
+        def fail():
+            calls.append("fail")
+            raise RuntimeError("cold")
+
+        timings = run_steps((("fail", fail), ("ok", lambda: calls.append("ok"))), "test")
+
+        self.assertEqual(calls, ["fail", "ok"])
+        self.assertIsNone(timings["fail"])
+        self.assertGreaterEqual(timings["ok"], 0)
+
+    def test_no_step_starts_after_the_budget(self):
+        calls = []
+
+        def slow():
+            calls.append("slow")
+            time.sleep(0.02)
+
+        timings = run_steps(
+            (("slow", slow), ("late", lambda: calls.append("late"))),
+            "test",
+            budget=0.01,
+            heartbeat=lambda: calls.append("beat")
+        )
+
+        self.assertEqual(calls, ["beat", "slow"])
+        self.assertIsNone(timings["late"])
@@ -0,0 +1,182 @@
+"""
+Cache warm-up after migrate and on worker start
+
+After a deploy every cache starts cold: the shared endpoint cache
+(performance.cache) was cleared, each new web worker has no compiled vendor
+mapping tables, facet index or read model, and MariaDB's buffer pool does
+not hold the pages the first list queries need. The first requests pay for
+all of it.
+
+With `pim_cache_warmup` set in site config:
+
+    after_migrate     warm_shared(): dashboard stats and the first page of
+                      the hot list queries
+    worker start      warm_worker(): the same where not cached yet, then
+                      this worker's mapping tables, facet index, read model
+                      and the first page of the item list; gunicorn calls
+                      it from post_fork (backend/gunicorn.conf.py) before
+                      the worker takes requests, which also covers workers
+                      recycled by --max-requests
+
+Only values that do not depend on the user are cached for everyone. Lists
+that frappe.get_list filters by permission are cached per user, so warming
+them as Administrator only brings their pages into the buffer pool.
+
+Every step is timed and logged to the imperium_pim logger. A failing step
+is logged and skipped; warm-up never fails a migrate or a worker boot.
+Gunicorn kills a worker that does not report for --timeout seconds, so the
+worker start warm-up reports between steps and starts no step once its
+budget has passed; what it skipped is built by the first request needing it.
+"""
+
+import os
+import time
+
+import frappe
+
+# Lists the frontend opens first: (method, kwargs). The item list is warmed
+# per worker, once the facet index it pages from is built.
+HOT_LISTS = (
+    ("imperium_pim.api.dashboard.get_recent_items", {}),
+    ("imperium_pim.api.dashboard.get_recent_vendors", {}),
+    ("imperium_pim.api.vendors.get_vendor_list", {}),
+    ("imperium_pim.api.attributes.get_attribute_list", {})
+)
+
+
+def is_enabled():
+    return bool(frappe.conf.get("pim_cache_warmup"))
+
+
+def warm_dashboard_stats():
+    from imperium_pim.api.dashboard import compute_dashboard_stats
+    from imperium_pim.performance.cache import get_cached
+
+    get_cached("dashboard_stats", compute_dashboard_stats)
+
+
+def warm_hot_lists():
+    for method, kwargs in HOT_LISTS:
+        frappe.get_attr(method)(**kwargs)
+
+
+def warm_mapping_tables():
+    """Compile the attribute code maps of vendors that sync"""
+    from imperium_pim.vendor_sync.mapping import get_mapping_table
+
+    for vendor in frappe.get_all("PIM Vendor", filters={"vendor_integration_enabled": 1}, pluck="name"):
+        get_mapping_table(vendor)
+
+
+def warm_facet_index():
+    from imperium_pim.catalog.facets import get_facet_index
+
+    get_facet_index()
+
+
+def warm_read_model():
+    from imperium_pim.catalog.read_model import get_read_model
+
+    get_read_model()
+
+
+def warm_item_list():
+    from imperium_pim.api.items import get_item_list
+
+    get_item_list()
+
+
+SHARED_STEPS = (
+    ("dashboard_stats", warm_dashboard_stats),
+    ("hot_lists", warm_hot_lists)
+)
+
+WORKER_STEPS = (
+    ("mapping_tables", warm_mapping_tables),
+    ("facet_index", warm_facet_index),
+    ("read_model", warm_read_model),
+    ("item_list", warm_item_list)
+)
+
+
+def run_steps(steps, trigger, budget=None, heartbeat=None):
+    """
+    Run warm-up steps, logging the time each took
+
+    Args:
+        budget (float): seconds after which no further step is started
+        heartbeat (callable): called before each step, such as gunicorn's
+                              worker.notify
+
+    Returns:
+        dict: step -> milliseconds, or None for steps that failed or were
+              skipped
+    """
+    logger = frappe.logger("imperium_pim")
+    timings = {}
+    started = time.perf_counter()
+    for name, step in steps:
+        if budget is not None and time.perf_counter() - started >= budget:
+            timings[name] = None
+            logger.info(f"Warm-up ({trigger}) {name} skipped, budget of {budget} s used up")
+            continue
+        if heartbeat:
+            heartbeat()
+        step_started = time.perf_counter()
+        try:
+            step()
+            timings[name] = round((time.perf_counter() - step_started) * 1000, 1)
+            logger.info(f"Warm-up ({trigger}) {name} took {timings[name]} ms")
+        except Exception:
+            timings[name] = None
+            logger.warning(f"Warm-up ({trigger}) {name} failed", exc_info=True)
+    logger.info(f"Warm-up ({trigger}) finished in {round((time.perf_counter() - started) * 1000, 1)} ms")
+    return timings
+
+
+def warm_shared(trigger="manual"):
+    """Warm the caches shared by all workers"""
+    return run_steps(SHARED_STEPS, trigger)
+
+
+def warm_worker(trigger="manual", budget=None, heartbeat=None):
+    """Warm the shared caches and the current worker's in-memory structures"""
+    return run_steps(SHARED_STEPS + WORKER_STEPS, trigger, budget=budget, heartbeat=heartbeat)
+
+
+def after_migrate():
+    """
+    after_migrate hook; patches write around the controllers, so every
+    reader of items rebuilds and cached values are dropped first
+    """
+    from imperium_pim.catalog.changes import reset_item_changes
+
+    reset_item_changes()
+    if is_enabled():
+        warm_shared("migrate")
+
+
+def on_worker_start(site=None, sites_path=None, budget=None, heartbeat=None):
+    """
+    Warm a freshly started web worker; call from gunicorn's post_fork
+
+    Args:
+        site (str): site to warm, SITE_NAME from the environment by default
+        sites_path (str): sites directory, SITES_PATH from the environment
+                          by default, as frappe.app resolves it
+        budget (float): seconds after which no further step is started
+        heartbeat (callable): tells gunicorn the worker is alive
+    """
+    site = site or os.environ.get("SITE_NAME")
+    if not site:
+        return
+
+    frappe.init(site=site, sites_path=sites_path or os.environ.get("SITES_PATH", "."))
+    try:
+        frappe.connect()
+        if is_enabled():
+            warm_worker("worker start", budget=budget, heartbeat=heartbeat)
+    except Exception:
+        frappe.logger("imperium_pim").warning(f"Warm-up of {site} failed", exc_info=True)
+    finally:
+        frappe.destroy()
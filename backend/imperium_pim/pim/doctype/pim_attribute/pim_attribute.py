@@ -5,12 +5,28 @@ import frappe
 import re
 from frappe.model.document import Document
 
+from imperium_pim.catalog.realtime import record_changes
+from imperium_pim.performance.cache import invalidate_cache
+from imperium_pim.vendor_sync.mapping import invalidate_all_mapping_tables
+
 
 class PIMAttribute(Document):
 	def validate(self):
 		"""Validate the document before saving"""
 		self.validate_attribute_code()
 	
+	def on_update(self):
+		"""Attribute types drive value translation, so recompile every vendor's mapping table"""
+		invalidate_all_mapping_tables()
+		invalidate_cache()
+		record_changes("PIM Attribute", [self.name])
+	
+	def on_trash(self):
+		"""Drop compiled mapping tables that may reference this attribute"""
+		invalidate_all_mapping_tables()
+		invalidate_cache()
+		record_changes("PIM Attribute", [self.name])
+	
 	def validate_attribute_code(self):
 		"""
 		Validate that attribute_code follows the required format:
@@ -5,6 +5,8 @@ import frappe
 import re
 from frappe.model.document import Document
 
+from imperium_pim.catalog.realtime import record_changes
+
 
 class PIMAttributeValue(Document):
 	def before_insert(self):
@@ -17,6 +19,13 @@ class PIMAttributeValue(Document):
 		if not self.attribute_value_code and self.pim_attribute and self.attribute_value_name:
 			self.attribute_value_code = self.generate_attribute_value_code()
 	
+	def on_update(self):
+		"""Open attribute screens receive the new value over realtime"""
+		record_changes("PIM Attribute Value", [self.name])
+	
+	def on_trash(self):
+		record_changes("PIM Attribute Value", [self.name])
+	
 	def generate_attribute_value_code(self):
 		"""Generate attribute_value_code using format: {pim_attribute_code}-{slugified_attribute_value_name}"""
 		# Get the attribute_code from the linked PIM Attribute
@@ -5,12 +5,50 @@ import frappe
 from frappe.model.document import Document
 import re
 
+from imperium_pim.catalog.attributes import count_permitted_items, query_permitted_items, validate_assignments
+from imperium_pim.catalog.changes import record_item_changes
+from imperium_pim.catalog.codes import invalidate_missing_codes
+from imperium_pim.catalog.facets import query_page
+from imperium_pim.catalog.kits import CLOSURE_DOCTYPE, get_component_pairs, rebuild_closure, validate_components
+from imperium_pim.catalog.logistics import METRIC_FIELDS, get_box_filters, get_item_metrics
+from imperium_pim.catalog.permissions import has_unrestricted_read
+from imperium_pim.vendor_sync.hashing import clear_record_hashes
+
 
 class PIMItem(Document):
 	def before_save(self):
 		"""Generate SKU if not already set and validate fields"""
 		self.generate_sku()
 		self.validate_upc()
+		self.set_logistics_metrics()
+		self.validate_kit_components()
+		self.validate_item_attributes()
+	
+	def on_update(self):
+		"""New codes may answer lookups that were cached as missing; in-memory indexes re-read the item"""
+		record_item_changes([self.name])
+		
+		if any(self.has_value_changed(field) for field in ("upc", "vendor_sku")):
+			invalidate_missing_codes()
+		
+		previous = self.get_doc_before_save()
+		if get_component_pairs(self) != (get_component_pairs(previous) if previous else []):
+			rebuild_closure(self.name)
+	
+	def after_rename(self, old, new, merge=False):
+		invalidate_missing_codes()
+		record_item_changes([old, new])
+	
+	def on_trash(self):
+		"""Forget the vendor feed hash so the next sync can recreate the item, and drop kit closure rows"""
+		record_item_changes([self.name])
+		
+		if self.vendor_code and self.vendor_sku:
+			clear_record_hashes(self.vendor_code, self.vendor_sku)
+		
+		# kits containing this item block its deletion through kit_components,
+		# so only its own closure rows remain
+		frappe.db.delete(CLOSURE_DOCTYPE, {"ancestor": self.name})
 	
 	def generate_sku(self):
 		"""Auto-generate SKU using format: {vendor_code}-{vendor_sku}"""
@@ -32,18 +70,41 @@ class PIMItem(Document):
 			
 			# Update the field with cleaned value
 			self.upc = upc_clean
+	
+	def validate_kit_components(self):
+		"""Only kits have components, and a kit may not contain itself at any depth"""
+		components = get_component_pairs(self)
+		if not components:
+			return
+		
+		if self.item_type != "Kit":
+			frappe.throw(f"Only items of type Kit can have components, {self.name} is {self.item_type}")
+		
+		validate_components(self.name, components)
+	
+	def validate_item_attributes(self):
+		"""No repeated values, and one value per attribute unless it is multi-select"""
+		validate_assignments(self)
+	
+	def set_logistics_metrics(self):
+		"""Derive volume, dimensional weight, sorted sides and girth from the carton"""
+		self.update(get_item_metrics(self))
 
 
 @frappe.whitelist()
-def get_items(filters=None, fields=None, limit=None, offset=None):
+def get_items(filters=None, fields=None, limit=None, offset=None, fits_in_box=None, attributes=None):
 	"""
 	REST API endpoint to retrieve PIM Items with filtering capabilities
 	
 	Args:
-		filters (dict): Filter conditions for the query
+		filters (dict): Filter conditions for the query. Shipping metrics accept
+			range conditions, e.g. {"carton_dim_weight_lbs": ["<=", 70]}
 		fields (list): List of fields to return (default: all fields)
 		limit (int): Maximum number of records to return
 		offset (int): Number of records to skip
+		fits_in_box (str): Only items whose carton fits in a box, e.g. "24x18x12"
+		attributes (dict): Attribute filters, {attribute: value or [values]}; values
+			of one attribute are alternatives, all attributes must match
 	
 	Returns:
 		dict: Response containing items data and metadata
@@ -60,7 +121,7 @@ def get_items(filters=None, fields=None, limit=None, offset=None):
 		# Define allowed filter fields
 		allowed_filters = [
 			'sku', 'upc', 'name1', 'status', 'item_type', 
-			'vendor_code', 'vendor_sku', 'brand'
+			'vendor_code', 'vendor_sku', 'brand', *METRIC_FIELDS
 		]
 		
 		# Clean filters to only include allowed fields
@@ -69,13 +130,16 @@ def get_items(filters=None, fields=None, limit=None, offset=None):
 			if key in allowed_filters and value:
 				clean_filters[key] = value
 		
+		if fits_in_box:
+			clean_filters.update(get_box_filters(fits_in_box))
+		
 		# Define default fields to return (all fields)
 		if not fields:
 			fields = [
 				'name', 'sku', 'name1', 'brand', 'status', 'item_type', 'dropship',
 				'item_width_inches', 'item_depth_inches', 'item_height_inches',
 				'carton_width_inches', 'carton_depth_inches', 'carton_height_inches',
-				'item_weight_lbs', 'carton_weight_lbs', 'assembly_required',
+				'item_weight_lbs', 'carton_weight_lbs', *METRIC_FIELDS, 'assembly_required',
 				'upc', 'vendor_code', 'vendor_sku', 'creation', 'modified'
 			]
 		
@@ -84,17 +148,44 @@ def get_items(filters=None, fields=None, limit=None, offset=None):
 			limit = 100
 		
 		# Query the database
-		items = frappe.get_all(
-			"PIM Item",
-			filters=clean_filters,
-			fields=fields,
-			limit=limit,
-			start=offset or 0,
-			order_by="modified desc"
-		)
-		
-		# Get total count for pagination
-		total_count = frappe.db.count("PIM Item", filters=clean_filters)
+		if attributes:
+			items = query_permitted_items(
+				filters=clean_filters,
+				attributes=attributes,
+				fields=fields,
+				limit=limit,
+				offset=offset or 0,
+				order_by="modified desc"
+			)
+			total_count = count_permitted_items(filters=clean_filters, attributes=attributes)
+		else:
+			# Facet-only filters are answered by the in-memory bitmap index, for
+			# users whose rows get_list would not filter (see catalog.permissions)
+			unrestricted = has_unrestricted_read("PIM Item")
+			page = query_page(clean_filters, fields, limit=limit, offset=offset) if unrestricted else None
+			if page is not None:
+				items, total_count = page
+			else:
+				items = frappe.get_list(
+					"PIM Item",
+					filters=clean_filters,
+					fields=fields,
+					limit=limit,
+					start=offset or 0,
+					order_by="modified desc"
+				)
+				
+				# Get total count for pagination
+				if unrestricted:
+					total_count = frappe.db.count("PIM Item", filters=clean_filters)
+				else:
+					# counted in the database with the same permission conditions as the page
+					total_count = frappe.get_list(
+						"PIM Item",
+						filters=clean_filters,
+						fields=["count(name) as total"],
+						limit_page_length=0
+					)[0].total
 		
 		return {
 			"success": True,
@@ -102,6 +193,7 @@ def get_items(filters=None, fields=None, limit=None, offset=None):
 			"total_count": total_count,
 			"returned_count": len(items),
 			"filters_applied": clean_filters,
+			"attributes_applied": attributes or {},
 			"limit": limit,
 			"offset": offset or 0
 		}
@@ -305,6 +305,50 @@ class TestPIMItem(FrappeTestCase):
 		result = get_vendor_info("NON_EXISTING")
 		self.assertFalse(result["success"])
 		self.assertIn("not found", result["message"])
+	
+	def test_get_items_applies_user_permissions(self):
+		"""Facet filters of a user restricted to another vendor do not go through the index"""
+		frappe.get_doc({
+			"doctype": "PIM Item",
+			"name1": "Restricted Item",
+			"vendor_code": "TEST_VENDOR",
+			"vendor_sku": "RESTRICTED001",
+			"status": "New"
+		}).insert(ignore_permissions=True)
+		if not frappe.db.exists("PIM Vendor", "OTHER_VENDOR"):
+			frappe.get_doc({
+				"doctype": "PIM Vendor",
+				"vendor_name": "Other Vendor",
+				"vendor_code": "OTHER_VENDOR",
+				"vendor_active": 1
+			}).insert(ignore_permissions=True)
+		
+		user = "item-restricted@example.com"
+		if not frappe.db.exists("User", user):
+			frappe.get_doc({
+				"doctype": "User",
+				"email": user,
+				"first_name": "Restricted",
+				"send_welcome_email": 0,
+				"roles": [{"role": "System Manager"}]
+			}).insert(ignore_permissions=True)
+		frappe.get_doc({
+			"doctype": "User Permission",
+			"user": user,
+			"allow": "PIM Vendor",
+			"for_value": "OTHER_VENDOR"
+		}).insert(ignore_permissions=True)
+		
+		frappe.set_user(user)
+		try:
+			response = get_items(filters={"vendor_code": "TEST_VENDOR"})
+			self.assertTrue(response["success"])
+			self.assertEqual(response["data"], [])
+			self.assertEqual(response["total_count"], 0)
+		finally:
+			frappe.set_user("Administrator")
+			frappe.db.delete("User Permission", {"user": user})
+			frappe.db.delete("PIM Vendor", {"vendor_code": "OTHER_VENDOR"})
 
 
 if __name__ == '__main__':
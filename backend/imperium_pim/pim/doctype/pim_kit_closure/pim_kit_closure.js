@@ -0,0 +1,8 @@
+// Copyright (c) 2025, Imperium Systems & Consulting and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("PIM Kit Closure", {
+// 	refresh(frm) {
+
+// 	},
+// });
@@ -0,0 +1,85 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from imperium_pim.catalog.kits import get_components, get_containing_kits, rebuild_all
+
+
+def closure_of(kit):
+	return {row.component: (row.depth, row.quantity) for row in get_components(kit)}
+
+
+class TestPIMKitClosure(FrappeTestCase):
+	def setUp(self):
+		"""Set up test data: a desk kit made of a drawer kit and loose parts"""
+		if not frappe.db.exists("PIM Vendor", "KITV"):
+			frappe.get_doc({
+				"doctype": "PIM Vendor",
+				"vendor_name": "Kit Test Vendor",
+				"vendor_code": "KITV",
+				"vendor_active": 1
+			}).insert(ignore_permissions=True)
+		
+		for vendor_sku in ("SCREW", "HANDLE", "PANEL"):
+			self.make_item(vendor_sku, "Component")
+		
+		self.drawer = self.make_item("DRAWER", "Kit", [("KITV-SCREW", 4), ("KITV-HANDLE", 1), ("KITV-PANEL", 5)])
+		self.desk = self.make_item("DESK", "Kit", [("KITV-DRAWER", 2), ("KITV-SCREW", 8)])
+	
+	def tearDown(self):
+		"""Clean up test data"""
+		for vendor_sku in ("DESK", "DRAWER", "SCREW", "HANDLE", "PANEL"):
+			if frappe.db.exists("PIM Item", f"KITV-{vendor_sku}"):
+				frappe.delete_doc("PIM Item", f"KITV-{vendor_sku}", ignore_permissions=True, force=True)
+		frappe.db.delete("PIM Kit Closure", {"ancestor": ["like", "KITV-%"]})
+		frappe.db.delete("PIM Vendor", {"vendor_code": "KITV"})
+		frappe.db.commit()
+	
+	def make_item(self, vendor_sku, item_type, components=None):
+		return frappe.get_doc({
+			"doctype": "PIM Item",
+			"name1": vendor_sku.title(),
+			"vendor_code": "KITV",
+			"vendor_sku": vendor_sku,
+			"item_type": item_type,
+			"kit_components": [
+				{"component": component, "quantity": quantity}
+				for component, quantity in components or []
+			]
+		}).insert(ignore_permissions=True)
+	
+	def test_multi_level_closure(self):
+		"""Components of nested kits are listed with depth and summed quantities"""
+		self.assertEqual(closure_of("KITV-DESK"), {
+			"KITV-DRAWER": (1, 2),
+			# 8 loose screws plus 4 in each of the 2 drawers
+			"KITV-SCREW": (1, 16),
+			"KITV-HANDLE": (2, 2),
+			"KITV-PANEL": (2, 10)
+		})
+		
+		kits = {row.kit: row.depth for row in get_containing_kits("KITV-HANDLE")}
+		self.assertEqual(kits, {"KITV-DRAWER": 1, "KITV-DESK": 2})
+	
+	def test_changes_propagate_to_parent_kits(self):
+		self.drawer.kit_components[0].quantity = 6
+		self.drawer.save(ignore_permissions=True)
+		
+		self.assertEqual(closure_of("KITV-DESK")["KITV-SCREW"], (1, 20))
+	
+	def test_cycles_are_rejected(self):
+		self.drawer.append("kit_components", {"component": "KITV-DESK", "quantity": 1})
+		self.assertRaises(frappe.ValidationError, self.drawer.save, ignore_permissions=True)
+		
+		self.desk.reload()
+		self.desk.append("kit_components", {"component": "KITV-DESK", "quantity": 1})
+		self.assertRaises(frappe.ValidationError, self.desk.save, ignore_permissions=True)
+	
+	def test_only_kits_have_components(self):
+		self.assertRaises(frappe.ValidationError, self.make_item, "BOX", "Item", [("KITV-SCREW", 1)])
+	
+	def test_rebuild_all_matches_incremental(self):
+		before = closure_of("KITV-DESK")
+		rebuild_all()
+		self.assertEqual(closure_of("KITV-DESK"), before)
@@ -13,6 +13,11 @@ frappe.ui.form.on("PIM Vendor", {
 		
 		// Set up event listeners for refreshing the table
 		setup_table_refresh_listeners(frm);
+		
+		if (!frm.is_new()) {
+			add_sync_buttons(frm);
+			setup_sync_progress_listener(frm);
+		}
 	},
 	
 	vendor_api_auth_type(frm) {
@@ -39,6 +44,70 @@ function toggle_auth_fields(frm) {
 	frm.set_df_property("vendor_api_password", "reqd", show_basic_fields);
 }
 
+function add_sync_buttons(frm) {
+	if (frm.doc.vendor_integration_enabled && frm.doc.vendor_api_base_url) {
+		frm.add_custom_button(__("Sync Now"), () => start_sync(frm, 0), __("Sync"));
+		frm.add_custom_button(__("Full Sync"), () => start_sync(frm, 1), __("Sync"));
+	}
+	
+	frm.add_custom_button(__("Import Feed File"), () => {
+		new frappe.ui.FileUploader({
+			allow_multiple: false,
+			restrictions: { allowed_file_types: [".json", ".ndjson", ".jsonl", ".csv"] },
+			on_success(file) {
+				frappe.call({
+					method: "imperium_pim.pim.doctype.pim_vendor.pim_vendor.start_bulk_import",
+					args: { vendor: frm.doc.name, file_url: file.file_url },
+					callback: (r) => show_queue_result(r.message)
+				});
+			}
+		});
+	}, __("Sync"));
+}
+
+function start_sync(frm, full) {
+	frappe.call({
+		method: "imperium_pim.pim.doctype.pim_vendor.pim_vendor.start_vendor_sync",
+		args: { vendor: frm.doc.name, full: full },
+		callback: (r) => show_queue_result(r.message)
+	});
+}
+
+function show_queue_result(result) {
+	if (!result) return;
+	frappe.show_alert({
+		message: result.message,
+		indicator: result.success ? 'green' : 'orange'
+	});
+}
+
+function setup_sync_progress_listener(frm) {
+	// Progress events are published by imperium_pim.vendor_sync.jobs
+	frappe.realtime.off("pim_vendor_sync_progress");
+	frappe.realtime.on("pim_vendor_sync_progress", function(data) {
+		if (!cur_frm || cur_frm.doc.name !== data.vendor) return;
+		
+		const title = data.operation === "import" ? __("Importing feed") : __("Syncing vendor");
+		
+		if (data.status === "running") {
+			let description = __("{0} records, {1}/s", [data.records, data.rate]);
+			if (data.eta_seconds) {
+				description += " · " + __("about {0} left", [Math.ceil(data.eta_seconds / 60) + " min"]);
+			}
+			cur_frm.dashboard.show_progress(title, data.expected ? data.records : 0, data.expected || 100, description);
+		} else {
+			cur_frm.dashboard.hide_progress(title);
+			frappe.show_alert({
+				message: data.status === "completed"
+					? __("{0} finished: {1} records", [title, data.records])
+					: __("{0} failed", [title]),
+				indicator: data.status === "completed" ? 'green' : 'red'
+			});
+			cur_frm.reload_doc();
+		}
+	});
+}
+
 function setup_table_refresh_listeners(frm) {
 	// Listen for new PIM Vendor Attribute documents
 	frappe.realtime.on("doc_update", function(data) {
@@ -4,9 +4,19 @@
 import frappe
 from frappe.model.document import Document
 
+from imperium_pim.catalog.realtime import record_changes
+from imperium_pim.performance.cache import invalidate_cache
+
 
 class PIMVendor(Document):
-	pass
+	def on_update(self):
+		"""Vendor counts and lists are cached for the dashboard"""
+		invalidate_cache()
+		record_changes("PIM Vendor", [self.name])
+	
+	def on_trash(self):
+		invalidate_cache()
+		record_changes("PIM Vendor", [self.name])
 
 
 @frappe.whitelist()
@@ -103,3 +113,40 @@ def update_attribute_mapping(vendor, vendor_attribute, pim_attribute):
 			"success": False,
 			"error": f"Error updating mapping: {str(e)}"
 		}
+
+
+@frappe.whitelist()
+def start_vendor_sync(vendor, full=0):
+	"""Queue a background sync of the vendor's API endpoints"""
+	from imperium_pim.vendor_sync.jobs import enqueue_vendor_sync
+
+	frappe.has_permission("PIM Vendor", "write", vendor, throw=True)
+
+	try:
+		return enqueue_vendor_sync(vendor, full=bool(int(full)))
+	except Exception as e:
+		frappe.log_error(f"Error queueing vendor sync: {str(e)}")
+		return {
+			"success": False,
+			"message": f"Error queueing sync: {str(e)}"
+		}
+
+
+@frappe.whitelist()
+def start_bulk_import(vendor, file_url):
+	"""Queue a background import of an uploaded JSON, NDJSON or CSV item feed"""
+	from imperium_pim.vendor_sync.jobs import enqueue_bulk_import
+
+	frappe.has_permission("PIM Vendor", "write", vendor, throw=True)
+	# the import job opens the file from disk without a permission check, so the caller must be able to read it
+	file_doc = frappe.get_doc("File", {"file_url": file_url})
+	frappe.has_permission("File", "read", file_doc, throw=True)
+
+	try:
+		return enqueue_bulk_import(vendor, file_url)
+	except Exception as e:
+		frappe.log_error(f"Error queueing bulk import: {str(e)}")
+		return {
+			"success": False,
+			"message": f"Error queueing import: {str(e)}"
+		}
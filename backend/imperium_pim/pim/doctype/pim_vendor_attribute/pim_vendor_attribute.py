@@ -5,6 +5,8 @@ import frappe
 import re
 from frappe.model.document import Document
 
+from imperium_pim.vendor_sync.mapping import invalidate_mapping_table
+
 
 class PIMVendorAttribute(Document):
 	def before_insert(self):
@@ -17,6 +19,14 @@ class PIMVendorAttribute(Document):
 		if not self.vendor_attribute_code:
 			self.vendor_attribute_code = self.generate_vendor_attribute_code()
 	
+	def on_update(self):
+		"""Recompile the vendor's mapping table on next use"""
+		invalidate_mapping_table(self.pim_vendor)
+	
+	def on_trash(self):
+		"""Recompile the vendor's mapping table on next use"""
+		invalidate_mapping_table(self.pim_vendor)
+	
 	def generate_vendor_attribute_code(self):
 		"""
 		Generate vendor_attribute_code using format: {vendor_code}-{slugified_vendor_attribute_name}
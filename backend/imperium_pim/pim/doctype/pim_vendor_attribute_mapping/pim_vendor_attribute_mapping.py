@@ -1,9 +1,16 @@
 # Copyright (c) 2025, Imperium Systems & Consulting and contributors
 # For license information, please see license.txt
 
-# import frappe
 from frappe.model.document import Document
 
+from imperium_pim.vendor_sync.mapping import invalidate_mapping_table
+
 
 class PIMVendorAttributeMapping(Document):
-	pass
+	def on_update(self):
+		"""Recompile the vendor's mapping table on next use"""
+		invalidate_mapping_table(self.pim_vendor)
+	
+	def on_trash(self):
+		"""Recompile the vendor's mapping table on next use"""
+		invalidate_mapping_table(self.pim_vendor)
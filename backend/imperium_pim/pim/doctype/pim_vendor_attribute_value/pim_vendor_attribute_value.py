@@ -5,6 +5,8 @@ import frappe
 import re
 from frappe.model.document import Document
 
+from imperium_pim.vendor_sync.mapping import invalidate_mapping_table
+
 
 class PIMVendorAttributeValue(Document):
 	def autoname(self):
@@ -28,6 +30,14 @@ class PIMVendorAttributeValue(Document):
 		if not self.vendor_attribute_value_code:
 			frappe.throw("Attribute Value Code is required and could not be auto-generated. Please ensure Parent Attribute and Attribute Value Name are provided.")
 	
+	def on_update(self):
+		"""Recompile the vendor's mapping table on next use"""
+		invalidate_mapping_table(self.pim_vendor)
+	
+	def on_trash(self):
+		"""Recompile the vendor's mapping table on next use"""
+		invalidate_mapping_table(self.pim_vendor)
+	
 	def generate_attribute_value_code(self):
 		"""Generate attribute_value_code using format: {vendor_attribute_code}-{slugified_value_name}"""
 		# Get vendor_attribute_code from the linked parent attribute
@@ -0,0 +1,71 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from imperium_pim.vendor_sync.hashing import (
+	clear_record_hashes,
+	filter_changed_records,
+	record_hash,
+	store_record_hashes
+)
+
+
+class TestPIMVendorRecordHash(FrappeTestCase):
+	def setUp(self):
+		"""Set up test data"""
+		if not frappe.db.exists("PIM Vendor", "HASHV"):
+			frappe.get_doc({
+				"doctype": "PIM Vendor",
+				"vendor_name": "Hash Test Vendor",
+				"vendor_code": "HASHV",
+				"vendor_active": 1
+			}).insert()
+		clear_record_hashes("HASHV")
+
+	def tearDown(self):
+		"""Clean up test data"""
+		clear_record_hashes("HASHV")
+
+	def test_record_hash_ignores_key_order(self):
+		"""Hashes only depend on content"""
+		self.assertEqual(
+			record_hash({"sku": "1", "name": "Chair"}),
+			record_hash({"name": "Chair", "sku": "1"})
+		)
+		self.assertNotEqual(
+			record_hash({"sku": "1", "name": "Chair"}),
+			record_hash({"sku": "1", "name": "Table"})
+		)
+
+	def test_unchanged_records_are_discarded(self):
+		"""Only new or modified records survive a second pass"""
+		records = [
+			{"vendor_sku": "A1", "name": "Chair"},
+			{"vendor_sku": "A2", "name": "Table"}
+		]
+		changed, hashes = filter_changed_records("HASHV", "items", records)
+		self.assertEqual(len(changed), 2)
+		store_record_hashes("HASHV", "items", hashes)
+
+		records[1] = {"vendor_sku": "A2", "name": "Dining Table"}
+		records.append({"vendor_sku": "A3", "name": "Bench"})
+		changed, hashes = filter_changed_records("HASHV", "items", records)
+
+		self.assertEqual([record["vendor_sku"] for record in changed], ["A2", "A3"])
+		self.assertEqual(set(hashes), {"A2", "A3"})
+
+	def test_hashes_are_scoped_per_endpoint(self):
+		"""The same vendor key on another endpoint is tracked separately"""
+		records = [{"vendor_sku": "A1", "price": 10}]
+		store_record_hashes("HASHV", "items", filter_changed_records("HASHV", "items", records)[1])
+
+		changed, _ = filter_changed_records("HASHV", "item_prices", records)
+		self.assertEqual(len(changed), 1)
+
+	def test_records_without_key_are_always_changed(self):
+		"""Records without a vendor key cannot be deduplicated"""
+		changed, hashes = filter_changed_records("HASHV", "items", [{"name": "No key"}])
+
+		self.assertEqual(len(changed), 1)
+		self.assertEqual(hashes, {})
@@ -0,0 +1,4 @@
+# Vendor integration for Imperium PIM
+#
+# Pulls vendor catalog data into PIM and translates vendor attribute codes
+# into PIM attribute codes using the approved vendor mappings.
@@ -0,0 +1,104 @@
+"""
+Resumable vendor sync checkpoints
+
+A checkpoint is kept in the hidden vendor_sync_checkpoint field of PIM Vendor
+while a sync is running:
+
+    {
+        "started": "2025-07-20 02:00:00",   # becomes vendor_last_sync on success
+        "since": "2025-07-19 02:00:00",     # modified-since value sent to the vendor
+        "endpoints": {
+            "items": {"cursor": {"page": 41}, "records": 20000, "done": false},
+            "item_prices": {"cursor": null, "records": 8000, "done": true}
+        }
+    }
+
+Progress is saved after every page is written, so an interrupted sync picks
+up at the next unwritten page of each endpoint. The checkpoint is cleared
+and vendor_last_sync advanced only when every configured endpoint
+completed, also when a run was limited to some of them: the others still
+need the changes since the old high-water mark.
+
+Checkpoints are written with update_modified=False so they do not create
+Version rows on the vendor.
+"""
+
+import json
+
+import frappe
+from frappe.utils import get_datetime, now_datetime
+
+
+class SyncCheckpoint:
+    """Progress of one vendor sync run"""
+
+    def __init__(self, vendor, started, since=None, endpoints=None):
+        self.vendor = vendor
+        self.started = started
+        self.since = since
+        self.endpoints = endpoints or {}
+
+    @classmethod
+    def load(cls, vendor_doc, full=False):
+        """
+        Resume the vendor's interrupted sync or start a new one
+
+        Args:
+            vendor_doc (Document): PIM Vendor
+            full (bool): ignore any checkpoint and the last sync high-water mark
+
+        Returns:
+            SyncCheckpoint
+        """
+        data = vendor_doc.vendor_sync_checkpoint
+        if data and not full:
+            if isinstance(data, str):
+                data = json.loads(data)
+            return cls(
+                vendor_doc.name,
+                get_datetime(data.get("started")),
+                since=get_datetime(data["since"]) if data.get("since") else None,
+                endpoints=data.get("endpoints") or {}
+            )
+
+        since = None if full else vendor_doc.vendor_last_sync
+        return cls(vendor_doc.name, now_datetime(), since=get_datetime(since) if since else None)
+
+    @property
+    def resumed(self):
+        return bool(self.endpoints)
+
+    def is_done(self, endpoint):
+        return bool(self.endpoints.get(endpoint, {}).get("done"))
+
+    def get_cursor(self, endpoint):
+        return self.endpoints.get(endpoint, {}).get("cursor")
+
+    def advance(self, endpoint, cursor, records):
+        """Record that a page was written and where the next page starts"""
+        state = self.endpoints.setdefault(endpoint, {"cursor": None, "records": 0, "done": False})
+        state["cursor"] = cursor
+        state["records"] += records
+        state["done"] = cursor is None
+        self.save()
+
+    def as_dict(self):
+        return {
+            "started": str(self.started),
+            "since": str(self.since) if self.since else None,
+            "endpoints": self.endpoints
+        }
+
+    def save(self):
+        frappe.db.set_value(
+            "PIM Vendor", self.vendor, "vendor_sync_checkpoint",
+            json.dumps(self.as_dict()), update_modified=False
+        )
+
+    def complete(self):
+        """Advance vendor_last_sync to the start of this run and drop the checkpoint"""
+        frappe.db.set_value(
+            "PIM Vendor", self.vendor,
+            {"vendor_last_sync": self.started, "vendor_sync_checkpoint": None},
+            update_modified=False
+        )
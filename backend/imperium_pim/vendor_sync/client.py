@@ -0,0 +1,370 @@
+"""
+HTTP client for vendor APIs
+
+One VendorClient is created per vendor sync. It holds a pooled requests
+session shared by all endpoint fetchers, a token bucket enforcing the
+vendor's rate limit across threads, and retry with exponential backoff for
+throttling and transient server errors.
+
+This module does not touch the database so fetch threads can use it freely.
+"""
+
+import random
+import threading
+import time
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from imperium_pim.vendor_sync.feeds import (
+    RECORD_KEYS,
+    detect_format,
+    get_record_reader,
+    iter_batches,
+    spool_response
+)
+
+# Keys vendors commonly use for the URL of the next page
+NEXT_KEYS = ("next", "next_url", "next_page_url")
+
+# Keys vendors commonly use to say whether more pages follow, and for the
+# number of records in all pages
+MORE_KEYS = ("has_more", "hasMore", "has_next", "more")
+TOTAL_KEYS = ("total", "total_count", "totalCount", "total_records")
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class VendorAPIError(Exception):
+    """Raised when a vendor API request fails after all retries"""
+
+    def __init__(self, message, status_code=None, url=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.url = url
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket
+
+    Args:
+        rate (float): requests per second, 0 or None disables limiting
+        burst (int): number of requests allowed back to back
+    """
+
+    def __init__(self, rate=None, burst=1):
+        self.rate = float(rate or 0)
+        self.capacity = max(int(burst or 1), 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class VendorClient:
+    """
+    Pooled, rate-limited HTTP client for one vendor API
+
+    Args:
+        base_url (str): vendor API base URL
+        auth_type (str): "Bearer" or "Basic"
+        api_key (str): bearer token
+        username (str): basic auth username
+        password (str): basic auth password
+        rate_limit (float): maximum requests per second across all threads
+        pool_size (int): maximum pooled connections to the vendor host
+        page_size (int): records requested per page
+        batch_size (int): records per batch when a page is streamed
+        max_retries (int): retries for throttled or failed requests
+        backoff (float): base delay in seconds for exponential backoff
+        timeout (float): per-request timeout in seconds
+    """
+
+    page_param = "page"
+    page_size_param = "page_size"
+
+    def __init__(self, base_url, auth_type=None, api_key=None, username=None, password=None,
+                 rate_limit=None, pool_size=8, page_size=500, batch_size=1000, max_retries=5,
+                 backoff=0.5, timeout=60):
+        self.base_url = base_url.rstrip("/") + "/"
+        self.page_size = int(page_size or 500)
+        self.batch_size = int(batch_size or 1000)
+        self.max_retries = int(max_retries)
+        self.backoff = float(backoff)
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(rate_limit, burst=pool_size)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(int(pool_size or 1), 1))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+
+        if auth_type == "Bearer" and api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+        elif auth_type == "Basic" and username:
+            self.session.auth = (username, password or "")
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def url_for(self, endpoint):
+        """Resolve an endpoint path against the base URL"""
+        return urljoin(self.base_url, endpoint.lstrip("/"))
+
+    def get(self, url, params=None, stream=False):
+        """
+        GET a URL with rate limiting and retries
+
+        Throttling (429) and 5xx responses as well as connection errors are
+        retried with exponential backoff and jitter. A Retry-After header from
+        the vendor takes precedence over the computed delay.
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise VendorAPIError(f"Request to {url} failed: {str(e)}", url=url)
+                self._sleep(attempt)
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                retry_after = response.headers.get("Retry-After")
+                response.close()
+                self._sleep(attempt, retry_after)
+                attempt += 1
+                continue
+
+            if response.status_code >= 400:
+                response.close()
+                raise VendorAPIError(
+                    f"Request to {url} failed with status {response.status_code}",
+                    status_code=response.status_code,
+                    url=url
+                )
+
+            return response
+
+    def _sleep(self, attempt, retry_after=None):
+        delay = None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                delay = None
+        if delay is None:
+            delay = self.backoff * (2 ** attempt)
+            delay += random.uniform(0, delay / 2)
+        time.sleep(delay)
+
+    def iter_pages(self, endpoint, params=None):
+        """
+        Yield the records of an endpoint one page at a time
+
+        A next-page URL from the response body or Link header is followed when
+        the vendor provides one. Otherwise page-number pagination is used,
+        stopping when the vendor's has-more or total fields say the records
+        are exhausted, or else at the first empty page. A short page is not
+        the end: vendors may serve fewer records than the page size asked for.
+        """
+        for records, cursor in self.iter_pages_with_cursor(endpoint, params=params):
+            if records:
+                yield records
+
+    def iter_pages_with_cursor(self, endpoint, params=None, cursor=None, stream=False):
+        """
+        Yield (records, cursor) for each page of an endpoint
+
+        The cursor describes where the following page starts, either
+        {"page": n} or {"url": next_url}, and is None after the last page.
+        Passing a saved cursor back in resumes the endpoint from that page.
+
+        With stream=True each page body is spooled to a temporary file and
+        parsed incrementally (see vendor_sync.feeds), and a page is yielded as
+        several batches of at most batch_size records. Every batch but the
+        last carries the cursor of its own page, so a sync interrupted in the
+        middle of a page resumes at the start of that page.
+        """
+        url = self.url_for(endpoint)
+        params = dict(params or {})
+        params.setdefault(self.page_size_param, self.page_size)
+        page = 1
+        # records read in this run, compared with the vendor's total when it
+        # sends one; unknown for runs resumed from a saved cursor
+        seen = 0
+
+        if cursor and cursor.get("url"):
+            url = cursor["url"]
+            page = None
+        elif cursor and cursor.get("page"):
+            page = int(cursor["page"])
+            seen = None
+
+        while url:
+            page_cursor = {"page": page} if page else {"url": url}
+            # next-page URLs already carry their own query string
+            request_params = dict(params, **{self.page_param: page}) if page else None
+            response = self.get(url, params=request_params, stream=stream)
+
+            page_info = {"count": 0, "next_url": None, "has_more": None, "total": None}
+            batches = self._read_streamed(response, page_info) if stream else self._read_json(response, page_info)
+
+            pending = None
+            for batch in batches:
+                if pending is not None:
+                    yield pending, page_cursor
+                pending = batch
+
+            next_url = page_info["next_url"]
+            if not next_url and response.links.get("next"):
+                next_url = response.links["next"].get("url")
+            if seen is not None:
+                seen += page_info["count"]
+
+            if next_url:
+                url = urljoin(response.url, next_url)
+                page = None
+                cursor = {"url": url}
+            elif page and has_more_pages(page_info, seen):
+                page += 1
+                cursor = {"page": page}
+            else:
+                url = None
+                cursor = None
+
+            yield pending or [], cursor
+
+    def _read_json(self, response, page_info):
+        """Parse a whole page body at once"""
+        try:
+            payload = response.json()
+        except ValueError:
+            raise VendorAPIError(f"Response from {response.url} is not valid JSON", url=response.url)
+        finally:
+            response.close()
+
+        records, page_info["next_url"] = parse_page(payload)
+        page_info["has_more"], page_info["total"] = parse_page_info(payload)
+        page_info["count"] = len(records)
+        yield records
+
+    def _read_streamed(self, response, page_info):
+        """Parse a page body incrementally, yielding batches of records"""
+        fmt = detect_format(response.headers.get("Content-Type"))
+        with spool_response(response) as spool:
+            reader = get_record_reader(spool, fmt)
+            try:
+                for batch in iter_batches(reader, self.batch_size):
+                    page_info["count"] += len(batch)
+                    yield batch
+            except ValueError as e:
+                raise VendorAPIError(f"Response from {response.url} is not valid {fmt}: {str(e)}", url=response.url)
+
+            meta = getattr(reader, "meta", {})
+            page_info["next_url"] = parse_page(meta)[1]
+            page_info["has_more"], page_info["total"] = parse_page_info(meta)
+
+
+def parse_page(payload):
+    """
+    Split a page payload into its records and the next-page URL
+
+    Accepts a bare list of records or an envelope object holding the records
+    under one of RECORD_KEYS, with an optional next URL under NEXT_KEYS or
+    links.next.
+
+    Returns:
+        tuple: (records, next_url)
+    """
+    if isinstance(payload, list):
+        return payload, None
+
+    if not isinstance(payload, dict):
+        return [], None
+
+    records = []
+    for key in RECORD_KEYS:
+        if isinstance(payload.get(key), list):
+            records = payload[key]
+            break
+
+    next_url = None
+    for key in NEXT_KEYS:
+        if isinstance(payload.get(key), str) and payload[key]:
+            next_url = payload[key]
+            break
+    if not next_url and isinstance(payload.get("links"), dict):
+        next_url = payload["links"].get("next") or None
+
+    return records, next_url
+
+
+def parse_page_info(payload):
+    """
+    Whether more pages follow and the number of records in all pages, as
+    far as an envelope object says
+
+    Returns:
+        tuple: (has_more, total), each None when the vendor does not send it
+    """
+    if not isinstance(payload, dict):
+        return None, None
+
+    has_more = None
+    for key in MORE_KEYS:
+        if isinstance(payload.get(key), bool):
+            has_more = payload[key]
+            break
+
+    total = None
+    for key in TOTAL_KEYS:
+        value = payload.get(key)
+        if isinstance(value, int) and not isinstance(value, bool):
+            total = value
+            break
+
+    return has_more, total
+
+
+def has_more_pages(page_info, seen=None):
+    """
+    Whether page-number pagination continues after a page
+
+    Args:
+        page_info (dict): count, has_more and total of the page just read
+        seen (int): records read so far, None when not known
+    """
+    if not page_info["count"]:
+        return False
+    if page_info["has_more"] is not None:
+        return page_info["has_more"]
+    if page_info["total"] is not None and seen is not None:
+        return seen < page_info["total"]
+    return True
@@ -0,0 +1,263 @@
+"""
+Vendor sync engine
+
+Fetches every configured endpoint of a PIM Vendor concurrently and streams the
+records into the bulk upsert path.
+
+Syncs are incremental: records changed since vendor_last_sync are requested
+when the vendor supports a modified-since parameter, and progress is
+checkpointed per endpoint so an interrupted sync resumes where it stopped
+(see vendor_sync.checkpoint). Records whose content hash matches the last
+written version are dropped before reaching the handlers (see
+vendor_sync.hashing).
+
+Only the HTTP work runs in fetch threads. Pages are handed to the calling
+thread through a bounded queue, and all database writes happen there, since
+the Frappe database connection is bound to the request/job thread. The
+bounded queue also applies backpressure when writes are slower than fetches.
+
+Usage:
+    bench --site [site-name] execute imperium_pim.vendor_sync.engine.sync_vendor --args "['ASH']"
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import frappe
+from frappe.utils import cint, flt
+
+from imperium_pim.vendor_sync.checkpoint import SyncCheckpoint
+from imperium_pim.vendor_sync.client import VendorClient
+from imperium_pim.vendor_sync.hashing import filter_changed_records, store_record_hashes
+from imperium_pim.vendor_sync.ingest import upsert_vendor_items
+
+# Endpoint key -> PIM Vendor field holding its path
+ENDPOINT_FIELDS = {
+    "items": "vendor_items_endpoint",
+    "item_prices": "vendor_item_prices_endpoint",
+    "item_categories": "vendor_item_categories_endpoint",
+    "master_items": "vendor_master_items_endpoint",
+    "packages": "vendor_packages_endpoint",
+    "package_prices": "vendor_package_prices_endpoint",
+    "package_categories": "vendor_package_categories_endpoint",
+    "collections": "vendor_collections_endpoint"
+}
+
+# Endpoint key -> callable(vendor_code, records) returning a dict of counts.
+# Endpoints without a handler are fetched and counted only.
+RECORD_HANDLERS = {
+    "items": upsert_vendor_items,
+    "master_items": upsert_vendor_items
+}
+
+# Endpoints whose pages can be hundreds of MB. Their bodies are spooled to
+# disk and parsed incrementally instead of being loaded with json.loads.
+STREAMED_ENDPOINTS = ("master_items", "collections")
+
+# Batches buffered between fetch threads and the writer
+QUEUE_SIZE = 16
+
+_DONE = object()
+
+
+def get_vendor_client(vendor_doc):
+    """Build a VendorClient from a PIM Vendor document"""
+    return VendorClient(
+        vendor_doc.vendor_api_base_url,
+        auth_type=vendor_doc.vendor_api_auth_type,
+        api_key=vendor_doc.get_password("vendor_api_key", raise_exception=False),
+        username=vendor_doc.vendor_api_username,
+        password=vendor_doc.get_password("vendor_api_password", raise_exception=False),
+        rate_limit=flt(vendor_doc.vendor_rate_limit),
+        pool_size=cint(vendor_doc.vendor_max_concurrency) or 4,
+        page_size=cint(vendor_doc.vendor_page_size) or 500
+    )
+
+
+def get_configured_endpoints(vendor_doc, endpoints=None):
+    """Return {endpoint key: path} for the endpoints set on the vendor"""
+    keys = endpoints or list(ENDPOINT_FIELDS)
+    return {
+        key: vendor_doc.get(ENDPOINT_FIELDS[key])
+        for key in keys
+        if key in ENDPOINT_FIELDS and vendor_doc.get(ENDPOINT_FIELDS[key])
+    }
+
+
+def fetch_endpoints(client, endpoints, max_workers=4, params=None, cursors=None):
+    """
+    Fetch several endpoints concurrently
+
+    Args:
+        client (VendorClient): client shared by all fetch threads
+        endpoints (dict): endpoint key -> path
+        max_workers (int): maximum endpoints fetched at the same time
+        params (dict): endpoint key -> extra query parameters
+        cursors (dict): endpoint key -> cursor to resume from
+
+    Yields:
+        tuple: (endpoint key, records, error, cursor). Each batch of records
+            comes with the cursor to resume from once it is written (None
+            after the last page); a failed endpoint yields
+            (key, None, exception, None) once.
+    """
+    pages = queue.Queue(maxsize=QUEUE_SIZE)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def fetch(key, path):
+        try:
+            for records, cursor in client.iter_pages_with_cursor(
+                path,
+                params=(params or {}).get(key),
+                cursor=(cursors or {}).get(key),
+                stream=key in STREAMED_ENDPOINTS
+            ):
+                if not put((key, records, None, cursor)):
+                    return
+        except Exception as e:
+            put((key, None, e, None))
+        finally:
+            put((key, _DONE, None, None))
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(endpoints) or 1)))
+    try:
+        for key, path in endpoints.items():
+            executor.submit(fetch, key, path)
+
+        remaining = len(endpoints)
+        while remaining:
+            key, records, error, cursor = pages.get()
+            if records is _DONE:
+                remaining -= 1
+                continue
+            yield key, records, error, cursor
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
+
+
+def get_endpoint_params(vendor_doc, checkpoint, endpoints):
+    """Build the modified-since query parameters for an incremental sync"""
+    param = (vendor_doc.vendor_modified_since_param or "").strip()
+    if not param or not checkpoint.since:
+        return {}
+    since = checkpoint.since.isoformat(timespec="seconds")
+    return {key: {param: since} for key in endpoints}
+
+
+def process_records(vendor, vendor_code, endpoint, records, handler, stats):
+    """
+    Pass the changed records of a batch to their handler
+
+    Unchanged records are dropped by content hash first, and the hashes of the
+    written records are stored once the handler succeeded. Counts are added to
+    the stats dict in place.
+    """
+    changed, hashes = filter_changed_records(vendor, endpoint, records)
+    stats["changed"] = stats.get("changed", 0) + len(changed)
+    stats["unchanged"] = stats.get("unchanged", 0) + len(records) - len(changed)
+
+    if changed:
+        for count, value in (handler(vendor_code, changed) or {}).items():
+            stats[count] = stats.get(count, 0) + value
+        store_record_hashes(vendor, endpoint, hashes)
+
+
+def sync_vendor(vendor, endpoints=None, handlers=None, full=False, progress=None):
+    """
+    Sync a vendor's configured endpoints into PIM
+
+    Args:
+        vendor (str): PIM Vendor name
+        endpoints (list): endpoint keys to sync, defaults to all configured
+            ones; a subset is kept in the checkpoint as done, and
+            vendor_last_sync only advances once a later run syncs the rest
+        handlers (dict): endpoint key -> record handler, defaults to RECORD_HANDLERS
+        full (bool): pull everything, ignoring vendor_last_sync and any checkpoint
+        progress (callable): called with the per-endpoint stats after every
+            committed batch
+
+    Returns:
+        dict: per-endpoint batch/record counts, handler counts and errors
+    """
+    vendor_doc = frappe.get_doc("PIM Vendor", vendor)
+    if not vendor_doc.vendor_api_base_url:
+        frappe.throw(f"Vendor {vendor} has no API base URL configured")
+
+    checkpoint = SyncCheckpoint.load(vendor_doc, full=full)
+    resumed = checkpoint.resumed
+    configured = {
+        key: path
+        for key, path in get_configured_endpoints(vendor_doc, endpoints).items()
+        if not checkpoint.is_done(key)
+    }
+    handlers = RECORD_HANDLERS if handlers is None else handlers
+    start_time = time.monotonic()
+
+    stats = {key: {"batches": 0, "records": 0} for key in configured}
+    errors = {}
+
+    with get_vendor_client(vendor_doc) as client:
+        for key, records, error, cursor in fetch_endpoints(
+            client,
+            configured,
+            max_workers=cint(vendor_doc.vendor_max_concurrency) or 4,
+            params=get_endpoint_params(vendor_doc, checkpoint, configured),
+            cursors={key: checkpoint.get_cursor(key) for key in configured}
+        ):
+            if error is not None:
+                errors[key] = str(error)
+                frappe.log_error(f"Vendor sync of {vendor} endpoint {key} failed: {str(error)}")
+                continue
+
+            endpoint_stats = stats[key]
+            endpoint_stats["batches"] += 1
+            endpoint_stats["records"] += len(records)
+
+            handler = handlers.get(key)
+            if handler and records:
+                process_records(vendor, vendor_doc.vendor_code, key, records, handler, endpoint_stats)
+
+            # the batch is only checkpointed once its records are committed
+            checkpoint.advance(key, cursor, len(records))
+            frappe.db.commit()
+
+            if progress:
+                progress(stats)
+
+    # vendor_last_sync covers every endpoint, so a run of some endpoints
+    # leaves their progress in the checkpoint until the others are synced too
+    all_done = all(checkpoint.is_done(key) for key in get_configured_endpoints(vendor_doc))
+    if not errors and all_done:
+        checkpoint.complete()
+        frappe.db.commit()
+
+    elapsed = time.monotonic() - start_time
+    total_records = sum(endpoint_stats["records"] for endpoint_stats in stats.values())
+    changed = sum(endpoint_stats.get("changed", 0) for endpoint_stats in stats.values())
+    compared = changed + sum(endpoint_stats.get("unchanged", 0) for endpoint_stats in stats.values())
+
+    return {
+        "success": not errors,
+        "vendor": vendor,
+        "incremental": bool(checkpoint.since),
+        "resumed": resumed,
+        "endpoints": stats,
+        "errors": errors,
+        "records": total_records,
+        "changed_records": changed,
+        "change_ratio": round(changed / compared, 4) if compared else 0,
+        "elapsed_seconds": round(elapsed, 3),
+        "records_per_second": round(total_records / elapsed, 1) if elapsed else 0
+    }
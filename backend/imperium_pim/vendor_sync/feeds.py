@@ -0,0 +1,241 @@
+"""
+Streaming readers for vendor feed payloads
+
+Master item and collection feeds can be hundreds of MB, which json.loads
+turns into several GB of Python objects. Feed bodies are instead spooled to a
+temporary file and parsed incrementally, yielding records in fixed-size
+batches, so peak memory depends on the batch size and not the feed size.
+
+Supported formats:
+    json    a top-level array, or an object holding the records in an array
+            under one of RECORD_KEYS ({"data": [...], "next": "..."})
+    ndjson  one JSON record per line
+    csv     header row followed by one record per row
+
+All readers take binary file objects.
+"""
+
+import codecs
+import csv
+import json
+import tempfile
+from itertools import islice
+
+# Keys vendors commonly use to wrap the records of a page
+RECORD_KEYS = ("data", "items", "results", "records")
+
+# Bytes read from the spooled file per step
+CHUNK_SIZE = 64 * 1024
+
+# Response bodies up to this size stay in memory, larger ones go to disk
+SPOOL_MEMORY_SIZE = 8 * 1024 * 1024
+
+WHITESPACE = " \t\r\n"
+
+
+class JSONRecordReader:
+    """
+    Incremental reader for JSON feeds
+
+    Iterating yields the records one at a time while keeping only a small
+    window of the file in memory. Top-level members of an envelope object
+    other than the records (e.g. a next-page URL) are collected in `meta`
+    and are complete once iteration has finished.
+
+    Args:
+        fp: binary or text file object
+        record_keys (tuple): envelope keys that may hold the records
+        chunk_size (int): characters read per step
+    """
+
+    def __init__(self, fp, record_keys=RECORD_KEYS, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.record_keys = record_keys
+        self.chunk_size = chunk_size
+        self.meta = {}
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def __iter__(self):
+        char = self._skip_whitespace()
+        if char == "[":
+            self.pos += 1
+            yield from self._iter_array()
+        elif char == "{":
+            self.pos += 1
+            yield from self._iter_envelope()
+        elif char:
+            self._error("Expected a JSON array or object")
+
+    def _fill(self, size=None):
+        """Append the next chunk to the unread part of the buffer"""
+        if self.eof:
+            return False
+        chunk = self.fp.read(size or self.chunk_size)
+        if isinstance(chunk, bytes):
+            chunk = self.text_decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        """Advance past whitespace and return the next character, or "" at the end"""
+        while True:
+            buffer = self.buffer
+            length = len(buffer)
+            pos = self.pos
+            while pos < length and buffer[pos] in WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < length:
+                return buffer[pos]
+            if not self._fill():
+                return ""
+
+    def _decode_value(self):
+        """Decode the complete JSON value starting at the current position"""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # the value continues in the next chunk; read at least as much
+                # again as is buffered so large values are not re-parsed often
+                if not self._fill(max(self.chunk_size, len(self.buffer) - self.pos)):
+                    raise
+                continue
+
+            # a number at the very end of the buffer may continue in the next chunk
+            if (end == len(self.buffer) and not self.eof
+                    and isinstance(value, (int, float)) and not isinstance(value, bool)):
+                if self._fill():
+                    continue
+
+            self.pos = end
+            return value
+
+    def _expect(self, char):
+        if self._skip_whitespace() != char:
+            self._error(f"Expected '{char}'")
+        self.pos += 1
+
+    def _iter_array(self):
+        if self._skip_whitespace() == "]":
+            self.pos += 1
+            return
+
+        while True:
+            yield self._decode_value()
+            char = self._skip_whitespace()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                self._error("Expected ',' or ']' in array")
+
+    def _iter_envelope(self):
+        if self._skip_whitespace() == "}":
+            self.pos += 1
+            return
+
+        found = False
+        while True:
+            key = self._decode_value()
+            if not isinstance(key, str):
+                self._error("Expected an object key")
+            self._expect(":")
+
+            if not found and key in self.record_keys and self._skip_whitespace() == "[":
+                found = True
+                self.pos += 1
+                yield from self._iter_array()
+            else:
+                value = self._decode_value()
+                # other lists are skipped rather than kept, they may be large
+                if not isinstance(value, list):
+                    self.meta[key] = value
+
+            char = self._skip_whitespace()
+            self.pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                self._error("Expected ',' or '}' in object")
+
+    def _error(self, message):
+        raise json.JSONDecodeError(message, self.buffer, self.pos)
+
+
+def iter_ndjson_records(fp):
+    """Yield the records of a newline-delimited JSON file"""
+    for line in fp:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_csv_records(fp, encoding="utf-8-sig"):
+    """Yield the rows of a CSV file with a header row as dicts"""
+    yield from csv.DictReader(codecs.iterdecode(fp, encoding))
+
+
+def detect_format(content_type=None, filename=None):
+    """Guess the feed format from a Content-Type header or file name"""
+    content_type = (content_type or "").lower()
+    filename = (filename or "").lower()
+
+    if "ndjson" in content_type or "jsonl" in content_type or filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if "csv" in content_type or filename.endswith(".csv"):
+        return "csv"
+    return "json"
+
+
+def get_record_reader(fp, fmt="json"):
+    """
+    Return an iterator over the records of a feed file
+
+    For JSON feeds the JSONRecordReader itself is returned, so envelope
+    members are available from its `meta` after iteration.
+    """
+    if fmt == "ndjson":
+        return iter_ndjson_records(fp)
+    if fmt == "csv":
+        return iter_csv_records(fp)
+    return JSONRecordReader(fp)
+
+
+def iter_batches(records, size):
+    """Group an iterable of records into lists of at most `size` records"""
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def spool_response(response, max_memory=SPOOL_MEMORY_SIZE):
+    """
+    Copy a streamed HTTP response body into a spooled temporary file
+
+    The response is consumed and closed. The caller owns the returned file,
+    positioned at its start.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    try:
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            spool.write(chunk)
+    except Exception:
+        spool.close()
+        raise
+    finally:
+        response.close()
+    spool.seek(0)
+    return spool
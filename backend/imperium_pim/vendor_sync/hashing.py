@@ -0,0 +1,138 @@
+"""
+Content-hash change detection for vendor feed records
+
+Most records of a nightly vendor feed are identical to the previous night.
+A hash of every record written to PIM is kept in PIM Vendor Record Hash,
+keyed by vendor, endpoint and the record's vendor key, so unchanged records
+are discarded with one lookup query per page, before any PIM document is
+loaded or written (and before any Version row is created for it).
+
+Hash rows get a deterministic name derived from (vendor, endpoint, key), so
+the lookup is a primary key IN query and storing is a single upsert per chunk.
+"""
+
+import hashlib
+import json
+
+import frappe
+from frappe.utils import now
+
+from imperium_pim.vendor_sync.ingest import ITEM_FIELD_ALIASES
+
+# Record fields tried, in order, to find the vendor key of a record
+RECORD_KEY_FIELDS = ITEM_FIELD_ALIASES["vendor_sku"] + ("code",)
+
+# Rows per upsert statement
+UPSERT_CHUNK_SIZE = 1000
+
+
+def record_hash(record):
+    """Stable hash of a record's content, independent of key order"""
+    payload = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def get_record_key(record):
+    """Return the vendor key of a record, or None if it has none"""
+    for field in RECORD_KEY_FIELDS:
+        value = record.get(field)
+        if value not in (None, ""):
+            return str(value).strip()
+    return None
+
+
+def get_hash_name(vendor, endpoint, record_key):
+    """Deterministic PIM Vendor Record Hash name for a vendor record"""
+    return hashlib.blake2b(
+        f"{vendor}\x1f{endpoint}\x1f{record_key}".encode(), digest_size=16
+    ).hexdigest()
+
+
+def filter_changed_records(vendor, endpoint, records):
+    """
+    Drop records whose content is unchanged since they were last written
+
+    Records without a vendor key are always treated as changed.
+
+    Returns:
+        tuple: (changed records, {record key: content hash} to store once the
+            changed records have been written)
+    """
+    candidates = []
+    for record in records:
+        key = get_record_key(record)
+        if key is None:
+            candidates.append((record, None, None, None))
+        else:
+            candidates.append((record, key, get_hash_name(vendor, endpoint, key), record_hash(record)))
+
+    names = [name for _, _, name, _ in candidates if name]
+    existing = {}
+    if names:
+        existing = dict(frappe.get_all(
+            "PIM Vendor Record Hash",
+            filters={"name": ["in", names]},
+            fields=["name", "content_hash"],
+            as_list=True
+        ))
+
+    changed = []
+    hashes = {}
+    for record, key, name, content_hash in candidates:
+        if name and existing.get(name) == content_hash:
+            continue
+        changed.append(record)
+        if key is not None:
+            hashes[key] = content_hash
+
+    return changed, hashes
+
+
+def store_record_hashes(vendor, endpoint, hashes):
+    """Insert or update the content hashes of written records"""
+    if not hashes:
+        return
+
+    timestamp = now()
+    user = frappe.session.user
+    rows = [
+        (get_hash_name(vendor, endpoint, key), vendor, endpoint, key, content_hash,
+         timestamp, timestamp, user, user)
+        for key, content_hash in hashes.items()
+    ]
+    columns = "name, pim_vendor, endpoint, record_key, content_hash, creation, modified, owner, modified_by"
+
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(chunk))
+        values = [value for row in chunk for value in row]
+        frappe.db.multisql({
+            "mariadb": f"""
+                INSERT INTO `tabPIM Vendor Record Hash` ({columns})
+                VALUES {placeholders}
+                ON DUPLICATE KEY UPDATE
+                    content_hash = VALUES(content_hash),
+                    modified = VALUES(modified)
+            """,
+            "postgres": f"""
+                INSERT INTO "tabPIM Vendor Record Hash" ({columns})
+                VALUES {placeholders}
+                ON CONFLICT (name) DO UPDATE SET
+                    content_hash = EXCLUDED.content_hash,
+                    modified = EXCLUDED.modified
+            """
+        }, values)
+
+
+def clear_record_hashes(vendor, record_key=None):
+    """
+    Forget stored hashes so the next sync rewrites the records
+
+    Args:
+        vendor (str): PIM Vendor name
+        record_key (str): only forget hashes of this vendor key
+    """
+    filters = {"pim_vendor": vendor}
+    if record_key:
+        filters["record_key"] = record_key
+    frappe.db.delete("PIM Vendor Record Hash", filters)
@@ -0,0 +1,174 @@
+"""
+Bulk upsert of vendor feed records into PIM Item
+
+Vendor feeds can carry hundreds of thousands of items, so records are written
+in batches: one query loads the existing items of a batch, new items are
+inserted with a single multi-row INSERT and only items whose fields actually
+changed are updated, with one bulk UPDATE per chunk of items.
+
+Bulk inserts bypass the PIM Item controller, so the SKU and UPC rules of
+PIMItem.before_save are applied here as well: logistics metrics are derived
+from the carton fields, new codes invalidate the negative cache of
+catalog.codes and written items go to the item change log, just as the
+controller does.
+"""
+
+import re
+
+import frappe
+from frappe.utils import flt, now
+
+from imperium_pim.catalog.changes import record_item_changes
+from imperium_pim.catalog.codes import invalidate_missing_codes
+from imperium_pim.catalog.logistics import METRIC_FIELDS, get_divisor, get_item_metrics
+
+# PIM Item field -> keys vendors commonly use for it, in order of preference
+ITEM_FIELD_ALIASES = {
+    "vendor_sku": ("vendor_sku", "sku", "item_number", "item_no", "id"),
+    "name1": ("name1", "name", "item_name", "title", "description"),
+    "brand": ("brand", "brand_name"),
+    "upc": ("upc", "upc_code", "barcode"),
+    "item_type": ("item_type", "type"),
+    "item_width_inches": ("item_width_inches", "width"),
+    "item_depth_inches": ("item_depth_inches", "depth", "length"),
+    "item_height_inches": ("item_height_inches", "height"),
+    "item_weight_lbs": ("item_weight_lbs", "weight"),
+    "carton_width_inches": ("carton_width_inches", "carton_width"),
+    "carton_depth_inches": ("carton_depth_inches", "carton_depth", "carton_length"),
+    "carton_height_inches": ("carton_height_inches", "carton_height"),
+    "carton_weight_lbs": ("carton_weight_lbs", "carton_weight")
+}
+
+FLOAT_FIELDS = (
+    "item_width_inches", "item_depth_inches", "item_height_inches", "item_weight_lbs",
+    "carton_width_inches", "carton_depth_inches", "carton_height_inches", "carton_weight_lbs"
+)
+
+ITEM_TYPES = ("Component", "Item", "Kit")
+
+# Fields compared to decide whether an existing item needs an update
+COMPARED_FIELDS = tuple(field for field in ITEM_FIELD_ALIASES if field != "vendor_sku")
+
+
+def normalize_item_record(vendor_code, record):
+    """
+    Map a vendor item payload onto PIM Item fields
+
+    Returns:
+        dict: PIM Item values including the generated sku, or None when the
+            record has no vendor SKU
+    """
+    row = {}
+    for field, aliases in ITEM_FIELD_ALIASES.items():
+        for alias in aliases:
+            value = record.get(alias)
+            if value not in (None, ""):
+                row[field] = value
+                break
+
+    vendor_sku = str(row.get("vendor_sku") or "").strip()
+    if not vendor_sku:
+        return None
+
+    row["vendor_sku"] = vendor_sku
+    row["vendor_code"] = vendor_code
+    row["sku"] = f"{vendor_code}-{vendor_sku}"
+
+    for field in FLOAT_FIELDS:
+        if field in row:
+            row[field] = flt(row[field])
+
+    if row.get("upc") is not None:
+        upc = str(row["upc"]).strip()
+        if re.match(r'^\d{12}$', upc):
+            row["upc"] = upc
+        else:
+            # an invalid feed code must not overwrite a valid stored one
+            row.pop("upc")
+
+    if row.get("item_type") not in ITEM_TYPES:
+        row.pop("item_type", None)
+
+    return row
+
+
+def upsert_vendor_items(vendor_code, records):
+    """
+    Insert or update a batch of vendor item payloads
+
+    Args:
+        vendor_code (str): PIM Vendor code the records belong to
+        records (list): vendor item payloads
+
+    Returns:
+        dict: counts of inserted, updated, identical and skipped records
+    """
+    stats = {"inserted": 0, "updated": 0, "identical": 0, "skipped": 0}
+
+    rows = {}
+    for record in records:
+        row = normalize_item_record(vendor_code, record)
+        if row is None:
+            stats["skipped"] += 1
+            continue
+        rows[row["sku"]] = row
+
+    if not rows:
+        return stats
+
+    existing = {
+        item.name: item
+        for item in frappe.get_all(
+            "PIM Item",
+            filters={"name": ["in", list(rows)]},
+            fields=["name", *COMPARED_FIELDS]
+        )
+    }
+
+    timestamp = now()
+    user = frappe.session.user
+    insert_fields = ["name", "sku", "vendor_code", "vendor_sku", *COMPARED_FIELDS, *METRIC_FIELDS, "status",
+                     "creation", "modified", "owner", "modified_by", "docstatus"]
+    inserts = []
+    updates = {}
+    upc_changed = False
+    divisor = get_divisor()
+
+    for sku, row in rows.items():
+        current = existing.get(sku)
+        if current is None:
+            metrics = get_item_metrics(row, divisor)
+            inserts.append([
+                sku, sku, vendor_code, row["vendor_sku"],
+                *(row.get(field) for field in COMPARED_FIELDS),
+                *(metrics[field] for field in METRIC_FIELDS),
+                "New", timestamp, timestamp, user, user, 0
+            ])
+            continue
+
+        changes = {
+            field: row[field]
+            for field in COMPARED_FIELDS
+            if field in row and row[field] != current.get(field)
+        }
+        if changes:
+            if any(field.startswith("carton_") for field in changes):
+                changes.update(get_item_metrics({**current, **changes}, divisor))
+            updates[sku] = changes
+            upc_changed = upc_changed or "upc" in changes
+            stats["updated"] += 1
+        else:
+            stats["identical"] += 1
+
+    if inserts:
+        frappe.db.bulk_insert("PIM Item", fields=insert_fields, values=inserts, ignore_duplicates=True)
+        stats["inserted"] = len(inserts)
+    if updates:
+        frappe.db.bulk_update("PIM Item", updates, chunk_size=1000, modified=timestamp, modified_by=user)
+
+    if inserts or upc_changed:
+        invalidate_missing_codes()
+    if inserts or updates:
+        record_item_changes([*updates, *(row[0] for row in inserts)])
+
+    return stats
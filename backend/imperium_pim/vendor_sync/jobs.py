@@ -0,0 +1,277 @@
+"""
+Background jobs for vendor syncs and bulk imports
+
+Syncs and imports never run inside a web request. They are enqueued as
+Frappe background jobs on the queue named by the `pim_sync_queue` site
+config key ("long" by default). To give vendor syncs dedicated workers,
+add the queue to common_site_config.json and set the site config key:
+
+    "workers": {"pim_sync": {"timeout": 14400}}
+    "pim_sync_queue": "pim_sync"
+
+Different vendors sync in parallel on as many workers as the queue has, while
+a Redis lock per vendor ensures no two workers process the same vendor. A job
+whose lock expired and was taken by another job stops at its next progress
+report (VendorLockLost), leaving the checkpoint to the job holding the lock.
+Progress (records processed, rate, ETA) is pushed to the PIM Vendor form as
+the `pim_vendor_sync_progress` realtime event.
+"""
+
+import time
+
+import frappe
+from frappe.utils import add_to_date, cint, now_datetime
+from frappe.utils.background_jobs import is_job_enqueued
+from redis.exceptions import LockError
+
+from imperium_pim.vendor_sync.engine import process_records, sync_vendor
+from imperium_pim.vendor_sync.feeds import detect_format, get_record_reader, iter_batches
+from imperium_pim.vendor_sync.ingest import upsert_vendor_items
+
+PROGRESS_EVENT = "pim_vendor_sync_progress"
+
+# Seconds between progress events
+PROGRESS_INTERVAL = 2
+
+# A vendor lock expires after this many seconds without progress, so a
+# crashed worker cannot block the vendor forever
+LOCK_TIMEOUT = 15 * 60
+
+JOB_TIMEOUT = 6 * 60 * 60
+
+IMPORT_BATCH_SIZE = 1000
+
+
+class VendorLockLost(Exception):
+    """Raised when another job took a vendor's lock while this job was syncing it"""
+
+
+def get_sync_queue():
+    return frappe.conf.get("pim_sync_queue") or "long"
+
+
+def get_job_id(vendor):
+    return f"pim_vendor_sync::{vendor}"
+
+
+def get_vendor_lock(vendor):
+    """Redis lock held while a vendor is being synced or imported"""
+    cache = frappe.cache()
+    return cache.lock(cache.make_key(f"imperium_pim:vendor_sync_lock:{vendor}"), timeout=LOCK_TIMEOUT)
+
+
+def release_vendor_lock(vendor, lock):
+    """Release a vendor lock; one that expired during a long step is logged rather than failing the job"""
+    try:
+        lock.release()
+    except LockError:
+        frappe.logger("imperium_pim").warning(f"Sync lock of {vendor} expired before the job finished")
+
+
+def is_vendor_syncing(vendor):
+    """Whether a sync or import for the vendor is queued or running"""
+    return is_job_enqueued(get_job_id(vendor)) or get_vendor_lock(vendor).locked()
+
+
+def enqueue_vendor_sync(vendor, full=False):
+    """
+    Enqueue a sync of one vendor
+
+    Returns:
+        dict: whether a job was enqueued and a message
+    """
+    if is_vendor_syncing(vendor):
+        return {"success": False, "message": f"A sync for {vendor} is already queued or running"}
+
+    frappe.enqueue(
+        "imperium_pim.vendor_sync.jobs.run_vendor_sync",
+        queue=get_sync_queue(),
+        timeout=JOB_TIMEOUT,
+        job_id=get_job_id(vendor),
+        deduplicate=True,
+        vendor=vendor,
+        full=full
+    )
+    return {"success": True, "message": f"Sync for {vendor} has been queued"}
+
+
+def enqueue_bulk_import(vendor, file_url):
+    """
+    Enqueue an import of an uploaded JSON, NDJSON or CSV item feed
+
+    Returns:
+        dict: whether a job was enqueued and a message
+    """
+    if is_vendor_syncing(vendor):
+        return {"success": False, "message": f"A sync for {vendor} is already queued or running"}
+
+    frappe.enqueue(
+        "imperium_pim.vendor_sync.jobs.run_bulk_import",
+        queue=get_sync_queue(),
+        timeout=JOB_TIMEOUT,
+        job_id=get_job_id(vendor),
+        deduplicate=True,
+        vendor=vendor,
+        file_url=file_url
+    )
+    return {"success": True, "message": f"Import for {vendor} has been queued"}
+
+
+def enqueue_scheduled_syncs():
+    """
+    Scheduler entry point: queue syncs for integration-enabled vendors
+
+    A vendor is due when its last sync is older than its sync interval.
+    """
+    vendors = frappe.get_all(
+        "PIM Vendor",
+        filters={"vendor_integration_enabled": 1, "vendor_active": 1},
+        fields=["name", "vendor_api_base_url", "vendor_last_sync", "vendor_sync_interval_hours"]
+    )
+
+    for vendor in vendors:
+        interval = cint(vendor.vendor_sync_interval_hours)
+        if not vendor.vendor_api_base_url or interval <= 0:
+            continue
+        if vendor.vendor_last_sync and vendor.vendor_last_sync > add_to_date(now_datetime(), hours=-interval):
+            continue
+        enqueue_vendor_sync(vendor.name)
+
+
+class ProgressReporter:
+    """
+    Publishes throttled progress events for a vendor and keeps its lock alive
+
+    Args:
+        vendor (str): PIM Vendor name
+        lock: the vendor's Redis lock
+        operation (str): "sync" or "import"
+        expected (int): expected number of records, used for the ETA
+    """
+
+    def __init__(self, vendor, lock, operation, expected=None):
+        self.vendor = vendor
+        self.lock = lock
+        self.operation = operation
+        self.expected = expected
+        self.started = time.monotonic()
+        self.last_published = 0
+        self.lock_lost = False
+
+    def __call__(self, stats, force=False):
+        now = time.monotonic()
+        if not force and now - self.last_published < PROGRESS_INTERVAL:
+            return
+        self.last_published = now
+        try:
+            self.lock.reacquire()
+        except LockError:
+            # expired during a long step; take it again unless another job has it
+            if not self.lock.acquire(blocking=False):
+                self.lock_lost = True
+                raise VendorLockLost(f"Sync lock of {self.vendor} was taken by another job")
+
+        processed = sum(endpoint_stats.get("records", 0) for endpoint_stats in stats.values())
+        elapsed = now - self.started
+        rate = processed / elapsed if elapsed else 0
+
+        eta = None
+        if self.expected and rate and processed < self.expected:
+            eta = round((self.expected - processed) / rate)
+
+        self.publish({
+            "status": "running",
+            "records": processed,
+            "expected": self.expected,
+            "rate": round(rate, 1),
+            "eta_seconds": eta,
+            "elapsed_seconds": round(elapsed),
+            "endpoints": stats
+        })
+
+    def publish(self, message):
+        message.update({"vendor": self.vendor, "operation": self.operation})
+        frappe.publish_realtime(PROGRESS_EVENT, message, doctype="PIM Vendor", docname=self.vendor)
+
+
+def get_expected_records(vendor):
+    """Estimate a full pull's size from the records written by earlier syncs"""
+    return frappe.db.count("PIM Vendor Record Hash", {"pim_vendor": vendor}) or None
+
+
+def stop_after_lock_lost(vendor, progress, error):
+    """End a job whose lock another job took; what it committed stays in the checkpoint"""
+    frappe.db.rollback()
+    frappe.logger("imperium_pim").warning(f"Stopped {progress.operation} of {vendor}: {str(error)}")
+    progress.publish({"status": "stopped", "error": str(error)})
+    return {"success": False, "message": str(error)}
+
+
+def run_vendor_sync(vendor, full=False):
+    """Background job: sync one vendor under its lock"""
+    lock = get_vendor_lock(vendor)
+    if not lock.acquire(blocking=False):
+        return {"success": False, "message": f"A sync for {vendor} is already running"}
+
+    expected = None
+    if full or not frappe.db.get_value("PIM Vendor", vendor, "vendor_last_sync"):
+        expected = get_expected_records(vendor)
+    progress = ProgressReporter(vendor, lock, "sync", expected=expected)
+
+    try:
+        result = sync_vendor(vendor, full=full, progress=progress)
+    except VendorLockLost as e:
+        return stop_after_lock_lost(vendor, progress, e)
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(f"Vendor sync of {vendor} failed: {str(e)}")
+        progress.publish({"status": "failed", "error": str(e)})
+        raise
+    finally:
+        if not progress.lock_lost:
+            release_vendor_lock(vendor, lock)
+
+    progress.publish({
+        "status": "completed" if result["success"] else "failed",
+        "records": result["records"],
+        "change_ratio": result["change_ratio"],
+        "rate": result["records_per_second"],
+        "errors": result["errors"]
+    })
+    return result
+
+
+def run_bulk_import(vendor, file_url):
+    """Background job: import an uploaded item feed for one vendor under its lock"""
+    lock = get_vendor_lock(vendor)
+    if not lock.acquire(blocking=False):
+        return {"success": False, "message": f"A sync for {vendor} is already running"}
+
+    progress = ProgressReporter(vendor, lock, "import")
+    stats = {"import": {"batches": 0, "records": 0}}
+    vendor_code = frappe.db.get_value("PIM Vendor", vendor, "vendor_code")
+
+    try:
+        file_doc = frappe.get_doc("File", {"file_url": file_url})
+        fmt = detect_format(filename=file_doc.file_name)
+
+        with open(file_doc.get_full_path(), "rb") as f:
+            for records in iter_batches(get_record_reader(f, fmt), IMPORT_BATCH_SIZE):
+                stats["import"]["batches"] += 1
+                stats["import"]["records"] += len(records)
+                process_records(vendor, vendor_code, "items", records, upsert_vendor_items, stats["import"])
+                frappe.db.commit()
+                progress(stats)
+    except VendorLockLost as e:
+        return stop_after_lock_lost(vendor, progress, e)
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(f"Bulk import for {vendor} from {file_url} failed: {str(e)}")
+        progress.publish({"status": "failed", "error": str(e)})
+        raise
+    finally:
+        if not progress.lock_lost:
+            release_vendor_lock(vendor, lock)
+
+    progress.publish({"status": "completed", "records": stats["import"]["records"], "endpoints": stats})
+    return {"success": True, "vendor": vendor, "stats": stats["import"]}
@@ -0,0 +1,252 @@
+"""
+Compiled vendor mapping tables
+
+Translating a vendor feed record needs two lookups per attribute: vendor
+attribute -> PIM attribute and vendor value -> PIM attribute value. Doing
+those through the ORM per record is far too slow for nightly feeds, so a
+vendor's approved mappings are compiled once into plain dictionaries and
+cached per worker.
+
+The cache is invalidated through a version token kept in Redis. Any change to
+a mapping, a vendor attribute or a vendor attribute value replaces the token
+for that vendor; a change to a PIM Attribute replaces the global token.
+"""
+
+import frappe
+
+# PIM attribute types whose values must go through a value mapping.
+# Every other type accepts the vendor value as-is.
+CODED_ATTRIBUTE_TYPES = ("Select", "MultiSelect")
+
+VENDOR_VERSION_KEY = "imperium_pim:vendor_mapping_version:{vendor}"
+GLOBAL_VERSION_KEY = "imperium_pim:vendor_mapping_version"
+
+# Per-worker cache of compiled tables, keyed by vendor
+_mapping_tables = {}
+
+
+class VendorMappingTable:
+    """
+    In-memory mapping tables for one vendor
+
+    Args:
+        vendor (str): PIM Vendor name
+        attributes (dict): vendor attribute key -> vendor attribute code. Keys
+            are the vendor attribute code and the lowercased attribute name
+        pim_attributes (dict): vendor attribute code -> (pim attribute code, attribute type)
+        values (dict): vendor attribute code -> {vendor value key -> pim value code}.
+            Keys are the vendor value code and the lowercased value name
+        version (tuple): version tokens the table was compiled against
+    """
+
+    __slots__ = ("vendor", "attributes", "pim_attributes", "values", "version")
+
+    def __init__(self, vendor, attributes, pim_attributes, values, version=None):
+        self.vendor = vendor
+        self.attributes = attributes
+        self.pim_attributes = pim_attributes
+        self.values = values
+        self.version = version
+
+    def translate(self, vendor_attributes):
+        """
+        Translate a dict of vendor attribute values into PIM attribute assignments
+
+        Args:
+            vendor_attributes (dict): vendor attribute code or name -> value.
+                Values may be a single value or a list for multi-valued attributes
+
+        Returns:
+            tuple: (assignments, unmapped) where assignments maps PIM attribute
+                code -> PIM value (code for coded attributes, raw value otherwise)
+                and unmapped lists (vendor attribute, value) pairs without a mapping
+        """
+        attributes = self.attributes
+        pim_attributes = self.pim_attributes
+        value_maps = self.values
+
+        assignments = {}
+        unmapped = []
+
+        for key, value in vendor_attributes.items():
+            if value is None or value == "":
+                continue
+
+            vendor_attribute = attributes.get(key)
+            if vendor_attribute is None:
+                vendor_attribute = attributes.get(str(key).strip().lower())
+            if vendor_attribute is None:
+                unmapped.append((key, value))
+                continue
+
+            pim_attribute, attribute_type = pim_attributes[vendor_attribute]
+            if attribute_type not in CODED_ATTRIBUTE_TYPES:
+                assignments[pim_attribute] = value
+                continue
+
+            value_map = value_maps.get(vendor_attribute, {})
+            if isinstance(value, (list, tuple)):
+                codes = []
+                for item in value:
+                    code = _lookup_value(value_map, item)
+                    if code is None:
+                        unmapped.append((key, item))
+                    else:
+                        codes.append(code)
+                if codes:
+                    assignments[pim_attribute] = codes
+            else:
+                code = _lookup_value(value_map, value)
+                if code is None:
+                    unmapped.append((key, value))
+                else:
+                    assignments[pim_attribute] = code
+
+        return assignments, unmapped
+
+    def translate_record(self, record):
+        """
+        Translate one vendor item payload
+
+        Args:
+            record (dict): vendor item payload with an "attributes" dict
+
+        Returns:
+            dict: vendor_sku, PIM attribute assignments and unmapped pairs
+        """
+        assignments, unmapped = self.translate(record.get("attributes") or {})
+        return {
+            "vendor_sku": record.get("vendor_sku") or record.get("sku"),
+            "attributes": assignments,
+            "unmapped": unmapped
+        }
+
+    def translate_records(self, records):
+        """Translate a batch of vendor item payloads"""
+        translate_record = self.translate_record
+        return [translate_record(record) for record in records]
+
+
+def _lookup_value(value_map, value):
+    """Resolve a vendor value by code first, then by lowercased name"""
+    code = value_map.get(value)
+    if code is None:
+        code = value_map.get(str(value).strip().lower())
+    return code
+
+
+def compile_mapping_table(vendor, version=None):
+    """
+    Build a VendorMappingTable from the vendor's approved mappings
+
+    Only attribute mappings marked as approved are used. Value mappings are
+    included when their vendor attribute has an approved attribute mapping.
+    The whole table is built from five queries regardless of mapping volume.
+    """
+    attribute_mappings = frappe.get_all(
+        "PIM Vendor Attribute Mapping",
+        filters={"pim_vendor": vendor, "approved": 1},
+        fields=["vendor_attribute", "pim_attribute"]
+    )
+    mapped = {m.vendor_attribute: m.pim_attribute for m in attribute_mappings}
+
+    attribute_types = {}
+    if mapped:
+        attribute_types = dict(frappe.get_all(
+            "PIM Attribute",
+            filters={"name": ["in", list(set(mapped.values()))]},
+            fields=["name", "attribute_type"],
+            as_list=True
+        ))
+
+    attributes = {}
+    pim_attributes = {}
+    for attr in frappe.get_all(
+        "PIM Vendor Attribute",
+        filters={"pim_vendor": vendor},
+        fields=["name", "vendor_attribute_name"]
+    ):
+        if attr.name not in mapped:
+            continue
+        pim_attribute = mapped[attr.name]
+        pim_attributes[attr.name] = (pim_attribute, attribute_types.get(pim_attribute))
+        attributes[attr.name] = attr.name
+        if attr.vendor_attribute_name:
+            attributes.setdefault(attr.vendor_attribute_name.strip().lower(), attr.name)
+
+    value_names = {}
+    if pim_attributes:
+        for value in frappe.get_all(
+            "PIM Vendor Attribute Value",
+            filters={"pim_vendor": vendor},
+            fields=["name", "vendor_attribute_value_name"]
+        ):
+            value_names[value.name] = value.vendor_attribute_value_name
+
+    values = {}
+    for value_mapping in frappe.get_all(
+        "PIM Vendor Attribute Value Mapping",
+        filters={"pim_vendor": vendor},
+        fields=["vendor_attribute_value", "pim_vendor_attribute", "pim_attribute_value"]
+    ):
+        if value_mapping.pim_vendor_attribute not in pim_attributes:
+            continue
+        value_map = values.setdefault(value_mapping.pim_vendor_attribute, {})
+        value_map[value_mapping.vendor_attribute_value] = value_mapping.pim_attribute_value
+        value_name = value_names.get(value_mapping.vendor_attribute_value)
+        if value_name:
+            value_map.setdefault(value_name.strip().lower(), value_mapping.pim_attribute_value)
+
+    return VendorMappingTable(vendor, attributes, pim_attributes, values, version=version)
+
+
+def get_mapping_version(vendor):
+    """Return the current (vendor, global) version tokens for a vendor's mappings"""
+    cache = frappe.cache()
+    return (
+        cache.get_value(VENDOR_VERSION_KEY.format(vendor=vendor)),
+        cache.get_value(GLOBAL_VERSION_KEY)
+    )
+
+
+def get_mapping_table(vendor):
+    """
+    Get the compiled mapping table for a vendor, recompiling if its version changed
+
+    The version check is a single Redis round-trip, so callers should fetch the
+    table once per batch rather than once per record.
+    """
+    version = get_mapping_version(vendor)
+    table = _mapping_tables.get(vendor)
+    if table is None or table.version != version:
+        table = compile_mapping_table(vendor, version=version)
+        _mapping_tables[vendor] = table
+    return table
+
+
+def translate_records(vendor, records):
+    """
+    Translate a batch of vendor item payloads into PIM attribute assignments
+
+    Args:
+        vendor (str): PIM Vendor name
+        records (list): vendor item payloads, each with an "attributes" dict
+
+    Returns:
+        list: one dict per record with vendor_sku, attributes and unmapped pairs
+    """
+    return get_mapping_table(vendor).translate_records(records)
+
+
+def invalidate_mapping_table(vendor):
+    """Invalidate the compiled mapping table of a vendor on every worker"""
+    if not vendor:
+        return
+    frappe.cache().set_value(VENDOR_VERSION_KEY.format(vendor=vendor), frappe.generate_hash(length=10))
+    _mapping_tables.pop(vendor, None)
+
+
+def invalidate_all_mapping_tables():
+    """Invalidate the compiled mapping tables of all vendors on every worker"""
+    frappe.cache().set_value(GLOBAL_VERSION_KEY, frappe.generate_hash(length=10))
+    _mapping_tables.clear()
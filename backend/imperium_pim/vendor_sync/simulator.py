@@ -0,0 +1,365 @@
+"""
+Local vendor API simulator
+
+A stub vendor API for tuning and benchmarking the sync engine without network
+access. It serves the eight endpoint types configured on PIM Vendor with a
+synthetic, deterministic catalog that is generated per request, so catalogs
+of millions of records cost no memory.
+
+Configurable behaviour:
+    records         catalog size per endpoint
+    max_page_size   upper bound for the page_size query parameter
+    pagination      "page" (bare list, page-number paging) or "link"
+                    (envelope with a next URL)
+    latency         seconds added to every response
+    error_rate      fraction of requests answered with 429 or 503
+    auth_type       None, "Bearer" or "Basic"; other credentials get 401
+
+Records are stamped with a `modified` time and the simulator honours a
+`modified_since` query parameter. touch() marks a fraction of the catalog as
+changed, so incremental and unchanged-record syncs can be measured too.
+
+Usage:
+    python -m imperium_pim.vendor_sync.simulator --port 8765 --records 100000 --latency 0.05
+
+or from code:
+
+    with VendorSimulator(records=10000, auth_type="Bearer", api_key="secret") as simulator:
+        ...  # point a PIM Vendor at simulator.base_url
+"""
+
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+# Endpoint key -> path served by the simulator
+ENDPOINTS = {
+    "items": "/v1/items",
+    "item_prices": "/v1/items/prices",
+    "item_categories": "/v1/items/categories",
+    "master_items": "/v1/master-items",
+    "packages": "/v1/packages",
+    "package_prices": "/v1/packages/prices",
+    "package_categories": "/v1/packages/categories",
+    "collections": "/v1/collections"
+}
+
+MODIFIED_SINCE_PARAM = "modified_since"
+
+# Modification time of every record that was never touched
+CATALOG_CREATED = datetime(2025, 1, 1)
+
+BRANDS = 250
+CATEGORIES = ("Living Room", "Bedroom", "Dining", "Office", "Outdoor", "Lighting", "Rugs", "Decor")
+COLORS = ("Black", "White", "Oak", "Walnut", "Grey")
+MATERIALS = ("Wood", "Metal", "Fabric", "Leather")
+
+
+def item_record(i, version):
+    return {
+        "vendor_sku": f"SIM{i:08d}",
+        "name": f"Simulated Item {i}" + (f" rev {version}" if version else ""),
+        "brand": f"Brand {i % BRANDS}",
+        "upc": f"{100000000000 + i:012d}",
+        "type": ("Component", "Item", "Kit")[i % 3],
+        "width": round(10 + (i % 50) * 0.5, 2),
+        "depth": round(12 + (i % 40) * 0.5, 2),
+        "height": round(8 + (i % 30) * 0.5, 2),
+        "weight": round(5 + (i % 100) * 0.25, 2),
+        "carton_width": round(12 + (i % 50) * 0.5, 2),
+        "carton_depth": round(14 + (i % 40) * 0.5, 2),
+        "carton_height": round(10 + (i % 30) * 0.5, 2),
+        "carton_weight": round(7 + (i % 100) * 0.25, 2)
+    }
+
+
+def master_item_record(i, version):
+    record = item_record(i, version)
+    record.update({
+        "color": COLORS[i % len(COLORS)],
+        "material": MATERIALS[i % len(MATERIALS)],
+        "description": f"Long form marketing copy for simulated item {i}. " * 4,
+        "images": [f"https://cdn.example.com/sim/{i}/{n}.jpg" for n in range(3)]
+    })
+    return record
+
+
+def price_record(key_field, prefix):
+    def build(i, version):
+        cost = round(20 + (i % 500) * 1.5 + version, 2)
+        return {key_field: f"{prefix}{i:08d}", "cost": cost, "msrp": round(cost * 2.2, 2), "currency": "USD"}
+    return build
+
+
+def category_record(key_field, prefix):
+    def build(i, version):
+        return {key_field: f"{prefix}{i:08d}", "category": CATEGORIES[(i + version) % len(CATEGORIES)]}
+    return build
+
+
+def package_record(i, version):
+    return {
+        "id": f"PKG{i:08d}",
+        "name": f"Simulated Package {i}" + (f" rev {version}" if version else ""),
+        "components": [{"vendor_sku": f"SIM{(i * 3 + n):08d}", "qty": n + 1} for n in range(3)]
+    }
+
+
+def collection_record(i, version):
+    return {
+        "code": f"COL{i:06d}",
+        "name": f"Simulated Collection {i}" + (f" rev {version}" if version else ""),
+        "items": [f"SIM{(i * 10 + n):08d}" for n in range(10)]
+    }
+
+
+RECORD_BUILDERS = {
+    "items": item_record,
+    "item_prices": price_record("vendor_sku", "SIM"),
+    "item_categories": category_record("vendor_sku", "SIM"),
+    "master_items": master_item_record,
+    "packages": package_record,
+    "package_prices": price_record("id", "PKG"),
+    "package_categories": category_record("id", "PKG"),
+    "collections": collection_record
+}
+
+
+class VendorSimulator:
+    """
+    Threaded stub vendor API server
+
+    Args:
+        records (int): records served per endpoint
+        max_page_size (int): largest page size honoured
+        pagination (str): "page" or "link"
+        latency (float): seconds added to every response
+        error_rate (float): fraction of requests that fail with 429 or 503
+        auth_type (str): None, "Bearer" or "Basic"
+        api_key (str): expected bearer token
+        username (str): expected basic auth username
+        password (str): expected basic auth password
+        host (str): interface to bind
+        port (int): port to bind, 0 picks a free one
+        seed (int): seed for the error generator
+    """
+
+    def __init__(self, records=10000, max_page_size=1000, pagination="page", latency=0.0,
+                 error_rate=0.0, auth_type=None, api_key=None, username=None, password=None,
+                 host="127.0.0.1", port=0, seed=0):
+        if pagination not in ("page", "link"):
+            raise ValueError("pagination must be 'page' or 'link'")
+
+        self.records = int(records)
+        self.max_page_size = int(max_page_size)
+        self.pagination = pagination
+        self.latency = float(latency)
+        self.error_rate = float(error_rate)
+        self.auth_type = auth_type
+        self.expected_auth = None
+        if auth_type == "Bearer":
+            self.expected_auth = f"Bearer {api_key or ''}"
+        elif auth_type == "Basic":
+            token = base64.b64encode(f"{username or ''}:{password or ''}".encode()).decode()
+            self.expected_auth = f"Basic {token}"
+
+        self.touched_stride = None
+        self.touched_at = None
+        self.revision = 0
+
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counters = {"requests": 0, "errors": 0, "records": 0, "bytes": 0}
+
+        self.server = ThreadingHTTPServer((host, port), SimulatorHandler)
+        self.server.daemon_threads = True
+        self.server.simulator = self
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def touch(self, fraction):
+        """
+        Change a fraction of every endpoint's records
+
+        Touched records get new content and a modified time of now, so a
+        following incremental sync only receives those.
+        """
+        with self.lock:
+            self.revision += 1
+            self.touched_stride = max(1, round(1 / fraction)) if fraction > 0 else None
+            # whole seconds, since vendors send modified_since at that precision
+            self.touched_at = datetime.now().replace(microsecond=0)
+
+    def reset_counters(self):
+        with self.lock:
+            for key in self.counters:
+                self.counters[key] = 0
+
+    def count(self, **values):
+        with self.lock:
+            for key, value in values.items():
+                self.counters[key] += value
+
+    def pick_error(self):
+        """Return the error status to answer with, or None"""
+        if not self.error_rate:
+            return None
+        with self.lock:
+            if self.random.random() >= self.error_rate:
+                return None
+            return self.random.choice((429, 503))
+
+    def is_touched(self, index):
+        return bool(self.touched_stride) and index % self.touched_stride == 0
+
+    def get_indexes(self, modified_since=None):
+        """Catalog positions visible for a modified-since filter, as a range"""
+        if not modified_since or modified_since < CATALOG_CREATED:
+            return range(self.records)
+        if self.touched_stride and self.touched_at > modified_since:
+            return range(0, self.records, self.touched_stride)
+        return range(0)
+
+    def build_record(self, endpoint, index):
+        touched = self.is_touched(index)
+        record = RECORD_BUILDERS[endpoint](index, self.revision if touched else 0)
+        modified = self.touched_at if touched else CATALOG_CREATED
+        record["modified"] = modified.isoformat(timespec="seconds")
+        return record
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # endpoint path -> key, resolved once
+    routes = {path: key for key, path in ENDPOINTS.items()}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        simulator = self.server.simulator
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if simulator.latency:
+            time.sleep(simulator.latency)
+
+        if simulator.expected_auth and self.headers.get("Authorization") != simulator.expected_auth:
+            simulator.count(requests=1, errors=1)
+            return self.send_json(401, {"error": "Unauthorized"})
+
+        endpoint = self.routes.get(url.path.rstrip("/"))
+        if not endpoint:
+            simulator.count(requests=1, errors=1)
+            return self.send_json(404, {"error": f"Unknown endpoint {url.path}"})
+
+        error = simulator.pick_error()
+        if error:
+            simulator.count(requests=1, errors=1)
+            if error == 429:
+                return self.send_json(429, {"error": "Too Many Requests"}, {"Retry-After": "0"})
+            return self.send_json(503, {"error": "Service Unavailable"})
+
+        try:
+            page = max(int(query.get("page", 1)), 1)
+            page_size = min(max(int(query.get("page_size", 100)), 1), simulator.max_page_size)
+            modified_since = query.get(MODIFIED_SINCE_PARAM)
+            modified_since = datetime.fromisoformat(modified_since) if modified_since else None
+        except ValueError as e:
+            simulator.count(requests=1, errors=1)
+            return self.send_json(400, {"error": str(e)})
+
+        indexes = simulator.get_indexes(modified_since)
+        start = (page - 1) * page_size
+        records = [simulator.build_record(endpoint, index) for index in indexes[start:start + page_size]]
+
+        if simulator.pagination == "link":
+            body = {"data": records, "total": len(indexes)}
+            if start + page_size < len(indexes):
+                body["next"] = f"{url.path}?{urlencode(dict(query, page=page + 1, page_size=page_size))}"
+        else:
+            body = records
+
+        size = self.send_json(200, body)
+        simulator.count(requests=1, records=len(records), bytes=size)
+
+    def send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        return len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--max-page-size", type=int, default=1000)
+    parser.add_argument("--pagination", choices=("page", "link"), default="page")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--auth-type", choices=("Bearer", "Basic"))
+    parser.add_argument("--api-key")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    simulator = VendorSimulator(
+        records=args.records,
+        max_page_size=args.max_page_size,
+        pagination=args.pagination,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        auth_type=args.auth_type,
+        api_key=args.api_key,
+        username=args.username,
+        password=args.password,
+        host=args.host,
+        port=args.port
+    )
+    print(f"Serving {args.records} records per endpoint at {simulator.base_url}")
+    for key, path in ENDPOINTS.items():
+        print(f"  {key:<20} {path}")
+
+    try:
+        simulator.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from imperium_pim.vendor_sync.client import RateLimiter, VendorAPIError, VendorClient
+from imperium_pim.vendor_sync.engine import fetch_endpoints
+
+
+class StubVendorHandler(BaseHTTPRequestHandler):
+    """Serves 25 records per endpoint with page-number or next-link pagination"""
+
+    total = 25
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        server = self.server
+        server.requests.append((url.path, query, self.headers.get("Authorization")))
+
+        if url.path == "/throttled" and server.throttled < 2:
+            server.throttled += 1
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+
+        if url.path == "/broken":
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        page = int(query.get("page", query.get("cursor", 1)))
+        page_size = int(query.get("page_size", 10))
+        start = (page - 1) * page_size
+        records = [{"vendor_sku": str(i)} for i in range(start, min(start + page_size, self.total))]
+
+        if url.path == "/linked":
+            body = {"data": records}
+            if start + page_size < self.total:
+                body["next"] = f"/linked?cursor={page + 1}&page_size={page_size}"
+        elif url.path == "/counted":
+            body = {"data": records, "total": self.total}
+        elif url.path == "/flagged":
+            body = {"data": records, "has_more": start + page_size < self.total}
+        else:
+            body = records
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class TestVendorClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubVendorHandler)
+        cls.server.requests = []
+        cls.server.throttled = 0
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.requests.clear()
+        self.server.throttled = 0
+
+    def test_page_number_pagination(self):
+        """Without paging fields, pages are requested until an empty page is returned"""
+        with VendorClient(self.base_url, page_size=10) as client:
+            pages = list(client.iter_pages("/items"))
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual([q["page"] for _, q, _ in self.server.requests], ["1", "2", "3", "4"])
+
+    def test_page_number_pagination_with_paging_fields(self):
+        """A total or has-more field ends pagination without an empty page"""
+        for path in ("/counted", "/flagged"):
+            self.server.requests.clear()
+            with VendorClient(self.base_url, page_size=10) as client:
+                records = [r for page in client.iter_pages(path) for r in page]
+
+            self.assertEqual(len(records), 25)
+            self.assertEqual([q["page"] for _, q, _ in self.server.requests], ["1", "2", "3"])
+
+    def test_next_link_pagination(self):
+        """A next URL in the envelope is followed until it disappears"""
+        with VendorClient(self.base_url, page_size=10) as client:
+            records = [r for page in client.iter_pages("/linked") for r in page]
+
+        self.assertEqual(len(records), 25)
+        self.assertEqual(records[-1]["vendor_sku"], "24")
+
+    def test_streamed_pages_are_batched(self):
+        """Streamed pages arrive in batches; only the last batch moves the cursor"""
+        with VendorClient(self.base_url, page_size=10, batch_size=4) as client:
+            batches = list(client.iter_pages_with_cursor("/linked", stream=True))
+
+        self.assertEqual([len(records) for records, _ in batches], [4, 4, 2, 4, 4, 2, 4, 1])
+        self.assertEqual(batches[0][1], {"page": 1})
+        self.assertTrue(batches[2][1]["url"].endswith("cursor=2&page_size=10"))
+        self.assertIsNone(batches[-1][1])
+
+    def test_resume_from_cursor(self):
+        """A saved cursor resumes the endpoint at the following page"""
+        with VendorClient(self.base_url, page_size=10) as client:
+            pages = list(client.iter_pages_with_cursor("/items"))
+            self.assertEqual([cursor for _, cursor in pages], [{"page": 2}, {"page": 3}, {"page": 4}, None])
+
+            resumed = list(client.iter_pages_with_cursor("/items", cursor={"page": 3}))
+
+        self.assertEqual([len(records) for records, _ in resumed], [5, 0])
+        self.assertEqual(resumed[0][0][0]["vendor_sku"], "20")
+
+    def test_bearer_auth_header(self):
+        """Bearer credentials are sent on every request"""
+        with VendorClient(self.base_url, auth_type="Bearer", api_key="secret") as client:
+            list(client.iter_pages("/items"))
+
+        self.assertTrue(all(auth == "Bearer secret" for _, _, auth in self.server.requests))
+
+    def test_retries_throttled_requests(self):
+        """429 responses are retried honouring Retry-After"""
+        with VendorClient(self.base_url, page_size=50, backoff=0) as client:
+            pages = list(client.iter_pages("/throttled"))
+
+        self.assertEqual(len(pages[0]), 25)
+        # two throttled attempts, the page and the empty page after it
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_gives_up_after_max_retries(self):
+        """Persistent server errors raise VendorAPIError"""
+        with VendorClient(self.base_url, max_retries=2, backoff=0) as client:
+            with self.assertRaises(VendorAPIError) as context:
+                list(client.iter_pages("/broken"))
+
+        self.assertEqual(context.exception.status_code, 500)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_fetch_endpoints_concurrently(self):
+        """All endpoints are drained and failures are reported per endpoint"""
+        endpoints = {"items": "/items", "collections": "/linked", "packages": "/broken"}
+        with VendorClient(self.base_url, page_size=10, max_retries=0) as client:
+            results = list(fetch_endpoints(client, endpoints, max_workers=3))
+
+        records = {}
+        errors = {}
+        for key, page, error, cursor in results:
+            if error is not None:
+                errors[key] = error
+            else:
+                records[key] = records.get(key, 0) + len(page)
+
+        self.assertEqual(records, {"items": 25, "collections": 25})
+        self.assertEqual(list(errors), ["packages"])
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_rate_limit_spaces_requests(self):
+        """Requests beyond the burst wait for new tokens"""
+        limiter = RateLimiter(rate=50, burst=1)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
@@ -0,0 +1,92 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import io
+import json
+import unittest
+
+from imperium_pim.vendor_sync.feeds import (
+    JSONRecordReader,
+    detect_format,
+    get_record_reader,
+    iter_batches
+)
+
+
+class TestJSONRecordReader(unittest.TestCase):
+    def setUp(self):
+        self.records = [
+            {"vendor_sku": str(i), "name": f"Item {i} é", "price": i * 1.25, "tags": ["a", "b"]}
+            for i in range(50)
+        ]
+
+    def read(self, payload, chunk_size=7):
+        reader = JSONRecordReader(io.BytesIO(payload.encode()), chunk_size=chunk_size)
+        return list(reader), reader.meta
+
+    def test_top_level_array(self):
+        """Records split across many small chunks are decoded intact"""
+        records, meta = self.read(json.dumps(self.records))
+
+        self.assertEqual(records, self.records)
+        self.assertEqual(meta, {})
+
+    def test_envelope_with_metadata(self):
+        """Records are read from the envelope and other members kept as meta"""
+        payload = json.dumps({
+            "total": 50,
+            "data": self.records,
+            "facets": [1, 2, 3],
+            "next": "/items?cursor=abc"
+        }, indent=2)
+        records, meta = self.read(payload)
+
+        self.assertEqual(records, self.records)
+        self.assertEqual(meta, {"total": 50, "next": "/items?cursor=abc"})
+
+    def test_numbers_on_chunk_boundaries(self):
+        """Numbers cut by a chunk boundary are not truncated"""
+        numbers = list(range(0, 100000, 997))
+        for chunk_size in (1, 2, 3, 5):
+            with self.subTest(chunk_size=chunk_size):
+                records, _ = self.read(json.dumps(numbers), chunk_size=chunk_size)
+                self.assertEqual(records, numbers)
+
+    def test_empty_feeds(self):
+        """Empty arrays and envelopes yield nothing"""
+        self.assertEqual(self.read("[]")[0], [])
+        self.assertEqual(self.read('{"data": []}')[0], [])
+        self.assertEqual(self.read("")[0], [])
+
+    def test_malformed_feed_raises(self):
+        """Truncated feeds raise a decode error"""
+        with self.assertRaises(ValueError):
+            self.read(json.dumps(self.records)[:-20])
+
+
+class TestFeedFormats(unittest.TestCase):
+    def test_ndjson(self):
+        payload = b'{"vendor_sku": "1"}\n\n{"vendor_sku": "2"}\n'
+        records = list(get_record_reader(io.BytesIO(payload), "ndjson"))
+
+        self.assertEqual(records, [{"vendor_sku": "1"}, {"vendor_sku": "2"}])
+
+    def test_csv(self):
+        payload = '\ufeffvendor_sku,name\n1,"Chair, oak"\n2,Table\n'.encode()
+        records = list(get_record_reader(io.BytesIO(payload), "csv"))
+
+        self.assertEqual(records, [
+            {"vendor_sku": "1", "name": "Chair, oak"},
+            {"vendor_sku": "2", "name": "Table"}
+        ])
+
+    def test_detect_format(self):
+        self.assertEqual(detect_format("application/x-ndjson"), "ndjson")
+        self.assertEqual(detect_format("text/csv; charset=utf-8"), "csv")
+        self.assertEqual(detect_format(filename="feed.jsonl"), "ndjson")
+        self.assertEqual(detect_format("application/json"), "json")
+
+    def test_iter_batches(self):
+        batches = list(iter_batches(range(25), 10))
+
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
@@ -0,0 +1,24 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import unittest
+
+from imperium_pim.vendor_sync.ingest import normalize_item_record
+
+
+class TestNormalizeItemRecord(unittest.TestCase):
+    def test_fields_are_mapped_from_aliases(self):
+        row = normalize_item_record("ACME", {"sku": " 42 ", "title": "Chair", "width": "20.5", "type": "Kit"})
+
+        self.assertEqual(row["sku"], "ACME-42")
+        self.assertEqual(row["name1"], "Chair")
+        self.assertEqual(row["item_width_inches"], 20.5)
+        self.assertEqual(row["item_type"], "Kit")
+
+    def test_invalid_upc_is_left_out(self):
+        """An invalid feed UPC must not be written over the stored one"""
+        self.assertEqual(normalize_item_record("ACME", {"sku": "1", "upc": "012345678905"})["upc"], "012345678905")
+        self.assertNotIn("upc", normalize_item_record("ACME", {"sku": "1", "upc": "12-34"}))
+
+    def test_record_without_sku_is_skipped(self):
+        self.assertIsNone(normalize_item_record("ACME", {"name": "No SKU"}))
@@ -0,0 +1,46 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import unittest
+from unittest.mock import patch
+
+from redis.exceptions import LockError
+
+from imperium_pim.vendor_sync.jobs import ProgressReporter, VendorLockLost
+
+
+class ExpiredLock:
+    """Lock that expired; acquire succeeds only when no other job took it"""
+
+    def __init__(self, taken):
+        self.taken = taken
+        self.acquired = 0
+
+    def reacquire(self):
+        raise LockError("expired")
+
+    def acquire(self, blocking=True):
+        self.acquired += 1
+        return not self.taken
+
+
+class TestProgressReporter(unittest.TestCase):
+    def test_expired_lock_is_taken_again(self):
+        lock = ExpiredLock(taken=False)
+        progress = ProgressReporter("JOBV", lock, "sync")
+
+        with patch.object(ProgressReporter, "publish") as publish:
+            progress({"items": {"records": 10}}, force=True)
+
+        self.assertEqual(lock.acquired, 1)
+        self.assertFalse(progress.lock_lost)
+        publish.assert_called_once()
+
+    def test_lock_taken_by_another_job_stops_the_job(self):
+        progress = ProgressReporter("JOBV", ExpiredLock(taken=True), "sync")
+
+        with patch.object(ProgressReporter, "publish") as publish:
+            self.assertRaises(VendorLockLost, progress, {"items": {"records": 10}}, force=True)
+
+        self.assertTrue(progress.lock_lost)
+        publish.assert_not_called()
@@ -0,0 +1,148 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from imperium_pim.vendor_sync.mapping import (
+    VendorMappingTable,
+    get_mapping_table,
+    invalidate_mapping_table,
+    translate_records
+)
+
+
+class TestVendorMappingTable(FrappeTestCase):
+    def test_translate_coded_and_free_text_attributes(self):
+        """Coded attributes go through the value map, others pass through"""
+        table = VendorMappingTable(
+            "MAPV",
+            attributes={"MAPV-color": "MAPV-color", "color": "MAPV-color", "MAPV-notes": "MAPV-notes"},
+            pim_attributes={"MAPV-color": ("test_color", "Select"), "MAPV-notes": ("test_notes", "LongText")},
+            values={"MAPV-color": {"MAPV-color-red": "test_color-red", "red": "test_color-red"}}
+        )
+
+        assignments, unmapped = table.translate({
+            "Color": "Red",
+            "MAPV-notes": "Solid wood",
+            "MAPV-size": "Large"
+        })
+
+        self.assertEqual(assignments, {"test_color": "test_color-red", "test_notes": "Solid wood"})
+        self.assertEqual(unmapped, [("MAPV-size", "Large")])
+
+    def test_translate_multi_valued_attribute(self):
+        """Each value of a list is mapped and unknown values are reported"""
+        table = VendorMappingTable(
+            "MAPV",
+            attributes={"MAPV-finish": "MAPV-finish"},
+            pim_attributes={"MAPV-finish": ("test_finish", "MultiSelect")},
+            values={"MAPV-finish": {"oak": "test_finish-oak", "walnut": "test_finish-walnut"}}
+        )
+
+        record = table.translate_record({
+            "vendor_sku": "100",
+            "attributes": {"MAPV-finish": ["Oak", "Walnut", "Teak"]}
+        })
+
+        self.assertEqual(record["vendor_sku"], "100")
+        self.assertEqual(record["attributes"], {"test_finish": ["test_finish-oak", "test_finish-walnut"]})
+        self.assertEqual(record["unmapped"], [("MAPV-finish", "Teak")])
+
+
+class TestCompiledVendorMappings(FrappeTestCase):
+    def setUp(self):
+        """Set up a vendor with one approved attribute and value mapping"""
+        if not frappe.db.exists("PIM Vendor", "MAPV"):
+            frappe.get_doc({
+                "doctype": "PIM Vendor",
+                "vendor_name": "Mapping Test Vendor",
+                "vendor_code": "MAPV",
+                "vendor_active": 1
+            }).insert()
+
+        if not frappe.db.exists("PIM Attribute", "test_map_color"):
+            frappe.get_doc({
+                "doctype": "PIM Attribute",
+                "attribute_code": "test_map_color",
+                "attribute_name": "Color",
+                "attribute_type": "Select"
+            }).insert()
+
+        if not frappe.db.exists("PIM Attribute Value", "test_map_color-red"):
+            frappe.get_doc({
+                "doctype": "PIM Attribute Value",
+                "pim_attribute": "test_map_color",
+                "attribute_value_name": "Red"
+            }).insert()
+
+        if not frappe.db.exists("PIM Vendor Attribute", "MAPV-colour"):
+            frappe.get_doc({
+                "doctype": "PIM Vendor Attribute",
+                "pim_vendor": "MAPV",
+                "vendor_attribute_name": "Colour"
+            }).insert()
+
+        if not frappe.db.exists("PIM Vendor Attribute Value", "MAPV-colour-rouge"):
+            frappe.get_doc({
+                "doctype": "PIM Vendor Attribute Value",
+                "pim_vendor": "MAPV",
+                "pim_vendor_attribute": "MAPV-colour",
+                "vendor_attribute_value_name": "Rouge"
+            }).insert()
+
+        if not frappe.db.exists("PIM Vendor Attribute Mapping", "MAPV-colour-map"):
+            frappe.get_doc({
+                "doctype": "PIM Vendor Attribute Mapping",
+                "pim_vendor": "MAPV",
+                "vendor_attribute": "MAPV-colour",
+                "pim_attribute": "test_map_color",
+                "approved": 1
+            }).insert()
+
+        if not frappe.db.exists("PIM Vendor Attribute Value Mapping", "MAPV-colour-rouge-map"):
+            frappe.get_doc({
+                "doctype": "PIM Vendor Attribute Value Mapping",
+                "pim_vendor": "MAPV",
+                "vendor_attribute_value": "MAPV-colour-rouge",
+                "pim_attribute_value": "test_map_color-red",
+                "pim_vendor_attribute": "MAPV-colour",
+                "pim_attribute": "test_map_color"
+            }).insert()
+
+    def approve_mapping(self, name):
+        """Restore the shared fixture's approval, through the controller so the table is recompiled"""
+        mapping = frappe.get_doc("PIM Vendor Attribute Mapping", name)
+        mapping.approved = 1
+        mapping.save()
+
+    def test_translate_records(self):
+        """Vendor codes and names are both translated to PIM codes"""
+        records = translate_records("MAPV", [
+            {"vendor_sku": "A1", "attributes": {"Colour": "Rouge"}},
+            {"vendor_sku": "A2", "attributes": {"MAPV-colour": "MAPV-colour-rouge"}}
+        ])
+
+        self.assertEqual(records[0]["attributes"], {"test_map_color": "test_map_color-red"})
+        self.assertEqual(records[1]["attributes"], {"test_map_color": "test_map_color-red"})
+
+    def test_unapproved_mapping_is_ignored(self):
+        """Revoking approval takes effect on the next lookup"""
+        get_mapping_table("MAPV")
+        mapping = frappe.get_doc("PIM Vendor Attribute Mapping", "MAPV-colour-map")
+        mapping.approved = 0
+        mapping.save()
+        self.addCleanup(self.approve_mapping, "MAPV-colour-map")
+
+        records = translate_records("MAPV", [{"vendor_sku": "A1", "attributes": {"Colour": "Rouge"}}])
+
+        self.assertEqual(records[0]["attributes"], {})
+        self.assertEqual(records[0]["unmapped"], [("Colour", "Rouge")])
+
+    def test_table_is_cached_until_invalidated(self):
+        """The compiled table is reused until its version changes"""
+        table = get_mapping_table("MAPV")
+        self.assertIs(get_mapping_table("MAPV"), table)
+
+        invalidate_mapping_table("MAPV")
+        self.assertIsNot(get_mapping_table("MAPV"), table)
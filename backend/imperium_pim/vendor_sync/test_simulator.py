@@ -0,0 +1,69 @@
+# Copyright (c) 2025, Imperium Systems & Consulting and Contributors
+# See license.txt
+
+import unittest
+from datetime import datetime
+
+from imperium_pim.vendor_sync.client import VendorAPIError, VendorClient
+from imperium_pim.vendor_sync.engine import fetch_endpoints
+from imperium_pim.vendor_sync.simulator import ENDPOINTS, VendorSimulator
+
+
+class TestVendorSimulator(unittest.TestCase):
+    def test_serves_all_endpoints(self):
+        """Every endpoint type is drained completely through the client"""
+        with VendorSimulator(records=120, pagination="link") as simulator:
+            with VendorClient(simulator.base_url, page_size=50) as client:
+                counts = {}
+                for key, records, error, _ in fetch_endpoints(client, ENDPOINTS, max_workers=4):
+                    self.assertIsNone(error)
+                    counts[key] = counts.get(key, 0) + len(records)
+
+        self.assertEqual(counts, {key: 120 for key in ENDPOINTS})
+
+    def test_page_size_is_capped(self):
+        """Page sizes above max_page_size are served in smaller pages, and all of them are read"""
+        with VendorSimulator(records=5000, max_page_size=1000) as simulator:
+            with VendorClient(simulator.base_url, page_size=1500) as client:
+                pages = list(client.iter_pages(ENDPOINTS["items"]))
+
+        self.assertEqual([len(page) for page in pages], [1000] * 5)
+        self.assertEqual(pages[-1][-1]["vendor_sku"], "SIM00004999")
+        # without a next link or total, the empty sixth page ends the endpoint
+        self.assertEqual(simulator.counters["requests"], 6)
+
+    def test_auth_is_enforced(self):
+        """Requests with the wrong credentials are rejected"""
+        with VendorSimulator(records=5, auth_type="Basic", username="api", password="secret") as simulator:
+            with VendorClient(simulator.base_url, auth_type="Basic", username="api", password="secret") as client:
+                self.assertEqual(len(list(client.iter_pages(ENDPOINTS["items"]))[0]), 5)
+
+            with VendorClient(simulator.base_url, auth_type="Basic", username="api", password="wrong") as client:
+                with self.assertRaises(VendorAPIError) as context:
+                    list(client.iter_pages(ENDPOINTS["items"]))
+
+        self.assertEqual(context.exception.status_code, 401)
+
+    def test_errors_are_retried(self):
+        """Injected 429/503 responses are absorbed by client retries"""
+        with VendorSimulator(records=200, error_rate=0.3, seed=7) as simulator:
+            with VendorClient(simulator.base_url, page_size=20, max_retries=10, backoff=0) as client:
+                records = [r for page in client.iter_pages(ENDPOINTS["item_prices"]) for r in page]
+
+        self.assertEqual(len(records), 200)
+        self.assertGreater(simulator.counters["errors"], 0)
+
+    def test_modified_since_returns_touched_records(self):
+        """After touch() an incremental request only sees the changed records"""
+        with VendorSimulator(records=100) as simulator:
+            since = datetime.now().replace(microsecond=0).isoformat()
+            with VendorClient(simulator.base_url, page_size=100) as client:
+                self.assertEqual(list(client.iter_pages(ENDPOINTS["items"], params={"modified_since": since})), [])
+
+                simulator.touch(0.1)
+                changed = list(client.iter_pages(ENDPOINTS["items"], params={"modified_since": "2025-06-01T00:00:00"}))
+                everything = list(client.iter_pages(ENDPOINTS["items"], params={"modified_since": "2024-12-31T00:00:00"}))
+
+        self.assertEqual(len(changed[0]), 10)
+        self.assertTrue(all("rev 1" in record["name"] for record in changed[0]))
+        self.assertEqual(len(everything[0]), 100)
@@ -251,6 +251,7 @@ exec gunicorn \
     --max-requests 1000 \
     --max-requests-jitter 100 \
     --preload \
+    --config /home/frappe/gunicorn.conf.py \
     --access-logfile - \
     --error-logfile - \
     frappe.app:application
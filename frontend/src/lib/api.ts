@@ -36,6 +36,77 @@ export interface Product {
   modified: string;
 }
 
+export interface MethodMetrics {
+  method: string;
+  count: number;
+  errors: number;
+  client_errors: number;
+  error_rate: number;
+  total_seconds: number;
+  avg_ms: number;
+  p50_ms: number;
+  p95_ms: number;
+  p99_ms: number;
+  avg_queries: number;
+  p95_queries: number;
+  avg_db_ms: number;
+  db_share: number;
+}
+
+export interface MetricsSummary {
+  success: boolean;
+  methods: MethodMetrics[];
+  total_requests?: number;
+  timestamp?: string;
+  message?: string;
+}
+
+// Nested query: fields of the root plus relation name -> nested selection
+export interface QuerySelection {
+  fields?: string[];
+  filters?: Record<string, unknown>;
+  limit?: number;
+  offset?: number;
+  order_by?: string;
+  [relation: string]: QuerySelection | string[] | Record<string, unknown> | number | string | undefined;
+}
+
+export interface QueryResult<T = Record<string, unknown>> {
+  success: boolean;
+  data: T[];
+  queries: number;
+  message?: string;
+}
+
+// Catalog change deltas pushed over socket.io, and replayed by getChanges.
+// Pushed deltas list updated records by name only; getChanges adds their
+// fields for doctypes whose every record the user may read.
+export interface CatalogDelta {
+  id: string;
+  doctype: string;
+  updated?: Record<string, unknown>[];
+  deleted?: string[];
+  reset?: boolean;
+  count?: number | null;
+}
+
+export interface ChangeSubscription {
+  success: boolean;
+  event: string;
+  doctypes: string[];
+  rooms: Record<string, string>;
+  cursor: string;
+  message?: string;
+}
+
+export interface ChangeLog {
+  success: boolean;
+  deltas: CatalogDelta[];
+  cursor?: string;
+  reset: boolean;
+  message?: string;
+}
+
 class ApiClient {
   private baseUrl: string;
 
@@ -197,6 +268,11 @@ class ApiClient {
     return this.request<DashboardStats>('/method/imperium_pim.api.dashboard.get_dashboard_stats');
   }
 
+  // Request metrics
+  async getMetricsSummary(sortBy: string = 'total_seconds', limit: number = 50): Promise<MetricsSummary> {
+    return this.request<MetricsSummary>(`/method/imperium_pim.api.metrics.get_metrics_summary?sort_by=${sortBy}&limit=${limit}`);
+  }
+
   // Products
   async getProducts(limit: number = 20, offset: number = 0): Promise<Product[]> {
     return this.request<Product[]>(`/method/imperium_pim.api.items.get_item_list?limit=${limit}&offset=${offset}`);
@@ -206,6 +282,29 @@ class ApiClient {
     return this.request<Product>(`/method/imperium_pim.api.items.get_item_details?item_id=${encodeURIComponent(name)}`);
   }
 
+  // Items, vendors or attributes with nested relations in one request
+  async query<T = Record<string, unknown>>(
+    root: 'items' | 'vendors' | 'attributes' | 'attribute_values',
+    selection: QuerySelection
+  ): Promise<QueryResult<T>> {
+    return this.request<QueryResult<T>>('/method/imperium_pim.api.query.query', {
+      method: 'POST',
+      body: JSON.stringify({ root, selection })
+    });
+  }
+
+  // Realtime catalog changes: event, rooms and cursor to listen from
+  async subscribeChanges(doctypes?: string[]): Promise<ChangeSubscription> {
+    const query = doctypes ? `?doctypes=${encodeURIComponent(JSON.stringify(doctypes))}` : '';
+    return this.request<ChangeSubscription>(`/method/imperium_pim.api.changes.subscribe${query}`);
+  }
+
+  // Deltas missed while disconnected; refetch instead when reset is set
+  async getChanges(since: string, doctypes?: string[]): Promise<ChangeLog> {
+    const query = doctypes ? `&doctypes=${encodeURIComponent(JSON.stringify(doctypes))}` : '';
+    return this.request<ChangeLog>(`/method/imperium_pim.api.changes.get_changes?since=${encodeURIComponent(since)}${query}`);
+  }
+
   // Generic DocType operations
   async getDoc(doctype: string, name: string) {
     return this.request(`/method/frappe.client.get?doctype=${doctype}&name=${encodeURIComponent(name)}`);
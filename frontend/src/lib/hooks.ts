@@ -6,6 +6,7 @@ import { apiClient } from './api';
 export const queryKeys = {
   ping: ['ping'] as const,
   dashboardStats: ['dashboard', 'stats'] as const,
+  metricsSummary: (sortBy?: string) => ['metrics', 'summary', { sortBy }] as const,
   products: (limit?: number, offset?: number) => ['products', { limit, offset }] as const,
   product: (name: string) => ['product', name] as const,
 };
@@ -30,6 +31,16 @@ export function useDashboardStats() {
   });
 }
 
+// Request metrics
+export function useMetricsSummary(sortBy: string = 'total_seconds') {
+  return useQuery({
+    queryKey: queryKeys.metricsSummary(sortBy),
+    queryFn: () => apiClient.getMetricsSummary(sortBy),
+    staleTime: 30 * 1000, // 30 seconds
+    refetchInterval: 60 * 1000, // Refetch every minute
+  });
+}
+
 // Products
 export function useProducts(limit: number = 20, offset: number = 0) {
   return useQuery({